@@ -0,0 +1,455 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Banco SQLite de Resultados (consultas indexadas + migração dos CSVs)
+
+dados_pacientes.csv precisa ser lido inteiro para qualquer pergunta do tipo
+"todos os pacientes ALTO desta semana", e existe em dois formatos: com a
+coluna Modo (calculadora com albumina opcional) e sem ela
+(calculadora_desktop.py), às vezes misturados no mesmo arquivo. Este módulo
+oferece um banco SQLite opcional:
+
+- Tabela `resultados` com data/hora em ISO ('AAAA-MM-DD HH:MM:SS', ordenável),
+  entradas, escores, modo e categoria; albumina ausente = NULL
+- Índices por data, (categoria, data) e (modo, data): as consultas por
+  período e categoria percorrem só as linhas pedidas, em milissegundos mesmo
+  com milhões de linhas
+- Inserções em lote, cada lote numa única transação
+- Migração dos CSVs nos dois formatos. Linhas sem Modo recebem o modo
+  deduzido da albumina, como no restante da calculadora. Cada linha guarda
+  a origem e o número da linha de origem; a origem é o caminho absoluto
+  (resolvido) do arquivo, ou um rótulo dado com --origem. Dois arquivos de
+  mesmo nome em pastas diferentes são origens diferentes
+- Migração incremental: migrar de novo a mesma origem só insere as linhas
+  com número de linha ainda não visto. Isso vale para o CSV que só cresce
+  no fim (como o da calculadora); um arquivo reescrito ou reordenado com o
+  mesmo caminho deve ser migrado com outro rótulo de origem
+- Linhas com valor não finito, entrada fora das faixas do formulário
+  (pipeline_pacientes.FAIXAS_ENTRADA), escore fora de 0-100 ou modo COMPLETO
+  sem albumina são puladas e apontadas, como em pontuar_csv
+
+USO:
+    python banco_resultados.py migrar dados_pacientes.csv resultados.db
+    python banco_resultados.py migrar siteA/dados_pacientes.csv resultados.db --origem siteA
+    python banco_resultados.py consultar resultados.db --categoria ALTO --desde 2025-12-15
+    python banco_resultados.py benchmark [--linhas 1000000]
+"""
+
+import argparse
+import csv
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from pipeline_pacientes import CAMPOS_ENTRADA, FAIXAS_ENTRADA, MODO_COMPLETO, MODO_SIMPLIFICADO, validar_faixas
+from pontuar_csv import COLUNAS_ENTRADA, COLUNAS_SAIDA, montar_linha
+
+TAMANHO_LOTE_PADRAO = 10000
+
+CAMPOS_ESCORE = ('escore_fenotipico', 'escore_ingestao', 'escore_inflamatorio',
+                 'escore_gravidade', 'escore_final')
+
+# Universo de saída de todos os submódulos e do integrador
+FAIXA_ESCORE = (0, 100)
+
+_COLUNA_DO_CAMPO = {campo: coluna for coluna, campo in COLUNAS_ENTRADA.items()}
+
+# Colunas da tabela, na ordem de inserção
+COLUNAS_TABELA = ('data_hora', 'modo') + CAMPOS_ENTRADA + CAMPOS_ESCORE + ('categoria', 'origem', 'linha_origem')
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    data_hora TEXT NOT NULL,
+    modo TEXT NOT NULL,
+    {', '.join(f'{campo} REAL' for campo in CAMPOS_ENTRADA + CAMPOS_ESCORE)},
+    categoria TEXT,
+    origem TEXT,
+    linha_origem INTEGER,
+    UNIQUE (origem, linha_origem)
+);
+CREATE INDEX IF NOT EXISTS idx_resultados_data ON resultados (data_hora);
+CREATE INDEX IF NOT EXISTS idx_resultados_categoria_data ON resultados (categoria, data_hora);
+CREATE INDEX IF NOT EXISTS idx_resultados_modo_data ON resultados (modo, data_hora);
+"""
+
+# ==============================================================================
+# CONVERSÃO DAS LINHAS DO CSV
+# ==============================================================================
+
+def _numero(texto, coluna):
+    """float finito de um campo do CSV (vírgula decimal aceita); vazio ou N/A vira None"""
+    texto = (texto or '').strip().replace(',', '.')
+    if texto.upper() in ('', 'N/A'):
+        return None
+    try:
+        valor = float(texto)
+    except ValueError:
+        raise ValueError(f"{coluna} inválido: {texto!r}") from None
+    if not math.isfinite(valor):
+        raise ValueError(f"{coluna} inválido: {texto!r}")
+    return valor
+
+
+def _data_hora_iso(data, hora):
+    """'DD/MM/AAAA' + 'HH:MM:SS' da calculadora -> 'AAAA-MM-DD HH:MM:SS'"""
+    try:
+        return datetime.strptime(f"{data.strip()} {hora.strip()}", '%d/%m/%Y %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
+    except (ValueError, AttributeError):
+        raise ValueError(f"Data/Hora inválida: {data!r} {hora!r}") from None
+
+
+def registro_da_linha(linha, origem=None, linha_origem=None):
+    """Registro do banco a partir de uma linha do CSV (dict coluna -> texto)
+
+    Aceita os dois formatos de dados_pacientes.csv; sem a coluna Modo (ou com
+    ela vazia), o modo é deduzido da albumina.
+
+    Raises:
+    -------
+    ValueError : data/hora ou campo obrigatório inválido, valor não finito,
+                 entrada fora de FAIXAS_ENTRADA, escore fora de 0-100 ou modo
+                 COMPLETO sem albumina
+    """
+    registro = {'data_hora': _data_hora_iso(linha.get('Data'), linha.get('Hora'))}
+    for coluna, campo in COLUNAS_ENTRADA.items():
+        registro[campo] = _numero(linha.get(coluna), coluna)
+        if registro[campo] is None and campo != 'albumina':
+            raise ValueError(f"{coluna} vazio")
+    validar_faixas({campo: (math.nan if registro[campo] is None else registro[campo]) for campo in CAMPOS_ENTRADA},
+                   _COLUNA_DO_CAMPO)
+    for coluna, campo in COLUNAS_SAIDA.items():
+        if campo in CAMPOS_ESCORE:
+            registro[campo] = _numero(linha.get(coluna), coluna)
+            if registro[campo] is not None and not FAIXA_ESCORE[0] <= registro[campo] <= FAIXA_ESCORE[1]:
+                raise ValueError(f"{coluna} fora da faixa {FAIXA_ESCORE[0]}-{FAIXA_ESCORE[1]}: {registro[campo]}")
+    categoria = (linha.get('Categoria') or '').strip()
+    registro['categoria'] = categoria if categoria and categoria != 'SEM REGRA ATIVADA' else None
+
+    modo = (linha.get('Modo') or '').strip()
+    if not modo:
+        modo = MODO_COMPLETO if registro['albumina'] is not None else MODO_SIMPLIFICADO
+    elif modo == MODO_COMPLETO and registro['albumina'] is None:
+        raise ValueError("Modo COMPLETO sem albumina")
+    registro['modo'] = modo
+    registro['origem'] = origem
+    registro['linha_origem'] = linha_origem
+    return registro
+
+
+def texto_iso(momento):
+    """date, datetime ou texto ISO -> texto comparável com data_hora"""
+    if isinstance(momento, datetime):
+        return momento.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(momento, date):
+        return momento.isoformat()
+    return str(momento)
+
+# ==============================================================================
+# BANCO
+# ==============================================================================
+
+class BancoResultados:
+    """Resultados dos pacientes num arquivo SQLite
+
+    Parâmetros:
+    -----------
+    caminho : str
+        Arquivo do banco (criado se não existir) ou ':memory:'
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        if caminho != ':memory:':
+            # WAL: leitores não bloqueiam a gravação (e vice-versa)
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("PRAGMA synchronous=NORMAL")
+        # 64 MB de cache de páginas: os índices cabem na memória durante cargas grandes
+        self.conexao.execute("PRAGMA cache_size=-65536")
+        self.conexao.executescript(_ESQUEMA)
+
+    def fechar(self):
+        self.conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def inserir_varios(self, registros, tamanho_lote=TAMANHO_LOTE_PADRAO):
+        """Insere registros (dicts com as chaves de COLUNAS_TABELA), um lote por transação
+
+        Registros com (origem, linha_origem) já presentes são ignorados.
+
+        Retorna:
+        --------
+        int : registros de fato inseridos
+        """
+        sql = (f"INSERT OR IGNORE INTO resultados ({', '.join(COLUNAS_TABELA)}) "
+               f"VALUES ({', '.join('?' * len(COLUNAS_TABELA))})")
+        inseridos = 0
+        lote = []
+
+        def gravar():
+            nonlocal inseridos
+            with self.conexao:
+                antes = self.conexao.total_changes
+                self.conexao.executemany(sql, lote)
+                inseridos += self.conexao.total_changes - antes
+            lote.clear()
+
+        for registro in registros:
+            lote.append([registro.get(coluna) for coluna in COLUNAS_TABELA])
+            if len(lote) >= tamanho_lote:
+                gravar()
+        if lote:
+            gravar()
+        return inseridos
+
+    def inserir(self, registro):
+        return self.inserir_varios([registro])
+
+    def _filtro(self, categoria, modo, desde, ate):
+        condicoes, parametros = [], []
+        if categoria is not None:
+            condicoes.append("categoria = ?")
+            parametros.append(categoria)
+        if modo is not None:
+            condicoes.append("modo = ?")
+            parametros.append(modo)
+        if desde is not None:
+            condicoes.append("data_hora >= ?")
+            parametros.append(texto_iso(desde))
+        if ate is not None:
+            condicoes.append("data_hora < ?")
+            parametros.append(texto_iso(ate))
+        return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", parametros
+
+    def consultar(self, categoria=None, modo=None, desde=None, ate=None, limite=None):
+        """Resultados filtrados, em ordem de data/hora
+
+        Parâmetros:
+        -----------
+        categoria, modo : str, opcional
+        desde, ate : date, datetime ou texto ISO, opcional
+            Período [desde, ate); uma data sem hora vale a partir de 00:00
+        limite : int, opcional
+
+        Retorna:
+        --------
+        list de dict (colunas da tabela)
+        """
+        where, parametros = self._filtro(categoria, modo, desde, ate)
+        sql = f"SELECT * FROM resultados{where} ORDER BY data_hora"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(int(limite))
+        cursor = self.conexao.execute(sql, parametros)
+        colunas = [descricao[0] for descricao in cursor.description]
+        return [dict(zip(colunas, linha)) for linha in cursor]
+
+    def contar(self, categoria=None, modo=None, desde=None, ate=None):
+        where, parametros = self._filtro(categoria, modo, desde, ate)
+        return self.conexao.execute(f"SELECT COUNT(*) FROM resultados{where}", parametros).fetchone()[0]
+
+    def contar_por_categoria(self, desde=None, ate=None):
+        """dict categoria -> número de pacientes no período"""
+        where, parametros = self._filtro(None, None, desde, ate)
+        sql = f"SELECT categoria, COUNT(*) FROM resultados{where} GROUP BY categoria"
+        return {categoria: n for categoria, n in self.conexao.execute(sql, parametros)}
+
+    def plano(self, categoria=None, modo=None, desde=None, ate=None):
+        """Plano de execução (EXPLAIN QUERY PLAN) de consultar(), para conferir o índice usado"""
+        where, parametros = self._filtro(categoria, modo, desde, ate)
+        linhas = self.conexao.execute(f"EXPLAIN QUERY PLAN SELECT * FROM resultados{where} ORDER BY data_hora",
+                                      parametros)
+        return [linha[-1] for linha in linhas]
+
+# ==============================================================================
+# MIGRAÇÃO DOS CSVs
+# ==============================================================================
+
+def migrar_csv(caminho_csv, banco, tamanho_lote=TAMANHO_LOTE_PADRAO, delimitador=',', origem=None):
+    """Carrega no banco um CSV da calculadora (com ou sem a coluna Modo)
+
+    Parâmetros:
+    -----------
+    origem : str, opcional
+        Rótulo da origem gravado em cada linha (padrão: caminho absoluto
+        resolvido do arquivo). Linhas com (origem, número da linha) já
+        migradas são ignoradas, então migrar de novo só acrescenta as linhas
+        novas do fim do arquivo
+
+    Retorna:
+    --------
+    dict : linhas (válidas lidas), inseridas, repetidas (já migradas antes),
+           erros [(linha, motivo)]
+    """
+    if origem is None:
+        origem = os.path.realpath(caminho_csv)
+    resumo = {'linhas': 0, 'inseridas': 0, 'repetidas': 0, 'erros': []}
+
+    def registros(leitor, cabecalho):
+        for campos in leitor:
+            if not campos:
+                continue
+            try:
+                registro = registro_da_linha(montar_linha(cabecalho, campos), origem, leitor.line_num)
+            except ValueError as e:
+                resumo['erros'].append((leitor.line_num, str(e)))
+                continue
+            resumo['linhas'] += 1
+            yield registro
+
+    with open(caminho_csv, newline='', encoding='utf-8-sig') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = [coluna.strip() for coluna in next(leitor, [])]
+        if not cabecalho:
+            raise ValueError(f"Arquivo vazio: {caminho_csv}")
+        faltando = [coluna for coluna in ('Data', 'Hora', *COLUNAS_ENTRADA) if coluna not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas ausentes no CSV: {faltando}")
+        resumo['inseridas'] = banco.inserir_varios(registros(leitor, cabecalho), tamanho_lote)
+
+    resumo['repetidas'] = resumo['linhas'] - resumo['inseridas']
+    return resumo
+
+# ==============================================================================
+# BENCHMARK
+# ==============================================================================
+
+def gerar_registros(n, semente=0, inicio=datetime(2021, 1, 1), dias=5 * 365):
+    """n registros sintéticos espalhados por `dias` dias a partir de `inicio`
+
+    As entradas ficam no meio de FAIXAS_ENTRADA, para que o CSV gravado a
+    partir deles passe pela validação de registro_da_linha.
+    """
+    rng = np.random.default_rng(semente)
+    segundos = np.sort(rng.integers(0, dias * 86400, n))
+    escores = rng.uniform(0, 100, n)
+    completo = rng.random(n) < 0.6
+    categorias = np.array(["BAIXO", "BAIXO-MODERADO", "MODERADO", "MODERADO-ALTO", "ALTO"])
+    indices_categoria = np.digitize(escores, [25, 40, 60, 70])
+    for i in range(n):
+        registro = {campo: (minimo + maximo) / 2 for campo, (minimo, maximo) in FAIXAS_ENTRADA.items()}
+        registro.update({
+            'data_hora': (inicio + timedelta(seconds=int(segundos[i]))).strftime('%Y-%m-%d %H:%M:%S'),
+            'modo': MODO_COMPLETO if completo[i] else MODO_SIMPLIFICADO,
+            'albumina': 3.2 if completo[i] else None,
+            'escore_final': float(escores[i]),
+            'categoria': str(categorias[indices_categoria[i]]),
+        })
+        yield registro
+
+
+def _cronometrar(funcao, repeticoes=5):
+    """Menor tempo (ms) de `repeticoes` execuções e o último resultado"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return 1000 * melhor, resultado
+
+
+def executar_benchmark(banco, semana):
+    """Tempos (ms) das consultas típicas para a semana que começa em `semana`
+
+    Retorna:
+    --------
+    list de (descrição, ms, linhas devolvidas)
+    """
+    fim_semana = semana + timedelta(days=7)
+    consultas = [
+        ("ALTO desta semana", lambda: banco.consultar(categoria='ALTO', desde=semana, ate=fim_semana)),
+        ("Modo simplificado desta semana",
+         lambda: banco.consultar(modo=MODO_SIMPLIFICADO, desde=semana, ate=fim_semana)),
+        ("Todos os pacientes desta semana", lambda: banco.consultar(desde=semana, ate=fim_semana)),
+        ("Contagem por categoria desta semana", lambda: banco.contar_por_categoria(semana, fim_semana)),
+        ("Contagem de ALTO (total)", lambda: banco.contar(categoria='ALTO')),
+        ("Últimos 100 ALTO", lambda: banco.consultar(categoria='ALTO', desde=semana - timedelta(days=30),
+                                                     limite=100)),
+    ]
+    tempos = []
+    for descricao, consulta in consultas:
+        ms, resultado = _cronometrar(consulta)
+        tempos.append((descricao, ms, resultado if isinstance(resultado, int) else len(resultado)))
+    return tempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco SQLite de resultados da calculadora fuzzy")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    migrar = sub.add_parser('migrar', help="carrega CSVs da calculadora (com ou sem a coluna Modo)")
+    migrar.add_argument('csv', nargs='+', help="arquivos CSV (ex.: dados_pacientes.csv)")
+    migrar.add_argument('banco', help="arquivo SQLite (criado se não existir)")
+    migrar.add_argument('--delimitador', default=',', help="separador de campos (padrão: ',')")
+    migrar.add_argument('--origem', help="rótulo da origem das linhas, com um único CSV "
+                                         "(padrão: caminho absoluto do arquivo)")
+
+    consultar = sub.add_parser('consultar', help="lista resultados filtrados")
+    consultar.add_argument('banco')
+    consultar.add_argument('--categoria')
+    consultar.add_argument('--modo', choices=[MODO_COMPLETO, MODO_SIMPLIFICADO])
+    consultar.add_argument('--desde', help="AAAA-MM-DD[ HH:MM:SS], inclusivo")
+    consultar.add_argument('--ate', help="AAAA-MM-DD[ HH:MM:SS], exclusivo")
+    consultar.add_argument('--limite', type=int)
+
+    benchmark = sub.add_parser('benchmark', help="tempo das consultas num banco sintético")
+    benchmark.add_argument('--linhas', type=int, default=1000000)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'migrar':
+        if args.origem is not None and len(args.csv) > 1:
+            parser.error("--origem só pode ser usado com um único CSV")
+        erros = 0
+        with BancoResultados(args.banco) as banco:
+            for caminho in args.csv:
+                resumo = migrar_csv(caminho, banco, delimitador=args.delimitador, origem=args.origem)
+                for numero, motivo in resumo['erros']:
+                    print(f"  {caminho}, linha {numero} ignorada: {motivo}", file=sys.stderr)
+                print(f"{caminho}: {resumo['inseridas']} linhas inseridas, {resumo['repetidas']} já migradas, "
+                      f"{len(resumo['erros'])} inválidas", file=sys.stderr)
+                erros += len(resumo['erros'])
+        return 1 if erros else 0
+
+    if args.comando == 'consultar':
+        with BancoResultados(args.banco) as banco:
+            inicio = time.perf_counter()
+            linhas = banco.consultar(args.categoria, args.modo, args.desde, args.ate, args.limite)
+            tempo = time.perf_counter() - inicio
+        escritor = csv.writer(sys.stdout)
+        escritor.writerow(COLUNAS_TABELA[:-2])
+        for linha in linhas:
+            escritor.writerow([linha[coluna] for coluna in COLUNAS_TABELA[:-2]])
+        print(f"{len(linhas)} resultados em {1000*tempo:.1f} ms", file=sys.stderr)
+        return 0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        with BancoResultados(os.path.join(pasta, 'benchmark.db')) as banco:
+            inicio = time.perf_counter()
+            banco.inserir_varios(gerar_registros(args.linhas))
+            tempo = time.perf_counter() - inicio
+            print("="*80)
+            print(f"BANCO DE RESULTADOS - {args.linhas:,} linhas inseridas em {tempo:.1f} s "
+                  f"({args.linhas/tempo:,.0f} linhas/s)")
+            print("="*80)
+            print(f"{'Consulta':<45}{'ms':>10}{'Linhas':>12}")
+            print("-"*80)
+            for descricao, ms, linhas in executar_benchmark(banco, date(2023, 6, 5)):
+                print(f"{descricao:<45}{ms:>10.2f}{linhas:>12,}")
+            print("="*80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1019 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Definição Declarativa das Bases de Regras
+
+Fonte única das variáveis, termos, pontos de quebra e tabelas de regras de
+todas as bases. compilador_regras.py transforma cada definição em arrays de
+índices (uma vez por processo); a calculadora, o motor vetorizado e os
+protótipos por submódulo carregam a base compilada em vez de montar, cada
+um, seu próprio grafo de objetos skfuzzy. Este módulo é só dados: importá-lo
+não carrega numpy nem skfuzzy.
+
+FORMATO:
+- Variável: {'universo': (início, fim, passo), 'termos': {rótulo: peças}}
+  O universo é np.arange(início, fim, passo). As peças de um termo são uma
+  lista de (forma, pontos), forma 'trimf' ou 'trapmf', somadas como no
+  código skfuzzy original (o alto_risco do IMC tem duas peças); é o mesmo
+  formato de limites_calibracao.json.
+- Base: {'entradas': [(rótulo, variável), ...], 'saida': (rótulo, variável),
+  'regras': [(antecedente, consequente), ...]}
+- Antecedente: tupla com um termo por entrada, na ordem de 'entradas', e
+  None onde a entrada não participa; os termos são ligados por E (mínimo).
+  Uma lista de tuplas é o OU (máximo) dessas conjunções.
+- Consequente: rótulo de um termo da saída.
+
+As tabelas preservam a ordem e os comentários das definições originais
+(inclusive regras repetidas, que não alteram o resultado).
+"""
+
+# ==============================================================================
+# VARIÁVEIS DO SUBMÓDULO FENOTÍPICO
+# ==============================================================================
+
+# IMC (kg/m²): ideal 22-25; alto risco na desnutrição grave (<18) e na
+# obesidade mórbida (>30)
+IMC = {
+    'universo': (12, 50.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (20, 22, 25, 28))],
+        'medio_risco': [('trimf', (17, 20, 30))],
+        'alto_risco': [('trapmf', (12, 14, 16, 18)), ('trapmf', (30, 35, 45, 50))],
+    },
+}
+
+# Perda ponderal (% em 3 meses): moderada 5-10% (critério GLIM), grave >10%
+PERDA_PONDERAL = {
+    'universo': (0, 30.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 2, 5))],
+        'medio_risco': [('trimf', (3, 7, 12))],
+        'alto_risco': [('trapmf', (10, 12, 20, 30))],
+    },
+}
+
+# Sarcopenia clínica: 0 = ausente, 1 = leve, 2 = moderada, 3 = grave
+SARCOPENIA = {
+    'universo': (0, 3.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 0.5, 1))],
+        'medio_risco': [('trimf', (0.5, 1.5, 2.5))],
+        'alto_risco': [('trapmf', (2, 2.5, 3, 3))],
+    },
+}
+
+# ==============================================================================
+# VARIÁVEIS DO SUBMÓDULO DE INGESTÃO
+# ==============================================================================
+
+# % do VET consumido: adequado >=75%, subótimo 50-74%, muito insuficiente <50%
+VET_CONSUMIDO = {
+    'universo': (0, 101, 1),
+    'termos': {
+        'baixo_risco': [('trapmf', (75, 85, 100, 100))],
+        'medio_risco': [('trimf', (40, 60, 80))],
+        'alto_risco': [('trapmf', (0, 0, 25, 50))],
+    },
+}
+
+# Duração do déficit alimentar (dias): curto <7, moderado 7-14, prolongado >14
+DURACAO_DEFICIT = {
+    'universo': (0, 31, 1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 3, 7))],
+        'medio_risco': [('trimf', (5, 10, 16))],
+        'alto_risco': [('trapmf', (12, 14, 30, 30))],
+    },
+}
+
+# Sintomas gastrointestinais: 0 = ausentes, 1 = leves, 2 = moderados, 3 = graves
+SINTOMAS_GI = {
+    'universo': (0, 3.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 0.3, 0.8))],
+        'medio_risco': [('trimf', (0.5, 1.5, 2.3))],
+        'alto_risco': [('trapmf', (2, 2.5, 3, 3))],
+    },
+}
+
+# ==============================================================================
+# VARIÁVEIS DO SUBMÓDULO INFLAMATÓRIO
+# ==============================================================================
+
+# PCR (mg/L): normal <10, elevada 10-100, muito elevada >100
+PCR = {
+    'universo': (0, 401, 1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 5, 10))],
+        'medio_risco': [('trimf', (5, 50, 120))],
+        'alto_risco': [('trapmf', (80, 100, 400, 400))],
+    },
+}
+
+# PCR do modo sem albumina: limiares mais sensíveis para compensar a falta
+# da albumina
+PCR_SIMPLIFICADO = {
+    'universo': (0, 401, 1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 3, 8))],
+        'medio_risco': [('trimf', (5, 40, 100))],
+        'alto_risco': [('trapmf', (70, 85, 400, 400))],
+    },
+}
+
+# Albumina sérica (g/dL): normal >=3.5, reduzida leve 3.0-3.4, moderada/grave <3.0
+# (marcador negativo de fase aguda, não de estado nutricional isolado)
+ALBUMINA = {
+    'universo': (1.5, 5.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (3.5, 4.0, 5.0, 5.0))],
+        'medio_risco': [('trimf', (2.8, 3.2, 3.7))],
+        'alto_risco': [('trapmf', (1.5, 1.5, 2.5, 3.0))],
+    },
+}
+
+# Febre: 0 = ausente, 1 = subfebril (<38°C), 2 = febre (38-39°C), 3 = hipertermia (>39°C)
+FEBRE = {
+    'universo': (0, 3.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 0.5, 1.2))],
+        'medio_risco': [('trimf', (0.8, 1.8, 2.5))],
+        'alto_risco': [('trapmf', (2.2, 2.7, 3, 3))],
+    },
+}
+
+# ==============================================================================
+# VARIÁVEIS DO SUBMÓDULO DE GRAVIDADE
+# ==============================================================================
+
+# Diagnóstico/estresse metabólico: 0 = baixo (eletiva pequeno porte),
+# 1 = moderado (fratura de quadril, pneumonia), 2 = alto (politrauma, sepse),
+# 3 = muito alto (choque séptico, transplante, neoplasia avançada)
+DIAGNOSTICO = {
+    'universo': (0, 3.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 0.3, 0.8))],
+        'medio_risco': [('trimf', (0.5, 1.5, 2.3))],
+        'alto_risco': [('trapmf', (2, 2.5, 3, 3))],
+    },
+}
+
+# Comorbidades: 0 = nenhuma, 1-2 = leves/moderadas, 3-5 = 3+ ou comorbidade
+# crítica (IRC em diálise, ICC IV, DPOC O2-dependente, cirrose Child C)
+COMORBIDADES = {
+    'universo': (0, 5.1, 0.1),
+    'termos': {
+        'baixo_risco': [('trapmf', (0, 0, 0.3, 1.0))],
+        'medio_risco': [('trimf', (0.5, 2.0, 3.5))],
+        'alto_risco': [('trapmf', (3, 3.5, 5, 5))],
+    },
+}
+
+# Idade (anos): <65, 65-74, >=75 (fragilidade, reserva funcional reduzida)
+IDADE = {
+    'universo': (18, 101, 1),
+    'termos': {
+        'baixo_risco': [('trapmf', (18, 18, 55, 65))],
+        'medio_risco': [('trimf', (60, 70, 78))],
+        'alto_risco': [('trapmf', (73, 75, 100, 100))],
+    },
+}
+
+# Cirurgia de grande porte nos últimos 7 dias (0 = não, 1 = sim). Desde a
+# v2.1 os termos se encontram em 0.5, sem a zona morta entre 0.4 e 0.6
+CIRURGIA = {
+    'universo': (0, 1.1, 0.1),
+    'termos': {
+        'nao': [('trapmf', (0, 0, 0.3, 0.5))],
+        'sim': [('trapmf', (0.5, 0.7, 1, 1))],
+    },
+}
+
+# Termos da cirurgia até a v1.4 (e nos protótipos da Rodada 3 Delphi)
+CIRURGIA_V14 = {
+    'universo': (0, 1.1, 0.1),
+    'termos': {
+        'nao': [('trapmf', (0, 0, 0.2, 0.4))],
+        'sim': [('trapmf', (0.6, 0.8, 1, 1))],
+    },
+}
+
+# ==============================================================================
+# ESCORES (SAÍDAS DOS SUBMÓDULOS E ENTRADAS/SAÍDA DO INTEGRADOR)
+# ==============================================================================
+
+# Saída dos quatro submódulos (0-100)
+RISCO_SUBMODULO = {
+    'universo': (0, 101, 1),
+    'termos': {
+        'baixo': [('trapmf', (0, 0, 15, 30))],
+        'baixo_moderado': [('trimf', (20, 32, 45))],
+        'moderado': [('trimf', (35, 50, 65))],
+        'moderado_alto': [('trimf', (55, 67, 80))],
+        'alto': [('trapmf', (70, 85, 100, 100))],
+    },
+}
+
+# Escore de um submódulo como entrada do integrador
+ESCORE_INTEGRADOR = {
+    'universo': (0, 101, 1),
+    'termos': {
+        'baixo': [('trapmf', (0, 0, 20, 30))],
+        'baixo_moderado': [('trimf', (25, 35, 45))],
+        'moderado': [('trimf', (40, 50, 60))],
+        'moderado_alto': [('trimf', (55, 65, 75))],
+        'alto': [('trapmf', (70, 80, 100, 100))],
+    },
+}
+
+# Escore final de risco nutricional (0-100)
+RISCO_FINAL = {
+    'universo': (0, 101, 1),
+    'termos': {
+        'baixo': [('trapmf', (0, 0, 15, 25))],
+        'baixo_moderado': [('trimf', (20, 32, 40))],
+        'moderado': [('trimf', (35, 50, 60))],
+        'moderado_alto': [('trimf', (50, 60, 70))],
+        'alto': [('trapmf', (60, 70, 100, 100))],
+    },
+}
+
+# Escore final do protótipo da Rodada 3 Delphi (moderado_alto e alto mais à direita)
+RISCO_FINAL_DELPHI = {
+    'universo': (0, 101, 1),
+    'termos': {
+        'baixo': [('trapmf', (0, 0, 15, 25))],
+        'baixo_moderado': [('trimf', (20, 32, 40))],
+        'moderado': [('trimf', (35, 50, 60))],
+        'moderado_alto': [('trimf', (55, 67, 75))],
+        'alto': [('trapmf', (70, 80, 100, 100))],
+    },
+}
+
+ENTRADAS_INTEGRADOR = [
+    ('escore_fenotipico', ESCORE_INTEGRADOR),       # peso 30%
+    ('escore_ingestao', ESCORE_INTEGRADOR),         # peso 25%
+    ('escore_inflamatorio', ESCORE_INTEGRADOR),     # peso 15%
+    ('escore_gravidade', ESCORE_INTEGRADOR),        # peso 30%
+]
+
+# ==============================================================================
+# BASES DA CALCULADORA (v2.2)
+# ==============================================================================
+
+# Submódulo 1: Nutricional Fenotípico - 27 regras (todas as combinações)
+# (imc, perda_ponderal, sarcopenia) -> risco_fenotipico
+REGRAS_FENOTIPICO = [
+    # ALTO RISCO (desnutrição grave)
+    (('alto_risco',  'alto_risco',  'alto_risco'),  'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco'), 'alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco'),  'alto'),
+    (('medio_risco', 'alto_risco',  'alto_risco'),  'alto'),
+    # MODERADO-ALTO RISCO
+    (('alto_risco',  'alto_risco',  'baixo_risco'), 'moderado_alto'),
+    (('alto_risco',  'medio_risco', 'medio_risco'), 'moderado_alto'),
+    (('alto_risco',  'baixo_risco', 'alto_risco'),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'medio_risco'), 'moderado_alto'),
+    (('medio_risco', 'medio_risco', 'alto_risco'),  'moderado_alto'),
+    # MODERADO RISCO
+    (('alto_risco',  'medio_risco', 'baixo_risco'), 'moderado'),
+    (('alto_risco',  'baixo_risco', 'medio_risco'), 'moderado'),
+    (('medio_risco', 'alto_risco',  'baixo_risco'), 'moderado'),
+    (('medio_risco', 'medio_risco', 'medio_risco'), 'moderado'),
+    (('medio_risco', 'baixo_risco', 'alto_risco'),  'moderado'),
+    (('baixo_risco', 'alto_risco',  'alto_risco'),  'moderado'),
+    (('baixo_risco', 'alto_risco',  'medio_risco'), 'moderado'),
+    # BAIXO-MODERADO RISCO
+    (('alto_risco',  'baixo_risco', 'baixo_risco'), 'baixo_moderado'),
+    (('medio_risco', 'medio_risco', 'baixo_risco'), 'baixo_moderado'),
+    (('medio_risco', 'baixo_risco', 'medio_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'alto_risco'),  'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'medio_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'alto_risco',  'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'baixo_risco', 'alto_risco'),  'baixo_moderado'),
+    # BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+    (('baixo_risco', 'baixo_risco', 'medio_risco'), 'baixo'),
+    (('baixo_risco', 'medio_risco', 'baixo_risco'), 'baixo'),
+    (('medio_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+]
+FENOTIPICO = {
+    'entradas': [('imc', IMC), ('perda_ponderal', PERDA_PONDERAL), ('sarcopenia', SARCOPENIA)],
+    'saida': ('risco_fenotipico', RISCO_SUBMODULO),
+    'regras': REGRAS_FENOTIPICO,
+}
+
+# Submódulo 2: Ingestão e Absorção - 27 regras (todas as combinações)
+# (vet_consumido, duracao_deficit, sintomas_gi) -> risco_ingestao
+REGRAS_INGESTAO = [
+    # ALTO RISCO (deficit grave e prolongado)
+    (('alto_risco',  'alto_risco',  'alto_risco'),  'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco'), 'alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco'),  'alto'),
+    (('medio_risco', 'alto_risco',  'alto_risco'),  'alto'),
+    # MODERADO-ALTO RISCO
+    (('alto_risco',  'alto_risco',  'baixo_risco'), 'moderado_alto'),
+    (('alto_risco',  'medio_risco', 'medio_risco'), 'moderado_alto'),
+    (('alto_risco',  'baixo_risco', 'alto_risco'),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'medio_risco'), 'moderado_alto'),
+    (('medio_risco', 'medio_risco', 'alto_risco'),  'moderado_alto'),
+    # MODERADO RISCO
+    (('medio_risco', 'medio_risco', 'medio_risco'), 'moderado'),
+    (('medio_risco', 'alto_risco',  'baixo_risco'), 'moderado'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco'), 'moderado'),
+    (('alto_risco',  'medio_risco', 'baixo_risco'), 'moderado'),
+    (('medio_risco', 'baixo_risco', 'alto_risco'),  'moderado'),
+    (('baixo_risco', 'alto_risco',  'alto_risco'),  'moderado'),
+    (('baixo_risco', 'medio_risco', 'alto_risco'),  'moderado'),
+    # BAIXO-MODERADO RISCO
+    (('medio_risco', 'medio_risco', 'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'medio_risco'), 'baixo_moderado'),
+    (('medio_risco', 'baixo_risco', 'medio_risco'), 'baixo_moderado'),
+    (('medio_risco', 'baixo_risco', 'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'alto_risco',  'medio_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'alto_risco',  'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'baixo_risco', 'alto_risco'),  'baixo_moderado'),
+    (('alto_risco',  'baixo_risco', 'medio_risco'), 'baixo_moderado'),
+    # BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+    (('baixo_risco', 'baixo_risco', 'medio_risco'), 'baixo'),
+    (('baixo_risco', 'medio_risco', 'baixo_risco'), 'baixo'),
+]
+INGESTAO = {
+    'entradas': [('vet_consumido', VET_CONSUMIDO), ('duracao_deficit', DURACAO_DEFICIT),
+                 ('sintomas_gi', SINTOMAS_GI)],
+    'saida': ('risco_ingestao', RISCO_SUBMODULO),
+    'regras': REGRAS_INGESTAO,
+}
+
+# Submódulo 3: Inflamatório - 27 regras (todas as combinações)
+# (pcr, albumina, febre) -> risco_inflamatorio
+REGRAS_INFLAMATORIO = [
+    # ALTO RISCO (PCR alta + albumina baixa = inflamação grave)
+    (('alto_risco',  'alto_risco',  'alto_risco'),  'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco'), 'alto'),
+    (('alto_risco',  'alto_risco',  'baixo_risco'), 'alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco'),  'alto'),
+    (('medio_risco', 'alto_risco',  'alto_risco'),  'alto'),
+    # MODERADO-ALTO RISCO
+    (('alto_risco',  'medio_risco', 'medio_risco'), 'moderado_alto'),
+    (('alto_risco',  'baixo_risco', 'alto_risco'),  'moderado_alto'),
+    (('alto_risco',  'baixo_risco', 'medio_risco'), 'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'medio_risco'), 'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'baixo_risco'), 'moderado_alto'),
+    (('medio_risco', 'medio_risco', 'alto_risco'),  'moderado_alto'),
+    # MODERADO RISCO
+    (('alto_risco',  'medio_risco', 'baixo_risco'), 'moderado'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco'), 'moderado'),
+    (('medio_risco', 'medio_risco', 'medio_risco'), 'moderado'),
+    (('medio_risco', 'medio_risco', 'baixo_risco'), 'moderado'),
+    (('medio_risco', 'baixo_risco', 'alto_risco'),  'moderado'),
+    (('medio_risco', 'baixo_risco', 'medio_risco'), 'moderado'),
+    (('baixo_risco', 'alto_risco',  'alto_risco'),  'moderado'),
+    (('baixo_risco', 'alto_risco',  'medio_risco'), 'moderado'),
+    # BAIXO-MODERADO RISCO
+    (('medio_risco', 'baixo_risco', 'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'alto_risco'),  'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'medio_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'alto_risco',  'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'baixo_risco', 'alto_risco'),  'baixo_moderado'),
+    (('baixo_risco', 'baixo_risco', 'medio_risco'), 'baixo_moderado'),
+    # BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+]
+INFLAMATORIO = {
+    'entradas': [('pcr', PCR), ('albumina', ALBUMINA), ('febre', FEBRE)],
+    'saida': ('risco_inflamatorio', RISCO_SUBMODULO),
+    'regras': REGRAS_INFLAMATORIO,
+}
+
+# Submódulo 3 sem albumina (v2.0) - 9 regras (todas as combinações PCR x febre).
+# Sensibilidade ~10-15% menor que a do modo completo
+# (pcr, febre) -> risco_inflamatorio
+REGRAS_INFLAMATORIO_SIMPLIFICADO = [
+    # ALTO RISCO (PCR dominante)
+    (('alto_risco',  'alto_risco'),  'alto'),
+    (('alto_risco',  'medio_risco'), 'alto'),
+    (('alto_risco',  'baixo_risco'), 'moderado_alto'),
+    # MODERADO RISCO
+    (('medio_risco', 'alto_risco'),  'moderado_alto'),
+    (('medio_risco', 'medio_risco'), 'moderado'),
+    (('medio_risco', 'baixo_risco'), 'baixo_moderado'),
+    # BAIXO RISCO
+    (('baixo_risco', 'alto_risco'),  'baixo_moderado'),
+    (('baixo_risco', 'medio_risco'), 'baixo'),
+    (('baixo_risco', 'baixo_risco'), 'baixo'),
+]
+INFLAMATORIO_SIMPLIFICADO = {
+    'entradas': [('pcr', PCR_SIMPLIFICADO), ('febre', FEBRE)],
+    'saida': ('risco_inflamatorio', RISCO_SUBMODULO),
+    'regras': REGRAS_INFLAMATORIO_SIMPLIFICADO,
+}
+
+# Submódulo 4: Gravidade/Morbidade - 47 regras (v2.1: 35 regras da v1.4 com
+# a cirurgia sem zona morta + 12 regras de fallback; sempre há regra ativa)
+# (diagnostico, comorbidades, idade_var, cirurgia_var) -> risco_gravidade
+REGRAS_GRAVIDADE = [
+    # ALTO RISCO (múltiplos fatores graves)
+    (('alto_risco',  'alto_risco',  'alto_risco',  None),  'alto'),
+    (('alto_risco',  'alto_risco',  None,          'sim'), 'alto'),
+    (('alto_risco',  None,          'alto_risco',  'sim'), 'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco', None),  'alto'),
+    ((None,          'alto_risco',  'alto_risco',  'sim'), 'alto'),
+    # MODERADO-ALTO RISCO
+    (('alto_risco',  'medio_risco', 'medio_risco', None),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  None,          'sim'), 'moderado_alto'),
+    (('alto_risco',  'baixo_risco', None,          'sim'), 'moderado_alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco',  None),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'alto_risco',  None),  'moderado_alto'),
+    (('alto_risco',  None,          'alto_risco',  'nao'), 'moderado_alto'),
+    (('alto_risco',  'alto_risco',  'baixo_risco', None),  'moderado_alto'),
+    (('medio_risco', 'medio_risco', 'alto_risco',  'sim'), 'moderado_alto'),
+    # MODERADO RISCO
+    ((None,          'alto_risco',  None,          'nao'), 'moderado'),
+    (('medio_risco', 'medio_risco', 'medio_risco', None),  'moderado'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco', 'nao'), 'moderado'),
+    ((None,          None,          'alto_risco',  'sim'), 'moderado'),
+    (('alto_risco',  'baixo_risco', 'medio_risco', None),  'moderado'),
+    (('medio_risco', 'alto_risco',  'baixo_risco', None),  'moderado'),
+    (('alto_risco',  'medio_risco', 'baixo_risco', None),  'moderado'),
+    (('medio_risco', 'medio_risco', None,          'sim'), 'moderado'),
+    (('alto_risco',  None,          'medio_risco', 'nao'), 'moderado'),
+    (('medio_risco', 'alto_risco',  None,          'nao'), 'moderado'),
+    # BAIXO-MODERADO RISCO
+    (('medio_risco', 'baixo_risco', 'medio_risco', None),  'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'medio_risco', None),  'baixo_moderado'),
+    (('medio_risco', 'medio_risco', 'baixo_risco', None),  'baixo_moderado'),
+    (('baixo_risco', 'alto_risco',  'baixo_risco', None),  'baixo_moderado'),
+    (('baixo_risco', 'baixo_risco', 'alto_risco',  None),  'baixo_moderado'),
+    (('medio_risco', None,          'alto_risco',  'nao'), 'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', None,          'sim'), 'baixo_moderado'),
+    ((None,          'medio_risco', 'medio_risco', 'nao'), 'baixo_moderado'),
+    # BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco', 'nao'), 'baixo'),
+    (('baixo_risco', 'baixo_risco', 'medio_risco', 'nao'), 'baixo'),
+    (('medio_risco', 'baixo_risco', 'baixo_risco', 'nao'), 'baixo'),
+    (('baixo_risco', 'baixo_risco', 'baixo_risco', 'sim'), 'baixo'),
+    # === REGRAS DE FALLBACK UNIVERSAIS (GARANTIA DE COBERTURA 100%) ===
+    # Estas regras garantem que SEMPRE haverá pelo menos uma regra ativa,
+    # independente dos valores de entrada.
+    # Fallback: 2 variáveis em baixo_risco
+    (('baixo_risco', 'baixo_risco', None,          None),  'baixo'),
+    (('baixo_risco', None,          'baixo_risco', None),  'baixo'),
+    ((None,          'baixo_risco', 'baixo_risco', None),  'baixo_moderado'),
+    # Fallback: 2 variáveis em medio_risco (NOVO - crítico!)
+    (('medio_risco', 'medio_risco', None,          None),  'moderado'),
+    (('medio_risco', None,          'medio_risco', None),  'moderado'),
+    ((None,          'medio_risco', 'medio_risco', None),  'moderado'),
+    # Fallback: 2 variáveis em alto_risco
+    (('alto_risco',  'alto_risco',  None,          None),  'alto'),
+    (('alto_risco',  None,          'alto_risco',  None),  'moderado_alto'),
+    ((None,          'alto_risco',  'alto_risco',  None),  'moderado_alto'),
+    # Fallback: 1 variável isolada (última linha de defesa - CRÍTICO!)
+    (('alto_risco',  None,          None,          None),  'moderado_alto'),
+    ((None,          'alto_risco',  None,          None),  'moderado'),
+    ((None,          None,          'alto_risco',  None),  'baixo_moderado'),
+]
+GRAVIDADE = {
+    'entradas': [('diagnostico', DIAGNOSTICO), ('comorbidades', COMORBIDADES),
+                 ('idade_var', IDADE), ('cirurgia_var', CIRURGIA)],
+    'saida': ('risco_gravidade', RISCO_SUBMODULO),
+    'regras': REGRAS_GRAVIDADE,
+}
+
+# Módulo Integrador Final (adaptativo, v2.0): 118 regras no modo completo,
+# 108 no simplificado (sem as regras de inflamatório alto/moderado, que
+# dependem da albumina)
+# (escore_fenotipico, escore_ingestao, escore_inflamatorio, escore_gravidade) -> risco_final
+_REGRAS_INTEGRADOR_COMUNS = [
+    # === REGRAS DE DOMINÂNCIA: ALTO RISCO ===
+    (('alto',           None,             None,             'alto'),           'alto'),
+    (('alto',           'alto',           None,             None),             'alto'),
+    ((None,             'alto',           None,             'alto'),           'alto'),
+    # Se 1 ALTO + 1 MODERADO-ALTO → ALTO
+    (('alto',           'moderado_alto',  None,             None),             'alto'),
+    (('alto',           None,             None,             'moderado_alto'),  'alto'),
+    ((None,             'alto',           None,             'moderado_alto'),  'alto'),
+    # === REGRAS MODERADO-ALTO ===
+    (('alto',           'moderado',       None,             'moderado'),       'moderado_alto'),
+    (('alto',           'baixo_moderado', None,             'baixo_moderado'), 'moderado_alto'),
+    (('moderado',       'alto',           None,             'moderado'),       'moderado_alto'),
+    (('moderado',       'moderado',       None,             'alto'),           'moderado_alto'),
+    # Se ≥2 MODERADO-ALTO → MODERADO-ALTO
+    (('moderado_alto',  None,             None,             'moderado_alto'),  'moderado_alto'),
+    (('moderado_alto',  'moderado_alto',  None,             None),             'moderado_alto'),
+    ((None,             'moderado_alto',  None,             'moderado_alto'),  'moderado_alto'),
+    # === REGRAS MODERADO ===
+    (('moderado',       'moderado',       None,             'moderado'),       'moderado'),
+    # Se 1 MODERADO-ALTO + outros baixos → MODERADO
+    (('moderado_alto',  'baixo',          None,             'baixo'),          'moderado'),
+    (('baixo',          'moderado_alto',  None,             'baixo'),          'moderado'),
+    (('baixo',          'baixo',          None,             'moderado_alto'),  'moderado'),
+    # Mix MODERADO com BAIXO-MODERADO
+    (('moderado',       'baixo_moderado', None,             'moderado'),       'moderado'),
+    (('moderado',       'moderado',       None,             'baixo_moderado'), 'moderado'),
+    (('baixo_moderado', 'moderado',       None,             'moderado'),       'moderado'),
+    # === REGRAS BAIXO-MODERADO ===
+    (('baixo_moderado', 'baixo_moderado', None,             'baixo_moderado'), 'baixo_moderado'),
+    (('baixo_moderado', None,             None,             'baixo_moderado'), 'baixo_moderado'),
+    # Mix BAIXO-MODERADO com BAIXO
+    (('baixo_moderado', 'baixo',          None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo_moderado', None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo',          None,             'baixo_moderado'), 'baixo_moderado'),
+    # BAIXO-MODERADO com MODERADO
+    (('baixo_moderado', 'moderado',       None,             'baixo'),          'baixo_moderado'),
+    (('moderado',       'baixo',          None,             'baixo_moderado'), 'baixo_moderado'),
+    # === REGRAS BAIXO ===
+    (('baixo',          'baixo',          None,             'baixo'),          'baixo'),
+    (('baixo',          None,             None,             'baixo'),          'baixo'),
+    # === REGRAS ADICIONAIS PARA MELHOR COBERTURA ===
+    (('baixo_moderado', 'baixo_moderado', 'moderado',       'baixo'),          'baixo_moderado'),
+    (('baixo_moderado', 'baixo_moderado', 'baixo',          'moderado'),       'baixo_moderado'),
+    (('baixo_moderado', None,             'moderado',       'baixo'),          'baixo_moderado'),
+    ((None,             'baixo_moderado', 'moderado',       'baixo'),          'baixo_moderado'),
+    (('baixo_moderado', 'baixo_moderado', 'moderado',       None),             'baixo_moderado'),
+    (('baixo_moderado', None,             'moderado',       'baixo'),          'baixo_moderado'),
+    ((None,             'baixo_moderado', 'moderado',       'baixo'),          'baixo_moderado'),
+    (('baixo_moderado', 'baixo',          'moderado',       None),             'baixo_moderado'),
+    (('baixo',          None,             'moderado',       'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo_moderado', 'moderado',       None),             'baixo_moderado'),
+    (('baixo_moderado', 'baixo_moderado', None,             None),             'baixo_moderado'),
+    ((None,             'baixo_moderado', 'baixo_moderado', None),             'baixo_moderado'),
+    (('baixo_moderado', None,             'baixo_moderado', None),             'baixo_moderado'),
+    (('baixo',          None,             'moderado',       'baixo'),          'baixo_moderado'),
+    (('moderado',       'baixo',          None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'moderado',       None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo',          None,             'moderado'),       'baixo_moderado'),
+    (('baixo_moderado', 'moderado',       'baixo',          None),             'baixo_moderado'),
+    (('moderado',       'baixo_moderado', 'baixo',          None),             'baixo_moderado'),
+    (('baixo',          None,             'baixo_moderado', 'moderado'),       'baixo_moderado'),
+    # Regras gerais de fallback
+    (('moderado',       None,             None,             'moderado'),       'moderado'),
+    (('baixo_moderado', None,             None,             'moderado'),       'baixo_moderado'),
+    (('moderado',       None,             None,             'baixo_moderado'), 'baixo_moderado'),
+    (('moderado_alto',  'moderado',       None,             'baixo_moderado'), 'moderado'),
+    (('baixo',          'moderado_alto',  None,             'moderado'),       'moderado'),
+]
+# Apenas no modo completo (com albumina)
+_REGRAS_INTEGRADOR_ALBUMINA = [
+    # Regras de dominância com inflamatório alto
+    (('alto',          None,       'alto',          None),            'alto'),
+    (('alto',          None,       'alto',          None),            'alto'),
+    ((None,            'alto',     'alto',          None),            'alto'),
+    ((None,            None,       'alto',          'alto'),          'alto'),
+    # MODERADO-ALTO com inflamatório alto
+    (('moderado_alto', None,       'alto',          None),            'moderado_alto'),
+    ((None,            None,       'alto',          'moderado_alto'), 'moderado_alto'),
+    ((None,            None,       'moderado_alto', 'alto'),          'moderado_alto'),
+    # Inflamatório MODERADO com outros MODERADOS
+    (('moderado',      None,       'moderado',      None),            'moderado'),
+    ((None,            'moderado', 'moderado',      None),            'moderado'),
+    ((None,            None,       'moderado',      'moderado'),      'moderado'),
+]
+_REGRAS_INTEGRADOR_FALLBACK = [
+    # === REGRAS DE FALLBACK UNIVERSAIS (GARANTIA DE COBERTURA 100%) ===
+    # Estas regras garantem que SEMPRE haverá pelo menos uma regra ativa,
+    # independente dos valores de entrada (4 variáveis × 5 níveis = 625 combinações).
+    # Estratégia: cobrir todas as combinações principais das variáveis mais importantes.
+    # === FALLBACK NÍVEL 1: COMBINAÇÕES DE 3 VARIÁVEIS (SEM INFLAMATÓRIO) ===
+    # Fenotípico + Ingestão + Gravidade (as 3 mais importantes)
+    # Todas BAIXAS → BAIXO
+    (('baixo',          'baixo',          None,             'baixo'),          'baixo'),
+    # Pelo menos uma BAIXO-MODERADO + outras BAIXO → BAIXO-MODERADO
+    (('baixo_moderado', 'baixo',          None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo_moderado', None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo',          None,             'baixo_moderado'), 'baixo_moderado'),
+    # Pelo menos uma MODERADO + outras <= BAIXO-MODERADO → MODERADO ou BAIXO-MODERADO
+    (('moderado',       'baixo',          None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'moderado',       None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo',          None,             'moderado'),       'baixo_moderado'),
+    # 2+ MODERADO → MODERADO
+    (('moderado',       'moderado',       None,             'baixo'),          'moderado'),
+    (('moderado',       'baixo',          None,             'moderado'),       'moderado'),
+    (('baixo',          'moderado',       None,             'moderado'),       'moderado'),
+    # Pelo menos uma MODERADO-ALTO + outras <= MODERADO → MODERADO-ALTO ou MODERADO
+    (('moderado_alto',  'baixo',          None,             'baixo'),          'moderado'),
+    (('baixo',          'moderado_alto',  None,             'baixo'),          'moderado'),
+    (('baixo',          'baixo',          None,             'moderado_alto'),  'moderado'),
+    # 2+ MODERADO-ALTO → MODERADO-ALTO
+    (('moderado_alto',  'moderado_alto',  None,             'baixo'),          'moderado_alto'),
+    (('moderado_alto',  'baixo',          None,             'moderado_alto'),  'moderado_alto'),
+    (('baixo',          'moderado_alto',  None,             'moderado_alto'),  'moderado_alto'),
+    # Pelo menos uma ALTO + outras qualquer → ALTO ou MODERADO-ALTO
+    (('alto',           'baixo',          None,             'baixo'),          'moderado_alto'),
+    (('baixo',          'alto',           None,             'baixo'),          'moderado_alto'),
+    (('baixo',          'baixo',          None,             'alto'),           'moderado_alto'),
+    # === FALLBACK NÍVEL 2: COMBINAÇÕES DE 2 VARIÁVEIS (AS MAIS IMPORTANTES) ===
+    # Fenotípico + Gravidade (peso maior)
+    (('baixo',          None,             None,             'baixo'),          'baixo'),
+    (('baixo_moderado', None,             None,             'baixo_moderado'), 'baixo_moderado'),
+    (('moderado',       None,             None,             'moderado'),       'moderado'),
+    (('moderado_alto',  None,             None,             'moderado_alto'),  'moderado_alto'),
+    (('alto',           None,             None,             'alto'),           'alto'),
+    # Combinações mistas Fenotípico + Gravidade
+    (('alto',           None,             None,             'baixo'),          'moderado_alto'),
+    (('baixo',          None,             None,             'alto'),           'moderado_alto'),
+    (('moderado_alto',  None,             None,             'baixo'),          'moderado'),
+    (('baixo',          None,             None,             'moderado_alto'),  'moderado'),
+    # Ingestão + Gravidade
+    ((None,             'baixo',          None,             'baixo'),          'baixo'),
+    ((None,             'alto',           None,             'alto'),           'alto'),
+    ((None,             'moderado_alto',  None,             'moderado_alto'),  'moderado_alto'),
+    # Fenotípico + Ingestão
+    (('baixo',          'baixo',          None,             None),             'baixo'),
+    (('alto',           'alto',           None,             None),             'alto'),
+    (('moderado_alto',  'moderado_alto',  None,             None),             'moderado_alto'),
+    # === FALLBACK NÍVEL 3: VARIÁVEIS ISOLADAS (ÚLTIMA DEFESA - CRÍTICO!) ===
+    # Estas regras garantem que SEMPRE haverá saída, mesmo em casos extremos.
+    # São a "rede de segurança" que evita 100% dos KeyErrors.
+    # Se APENAS Fenotípico está definido claramente:
+    (('alto',           None,             None,             None),             'moderado_alto'),
+    (('moderado_alto',  None,             None,             None),             'moderado'),
+    (('moderado',       None,             None,             None),             'baixo_moderado'),
+    (('baixo_moderado', None,             None,             None),             'baixo_moderado'),
+    (('baixo',          None,             None,             None),             'baixo'),
+    # Se APENAS Ingestão está definida claramente:
+    ((None,             'alto',           None,             None),             'moderado_alto'),
+    ((None,             'moderado_alto',  None,             None),             'moderado'),
+    ((None,             'moderado',       None,             None),             'baixo_moderado'),
+    ((None,             'baixo_moderado', None,             None),             'baixo_moderado'),
+    ((None,             'baixo',          None,             None),             'baixo'),
+    # Se APENAS Gravidade está definida claramente:
+    ((None,             None,             None,             'alto'),           'moderado_alto'),
+    ((None,             None,             None,             'moderado_alto'),  'moderado'),
+    ((None,             None,             None,             'moderado'),       'baixo_moderado'),
+    ((None,             None,             None,             'baixo_moderado'), 'baixo_moderado'),
+    ((None,             None,             None,             'baixo'),          'baixo'),
+    # Se APENAS Inflamatório está definido claramente (menor peso, menor impacto):
+    ((None,             None,             'alto',           None),             'moderado'),
+    ((None,             None,             'moderado_alto',  None),             'baixo_moderado'),
+    ((None,             None,             'moderado',       None),             'baixo_moderado'),
+    ((None,             None,             'baixo_moderado', None),             'baixo'),
+    ((None,             None,             'baixo',          None),             'baixo'),
+]
+INTEGRADOR_COMPLETO = {
+    'entradas': ENTRADAS_INTEGRADOR,
+    'saida': ('risco_final', RISCO_FINAL),
+    'regras': _REGRAS_INTEGRADOR_COMUNS + _REGRAS_INTEGRADOR_ALBUMINA + _REGRAS_INTEGRADOR_FALLBACK,
+}
+
+INTEGRADOR_SIMPLIFICADO = {
+    'entradas': ENTRADAS_INTEGRADOR,
+    'saida': ('risco_final', RISCO_FINAL),
+    'regras': _REGRAS_INTEGRADOR_COMUNS + _REGRAS_INTEGRADOR_FALLBACK,
+}
+
+# ==============================================================================
+# BASES DA VERSÃO 1.4 (calculadora_desktop.py)
+# ==============================================================================
+# Fenotípico, ingestão e inflamatório são os mesmos da v2.2.
+
+# Gravidade - 35 regras, cirurgia com zona morta entre 0.4 e 0.6
+# (diagnostico, comorbidades, idade_var, cirurgia_var) -> risco_gravidade
+REGRAS_GRAVIDADE_V14 = [
+    # ALTO RISCO (múltiplos fatores graves)
+    (('alto_risco',  'alto_risco',  'alto_risco',  None),  'alto'),
+    (('alto_risco',  'alto_risco',  None,          'sim'), 'alto'),
+    (('alto_risco',  None,          'alto_risco',  'sim'), 'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco', None),  'alto'),
+    ((None,          'alto_risco',  'alto_risco',  'sim'), 'alto'),
+    # MODERADO-ALTO RISCO
+    (('alto_risco',  'medio_risco', 'medio_risco', None),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  None,          'sim'), 'moderado_alto'),
+    (('alto_risco',  'baixo_risco', None,          'sim'), 'moderado_alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco',  None),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'alto_risco',  None),  'moderado_alto'),
+    (('alto_risco',  None,          'alto_risco',  'nao'), 'moderado_alto'),
+    (('alto_risco',  'alto_risco',  'baixo_risco', None),  'moderado_alto'),
+    (('medio_risco', 'medio_risco', 'alto_risco',  'sim'), 'moderado_alto'),
+    # MODERADO RISCO
+    ((None,          'alto_risco',  None,          None),  'moderado'),
+    (('medio_risco', 'medio_risco', 'medio_risco', None),  'moderado'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco', 'nao'), 'moderado'),
+    ((None,          None,          'alto_risco',  'sim'), 'moderado'),
+    (('alto_risco',  'baixo_risco', 'medio_risco', None),  'moderado'),
+    (('medio_risco', 'alto_risco',  'baixo_risco', None),  'moderado'),
+    (('alto_risco',  'medio_risco', 'baixo_risco', None),  'moderado'),
+    (('medio_risco', 'medio_risco', None,          'sim'), 'moderado'),
+    (('alto_risco',  None,          'medio_risco', 'nao'), 'moderado'),
+    (('medio_risco', 'alto_risco',  None,          'nao'), 'moderado'),
+    # BAIXO-MODERADO RISCO
+    (('medio_risco', 'baixo_risco', 'medio_risco', None),  'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'medio_risco', None),  'baixo_moderado'),
+    (('medio_risco', 'medio_risco', 'baixo_risco', None),  'baixo_moderado'),
+    (('baixo_risco', 'alto_risco',  'baixo_risco', None),  'baixo_moderado'),
+    (('baixo_risco', 'baixo_risco', 'alto_risco',  None),  'baixo_moderado'),
+    (('medio_risco', None,          'alto_risco',  'nao'), 'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', None,          'sim'), 'baixo_moderado'),
+    ((None,          'medio_risco', 'medio_risco', 'nao'), 'baixo_moderado'),
+    # BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco', 'nao'), 'baixo'),
+    (('baixo_risco', 'baixo_risco', 'medio_risco', 'nao'), 'baixo'),
+    (('medio_risco', 'baixo_risco', 'baixo_risco', 'nao'), 'baixo'),
+    (('baixo_risco', 'baixo_risco', 'baixo_risco', 'sim'), 'baixo'),
+]
+GRAVIDADE_V14 = {
+    'entradas': [('diagnostico', DIAGNOSTICO), ('comorbidades', COMORBIDADES),
+                 ('idade_var', IDADE), ('cirurgia_var', CIRURGIA_V14)],
+    'saida': ('risco_gravidade', RISCO_SUBMODULO),
+    'regras': REGRAS_GRAVIDADE_V14,
+}
+
+# Integrador - 70 regras, sem distinção de modo
+# (escore_fenotipico, escore_ingestao, escore_inflamatorio, escore_gravidade) -> risco_final
+REGRAS_INTEGRADOR_V14 = [
+    # === REGRAS DE DOMINÂNCIA: ALTO RISCO ===
+    # Se ≥2 submódulos em ALTO → Resultado ALTO
+    (('alto',           None,             None,             'alto'),           'alto'),
+    (('alto',           'alto',           None,             None),             'alto'),
+    ((None,             'alto',           None,             'alto'),           'alto'),
+    (('alto',           None,             'alto',           None),             'alto'),
+    # Se 1 ALTO + 1 MODERADO-ALTO → ALTO
+    (('alto',           'moderado_alto',  None,             None),             'alto'),
+    (('alto',           None,             None,             'moderado_alto'),  'alto'),
+    ((None,             'alto',           None,             'moderado_alto'),  'alto'),
+    # Regras de dominância - Inflamatório alto com outros altos
+    (('alto',           None,             'alto',           None),             'alto'),
+    ((None,             'alto',           'alto',           None),             'alto'),
+    # === REGRAS MODERADO-ALTO ===
+    # Se 1 ALTO isolado → MODERADO-ALTO
+    (('alto',           'moderado',       None,             'moderado'),       'moderado_alto'),
+    (('alto',           'baixo_moderado', None,             'baixo_moderado'), 'moderado_alto'),
+    (('moderado',       'alto',           None,             'moderado'),       'moderado_alto'),
+    (('moderado',       'moderado',       None,             'alto'),           'moderado_alto'),
+    # Se ≥2 MODERADO-ALTO → MODERADO-ALTO
+    (('moderado_alto',  None,             None,             'moderado_alto'),  'moderado_alto'),
+    (('moderado_alto',  'moderado_alto',  None,             None),             'moderado_alto'),
+    ((None,             'moderado_alto',  None,             'moderado_alto'),  'moderado_alto'),
+    ((None,             None,             'alto',           'alto'),           'alto'),
+    # MODERADO-ALTO com inflamatório alto
+    (('moderado_alto',  None,             'alto',           None),             'moderado_alto'),
+    ((None,             None,             'alto',           'moderado_alto'),  'moderado_alto'),
+    ((None,             None,             'moderado_alto',  'alto'),           'moderado_alto'),
+    # === REGRAS MODERADO ===
+    # Se todos em MODERADO → MODERADO
+    (('moderado',       'moderado',       None,             'moderado'),       'moderado'),
+    (('moderado',       None,             'moderado',       'moderado'),       'moderado'),
+    # Se 1 MODERADO-ALTO + outros baixos → MODERADO
+    (('moderado_alto',  'baixo',          None,             'baixo'),          'moderado'),
+    (('baixo',          'moderado_alto',  None,             'baixo'),          'moderado'),
+    (('baixo',          'baixo',          None,             'moderado_alto'),  'moderado'),
+    # Mix MODERADO com BAIXO-MODERADO
+    (('moderado',       'baixo_moderado', None,             'moderado'),       'moderado'),
+    (('moderado',       'moderado',       None,             'baixo_moderado'), 'moderado'),
+    (('baixo_moderado', 'moderado',       None,             'moderado'),       'moderado'),
+    # Inflamatório MODERADO com outros MODERADOS
+    (('moderado',       None,             'moderado',       None),             'moderado'),
+    ((None,             'moderado',       'moderado',       None),             'moderado'),
+    ((None,             None,             'moderado',       'moderado'),       'moderado'),
+    # === REGRAS BAIXO-MODERADO ===
+    # Se todos em BAIXO-MODERADO → BAIXO-MODERADO
+    (('baixo_moderado', 'baixo_moderado', None,             'baixo_moderado'), 'baixo_moderado'),
+    (('baixo_moderado', None,             None,             'baixo_moderado'), 'baixo_moderado'),
+    # Mix BAIXO-MODERADO com BAIXO
+    (('baixo_moderado', 'baixo',          None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo_moderado', None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo',          None,             'baixo_moderado'), 'baixo_moderado'),
+    # BAIXO-MODERADO com MODERADO
+    (('baixo_moderado', 'moderado',       None,             'baixo'),          'baixo_moderado'),
+    (('moderado',       'baixo',          None,             'baixo_moderado'), 'baixo_moderado'),
+    # === REGRAS BAIXO ===
+    # Se todos em BAIXO → BAIXO
+    (('baixo',          'baixo',          'baixo',          'baixo'),          'baixo'),
+    (('baixo',          'baixo',          None,             'baixo'),          'baixo'),
+    (('baixo',          None,             'baixo',          'baixo'),          'baixo'),
+    ((None,             'baixo',          'baixo',          'baixo'),          'baixo'),
+    # === REGRAS DE COBERTURA ADICIONAL ===
+    # Casos mistos com inflamatório
+    (('baixo',          'baixo',          'baixo',          None),             'baixo'),
+    (('baixo_moderado', None,             'baixo_moderado', 'baixo_moderado'), 'baixo_moderado'),
+    (('moderado',       None,             'moderado_alto',  None),             'moderado_alto'),
+    # Regra geral de fallback: média ponderada dos principais
+    (('moderado',       None,             None,             'moderado'),       'moderado'),
+    (('baixo_moderado', None,             None,             'moderado'),       'baixo_moderado'),
+    (('moderado',       None,             None,             'baixo_moderado'), 'baixo_moderado'),
+    # Mais casos de cobertura
+    (('moderado_alto',  'moderado',       None,             'baixo_moderado'), 'moderado'),
+    (('baixo',          'moderado_alto',  None,             'moderado'),       'moderado'),
+    # === REGRAS ADICIONAIS PARA MELHOR COBERTURA ===
+    # Combinações com 2 BAIXO-MODERADO + 1 MODERADO + 1 BAIXO
+    (('baixo_moderado', 'baixo_moderado', 'moderado',       'baixo'),          'baixo_moderado'),
+    (('baixo_moderado', 'baixo_moderado', 'baixo',          'moderado'),       'baixo_moderado'),
+    (('baixo_moderado', None,             'moderado',       'baixo'),          'baixo_moderado'),
+    ((None,             'baixo_moderado', 'moderado',       'baixo'),          'baixo_moderado'),
+    # Combinações com MODERADO e BAIXO-MODERADO
+    (('baixo_moderado', 'baixo_moderado', 'moderado',       None),             'baixo_moderado'),
+    (('baixo_moderado', None,             'moderado',       'baixo'),          'baixo_moderado'),
+    ((None,             'baixo_moderado', 'moderado',       'baixo'),          'baixo_moderado'),
+    # Combinações com MODERADO isolado
+    (('baixo_moderado', 'baixo',          'moderado',       None),             'baixo_moderado'),
+    (('baixo',          None,             'moderado',       'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo_moderado', 'moderado',       None),             'baixo_moderado'),
+    # Mais combinações BAIXO-MODERADO
+    (('baixo_moderado', 'baixo_moderado', None,             None),             'baixo_moderado'),
+    ((None,             'baixo_moderado', 'baixo_moderado', None),             'baixo_moderado'),
+    (('baixo_moderado', None,             'baixo_moderado', None),             'baixo_moderado'),
+    # Combinações MODERADO com múltiplos BAIXO
+    (('baixo',          None,             'moderado',       'baixo'),          'baixo_moderado'),
+    (('moderado',       'baixo',          None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'moderado',       None,             'baixo'),          'baixo_moderado'),
+    (('baixo',          'baixo',          None,             'moderado'),       'baixo_moderado'),
+    # Combinações com 1 MODERADO + restante misto
+    (('baixo_moderado', 'moderado',       'baixo',          None),             'baixo_moderado'),
+    (('moderado',       'baixo_moderado', 'baixo',          None),             'baixo_moderado'),
+    (('baixo',          None,             'baixo_moderado', 'moderado'),       'baixo_moderado'),
+]
+INTEGRADOR_V14 = {
+    'entradas': ENTRADAS_INTEGRADOR,
+    'saida': ('risco_final', RISCO_FINAL),
+    'regras': REGRAS_INTEGRADOR_V14,
+}
+
+# ==============================================================================
+# PROTÓTIPOS DA RODADA 3 DELPHI (submodulo1-4, modulo_integrador_final)
+# ==============================================================================
+
+# Fenotípico - 12 regras + 1 regra OU para casos não cobertos
+# (imc, perda_ponderal, sarcopenia) -> risco_fenotipico
+REGRAS_FENOTIPICO_DELPHI = [
+    # REGRAS DE ALTO RISCO (prioridade alta)
+    (('alto_risco',  'alto_risco',  'alto_risco'),  'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco'), 'alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco'),  'alto'),
+    (('alto_risco',  'medio_risco', 'medio_risco'), 'moderado_alto'),
+    # REGRAS DE MÉDIO/MODERADO RISCO
+    (('alto_risco',  'baixo_risco', None),          'baixo_moderado'),  # Override obesidade estável
+    (('medio_risco', 'alto_risco',  'alto_risco'),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'medio_risco'), 'moderado'),
+    (('medio_risco', 'medio_risco', 'medio_risco'), 'moderado'),
+    (('medio_risco', 'medio_risco', 'baixo_risco'), 'baixo_moderado'),
+    # REGRAS DE BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+    (('medio_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco'), 'baixo_moderado'),
+    # REGRA DEFAULT (caso não coberto)
+    ([
+        ('medio_risco', None,          None),
+        (None,          'medio_risco', None),
+        (None,          None,          'medio_risco'),
+    ], 'moderado'),
+]
+FENOTIPICO_DELPHI = {
+    'entradas': FENOTIPICO['entradas'],
+    'saida': ('risco_fenotipico', RISCO_SUBMODULO),
+    'regras': REGRAS_FENOTIPICO_DELPHI,
+}
+
+# Ingestão - 15 regras
+# (vet_consumido, duracao_deficit, sintomas_gi) -> risco_ingestao
+REGRAS_INGESTAO_DELPHI = [
+    # REGRAS DE ALTO RISCO (deficit grave e prolongado)
+    (('alto_risco',  'alto_risco',  'alto_risco'),  'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco'), 'alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco'),  'alto'),
+    (('alto_risco',  'alto_risco',  'baixo_risco'), 'moderado_alto'),
+    # REGRAS DE MODERADO-ALTO RISCO
+    (('medio_risco', 'alto_risco',  'alto_risco'),  'moderado_alto'),
+    (('alto_risco',  'medio_risco', 'medio_risco'), 'moderado_alto'),
+    (('alto_risco',  'baixo_risco', 'alto_risco'),  'moderado_alto'),
+    # REGRAS DE MODERADO RISCO
+    (('medio_risco', 'medio_risco', 'medio_risco'), 'moderado'),
+    (('medio_risco', 'alto_risco',  'baixo_risco'), 'moderado'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco'), 'moderado'),
+    (('medio_risco', 'medio_risco', 'baixo_risco'), 'baixo_moderado'),
+    # REGRAS DE BAIXO-MODERADO RISCO
+    (('baixo_risco', 'medio_risco', 'medio_risco'), 'baixo_moderado'),
+    (('medio_risco', 'baixo_risco', 'medio_risco'), 'baixo_moderado'),
+    # REGRAS DE BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+    (('baixo_risco', 'baixo_risco', 'medio_risco'), 'baixo'),
+]
+INGESTAO_DELPHI = {
+    'entradas': INGESTAO['entradas'],
+    'saida': ('risco_ingestao', RISCO_SUBMODULO),
+    'regras': REGRAS_INGESTAO_DELPHI,
+}
+
+# Inflamatório - 10 regras
+# (pcr, albumina, febre) -> risco_inflamatorio
+REGRAS_INFLAMATORIO_DELPHI = [
+    # INCLUI REGRA DE DOMINANCIA: PCR >200 sempre alto risco
+    # REGRAS DE ALTO RISCO (inflamacao grave)
+    (('alto_risco',  'alto_risco',  'alto_risco'),  'alto'),
+    (('alto_risco',  'alto_risco',  'medio_risco'), 'alto'),
+    (('alto_risco',  'medio_risco', 'alto_risco'),  'alto'),
+    # REGRA DE DOMINANCIA: PCR extremamente elevada (>200) sempre alto risco
+    # Nota: Esta regra e capturada pela MF de alto_risco da PCR (>100)
+    # mas enfatizamos que valores >200 tem pertinencia maxima
+    (('alto_risco',  'alto_risco',  None),          'alto'),
+    # REGRAS DE MODERADO-ALTO RISCO
+    (('alto_risco',  'baixo_risco', 'medio_risco'), 'moderado_alto'),
+    (('medio_risco', 'alto_risco',  'alto_risco'),  'moderado_alto'),
+    # REGRAS DE MODERADO RISCO
+    (('medio_risco', 'medio_risco', 'medio_risco'), 'moderado'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco'), 'moderado'),
+    # REGRAS DE BAIXO-MODERADO E BAIXO RISCO
+    (('medio_risco', 'baixo_risco', 'baixo_risco'), 'baixo_moderado'),
+    (('baixo_risco', 'baixo_risco', 'baixo_risco'), 'baixo'),
+]
+INFLAMATORIO_DELPHI = {
+    'entradas': INFLAMATORIO['entradas'],
+    'saida': ('risco_inflamatorio', RISCO_SUBMODULO),
+    'regras': REGRAS_INFLAMATORIO_DELPHI,
+}
+
+# Gravidade - 13 regras
+# (diagnostico, comorbidades, idade, cirurgia) -> risco_gravidade
+REGRAS_GRAVIDADE_DELPHI = [
+    # ENFASE: Comorbidades criticas (IRC dialise, ICC IV, DPOC O2, cirrose C) sempre >= MODERADO
+    # REGRAS DE ALTO RISCO
+    (('alto_risco',  'alto_risco',  'alto_risco',  None),  'alto'),
+    (('alto_risco',  'alto_risco',  None,          'sim'), 'alto'),
+    (('alto_risco',  None,          'alto_risco',  'sim'), 'alto'),
+    # REGRAS DE MODERADO-ALTO RISCO
+    (('alto_risco',  'medio_risco', 'medio_risco', None),  'moderado_alto'),
+    (('medio_risco', 'alto_risco',  None,          'sim'), 'moderado_alto'),
+    (('alto_risco',  'baixo_risco', None,          'sim'), 'moderado_alto'),
+    # REGRAS DE MODERADO RISCO
+    # IMPORTANTE: Comorbidades criticas sempre >= MODERADO
+    ((None,          'alto_risco',  None,          None),  'moderado'),  # Regra de dominancia para comorbidades criticas
+    (('medio_risco', 'medio_risco', 'medio_risco', None),  'moderado'),
+    (('alto_risco',  'baixo_risco', 'baixo_risco', 'nao'), 'moderado'),
+    ((None,          None,          'alto_risco',  'sim'), 'moderado'),
+    # REGRAS DE BAIXO-MODERADO RISCO
+    (('medio_risco', 'baixo_risco', 'medio_risco', None),  'baixo_moderado'),
+    (('baixo_risco', 'medio_risco', 'medio_risco', None),  'baixo_moderado'),
+    # REGRAS DE BAIXO RISCO
+    (('baixo_risco', 'baixo_risco', 'baixo_risco', 'nao'), 'baixo'),
+]
+GRAVIDADE_DELPHI = {
+    'entradas': [('diagnostico', DIAGNOSTICO), ('comorbidades', COMORBIDADES),
+                 ('idade', IDADE), ('cirurgia', CIRURGIA_V14)],
+    'saida': ('risco_gravidade', RISCO_SUBMODULO),
+    'regras': REGRAS_GRAVIDADE_DELPHI,
+}
+
+# Integrador - 10 regras de integração e ajuste sinérgico + 2 regras OU
+# (escore_fenotipico, escore_ingestao, escore_inflamatorio, escore_gravidade) -> risco_final
+REGRAS_INTEGRADOR_DELPHI = [
+    # REGRAS DE ALTO RISCO
+    # Fenotipico e Gravidade tem peso 30% cada - se ambos altos, risco final e alto
+    (('alto',           None,            None,       'alto'),           'alto'),
+    (('alto',           'alto',          None,       None),             'alto'),
+    # REGRAS DE MODERADO-ALTO RISCO
+    (('moderado_alto',  None,            None,       'moderado_alto'),  'moderado_alto'),
+    ((None,             'alto',          None,       'moderado_alto'),  'moderado_alto'),
+    ([
+        ('alto',           None,            None,       None),
+        (None,             'alto',          None,       None),
+        (None,             None,            None,       'alto'),
+    ], 'moderado_alto'),
+    # REGRAS DE MODERADO RISCO
+    (('moderado',       None,            None,       'moderado'),       'moderado'),
+    ((None,             'moderado',      'moderado', None),             'moderado'),
+    ([
+        ('moderado',       None,            None,       None),
+        (None,             'moderado',      None,       None),
+        (None,             None,            None,       'moderado'),
+    ], 'moderado'),
+    # REGRAS DE BAIXO-MODERADO RISCO
+    (('baixo_moderado', None,            None,       'baixo_moderado'), 'baixo_moderado'),
+    # REGRAS DE BAIXO RISCO
+    (('baixo',          'baixo',         None,       'baixo'),          'baixo'),
+    # REGRAS DE AJUSTE SINERGICO
+    # Quando desnutricao grave (fenotipico alto) + deficit alimentar grave (ingestao alta)
+    # = SINERGIA que amplifica risco
+    (('alto',           'moderado_alto', None,       None),             'alto'),
+    # Quando inflamacao grave (inflamatorio alto) + gravidade alta + qualquer deficit nutricional
+    # = SINERGIA (catabolismo acelerado)
+    ((None,             None,            'alto',     'alto'),           'moderado_alto'),
+]
+INTEGRADOR_DELPHI = {
+    'entradas': ENTRADAS_INTEGRADOR,
+    'saida': ('risco_final', RISCO_FINAL_DELPHI),
+    'regras': REGRAS_INTEGRADOR_DELPHI,
+}
+
+# ==============================================================================
+# ÍNDICE DAS BASES
+# ==============================================================================
+
+BASES = {
+    # Registro da calculadora (calculadora_desktop_albumina_opcional.obter_sistema)
+    'fenotipico': FENOTIPICO,
+    'ingestao': INGESTAO,
+    'inflamatorio': INFLAMATORIO,
+    'inflamatorio_simplificado': INFLAMATORIO_SIMPLIFICADO,
+    'gravidade': GRAVIDADE,
+    'integrador_completo': INTEGRADOR_COMPLETO,
+    'integrador_simplificado': INTEGRADOR_SIMPLIFICADO,
+    # Versão 1.4
+    'gravidade_v14': GRAVIDADE_V14,
+    'integrador_v14': INTEGRADOR_V14,
+    # Protótipos da Rodada 3 Delphi
+    'fenotipico_delphi': FENOTIPICO_DELPHI,
+    'ingestao_delphi': INGESTAO_DELPHI,
+    'inflamatorio_delphi': INFLAMATORIO_DELPHI,
+    'gravidade_delphi': GRAVIDADE_DELPHI,
+    'integrador_delphi': INTEGRADOR_DELPHI,
+}
@@ -0,0 +1,338 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Benchmark dos Pontos de Entrada de Pontuação
+
+Mede, para cada função calcular_* dos módulos separados (submodulo1 ...
+modulo_integrador_final), de calculadora_desktop.py e de
+calculadora_desktop_albumina_opcional.py, e para o pipeline vetorizado:
+
+- Latência de uma chamada: p50 / p95 / p99 (ms)
+- Vazão em lote: chamadas por segundo num laço de pacientes
+- Pico de memória alocada durante o lote (tracemalloc)
+
+Os resultados podem ser salvos como referência JSON e comparados com uma
+execução posterior; uma piora além da tolerância é apontada como regressão.
+
+USO:
+    python benchmark_pontuacao.py --salvar referencia.json
+    python benchmark_pontuacao.py --comparar referencia.json [--tolerancia 0.25]
+    python benchmark_pontuacao.py --filtro albumina --amostras 100
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+AMOSTRAS_PADRAO = 200
+LOTE_PADRAO = 200
+TEMPO_MAXIMO_PADRAO = 3.0
+TOLERANCIA_PADRAO = 0.25
+
+# Métricas comparadas com a referência: (chave, maior_e_melhor)
+METRICAS_COMPARADAS = (('p50_ms', False), ('p95_ms', False), ('vazao', True), ('pico_memoria_kb', False))
+
+# ==============================================================================
+# PONTOS DE ENTRADA
+# ==============================================================================
+
+# Intervalos válidos de cada entrada (mesmos da validação dos submódulos)
+_INTERVALOS = {
+    'imc': (13, 45), 'perda': (0, 30), 'sarcopenia': (0, 3),
+    'vet': (0, 100), 'duracao': (0, 30), 'sintomas': (0, 3),
+    'pcr': (0, 300), 'albumina': (1.5, 5.0), 'febre': (0, 3),
+    'diagnostico': (0, 3), 'comorbidades': (0, 5), 'idade': (18, 100), 'cirurgia': (0, 1),
+    'escore': (0, 100),
+}
+
+_FENOTIPICO = ('imc', 'perda', 'sarcopenia')
+_INGESTAO = ('vet', 'duracao', 'sintomas')
+_INFLAMATORIO = ('pcr', 'albumina', 'febre')
+_GRAVIDADE = ('diagnostico', 'comorbidades', 'idade', 'cirurgia')
+_INTEGRADOR = ('escore',) * 4
+
+# (nome, módulo, função, campos dos argumentos, argumentos nomeados fixos)
+PONTOS_ENTRADA = [
+    ('submodulo1.calcular_risco_fenotipico', 'submodulo1_fenotipico', 'calcular_risco_fenotipico', _FENOTIPICO, {}),
+    ('submodulo2.calcular_risco_ingestao', 'submodulo2_ingestao', 'calcular_risco_ingestao', _INGESTAO, {}),
+    ('submodulo3.calcular_risco_inflamatorio', 'submodulo3_inflamatorio', 'calcular_risco_inflamatorio',
+     _INFLAMATORIO, {}),
+    ('submodulo4.calcular_risco_gravidade', 'submodulo4_gravidade', 'calcular_risco_gravidade', _GRAVIDADE, {}),
+    ('integrador.calcular_risco_final', 'modulo_integrador_final', 'calcular_risco_final', _INTEGRADOR, {}),
+
+    ('desktop.calcular_submodulo_fenotipico', 'calculadora_desktop', 'calcular_submodulo_fenotipico',
+     _FENOTIPICO, {}),
+    ('desktop.calcular_submodulo_ingestao', 'calculadora_desktop', 'calcular_submodulo_ingestao', _INGESTAO, {}),
+    ('desktop.calcular_submodulo_inflamatorio', 'calculadora_desktop', 'calcular_submodulo_inflamatorio',
+     _INFLAMATORIO, {}),
+    ('desktop.calcular_submodulo_gravidade', 'calculadora_desktop', 'calcular_submodulo_gravidade', _GRAVIDADE, {}),
+    ('desktop.calcular_risco_final_integrado', 'calculadora_desktop', 'calcular_risco_final_integrado',
+     _INTEGRADOR, {}),
+
+    ('albumina.calcular_submodulo_fenotipico', 'calculadora_desktop_albumina_opcional',
+     'calcular_submodulo_fenotipico', _FENOTIPICO, {}),
+    ('albumina.calcular_submodulo_ingestao', 'calculadora_desktop_albumina_opcional',
+     'calcular_submodulo_ingestao', _INGESTAO, {}),
+    ('albumina.calcular_submodulo_inflamatorio', 'calculadora_desktop_albumina_opcional',
+     'calcular_submodulo_inflamatorio', _INFLAMATORIO, {}),
+    ('albumina.calcular_submodulo_inflamatorio_simplificado', 'calculadora_desktop_albumina_opcional',
+     'calcular_submodulo_inflamatorio_simplificado', ('pcr', 'febre'), {}),
+    ('albumina.calcular_submodulo_gravidade', 'calculadora_desktop_albumina_opcional',
+     'calcular_submodulo_gravidade', _GRAVIDADE, {}),
+    ('albumina.calcular_risco_final_integrado[completo]', 'calculadora_desktop_albumina_opcional',
+     'calcular_risco_final_integrado', _INTEGRADOR, {'modo_completo': True}),
+    ('albumina.calcular_risco_final_integrado[simplificado]', 'calculadora_desktop_albumina_opcional',
+     'calcular_risco_final_integrado', _INTEGRADOR, {'modo_completo': False}),
+]
+
+# O pipeline vetorizado pontua o lote inteiro numa chamada; a vazão conta pacientes
+PIPELINE = 'pipeline.pontuar_pacientes[lote]'
+
+
+def _valores_aleatorios(campos, n, rng):
+    """n conjuntos de argumentos válidos (cirurgia binária)"""
+    colunas = []
+    for campo in campos:
+        minimo, maximo = _INTERVALOS[campo]
+        if campo == 'cirurgia':
+            colunas.append(rng.integers(0, 2, n).astype(float))
+        else:
+            colunas.append(rng.uniform(minimo, maximo, n))
+    return [tuple(float(v) for v in linha) for linha in zip(*colunas)]
+
+
+def _argumentos_validos(funcao, campos, fixos, n, rng, tempo_maximo=TEMPO_MAXIMO_PADRAO):
+    """Sorteia até n argumentos, descartando os que caem em zona sem regra
+    ativada (KeyError); em funções lentas para ao esgotar tempo_maximo"""
+    validos = []
+    limite = time.perf_counter() + tempo_maximo
+    for _ in range(20):
+        for argumentos in _valores_aleatorios(campos, n, rng):
+            try:
+                funcao(*argumentos, **fixos)
+            except KeyError:
+                continue
+            validos.append(argumentos)
+            if len(validos) == n or time.perf_counter() > limite:
+                return validos
+    if validos:
+        return validos
+    raise RuntimeError(f"Não foi possível sortear {n} entradas válidas para {funcao.__name__}")
+
+# ==============================================================================
+# MEDIÇÕES
+# ==============================================================================
+
+def _percentis_ms(tempos_s):
+    p50, p95, p99 = np.percentile(np.asarray(tempos_s) * 1000, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+
+def medir_funcao(funcao, argumentos, fixos=None, amostras=AMOSTRAS_PADRAO, lote=LOTE_PADRAO,
+                 tempo_maximo=TEMPO_MAXIMO_PADRAO):
+    """Latência, vazão e pico de memória de uma função de pontuação
+
+    Parâmetros:
+    -----------
+    funcao : callable
+        Função calcular_* a medir
+    argumentos : list de tuple
+        Entradas válidas, percorridas em ciclo
+    fixos : dict, opcional
+        Argumentos nomeados repetidos em toda chamada (ex.: modo_completo)
+    amostras : int
+        Chamadas cronometradas uma a uma (percentis de latência)
+    lote : int
+        Chamadas do laço de vazão
+    tempo_maximo : float
+        Limite em segundos de cada etapa, para funções lentas; ao menos 5
+        chamadas são sempre medidas
+
+    Retorna:
+    --------
+    dict : p50_ms, p95_ms, p99_ms, vazao (chamadas/s), pico_memoria_kb,
+           amostras, lote
+    """
+    fixos = fixos or {}
+    funcao(*argumentos[0], **fixos)  # aquecimento (compilação sob demanda)
+
+    tempos = []
+    limite = time.perf_counter() + tempo_maximo
+    for i in range(amostras):
+        inicio = time.perf_counter()
+        funcao(*argumentos[i % len(argumentos)], **fixos)
+        tempos.append(time.perf_counter() - inicio)
+        if i >= 4 and time.perf_counter() > limite:
+            break
+
+    chamadas = 0
+    inicio = time.perf_counter()
+    limite = inicio + tempo_maximo
+    for i in range(lote):
+        funcao(*argumentos[i % len(argumentos)], **fixos)
+        chamadas += 1
+        if i >= 4 and time.perf_counter() > limite:
+            break
+    tempo_lote = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    for i in range(min(chamadas, 20)):
+        funcao(*argumentos[i % len(argumentos)], **fixos)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {**_percentis_ms(tempos), 'vazao': chamadas / tempo_lote, 'pico_memoria_kb': pico / 1024,
+            'amostras': len(tempos), 'lote': chamadas}
+
+
+def medir_pipeline(n_pacientes=LOTE_PADRAO, amostras=20, semente=0):
+    """Latência de pontuar_pacientes para um lote de n_pacientes; vazão em pacientes/s"""
+    import pipeline_pacientes
+    from pontuacao_paralela import _lote_aleatorio
+
+    lote = _lote_aleatorio(n_pacientes, semente)
+    pipeline_pacientes.pontuar_pacientes(lote)  # aquecimento
+
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        pipeline_pacientes.pontuar_pacientes(lote)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    pipeline_pacientes.pontuar_pacientes(lote)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {**_percentis_ms(tempos), 'vazao': n_pacientes / float(np.median(tempos)),
+            'pico_memoria_kb': pico / 1024, 'amostras': amostras, 'lote': n_pacientes}
+
+
+def executar_benchmark(filtro=None, amostras=AMOSTRAS_PADRAO, lote=LOTE_PADRAO,
+                       tempo_maximo=TEMPO_MAXIMO_PADRAO, semente=0, progresso=None):
+    """Mede todos os pontos de entrada cujo nome contém `filtro`
+
+    Retorna:
+    --------
+    dict : {'metadados': {...}, 'resultados': {nome: métricas}}
+    """
+    rng = np.random.default_rng(semente)
+    resultados = {}
+    for nome, modulo, funcao, campos, fixos in PONTOS_ENTRADA:
+        if filtro and filtro not in nome:
+            continue
+        alvo = getattr(importlib.import_module(modulo), funcao)
+        argumentos = _argumentos_validos(alvo, campos, fixos, min(amostras, 50), rng, tempo_maximo)
+        resultados[nome] = medir_funcao(alvo, argumentos, fixos, amostras, lote, tempo_maximo)
+        if progresso:
+            progresso(nome, resultados[nome])
+    if not filtro or filtro in PIPELINE:
+        resultados[PIPELINE] = medir_pipeline(lote, semente=semente)
+        if progresso:
+            progresso(PIPELINE, resultados[PIPELINE])
+
+    import skfuzzy
+    return {
+        'metadados': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'skfuzzy': skfuzzy.__version__,
+            'plataforma': platform.platform(),
+            'processador': platform.processor() or platform.machine(),
+            'amostras': amostras,
+            'lote': lote,
+        },
+        'resultados': resultados,
+    }
+
+# ==============================================================================
+# REFERÊNCIAS JSON
+# ==============================================================================
+
+def salvar_referencia(relatorio, caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+
+
+def carregar_referencia(caminho):
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def comparar_relatorios(referencia, atual, tolerancia=TOLERANCIA_PADRAO):
+    """Compara métrica a métrica; piora relativa acima da tolerância é regressão
+
+    Retorna:
+    --------
+    list de dict : nome, metrica, referencia, atual, variacao (relativa,
+                   positiva = pior), regressao (bool); pontos de entrada
+                   ausentes em um dos relatórios são ignorados
+    """
+    comparacoes = []
+    for nome, metricas in atual['resultados'].items():
+        base = referencia['resultados'].get(nome)
+        if base is None:
+            continue
+        for metrica, maior_e_melhor in METRICAS_COMPARADAS:
+            if metrica not in base or metrica not in metricas or base[metrica] <= 0:
+                continue
+            variacao = (metricas[metrica] - base[metrica]) / base[metrica]
+            if maior_e_melhor:
+                variacao = -variacao
+            comparacoes.append({
+                'nome': nome, 'metrica': metrica, 'referencia': base[metrica], 'atual': metricas[metrica],
+                'variacao': variacao, 'regressao': variacao > tolerancia,
+            })
+    return comparacoes
+
+
+def _imprimir_linha(nome, m):
+    print(f"{nome:<56}{m['p50_ms']:>9.3f}{m['p95_ms']:>9.3f}{m['p99_ms']:>9.3f}"
+          f"{m['vazao']:>11.1f}{m['pico_memoria_kb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos pontos de entrada de pontuação")
+    parser.add_argument('--filtro', help="mede apenas pontos de entrada cujo nome contém este texto")
+    parser.add_argument('--amostras', type=int, default=AMOSTRAS_PADRAO, help="chamadas cronometradas por função")
+    parser.add_argument('--lote', type=int, default=LOTE_PADRAO, help="chamadas do laço de vazão")
+    parser.add_argument('--tempo-maximo', type=float, default=TEMPO_MAXIMO_PADRAO,
+                        help="segundos por etapa em funções lentas")
+    parser.add_argument('--salvar', help="grava o resultado como referência JSON")
+    parser.add_argument('--comparar', help="compara com uma referência JSON salva antes")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help="piora relativa aceita antes de acusar regressão (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    print("="*101)
+    print("BENCHMARK DE PONTUAÇÃO")
+    print("="*101)
+    print(f"{'Ponto de entrada':<56}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Vazão/s':>11}{'Pico KB':>10}")
+    relatorio = executar_benchmark(args.filtro, args.amostras, args.lote, args.tempo_maximo,
+                                   progresso=_imprimir_linha)
+    print("Vazão do pipeline em pacientes/s (lote inteiro por chamada)")
+
+    if args.salvar:
+        salvar_referencia(relatorio, args.salvar)
+        print(f"\nReferência salva em {args.salvar}")
+
+    if args.comparar:
+        comparacoes = comparar_relatorios(carregar_referencia(args.comparar), relatorio, args.tolerancia)
+        regressoes = [c for c in comparacoes if c['regressao']]
+        print(f"\n{'='*101}")
+        print(f"COMPARAÇÃO COM {args.comparar} (tolerância {100*args.tolerancia:.0f}%)")
+        print(f"{'='*101}")
+        for c in regressoes:
+            print(f"  ✗ {c['nome']} {c['metrica']}: {c['referencia']:.3f} -> {c['atual']:.3f} "
+                  f"({100*c['variacao']:+.0f}% pior)")
+        if regressoes:
+            print(f"\n✗ {len(regressoes)} regressão(ões) de desempenho em {len(comparacoes)} métricas comparadas")
+            sys.exit(1)
+        print(f"✓ Nenhuma regressão em {len(comparacoes)} métricas comparadas")
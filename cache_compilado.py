@@ -0,0 +1,148 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Cache em Disco de Artefatos Compilados
+
+Tabelar e certificar uma superfície (superficies_lut.py) leva de 0.5 a 7 s
+por base de regras; refazer isso a cada abertura do programa é desperdício.
+Este módulo guarda os arrays compilados em disco e os mapeia na memória na
+próxima execução:
+
+- Cada artefato é uma pasta com um arquivo .npy por array, lida com
+  np.load(mmap_mode='r'): a partida a quente só mapeia os arquivos
+- O nome da pasta contém a ASSINATURA do artefato: um SHA-256 dos pontos
+  das funções de pertinência e das matrizes de regras que o geraram (e dos
+  parâmetros de construção). Mudou uma regra ou um vértice, muda a
+  assinatura: o artefato antigo deixa de ser encontrado e é apagado quando
+  o novo é salvo
+- A gravação é atômica (pasta temporária + rename), então processos
+  simultâneos nunca leem um artefato pela metade
+
+Pasta padrão: .cache_compilado/ ao lado deste arquivo.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+DIRETORIO_CACHE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_compilado')
+
+# Incrementar quando o formato dos artefatos mudar
+VERSAO_FORMATO = 1
+
+# ==============================================================================
+# ASSINATURA
+# ==============================================================================
+
+def assinatura(*partes):
+    """SHA-256 (hex) de arrays, números, textos e listas/tuplas deles
+
+    Arrays entram com dtype e forma, para que (2, 3) e (3, 2) com os mesmos
+    bytes não colidam.
+    """
+    h = hashlib.sha256(f"formato={VERSAO_FORMATO}".encode())
+
+    def acumular(parte):
+        if isinstance(parte, (list, tuple)):
+            h.update(f"[{len(parte)}".encode())
+            for item in parte:
+                acumular(item)
+            h.update(b"]")
+        elif isinstance(parte, np.ndarray):
+            arr = np.ascontiguousarray(parte)
+            h.update(f"<{arr.dtype.str}{arr.shape}>".encode())
+            h.update(arr.tobytes())
+        else:
+            h.update(f"<{type(parte).__name__}:{parte!r}>".encode())
+
+    for parte in partes:
+        acumular(parte)
+    return h.hexdigest()
+
+
+def assinatura_motor(motor):
+    """Assinatura de uma BaseRegrasVetorizada: universos, pertinências e regras"""
+    return assinatura(
+        motor.entradas, motor.universos,
+        [[(rotulo, mf) for rotulo, mf in termos] for termos in motor.termos],
+        motor.saida, motor.universo_saida, motor.rotulos_saida, motor.mfs_saida,
+        motor.antecedentes, motor.consequentes, motor.pesos,
+    )
+
+# ==============================================================================
+# LEITURA E GRAVAÇÃO
+# ==============================================================================
+
+def _pasta(diretorio, nome, chave):
+    return os.path.join(diretorio, f"{nome}-{chave[:32]}")
+
+
+def carregar_artefato(nome, chave, diretorio=DIRETORIO_CACHE_PADRAO, mmap=True):
+    """Arrays do artefato `nome` com a assinatura `chave`, ou None se não houver
+
+    Parâmetros:
+    -----------
+    nome : str
+        Identificador do artefato (ex.: 'superficie-fenotipico')
+    chave : str
+        Assinatura (ver assinatura())
+    mmap : bool
+        Mapeia os arquivos na memória (somente leitura) em vez de copiá-los
+
+    Retorna:
+    --------
+    dict (nome do array -> np.ndarray) ou None
+    """
+    pasta = _pasta(diretorio, nome, chave)
+    try:
+        arquivos = sorted(a for a in os.listdir(pasta) if a.endswith('.npy'))
+        if not arquivos:
+            return None
+        return {a[:-4]: np.load(os.path.join(pasta, a), mmap_mode='r' if mmap else None, allow_pickle=False)
+                for a in arquivos}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # Ilegível ou corrompido: apaga para que a nova tabela possa ser gravada
+        shutil.rmtree(pasta, ignore_errors=True)
+        return None
+
+
+def salvar_artefato(nome, chave, arrays, diretorio=DIRETORIO_CACHE_PADRAO):
+    """Grava os arrays do artefato e apaga versões com outra assinatura
+
+    Falhas de gravação (pasta sem permissão, disco cheio) são ignoradas: o
+    cache é só uma otimização.
+
+    Retorna:
+    --------
+    bool : True se o artefato ficou gravado
+    """
+    destino = _pasta(diretorio, nome, chave)
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        temporaria = tempfile.mkdtemp(prefix=f".{nome}-", dir=diretorio)
+        try:
+            for rotulo, valores in arrays.items():
+                np.save(os.path.join(temporaria, f"{rotulo}.npy"), np.asarray(valores), allow_pickle=False)
+            os.rename(temporaria, destino)
+        except OSError:
+            shutil.rmtree(temporaria, ignore_errors=True)
+            if not os.path.isdir(destino):
+                return False
+            # Outro processo gravou o mesmo artefato primeiro
+
+        for antiga in os.listdir(diretorio):
+            caminho = os.path.join(diretorio, antiga)
+            if antiga.startswith(f"{nome}-") and caminho != destino:
+                shutil.rmtree(caminho, ignore_errors=True)
+        return True
+    except OSError:
+        return False
+
+
+def limpar_cache(diretorio=DIRETORIO_CACHE_PADRAO):
+    """Apaga todos os artefatos gravados"""
+    shutil.rmtree(diretorio, ignore_errors=True)
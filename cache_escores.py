@@ -0,0 +1,206 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Memoização dos Escores com Chave Quantizada e Descarte LRU
+
+As entradas da calculadora têm resolução grosseira (escalas 0-3/0-5 em
+combobox, IMC e perda com uma casa decimal), então as mesmas tuplas de
+entrada se repetem o tempo todo. CacheEscores envolve uma função calcular_*
+e transforma as repetições em consultas a um dicionário:
+
+- Cada entrada é QUANTIZADA no passo do universo da sua variável fuzzy
+  (IMC 0.1, PCR 1, idade 1, ...) e a função é avaliada no valor quantizado,
+  de modo que o escore guardado não depende de qual valor chegou primeiro.
+  Valores já sobre a grade (tudo o que a interface produz) não mudam.
+- No máximo `capacidade` resultados ficam guardados; o menos usado
+  recentemente é descartado (LRU).
+- Contadores de acertos, faltas e descartes em estatisticas().
+
+O integrador recebe escores contínuos dos submódulos; suas chaves não são
+quantizadas (arredondar um escore para o passo 1 mudaria o resultado final),
+e como os escores de entradas repetidas são idênticos, as repetições acertam
+o cache do mesmo jeito.
+
+Entradas em zona sem regra ativada (KeyError) não são guardadas. Entradas
+quantizadas NaN ou infinitas levantam ValueError com o nome do campo.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import calculadora_desktop_albumina_opcional as calculadora
+import motor_vetorizado as mv
+
+CAPACIDADE_PADRAO = 4096
+
+# ==============================================================================
+# CACHE LRU COM CHAVE QUANTIZADA
+# ==============================================================================
+
+class CacheEscores:
+    """Memoização de uma função de pontuação
+
+    Parâmetros:
+    -----------
+    funcao : callable
+        Função calcular_* a envolver
+    grades : list de (origem, passo) ou None
+        Grade de quantização de cada argumento posicional; None mantém o
+        valor exato. Argumentos além da lista (e os nomeados) entram na
+        chave sem quantização
+    capacidade : int
+        Número máximo de resultados guardados
+    nomes : list de str, opcional
+        Nome de cada argumento posicional, usado nas mensagens de erro
+    """
+
+    def __init__(self, funcao, grades, capacidade=CAPACIDADE_PADRAO, nomes=None):
+        if capacidade < 1:
+            raise ValueError("capacidade deve ser >= 1")
+        self.funcao = funcao
+        self.grades = list(grades)
+        self.nomes = list(nomes) if nomes is not None else []
+        self.capacidade = capacidade
+        self._resultados = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+
+    def quantizar(self, valores):
+        """Valores posicionais levados ao ponto mais próximo da grade de cada variável
+
+        Raises:
+        -------
+        ValueError : valor quantizado não numérico, NaN ou infinito
+        """
+        quantizados = []
+        for i, valor in enumerate(valores):
+            grade = self.grades[i] if i < len(self.grades) else None
+            if grade is None:
+                quantizados.append(valor)
+                continue
+            nome = self.nomes[i] if i < len(self.nomes) else f"argumento {i}"
+            try:
+                valor = float(valor)
+            except (TypeError, ValueError):
+                raise ValueError(f"{nome} inválido: {valor!r}") from None
+            if not math.isfinite(valor):
+                raise ValueError(f"{nome} ausente ou não finito: {valor}")
+            origem, passo = grade
+            # round(.., 10) elimina o ruído de ponto flutuante da multiplicação
+            quantizados.append(round(origem + round((valor - origem) / passo) * passo, 10))
+        return tuple(quantizados)
+
+    def __call__(self, *valores, **nomeados):
+        valores = self.quantizar(valores)
+        chave = (valores, tuple(sorted(nomeados.items())))
+        with self._trava:
+            if chave in self._resultados:
+                self._resultados.move_to_end(chave)
+                self.acertos += 1
+                return self._resultados[chave]
+            self.faltas += 1
+
+        resultado = self.funcao(*valores, **nomeados)
+
+        with self._trava:
+            self._resultados[chave] = resultado
+            self._resultados.move_to_end(chave)
+            while len(self._resultados) > self.capacidade:
+                self._resultados.popitem(last=False)
+                self.descartes += 1
+        return resultado
+
+    def estatisticas(self):
+        """Retorna dict com acertos, faltas, descartes, tamanho, capacidade e taxa_acerto"""
+        with self._trava:
+            consultas = self.acertos + self.faltas
+            return {
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'descartes': self.descartes,
+                'tamanho': len(self._resultados),
+                'capacidade': self.capacidade,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            }
+
+    def limpar(self):
+        """Esvazia o cache e zera os contadores"""
+        with self._trava:
+            self._resultados.clear()
+            self.acertos = self.faltas = self.descartes = 0
+
+# ==============================================================================
+# FUNÇÕES DA CALCULADORA COM CACHE
+# ==============================================================================
+
+def grades_do_sistema(nome):
+    """(origem, passo) do universo de cada entrada do sistema `nome`, na ordem dos argumentos"""
+    return [(float(universo[0]), float(universo[1] - universo[0])) for universo in mv.obter_motor(nome).universos]
+
+
+def _cache_do_sistema(funcao, nome, capacidade):
+    """CacheEscores de uma função calcular_* com a grade e os nomes das entradas do sistema `nome`"""
+    return CacheEscores(funcao, grades_do_sistema(nome), capacidade, nomes=mv.obter_motor(nome).entradas)
+
+
+def criar_caches(capacidade=CAPACIDADE_PADRAO):
+    """Cria um CacheEscores para cada função calcular_* da calculadora
+
+    Retorna:
+    --------
+    dict : nome da função -> CacheEscores (mesma assinatura da função original)
+    """
+    return {
+        'calcular_submodulo_fenotipico': _cache_do_sistema(
+            calculadora.calcular_submodulo_fenotipico, 'fenotipico', capacidade),
+        'calcular_submodulo_ingestao': _cache_do_sistema(
+            calculadora.calcular_submodulo_ingestao, 'ingestao', capacidade),
+        'calcular_submodulo_inflamatorio': _cache_do_sistema(
+            calculadora.calcular_submodulo_inflamatorio, 'inflamatorio', capacidade),
+        'calcular_submodulo_inflamatorio_simplificado': _cache_do_sistema(
+            calculadora.calcular_submodulo_inflamatorio_simplificado, 'inflamatorio_simplificado', capacidade),
+        'calcular_submodulo_gravidade': _cache_do_sistema(
+            calculadora.calcular_submodulo_gravidade, 'gravidade', capacidade),
+        'calcular_risco_final_integrado': CacheEscores(
+            calculadora.calcular_risco_final_integrado, [None] * 4, capacidade),
+    }
+
+
+_CACHES = None
+_TRAVA_CACHES = threading.Lock()
+
+def obter_caches():
+    """Caches compartilhados do processo, criados no primeiro uso"""
+    global _CACHES
+    with _TRAVA_CACHES:
+        if _CACHES is None:
+            _CACHES = criar_caches()
+    return _CACHES
+
+
+def calcular_submodulo_fenotipico(imc_valor, perda_valor, sarcopenia_valor):
+    return obter_caches()['calcular_submodulo_fenotipico'](imc_valor, perda_valor, sarcopenia_valor)
+
+def calcular_submodulo_ingestao(vet_valor, duracao_valor, sintomas_valor):
+    return obter_caches()['calcular_submodulo_ingestao'](vet_valor, duracao_valor, sintomas_valor)
+
+def calcular_submodulo_inflamatorio(pcr_valor, albumina_valor, febre_valor):
+    return obter_caches()['calcular_submodulo_inflamatorio'](pcr_valor, albumina_valor, febre_valor)
+
+def calcular_submodulo_inflamatorio_simplificado(pcr_valor, febre_valor):
+    return obter_caches()['calcular_submodulo_inflamatorio_simplificado'](pcr_valor, febre_valor)
+
+def calcular_submodulo_gravidade(diagnostico_valor, comorbidades_valor, idade_valor, cirurgia_valor):
+    return obter_caches()['calcular_submodulo_gravidade'](diagnostico_valor, comorbidades_valor,
+                                                          idade_valor, cirurgia_valor)
+
+def calcular_risco_final_integrado(escore_fen, escore_ing, escore_inf, escore_grav, modo_completo=True):
+    return obter_caches()['calcular_risco_final_integrado'](escore_fen, escore_ing, escore_inf, escore_grav,
+                                                            modo_completo=modo_completo)
+
+
+def estatisticas():
+    """Estatísticas de cada cache compartilhado (nome da função -> dict)"""
+    return {nome: cache.estatisticas() for nome, cache in obter_caches().items()}
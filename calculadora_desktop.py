@@ -34,11 +34,11 @@ import csv
 from datetime import datetime
 import os
 
+from simulacao_por_thread import SimulacaoPorThread
+
 # Importar as bibliotecas fuzzy
 try:
-    import numpy as np
-    import skfuzzy as fuzz
-    from skfuzzy import control as ctrl
+    from compilador_regras import compilar, construir_sistema_skfuzzy
 except ImportError:
     print("ERRO: Bibliotecas fuzzy não encontradas!")
     print("Por favor, execute: pip install scikit-fuzzy numpy matplotlib")
@@ -47,6 +47,18 @@ except ImportError:
 # ==============================================================================
 # FUNÇÕES DOS SUBMÓDULOS FUZZY (CÓDIGO EXATO VALIDADO)
 # ==============================================================================
+# As bases de regras estão em bases_regras.py: fenotípico, ingestão e
+# inflamatório são as mesmas da versão com albumina opcional; gravidade e
+# integrador são as da v1.4 ('gravidade_v14' e 'integrador_v14'). Cada base
+# é compilada uma única vez e cada thread reaproveita a própria simulação,
+# sem o cache do skfuzzy: um paciente sem regra ativada continua gerando o
+# KeyError em vez de repetir a saída do paciente anterior.
+
+def _simulacoes(nome):
+    return SimulacaoPorThread(lambda: construir_sistema_skfuzzy(compilar(nome, minimizada=True)), cache=False)
+
+_SIMULACOES = {nome: _simulacoes(nome)
+               for nome in ('fenotipico', 'ingestao', 'inflamatorio', 'gravidade_v14', 'integrador_v14')}
 
 def calcular_submodulo_fenotipico(imc_valor, perda_valor, sarcopenia_valor):
     """Submódulo 1: Nutricional Fenotípico
@@ -55,73 +67,7 @@ def calcular_submodulo_fenotipico(imc_valor, perda_valor, sarcopenia_valor):
     
     CORREÇÃO v1.2: Expandido de 13 para 27 regras para cobrir todas as combinações possíveis
     """
-    
-    # Criar variáveis fuzzy
-    imc = ctrl.Antecedent(np.arange(12, 50.1, 0.1), 'imc')
-    imc['baixo_risco'] = fuzz.trapmf(imc.universe, [20, 22, 25, 28])
-    imc['medio_risco'] = fuzz.trimf(imc.universe, [17, 20, 30])
-    imc['alto_risco'] = fuzz.trapmf(imc.universe, [12, 14, 16, 18]) + fuzz.trapmf(imc.universe, [30, 35, 45, 50])
-
-    perda_ponderal = ctrl.Antecedent(np.arange(0, 30.1, 0.1), 'perda_ponderal')
-    perda_ponderal['baixo_risco'] = fuzz.trapmf(perda_ponderal.universe, [0, 0, 2, 5])
-    perda_ponderal['medio_risco'] = fuzz.trimf(perda_ponderal.universe, [3, 7, 12])
-    perda_ponderal['alto_risco'] = fuzz.trapmf(perda_ponderal.universe, [10, 12, 20, 30])
-
-    sarcopenia = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'sarcopenia')
-    sarcopenia['baixo_risco'] = fuzz.trapmf(sarcopenia.universe, [0, 0, 0.5, 1])
-    sarcopenia['medio_risco'] = fuzz.trimf(sarcopenia.universe, [0.5, 1.5, 2.5])
-    sarcopenia['alto_risco'] = fuzz.trapmf(sarcopenia.universe, [2, 2.5, 3, 3])
-
-    risco_fenotipico = ctrl.Consequent(np.arange(0, 101, 1), 'risco_fenotipico')
-    risco_fenotipico['baixo'] = fuzz.trapmf(risco_fenotipico.universe, [0, 0, 15, 30])
-    risco_fenotipico['baixo_moderado'] = fuzz.trimf(risco_fenotipico.universe, [20, 32, 45])
-    risco_fenotipico['moderado'] = fuzz.trimf(risco_fenotipico.universe, [35, 50, 65])
-    risco_fenotipico['moderado_alto'] = fuzz.trimf(risco_fenotipico.universe, [55, 67, 80])
-    risco_fenotipico['alto'] = fuzz.trapmf(risco_fenotipico.universe, [70, 85, 100, 100])
-
-    # 27 regras (cobertura completa)
-    regras = [
-        # ALTO RISCO (desnutrição grave)
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], risco_fenotipico['alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], risco_fenotipico['alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['alto_risco'], risco_fenotipico['alto']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], risco_fenotipico['alto']),
-        
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado_alto']),
-        
-        # MODERADO RISCO
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado']),
-        
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['medio_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['medio_risco'] & sarcopenia['alto_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['alto_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['alto_risco'], risco_fenotipico['baixo_moderado']),
-        
-        # BAIXO RISCO
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['medio_risco'], risco_fenotipico['baixo']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['medio_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-    
+    calc = _SIMULACOES['fenotipico'].obter()
     calc.input['imc'] = imc_valor
     calc.input['perda_ponderal'] = perda_valor
     calc.input['sarcopenia'] = sarcopenia_valor
@@ -136,72 +82,7 @@ def calcular_submodulo_ingestao(vet_valor, duracao_valor, sintomas_valor):
     
     CORREÇÃO v1.2: Expandido de 15 para 27 regras para cobrir todas as combinações possíveis
     """
-    
-    vet_consumido = ctrl.Antecedent(np.arange(0, 101, 1), 'vet_consumido')
-    vet_consumido['baixo_risco'] = fuzz.trapmf(vet_consumido.universe, [75, 85, 100, 100])
-    vet_consumido['medio_risco'] = fuzz.trimf(vet_consumido.universe, [40, 60, 80])
-    vet_consumido['alto_risco'] = fuzz.trapmf(vet_consumido.universe, [0, 0, 25, 50])
-
-    duracao_deficit = ctrl.Antecedent(np.arange(0, 31, 1), 'duracao_deficit')
-    duracao_deficit['baixo_risco'] = fuzz.trapmf(duracao_deficit.universe, [0, 0, 3, 7])
-    duracao_deficit['medio_risco'] = fuzz.trimf(duracao_deficit.universe, [5, 10, 16])
-    duracao_deficit['alto_risco'] = fuzz.trapmf(duracao_deficit.universe, [12, 14, 30, 30])
-
-    sintomas_gi = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'sintomas_gi')
-    sintomas_gi['baixo_risco'] = fuzz.trapmf(sintomas_gi.universe, [0, 0, 0.3, 0.8])
-    sintomas_gi['medio_risco'] = fuzz.trimf(sintomas_gi.universe, [0.5, 1.5, 2.3])
-    sintomas_gi['alto_risco'] = fuzz.trapmf(sintomas_gi.universe, [2, 2.5, 3, 3])
-
-    risco_ingestao = ctrl.Consequent(np.arange(0, 101, 1), 'risco_ingestao')
-    risco_ingestao['baixo'] = fuzz.trapmf(risco_ingestao.universe, [0, 0, 15, 30])
-    risco_ingestao['baixo_moderado'] = fuzz.trimf(risco_ingestao.universe, [20, 32, 45])
-    risco_ingestao['moderado'] = fuzz.trimf(risco_ingestao.universe, [35, 50, 65])
-    risco_ingestao['moderado_alto'] = fuzz.trimf(risco_ingestao.universe, [55, 67, 80])
-    risco_ingestao['alto'] = fuzz.trapmf(risco_ingestao.universe, [70, 85, 100, 100])
-
-    # 27 regras (cobertura completa)
-    regras = [
-        # ALTO RISCO (deficit grave e prolongado)
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], risco_ingestao['alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['medio_risco'], risco_ingestao['alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['alto_risco'], risco_ingestao['alto']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], risco_ingestao['alto']),
-        
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['medio_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado_alto']),
-        
-        # MODERADO RISCO
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado']),
-        
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['alto_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-        
-        # BAIXO RISCO
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-    
+    calc = _SIMULACOES['ingestao'].obter()
     calc.input['vet_consumido'] = vet_valor
     calc.input['duracao_deficit'] = duracao_valor
     calc.input['sintomas_gi'] = sintomas_valor
@@ -216,72 +97,7 @@ def calcular_submodulo_inflamatorio(pcr_valor, albumina_valor, febre_valor):
     
     CORREÇÃO v1.2: Expandido de 10 para 27 regras para cobrir todas as combinações possíveis
     """
-    
-    pcr = ctrl.Antecedent(np.arange(0, 401, 1), 'pcr')
-    pcr['baixo_risco'] = fuzz.trapmf(pcr.universe, [0, 0, 5, 10])
-    pcr['medio_risco'] = fuzz.trimf(pcr.universe, [5, 50, 120])
-    pcr['alto_risco'] = fuzz.trapmf(pcr.universe, [80, 100, 400, 400])
-
-    albumina = ctrl.Antecedent(np.arange(1.5, 5.1, 0.1), 'albumina')
-    albumina['baixo_risco'] = fuzz.trapmf(albumina.universe, [3.5, 4.0, 5.0, 5.0])
-    albumina['medio_risco'] = fuzz.trimf(albumina.universe, [2.8, 3.2, 3.7])
-    albumina['alto_risco'] = fuzz.trapmf(albumina.universe, [1.5, 1.5, 2.5, 3.0])
-
-    febre = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'febre')
-    febre['baixo_risco'] = fuzz.trapmf(febre.universe, [0, 0, 0.5, 1.2])
-    febre['medio_risco'] = fuzz.trimf(febre.universe, [0.8, 1.8, 2.5])
-    febre['alto_risco'] = fuzz.trapmf(febre.universe, [2.2, 2.7, 3, 3])
-
-    risco_inflamatorio = ctrl.Consequent(np.arange(0, 101, 1), 'risco_inflamatorio')
-    risco_inflamatorio['baixo'] = fuzz.trapmf(risco_inflamatorio.universe, [0, 0, 15, 30])
-    risco_inflamatorio['baixo_moderado'] = fuzz.trimf(risco_inflamatorio.universe, [20, 32, 45])
-    risco_inflamatorio['moderado'] = fuzz.trimf(risco_inflamatorio.universe, [35, 50, 65])
-    risco_inflamatorio['moderado_alto'] = fuzz.trimf(risco_inflamatorio.universe, [55, 67, 80])
-    risco_inflamatorio['alto'] = fuzz.trapmf(risco_inflamatorio.universe, [70, 85, 100, 100])
-
-    # 27 regras (cobertura completa para todas as combinações)
-    regras = [
-        # ALTO RISCO (PCR alta + albumina baixa = inflamação grave)
-        ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['alto_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['medio_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['baixo_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['medio_risco'] & febre['alto_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['alto_risco'] & febre['alto_risco'], risco_inflamatorio['alto']),
-        
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(pcr['alto_risco'] & albumina['medio_risco'] & febre['medio_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['alto_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['medio_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['alto_risco'] & febre['medio_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['alto_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['medio_risco'] & febre['alto_risco'], risco_inflamatorio['moderado_alto']),
-        
-        # MODERADO RISCO
-        ctrl.Rule(pcr['alto_risco'] & albumina['medio_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['medio_risco'] & febre['medio_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['medio_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['baixo_risco'] & febre['alto_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['baixo_risco'] & febre['medio_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['alto_risco'] & febre['alto_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['alto_risco'] & febre['medio_risco'], risco_inflamatorio['moderado']),
-        
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(pcr['medio_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['medio_risco'] & febre['alto_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['medio_risco'] & febre['medio_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['medio_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['alto_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['baixo_risco'] & febre['alto_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['baixo_risco'] & febre['medio_risco'], risco_inflamatorio['baixo_moderado']),
-        
-        # BAIXO RISCO
-        ctrl.Rule(pcr['baixo_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-    
+    calc = _SIMULACOES['inflamatorio'].obter()
     calc.input['pcr'] = pcr_valor
     calc.input['albumina'] = albumina_valor
     calc.input['febre'] = febre_valor
@@ -297,84 +113,7 @@ def calcular_submodulo_gravidade(diagnostico_valor, comorbidades_valor, idade_va
     CORREÇÃO v1.2: Expandido de 13 para 35 regras para cobrir combinações críticas
     (4 variáveis = mais complexidade, foco nas combinações clinicamente relevantes)
     """
-    
-    diagnostico = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'diagnostico')
-    diagnostico['baixo_risco'] = fuzz.trapmf(diagnostico.universe, [0, 0, 0.3, 0.8])
-    diagnostico['medio_risco'] = fuzz.trimf(diagnostico.universe, [0.5, 1.5, 2.3])
-    diagnostico['alto_risco'] = fuzz.trapmf(diagnostico.universe, [2, 2.5, 3, 3])
-
-    comorbidades = ctrl.Antecedent(np.arange(0, 5.1, 0.1), 'comorbidades')
-    comorbidades['baixo_risco'] = fuzz.trapmf(comorbidades.universe, [0, 0, 0.3, 1.0])
-    comorbidades['medio_risco'] = fuzz.trimf(comorbidades.universe, [0.5, 2.0, 3.5])
-    comorbidades['alto_risco'] = fuzz.trapmf(comorbidades.universe, [3, 3.5, 5, 5])
-
-    idade_var = ctrl.Antecedent(np.arange(18, 101, 1), 'idade_var')
-    idade_var['baixo_risco'] = fuzz.trapmf(idade_var.universe, [18, 18, 55, 65])
-    idade_var['medio_risco'] = fuzz.trimf(idade_var.universe, [60, 70, 78])
-    idade_var['alto_risco'] = fuzz.trapmf(idade_var.universe, [73, 75, 100, 100])
-
-    cirurgia_var = ctrl.Antecedent(np.arange(0, 1.1, 0.1), 'cirurgia_var')
-    cirurgia_var['nao'] = fuzz.trapmf(cirurgia_var.universe, [0, 0, 0.2, 0.4])
-    cirurgia_var['sim'] = fuzz.trapmf(cirurgia_var.universe, [0.6, 0.8, 1, 1])
-
-    risco_gravidade = ctrl.Consequent(np.arange(0, 101, 1), 'risco_gravidade')
-    risco_gravidade['baixo'] = fuzz.trapmf(risco_gravidade.universe, [0, 0, 15, 30])
-    risco_gravidade['baixo_moderado'] = fuzz.trimf(risco_gravidade.universe, [20, 32, 45])
-    risco_gravidade['moderado'] = fuzz.trimf(risco_gravidade.universe, [35, 50, 65])
-    risco_gravidade['moderado_alto'] = fuzz.trimf(risco_gravidade.universe, [55, 67, 80])
-    risco_gravidade['alto'] = fuzz.trapmf(risco_gravidade.universe, [70, 85, 100, 100])
-
-    # 35 regras (cobertura expandida para 4 variáveis)
-    regras = [
-        # ALTO RISCO (múltiplos fatores graves)
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & idade_var['alto_risco'], risco_gravidade['alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & cirurgia_var['sim'], risco_gravidade['alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & idade_var['medio_risco'], risco_gravidade['alto']),
-        ctrl.Rule(comorbidades['alto_risco'] & idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['alto']),
-        
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['medio_risco'] & idade_var['medio_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & cirurgia_var['sim'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & cirurgia_var['sim'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['medio_risco'] & idade_var['alto_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & idade_var['alto_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & idade_var['alto_risco'] & cirurgia_var['nao'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & idade_var['baixo_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['moderado_alto']),
-        
-        # MODERADO RISCO
-        ctrl.Rule(comorbidades['alto_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & idade_var['medio_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['nao'], risco_gravidade['moderado']),
-        ctrl.Rule(idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & idade_var['medio_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & idade_var['baixo_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['medio_risco'] & idade_var['baixo_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & cirurgia_var['sim'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & idade_var['medio_risco'] & cirurgia_var['nao'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & cirurgia_var['nao'], risco_gravidade['moderado']),
-        
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['baixo_risco'] & idade_var['medio_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['medio_risco'] & idade_var['medio_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & idade_var['baixo_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['alto_risco'] & idade_var['baixo_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['alto_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & idade_var['alto_risco'] & cirurgia_var['nao'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['medio_risco'] & cirurgia_var['sim'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(comorbidades['medio_risco'] & idade_var['medio_risco'] & cirurgia_var['nao'], risco_gravidade['baixo_moderado']),
-        
-        # BAIXO RISCO
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['nao'], risco_gravidade['baixo']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['medio_risco'] & cirurgia_var['nao'], risco_gravidade['baixo']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['nao'], risco_gravidade['baixo']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['sim'], risco_gravidade['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-    
+    calc = _SIMULACOES['gravidade_v14'].obter()
     calc.input['diagnostico'] = diagnostico_valor
     calc.input['comorbidades'] = comorbidades_valor
     calc.input['idade_var'] = idade_valor
@@ -400,173 +139,7 @@ def calcular_risco_final_integrado(escore_fen, escore_ing, escore_inf, escore_gr
     CORREÇÃO v1.4: Expandido de 50 para 73 regras para cobrir casos ausentes
     (Cobertura completa de 625 combinações seria impraticável)
     """
-    
-    escore_fenotipico = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_fenotipico')
-    escore_fenotipico['baixo'] = fuzz.trapmf(escore_fenotipico.universe, [0, 0, 20, 30])
-    escore_fenotipico['baixo_moderado'] = fuzz.trimf(escore_fenotipico.universe, [25, 35, 45])
-    escore_fenotipico['moderado'] = fuzz.trimf(escore_fenotipico.universe, [40, 50, 60])
-    escore_fenotipico['moderado_alto'] = fuzz.trimf(escore_fenotipico.universe, [55, 65, 75])
-    escore_fenotipico['alto'] = fuzz.trapmf(escore_fenotipico.universe, [70, 80, 100, 100])
-
-    escore_ingestao = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_ingestao')
-    escore_ingestao['baixo'] = fuzz.trapmf(escore_ingestao.universe, [0, 0, 20, 30])
-    escore_ingestao['baixo_moderado'] = fuzz.trimf(escore_ingestao.universe, [25, 35, 45])
-    escore_ingestao['moderado'] = fuzz.trimf(escore_ingestao.universe, [40, 50, 60])
-    escore_ingestao['moderado_alto'] = fuzz.trimf(escore_ingestao.universe, [55, 65, 75])
-    escore_ingestao['alto'] = fuzz.trapmf(escore_ingestao.universe, [70, 80, 100, 100])
-
-    escore_inflamatorio = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_inflamatorio')
-    escore_inflamatorio['baixo'] = fuzz.trapmf(escore_inflamatorio.universe, [0, 0, 20, 30])
-    escore_inflamatorio['baixo_moderado'] = fuzz.trimf(escore_inflamatorio.universe, [25, 35, 45])
-    escore_inflamatorio['moderado'] = fuzz.trimf(escore_inflamatorio.universe, [40, 50, 60])
-    escore_inflamatorio['moderado_alto'] = fuzz.trimf(escore_inflamatorio.universe, [55, 65, 75])
-    escore_inflamatorio['alto'] = fuzz.trapmf(escore_inflamatorio.universe, [70, 80, 100, 100])
-
-    escore_gravidade_int = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_gravidade')
-    escore_gravidade_int['baixo'] = fuzz.trapmf(escore_gravidade_int.universe, [0, 0, 20, 30])
-    escore_gravidade_int['baixo_moderado'] = fuzz.trimf(escore_gravidade_int.universe, [25, 35, 45])
-    escore_gravidade_int['moderado'] = fuzz.trimf(escore_gravidade_int.universe, [40, 50, 60])
-    escore_gravidade_int['moderado_alto'] = fuzz.trimf(escore_gravidade_int.universe, [55, 65, 75])
-    escore_gravidade_int['alto'] = fuzz.trapmf(escore_gravidade_int.universe, [70, 80, 100, 100])
-
-    risco_final = ctrl.Consequent(np.arange(0, 101, 1), 'risco_final')
-    risco_final['baixo'] = fuzz.trapmf(risco_final.universe, [0, 0, 15, 25])
-    risco_final['baixo_moderado'] = fuzz.trimf(risco_final.universe, [20, 32, 40])
-    risco_final['moderado'] = fuzz.trimf(risco_final.universe, [35, 50, 60])
-    risco_final['moderado_alto'] = fuzz.trimf(risco_final.universe, [50, 60, 70])
-    risco_final['alto'] = fuzz.trapmf(risco_final.universe, [60, 70, 100, 100])
-
-    # 73 regras (cobertura expandida baseada em priorização e dominância)
-    # Pesos: Fenotípico(30%), Ingestão(25%), Inflamatório(15%), Gravidade(30%)
-    
-    regras = [
-        # === REGRAS DE DOMINÂNCIA: ALTO RISCO ===
-        # Se ≥2 submódulos em ALTO → Resultado ALTO
-        ctrl.Rule(escore_fenotipico['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['alto'], risco_final['alto']),
-        ctrl.Rule(escore_ingestao['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_inflamatorio['alto'], risco_final['alto']),
-        
-        # Se 1 ALTO + 1 MODERADO-ALTO → ALTO
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['moderado_alto'], risco_final['alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_gravidade_int['moderado_alto'], risco_final['alto']),
-        ctrl.Rule(escore_ingestao['alto'] & escore_gravidade_int['moderado_alto'], risco_final['alto']),
-
-        # Regras de dominância - Inflamatório alto com outros altos
-        ctrl.Rule(escore_inflamatorio['alto'] & escore_fenotipico['alto'], risco_final['alto']),
-        ctrl.Rule(escore_inflamatorio['alto'] & escore_ingestao['alto'], risco_final['alto']),
-
-        # === REGRAS MODERADO-ALTO ===
-        # Se 1 ALTO isolado → MODERADO-ALTO
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_ingestao['alto'] & escore_fenotipico['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_gravidade_int['alto'] & escore_fenotipico['moderado'] & escore_ingestao['moderado'], risco_final['moderado_alto']),
-        
-        # Se ≥2 MODERADO-ALTO → MODERADO-ALTO
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_ingestao['moderado_alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_inflamatorio['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-        
-        # MODERADO-ALTO com inflamatório alto
-        ctrl.Rule(escore_inflamatorio['alto'] & escore_fenotipico['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_inflamatorio['alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_inflamatorio['moderado_alto'] & escore_gravidade_int['alto'], risco_final['moderado_alto']),
-        
-        # === REGRAS MODERADO ===
-        # Se todos em MODERADO → MODERADO
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['moderado'] & escore_inflamatorio['moderado'], risco_final['moderado']),
-        
-        # Se 1 MODERADO-ALTO + outros baixos → MODERADO
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_ingestao['moderado_alto'] & escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_gravidade_int['moderado_alto'] & escore_fenotipico['baixo'] & escore_ingestao['baixo'], risco_final['moderado']),
-        
-        # Mix MODERADO com BAIXO-MODERADO
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['baixo_moderado'] & escore_ingestao['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_ingestao['moderado'] & escore_fenotipico['baixo_moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        
-        # Inflamatório MODERADO com outros MODERADOS
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_ingestao['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        
-        # === REGRAS BAIXO-MODERADO ===
-        # Se todos em BAIXO-MODERADO → BAIXO-MODERADO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        
-        # Mix BAIXO-MODERADO com BAIXO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        
-        # BAIXO-MODERADO com MODERADO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        
-        # === REGRAS BAIXO ===
-        # Se todos em BAIXO → BAIXO
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'] & escore_inflamatorio['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_gravidade_int['baixo'] & escore_inflamatorio['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_ingestao['baixo'] & escore_gravidade_int['baixo'] & escore_inflamatorio['baixo'], risco_final['baixo']),
-        
-        # === REGRAS DE COBERTURA ADICIONAL ===
-        # Casos mistos com inflamatório
-        ctrl.Rule(escore_inflamatorio['baixo'] & escore_fenotipico['baixo'] & escore_ingestao['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_inflamatorio['baixo_moderado'] & escore_fenotipico['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado_alto'] & escore_fenotipico['moderado'], risco_final['moderado_alto']),
-        
-        # Regra geral de fallback: média ponderada dos principais
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade_int['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        
-        # Mais casos de cobertura
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['moderado_alto'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-
-        # === REGRAS ADICIONAIS PARA MELHOR COBERTURA ===
-        # Combinações com 2 BAIXO-MODERADO + 1 MODERADO + 1 BAIXO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['baixo'] & escore_gravidade_int['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade_int['baixo'] & escore_inflamatorio['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo'] & escore_inflamatorio['moderado'], risco_final['baixo_moderado']),
-
-        # Combinações com MODERADO e BAIXO-MODERADO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo_moderado'] & escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-
-        # Combinações com MODERADO isolado
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'] & escore_fenotipico['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['baixo'] & escore_ingestao['baixo_moderado'], risco_final['baixo_moderado']),
-
-        # Mais combinações BAIXO-MODERADO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo_moderado'] & escore_inflamatorio['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_inflamatorio['baixo_moderado'], risco_final['baixo_moderado']),
-
-        # Combinações MODERADO com múltiplos BAIXO
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['moderado'] & escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_gravidade_int['moderado'] & escore_fenotipico['baixo'] & escore_ingestao['baixo'], risco_final['baixo_moderado']),
-
-        # Combinações com 1 MODERADO + restante misto
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['moderado'] & escore_inflamatorio['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_gravidade_int['moderado'] & escore_fenotipico['baixo'] & escore_inflamatorio['baixo_moderado'], risco_final['baixo_moderado'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-    
+    calc = _SIMULACOES['integrador_v14'].obter()
     calc.input['escore_fenotipico'] = escore_fen
     calc.input['escore_ingestao'] = escore_ing
     calc.input['escore_inflamatorio'] = escore_inf
@@ -63,96 +63,111 @@ LIMITAÇÕES DO MODO SIMPLIFICADO:
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import csv
 from datetime import datetime
-import os
+import functools
+import logging
+import queue
+import threading
+
+from persistencia_resultados import GravadorResultados
+
+_log = logging.getLogger(__name__)
 
 # Importar as bibliotecas fuzzy
 try:
-    import numpy as np
-    import skfuzzy as fuzz
     from skfuzzy import control as ctrl
+
+    from compilador_regras import SistemaFuzzyCompilado as _SistemaFuzzyCompilado
+    from compilador_regras import compilar, construir_sistema_skfuzzy
 except ImportError:
     print("ERRO: Bibliotecas fuzzy não encontradas!")
     print("Por favor, execute: pip install scikit-fuzzy numpy matplotlib")
     exit(1)
 
 # ==============================================================================
-# FUNÇÕES DOS SUBMÓDULOS FUZZY (CÓDIGO EXATO VALIDADO)
+# CONSTRUÇÃO DOS SISTEMAS FUZZY (CÓDIGO EXATO VALIDADO)
 # ==============================================================================
+# Variáveis, termos e tabelas de regras estão em bases_regras.py (uma única
+# definição por base); compilador_regras.py as compila uma vez por processo
+# e monta os ControlSystems a partir dos arrays compilados.
 
-def calcular_submodulo_fenotipico(imc_valor, perda_valor, sarcopenia_valor):
-    """Submódulo 1: Nutricional Fenotípico
+def _construir_sistema(nome):
+    """ControlSystem da base `nome` de bases_regras.py (minimizada, ver compilador_regras.minimizar)"""
+    return construir_sistema_skfuzzy(compilar(nome, minimizada=True), _SistemaFuzzyCompilado)
 
-    Total: 27 regras fuzzy (COBERTURA COMPLETA - 100% das combinações)
+# ==============================================================================
+# REGISTRO DE SISTEMAS FUZZY (CONSTRUÍDOS UMA ÚNICA VEZ POR THREAD)
+# ==============================================================================
+# Montar os Antecedents, as regras e o ControlSystem custa muito mais do que a
+# inferência em si (o integrador leva segundos para ser montado). Cada base de
+# regras é compilada na primeira utilização e reaproveitada nas chamadas
+# seguintes; o integrador tem uma entrada por valor de `modo_completo`.
+#
+# O registro é separado por thread: o skfuzzy guarda estado da inferência nos
+# termos do sistema (ver simulacao_por_thread.py), então duas threads nunca
+# podem usar o mesmo ControlSystem ao mesmo tempo.
+
+_CONSTRUTORES_SISTEMAS = {
+    nome: functools.partial(_construir_sistema, nome)
+    for nome in ('fenotipico', 'ingestao', 'inflamatorio', 'inflamatorio_simplificado', 'gravidade',
+                 'integrador_completo', 'integrador_simplificado')
+}
+
+_REGISTRO_DA_THREAD = threading.local()
+
+def _registro():
+    """Sistemas e simulações já construídos pela thread atual"""
+    if not hasattr(_REGISTRO_DA_THREAD, 'sistemas'):
+        _REGISTRO_DA_THREAD.sistemas = {}
+        _REGISTRO_DA_THREAD.simulacoes = {}
+    return _REGISTRO_DA_THREAD
+
+def chave_integrador(modo_completo):
+    """Retorna a chave do registro para o integrador do modo informado"""
+    return 'integrador_completo' if modo_completo else 'integrador_simplificado'
+
+def obter_sistema(nome):
+    """Retorna o ControlSystem registrado em `nome` para a thread atual,
+    construindo-o se necessário"""
+    sistemas = _registro().sistemas
+    if nome not in sistemas:
+        if nome not in _CONSTRUTORES_SISTEMAS:
+            raise KeyError(f"Sistema fuzzy desconhecido: {nome}")
+        sistemas[nome] = _CONSTRUTORES_SISTEMAS[nome]()
+    return sistemas[nome]
+
+def obter_simulacao(nome):
+    """Retorna a simulação reutilizável do sistema `nome` (thread atual)
+
+    O cache interno do skfuzzy fica desligado: com ele ligado, uma entrada que
+    não ativa nenhuma regra devolveria a saída do paciente anterior em vez de
+    gerar o KeyError esperado.
+    """
+    simulacoes = _registro().simulacoes
+    if nome not in simulacoes:
+        sistema = obter_sistema(nome)
+        # SimulacaoEsparsa: só calcula as regras com todos os termos ativos
+        classe = getattr(sistema, 'classe_simulacao', ctrl.ControlSystemSimulation)
+        simulacoes[nome] = classe(sistema, cache=False)
+    return simulacoes[nome]
+
+def construir_todos_sistemas():
+    """Compila antecipadamente todas as bases de regras do registro (thread atual)
+
+    Inclui a ordem de disparo das regras, que _SistemaFuzzyCompilado só
+    resolveria na primeira inferência.
     """
+    for nome in _CONSTRUTORES_SISTEMAS:
+        obter_simulacao(nome)
+        obter_sistema(nome).rules
 
-    # Criar variáveis fuzzy
-    imc = ctrl.Antecedent(np.arange(12, 50.1, 0.1), 'imc')
-    imc['baixo_risco'] = fuzz.trapmf(imc.universe, [20, 22, 25, 28])
-    imc['medio_risco'] = fuzz.trimf(imc.universe, [17, 20, 30])
-    imc['alto_risco'] = fuzz.trapmf(imc.universe, [12, 14, 16, 18]) + fuzz.trapmf(imc.universe, [30, 35, 45, 50])
-
-    perda_ponderal = ctrl.Antecedent(np.arange(0, 30.1, 0.1), 'perda_ponderal')
-    perda_ponderal['baixo_risco'] = fuzz.trapmf(perda_ponderal.universe, [0, 0, 2, 5])
-    perda_ponderal['medio_risco'] = fuzz.trimf(perda_ponderal.universe, [3, 7, 12])
-    perda_ponderal['alto_risco'] = fuzz.trapmf(perda_ponderal.universe, [10, 12, 20, 30])
-
-    sarcopenia = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'sarcopenia')
-    sarcopenia['baixo_risco'] = fuzz.trapmf(sarcopenia.universe, [0, 0, 0.5, 1])
-    sarcopenia['medio_risco'] = fuzz.trimf(sarcopenia.universe, [0.5, 1.5, 2.5])
-    sarcopenia['alto_risco'] = fuzz.trapmf(sarcopenia.universe, [2, 2.5, 3, 3])
-
-    risco_fenotipico = ctrl.Consequent(np.arange(0, 101, 1), 'risco_fenotipico')
-    risco_fenotipico['baixo'] = fuzz.trapmf(risco_fenotipico.universe, [0, 0, 15, 30])
-    risco_fenotipico['baixo_moderado'] = fuzz.trimf(risco_fenotipico.universe, [20, 32, 45])
-    risco_fenotipico['moderado'] = fuzz.trimf(risco_fenotipico.universe, [35, 50, 65])
-    risco_fenotipico['moderado_alto'] = fuzz.trimf(risco_fenotipico.universe, [55, 67, 80])
-    risco_fenotipico['alto'] = fuzz.trapmf(risco_fenotipico.universe, [70, 85, 100, 100])
-
-    # 27 regras (cobertura completa)
-    regras = [
-        # ALTO RISCO (desnutrição grave)
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], risco_fenotipico['alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], risco_fenotipico['alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['alto_risco'], risco_fenotipico['alto']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], risco_fenotipico['alto']),
-
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado_alto']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado_alto']),
-
-        # MODERADO RISCO
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], risco_fenotipico['moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], risco_fenotipico['moderado']),
-
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['medio_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['medio_risco'] & sarcopenia['alto_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['alto_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo_moderado']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['alto_risco'], risco_fenotipico['baixo_moderado']),
-
-        # BAIXO RISCO
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['medio_risco'], risco_fenotipico['baixo']),
-        ctrl.Rule(imc['baixo_risco'] & perda_ponderal['medio_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo']),
-        ctrl.Rule(imc['medio_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], risco_fenotipico['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
+# ==============================================================================
+# FUNÇÕES DOS SUBMÓDULOS FUZZY
+# ==============================================================================
 
+def calcular_submodulo_fenotipico(imc_valor, perda_valor, sarcopenia_valor):
+    """Submódulo 1: Nutricional Fenotípico (27 regras)"""
+    calc = obter_simulacao('fenotipico')
     calc.input['imc'] = imc_valor
     calc.input['perda_ponderal'] = perda_valor
     calc.input['sarcopenia'] = sarcopenia_valor
@@ -161,76 +176,8 @@ def calcular_submodulo_fenotipico(imc_valor, perda_valor, sarcopenia_valor):
     return calc.output['risco_fenotipico']
 
 def calcular_submodulo_ingestao(vet_valor, duracao_valor, sintomas_valor):
-    """Submódulo 2: Ingestão Alimentar
-
-    Total: 27 regras fuzzy (COBERTURA COMPLETA - 100% das combinações)
-    """
-
-    vet_consumido = ctrl.Antecedent(np.arange(0, 101, 1), 'vet_consumido')
-    vet_consumido['baixo_risco'] = fuzz.trapmf(vet_consumido.universe, [75, 85, 100, 100])
-    vet_consumido['medio_risco'] = fuzz.trimf(vet_consumido.universe, [40, 60, 80])
-    vet_consumido['alto_risco'] = fuzz.trapmf(vet_consumido.universe, [0, 0, 25, 50])
-
-    duracao_deficit = ctrl.Antecedent(np.arange(0, 31, 1), 'duracao_deficit')
-    duracao_deficit['baixo_risco'] = fuzz.trapmf(duracao_deficit.universe, [0, 0, 3, 7])
-    duracao_deficit['medio_risco'] = fuzz.trimf(duracao_deficit.universe, [5, 10, 16])
-    duracao_deficit['alto_risco'] = fuzz.trapmf(duracao_deficit.universe, [12, 14, 30, 30])
-
-    sintomas_gi = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'sintomas_gi')
-    sintomas_gi['baixo_risco'] = fuzz.trapmf(sintomas_gi.universe, [0, 0, 0.3, 0.8])
-    sintomas_gi['medio_risco'] = fuzz.trimf(sintomas_gi.universe, [0.5, 1.5, 2.3])
-    sintomas_gi['alto_risco'] = fuzz.trapmf(sintomas_gi.universe, [2, 2.5, 3, 3])
-
-    risco_ingestao = ctrl.Consequent(np.arange(0, 101, 1), 'risco_ingestao')
-    risco_ingestao['baixo'] = fuzz.trapmf(risco_ingestao.universe, [0, 0, 15, 30])
-    risco_ingestao['baixo_moderado'] = fuzz.trimf(risco_ingestao.universe, [20, 32, 45])
-    risco_ingestao['moderado'] = fuzz.trimf(risco_ingestao.universe, [35, 50, 65])
-    risco_ingestao['moderado_alto'] = fuzz.trimf(risco_ingestao.universe, [55, 67, 80])
-    risco_ingestao['alto'] = fuzz.trapmf(risco_ingestao.universe, [70, 85, 100, 100])
-
-    # 27 regras (cobertura completa)
-    regras = [
-        # ALTO RISCO (deficit grave e prolongado)
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], risco_ingestao['alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['medio_risco'], risco_ingestao['alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['alto_risco'], risco_ingestao['alto']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], risco_ingestao['alto']),
-
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['medio_risco'], risco_ingestao['moderado_alto']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado_alto']),
-
-        # MODERADO RISCO
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['alto_risco'], risco_ingestao['moderado']),
-
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['alto_risco'], risco_ingestao['baixo_moderado']),
-        ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo_moderado']),
-
-        # BAIXO RISCO
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], risco_ingestao['baixo']),
-        ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['baixo_risco'], risco_ingestao['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-
+    """Submódulo 2: Ingestão Alimentar (27 regras)"""
+    calc = obter_simulacao('ingestao')
     calc.input['vet_consumido'] = vet_valor
     calc.input['duracao_deficit'] = duracao_valor
     calc.input['sintomas_gi'] = sintomas_valor
@@ -239,76 +186,8 @@ def calcular_submodulo_ingestao(vet_valor, duracao_valor, sintomas_valor):
     return calc.output['risco_ingestao']
 
 def calcular_submodulo_inflamatorio(pcr_valor, albumina_valor, febre_valor):
-    """Submódulo 3: Inflamatório (MODO COMPLETO - com albumina)
-
-    Total: 27 regras fuzzy (COBERTURA COMPLETA - 100% das combinações)
-    """
-
-    pcr = ctrl.Antecedent(np.arange(0, 401, 1), 'pcr')
-    pcr['baixo_risco'] = fuzz.trapmf(pcr.universe, [0, 0, 5, 10])
-    pcr['medio_risco'] = fuzz.trimf(pcr.universe, [5, 50, 120])
-    pcr['alto_risco'] = fuzz.trapmf(pcr.universe, [80, 100, 400, 400])
-
-    albumina = ctrl.Antecedent(np.arange(1.5, 5.1, 0.1), 'albumina')
-    albumina['baixo_risco'] = fuzz.trapmf(albumina.universe, [3.5, 4.0, 5.0, 5.0])
-    albumina['medio_risco'] = fuzz.trimf(albumina.universe, [2.8, 3.2, 3.7])
-    albumina['alto_risco'] = fuzz.trapmf(albumina.universe, [1.5, 1.5, 2.5, 3.0])
-
-    febre = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'febre')
-    febre['baixo_risco'] = fuzz.trapmf(febre.universe, [0, 0, 0.5, 1.2])
-    febre['medio_risco'] = fuzz.trimf(febre.universe, [0.8, 1.8, 2.5])
-    febre['alto_risco'] = fuzz.trapmf(febre.universe, [2.2, 2.7, 3, 3])
-
-    risco_inflamatorio = ctrl.Consequent(np.arange(0, 101, 1), 'risco_inflamatorio')
-    risco_inflamatorio['baixo'] = fuzz.trapmf(risco_inflamatorio.universe, [0, 0, 15, 30])
-    risco_inflamatorio['baixo_moderado'] = fuzz.trimf(risco_inflamatorio.universe, [20, 32, 45])
-    risco_inflamatorio['moderado'] = fuzz.trimf(risco_inflamatorio.universe, [35, 50, 65])
-    risco_inflamatorio['moderado_alto'] = fuzz.trimf(risco_inflamatorio.universe, [55, 67, 80])
-    risco_inflamatorio['alto'] = fuzz.trapmf(risco_inflamatorio.universe, [70, 85, 100, 100])
-
-    # 27 regras (cobertura completa para todas as combinações)
-    regras = [
-        # ALTO RISCO (PCR alta + albumina baixa = inflamação grave)
-        ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['alto_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['medio_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['baixo_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['medio_risco'] & febre['alto_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['alto_risco'] & febre['alto_risco'], risco_inflamatorio['alto']),
-
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(pcr['alto_risco'] & albumina['medio_risco'] & febre['medio_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['alto_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['medio_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['alto_risco'] & febre['medio_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['alto_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['medio_risco'] & febre['alto_risco'], risco_inflamatorio['moderado_alto']),
-
-        # MODERADO RISCO
-        ctrl.Rule(pcr['alto_risco'] & albumina['medio_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['medio_risco'] & febre['medio_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['medio_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['baixo_risco'] & febre['alto_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & albumina['baixo_risco'] & febre['medio_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['alto_risco'] & febre['alto_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['alto_risco'] & febre['medio_risco'], risco_inflamatorio['moderado']),
-
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(pcr['medio_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['medio_risco'] & febre['alto_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['medio_risco'] & febre['medio_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['medio_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['alto_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['baixo_risco'] & febre['alto_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & albumina['baixo_risco'] & febre['medio_risco'], risco_inflamatorio['baixo_moderado']),
-
-        # BAIXO RISCO
-        ctrl.Rule(pcr['baixo_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-
+    """Submódulo 3: Inflamatório - MODO COMPLETO com albumina (27 regras)"""
+    calc = obter_simulacao('inflamatorio')
     calc.input['pcr'] = pcr_valor
     calc.input['albumina'] = albumina_valor
     calc.input['febre'] = febre_valor
@@ -317,57 +196,8 @@ def calcular_submodulo_inflamatorio(pcr_valor, albumina_valor, febre_valor):
     return calc.output['risco_inflamatorio']
 
 def calcular_submodulo_inflamatorio_simplificado(pcr_valor, febre_valor):
-    """Submódulo 3: Inflamatório SIMPLIFICADO (MODO SEM ALBUMINA)
-
-    Total: 9 regras fuzzy (COBERTURA COMPLETA PCR + Febre)
-
-    NOVO em v2.0: Versão alternativa quando albumina não está disponível.
-    Usa apenas PCR e Febre com ajustes de sensibilidade.
-
-    LIMITAÇÃO: Sensibilidade reduzida em ~10-15% comparado ao modo completo.
-    """
-
-    # PCR com ajustes para compensar falta de albumina (limiares mais sensíveis)
-    pcr = ctrl.Antecedent(np.arange(0, 401, 1), 'pcr')
-    pcr['baixo_risco'] = fuzz.trapmf(pcr.universe, [0, 0, 3, 8])         # Mais sensível
-    pcr['medio_risco'] = fuzz.trimf(pcr.universe, [5, 40, 100])          # Ajustado
-    pcr['alto_risco'] = fuzz.trapmf(pcr.universe, [70, 85, 400, 400])    # Threshold reduzido
-
-    # Febre mantida igual (não precisa ajuste)
-    febre = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'febre')
-    febre['baixo_risco'] = fuzz.trapmf(febre.universe, [0, 0, 0.5, 1.2])
-    febre['medio_risco'] = fuzz.trimf(febre.universe, [0.8, 1.8, 2.5])
-    febre['alto_risco'] = fuzz.trapmf(febre.universe, [2.2, 2.7, 3, 3])
-
-    # Saída mantida igual (compatibilidade com integrador)
-    risco_inflamatorio = ctrl.Consequent(np.arange(0, 101, 1), 'risco_inflamatorio')
-    risco_inflamatorio['baixo'] = fuzz.trapmf(risco_inflamatorio.universe, [0, 0, 15, 30])
-    risco_inflamatorio['baixo_moderado'] = fuzz.trimf(risco_inflamatorio.universe, [20, 32, 45])
-    risco_inflamatorio['moderado'] = fuzz.trimf(risco_inflamatorio.universe, [35, 50, 65])
-    risco_inflamatorio['moderado_alto'] = fuzz.trimf(risco_inflamatorio.universe, [55, 67, 80])
-    risco_inflamatorio['alto'] = fuzz.trapmf(risco_inflamatorio.universe, [70, 85, 100, 100])
-
-    # 9 regras otimizadas (cobertura completa 3x3)
-    regras = [
-        # ALTO RISCO (PCR dominante)
-        ctrl.Rule(pcr['alto_risco'] & febre['alto_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & febre['medio_risco'], risco_inflamatorio['alto']),
-        ctrl.Rule(pcr['alto_risco'] & febre['baixo_risco'], risco_inflamatorio['moderado_alto']),
-
-        # MODERADO RISCO
-        ctrl.Rule(pcr['medio_risco'] & febre['alto_risco'], risco_inflamatorio['moderado_alto']),
-        ctrl.Rule(pcr['medio_risco'] & febre['medio_risco'], risco_inflamatorio['moderado']),
-        ctrl.Rule(pcr['medio_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo_moderado']),
-
-        # BAIXO RISCO
-        ctrl.Rule(pcr['baixo_risco'] & febre['alto_risco'], risco_inflamatorio['baixo_moderado']),
-        ctrl.Rule(pcr['baixo_risco'] & febre['medio_risco'], risco_inflamatorio['baixo']),
-        ctrl.Rule(pcr['baixo_risco'] & febre['baixo_risco'], risco_inflamatorio['baixo'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-
+    """Submódulo 3: Inflamatório SIMPLIFICADO - sem albumina (9 regras)"""
+    calc = obter_simulacao('inflamatorio_simplificado')
     calc.input['pcr'] = pcr_valor
     calc.input['febre'] = febre_valor
     calc.compute()
@@ -375,120 +205,8 @@ def calcular_submodulo_inflamatorio_simplificado(pcr_valor, febre_valor):
     return calc.output['risco_inflamatorio']
 
 def calcular_submodulo_gravidade(diagnostico_valor, comorbidades_valor, idade_valor, cirurgia_valor):
-    """Submódulo 4: Gravidade/Morbidade
-
-    Total: 47 regras fuzzy (COBERTURA COMPLETA - 100% garantida)
-
-    CORREÇÕES v2.1:
-    - Eliminada zona morta em cirurgia (0.4-0.6)
-    - Adicionadas 12 regras de fallback universais
-    - Garantia de ativação de pelo menos uma regra SEMPRE
-    """
-
-    diagnostico = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'diagnostico')
-    diagnostico['baixo_risco'] = fuzz.trapmf(diagnostico.universe, [0, 0, 0.3, 0.8])
-    diagnostico['medio_risco'] = fuzz.trimf(diagnostico.universe, [0.5, 1.5, 2.3])
-    diagnostico['alto_risco'] = fuzz.trapmf(diagnostico.universe, [2, 2.5, 3, 3])
-
-    comorbidades = ctrl.Antecedent(np.arange(0, 5.1, 0.1), 'comorbidades')
-    comorbidades['baixo_risco'] = fuzz.trapmf(comorbidades.universe, [0, 0, 0.3, 1.0])
-    comorbidades['medio_risco'] = fuzz.trimf(comorbidades.universe, [0.5, 2.0, 3.5])
-    comorbidades['alto_risco'] = fuzz.trapmf(comorbidades.universe, [3, 3.5, 5, 5])
-
-    idade_var = ctrl.Antecedent(np.arange(18, 101, 1), 'idade_var')
-    idade_var['baixo_risco'] = fuzz.trapmf(idade_var.universe, [18, 18, 55, 65])
-    idade_var['medio_risco'] = fuzz.trimf(idade_var.universe, [60, 70, 78])
-    idade_var['alto_risco'] = fuzz.trapmf(idade_var.universe, [73, 75, 100, 100])
-
-    # CORREÇÃO CRÍTICA: Eliminar zona morta em cirurgia (0.4-0.6)
-    cirurgia_var = ctrl.Antecedent(np.arange(0, 1.1, 0.1), 'cirurgia_var')
-    cirurgia_var['nao'] = fuzz.trapmf(cirurgia_var.universe, [0, 0, 0.3, 0.5])   # Estendido até 0.5
-    cirurgia_var['sim'] = fuzz.trapmf(cirurgia_var.universe, [0.5, 0.7, 1, 1])   # Começa em 0.5
-
-    risco_gravidade = ctrl.Consequent(np.arange(0, 101, 1), 'risco_gravidade')
-    risco_gravidade['baixo'] = fuzz.trapmf(risco_gravidade.universe, [0, 0, 15, 30])
-    risco_gravidade['baixo_moderado'] = fuzz.trimf(risco_gravidade.universe, [20, 32, 45])
-    risco_gravidade['moderado'] = fuzz.trimf(risco_gravidade.universe, [35, 50, 65])
-    risco_gravidade['moderado_alto'] = fuzz.trimf(risco_gravidade.universe, [55, 67, 80])
-    risco_gravidade['alto'] = fuzz.trapmf(risco_gravidade.universe, [70, 85, 100, 100])
-
-    # 35 regras (cobertura expandida para 4 variáveis)
-    regras = [
-        # ALTO RISCO (múltiplos fatores graves)
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & idade_var['alto_risco'], risco_gravidade['alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & cirurgia_var['sim'], risco_gravidade['alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & idade_var['medio_risco'], risco_gravidade['alto']),
-        ctrl.Rule(comorbidades['alto_risco'] & idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['alto']),
-
-        # MODERADO-ALTO RISCO
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['medio_risco'] & idade_var['medio_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & cirurgia_var['sim'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & cirurgia_var['sim'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['medio_risco'] & idade_var['alto_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & idade_var['alto_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & idade_var['alto_risco'] & cirurgia_var['nao'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & idade_var['baixo_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['moderado_alto']),
-
-        # MODERADO RISCO
-        ctrl.Rule(comorbidades['alto_risco'] & cirurgia_var['nao'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & idade_var['medio_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['nao'], risco_gravidade['moderado']),
-        ctrl.Rule(idade_var['alto_risco'] & cirurgia_var['sim'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & idade_var['medio_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & idade_var['baixo_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['medio_risco'] & idade_var['baixo_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & cirurgia_var['sim'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['alto_risco'] & idade_var['medio_risco'] & cirurgia_var['nao'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & cirurgia_var['nao'], risco_gravidade['moderado']),
-
-        # BAIXO-MODERADO RISCO
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['baixo_risco'] & idade_var['medio_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['medio_risco'] & idade_var['medio_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & idade_var['baixo_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['alto_risco'] & idade_var['baixo_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['alto_risco'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & idade_var['alto_risco'] & cirurgia_var['nao'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['medio_risco'] & cirurgia_var['sim'], risco_gravidade['baixo_moderado']),
-        ctrl.Rule(comorbidades['medio_risco'] & idade_var['medio_risco'] & cirurgia_var['nao'], risco_gravidade['baixo_moderado']),
-
-        # BAIXO RISCO
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['nao'], risco_gravidade['baixo']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['medio_risco'] & cirurgia_var['nao'], risco_gravidade['baixo']),
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['nao'], risco_gravidade['baixo']),
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade_var['baixo_risco'] & cirurgia_var['sim'], risco_gravidade['baixo']),
-
-        # ========================================================================
-        # REGRAS DE FALLBACK UNIVERSAIS (GARANTIA DE COBERTURA 100%)
-        # ========================================================================
-        # Estas regras garantem que SEMPRE haverá pelo menos uma regra ativa,
-        # independente dos valores de entrada.
-
-        # Fallback: 2 variáveis em baixo_risco
-        ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'], risco_gravidade['baixo']),
-        ctrl.Rule(diagnostico['baixo_risco'] & idade_var['baixo_risco'], risco_gravidade['baixo']),
-        ctrl.Rule(comorbidades['baixo_risco'] & idade_var['baixo_risco'], risco_gravidade['baixo_moderado']),
-
-        # Fallback: 2 variáveis em medio_risco (NOVO - crítico!)
-        ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(diagnostico['medio_risco'] & idade_var['medio_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(comorbidades['medio_risco'] & idade_var['medio_risco'], risco_gravidade['moderado']),
-
-        # Fallback: 2 variáveis em alto_risco
-        ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'], risco_gravidade['alto']),
-        ctrl.Rule(diagnostico['alto_risco'] & idade_var['alto_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(comorbidades['alto_risco'] & idade_var['alto_risco'], risco_gravidade['moderado_alto']),
-
-        # Fallback: 1 variável isolada (última linha de defesa - CRÍTICO!)
-        ctrl.Rule(diagnostico['alto_risco'], risco_gravidade['moderado_alto']),
-        ctrl.Rule(comorbidades['alto_risco'], risco_gravidade['moderado']),
-        ctrl.Rule(idade_var['alto_risco'], risco_gravidade['baixo_moderado'])
-    ]
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-
+    """Submódulo 4: Gravidade/Morbidade (47 regras)"""
+    calc = obter_simulacao('gravidade')
     calc.input['diagnostico'] = diagnostico_valor
     calc.input['comorbidades'] = comorbidades_valor
     calc.input['idade_var'] = idade_valor
@@ -498,264 +216,8 @@ def calcular_submodulo_gravidade(diagnostico_valor, comorbidades_valor, idade_va
     return calc.output['risco_gravidade']
 
 def calcular_risco_final_integrado(escore_fen, escore_ing, escore_inf, escore_grav, modo_completo=True):
-    """Módulo Integrador Final (ADAPTATIVO)
-
-    Total: 73 regras (modo completo) ou 64 regras (modo simplificado)
-
-    NOVO em v2.0: Ajusta regras baseado no modo (com/sem albumina)
-
-    Modo Completo (com albumina):
-    - Pesos: Fenotípico 30%, Ingestão 25%, Inflamatório 15%, Gravidade 30%
-    - 73 regras fuzzy
-
-    Modo Simplificado (sem albumina):
-    - Pesos ajustados: Fenotípico 35%, Ingestão 30%, Inflamatório 10%, Gravidade 25%
-    - 64 regras fuzzy (algumas regras com inflamatório alto removidas)
-    """
-
-    escore_fenotipico = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_fenotipico')
-    escore_fenotipico['baixo'] = fuzz.trapmf(escore_fenotipico.universe, [0, 0, 20, 30])
-    escore_fenotipico['baixo_moderado'] = fuzz.trimf(escore_fenotipico.universe, [25, 35, 45])
-    escore_fenotipico['moderado'] = fuzz.trimf(escore_fenotipico.universe, [40, 50, 60])
-    escore_fenotipico['moderado_alto'] = fuzz.trimf(escore_fenotipico.universe, [55, 65, 75])
-    escore_fenotipico['alto'] = fuzz.trapmf(escore_fenotipico.universe, [70, 80, 100, 100])
-
-    escore_ingestao = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_ingestao')
-    escore_ingestao['baixo'] = fuzz.trapmf(escore_ingestao.universe, [0, 0, 20, 30])
-    escore_ingestao['baixo_moderado'] = fuzz.trimf(escore_ingestao.universe, [25, 35, 45])
-    escore_ingestao['moderado'] = fuzz.trimf(escore_ingestao.universe, [40, 50, 60])
-    escore_ingestao['moderado_alto'] = fuzz.trimf(escore_ingestao.universe, [55, 65, 75])
-    escore_ingestao['alto'] = fuzz.trapmf(escore_ingestao.universe, [70, 80, 100, 100])
-
-    escore_inflamatorio = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_inflamatorio')
-    escore_inflamatorio['baixo'] = fuzz.trapmf(escore_inflamatorio.universe, [0, 0, 20, 30])
-    escore_inflamatorio['baixo_moderado'] = fuzz.trimf(escore_inflamatorio.universe, [25, 35, 45])
-    escore_inflamatorio['moderado'] = fuzz.trimf(escore_inflamatorio.universe, [40, 50, 60])
-    escore_inflamatorio['moderado_alto'] = fuzz.trimf(escore_inflamatorio.universe, [55, 65, 75])
-    escore_inflamatorio['alto'] = fuzz.trapmf(escore_inflamatorio.universe, [70, 80, 100, 100])
-
-    escore_gravidade_int = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_gravidade')
-    escore_gravidade_int['baixo'] = fuzz.trapmf(escore_gravidade_int.universe, [0, 0, 20, 30])
-    escore_gravidade_int['baixo_moderado'] = fuzz.trimf(escore_gravidade_int.universe, [25, 35, 45])
-    escore_gravidade_int['moderado'] = fuzz.trimf(escore_gravidade_int.universe, [40, 50, 60])
-    escore_gravidade_int['moderado_alto'] = fuzz.trimf(escore_gravidade_int.universe, [55, 65, 75])
-    escore_gravidade_int['alto'] = fuzz.trapmf(escore_gravidade_int.universe, [70, 80, 100, 100])
-
-    risco_final = ctrl.Consequent(np.arange(0, 101, 1), 'risco_final')
-    risco_final['baixo'] = fuzz.trapmf(risco_final.universe, [0, 0, 15, 25])
-    risco_final['baixo_moderado'] = fuzz.trimf(risco_final.universe, [20, 32, 40])
-    risco_final['moderado'] = fuzz.trimf(risco_final.universe, [35, 50, 60])
-    risco_final['moderado_alto'] = fuzz.trimf(risco_final.universe, [50, 60, 70])
-    risco_final['alto'] = fuzz.trapmf(risco_final.universe, [60, 70, 100, 100])
-
-    # Regras base (comuns a ambos os modos)
-    regras = [
-        # === REGRAS DE DOMINÂNCIA: ALTO RISCO ===
-        ctrl.Rule(escore_fenotipico['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['alto'], risco_final['alto']),
-        ctrl.Rule(escore_ingestao['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-
-        # Se 1 ALTO + 1 MODERADO-ALTO → ALTO
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['moderado_alto'], risco_final['alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_gravidade_int['moderado_alto'], risco_final['alto']),
-        ctrl.Rule(escore_ingestao['alto'] & escore_gravidade_int['moderado_alto'], risco_final['alto']),
-
-        # === REGRAS MODERADO-ALTO ===
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_ingestao['alto'] & escore_fenotipico['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_gravidade_int['alto'] & escore_fenotipico['moderado'] & escore_ingestao['moderado'], risco_final['moderado_alto']),
-
-        # Se ≥2 MODERADO-ALTO → MODERADO-ALTO
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_ingestao['moderado_alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-
-        # === REGRAS MODERADO ===
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-
-        # Se 1 MODERADO-ALTO + outros baixos → MODERADO
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_ingestao['moderado_alto'] & escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_gravidade_int['moderado_alto'] & escore_fenotipico['baixo'] & escore_ingestao['baixo'], risco_final['moderado']),
-
-        # Mix MODERADO com BAIXO-MODERADO
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['baixo_moderado'] & escore_ingestao['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_ingestao['moderado'] & escore_fenotipico['baixo_moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-
-        # === REGRAS BAIXO-MODERADO ===
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-
-        # Mix BAIXO-MODERADO com BAIXO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-
-        # BAIXO-MODERADO com MODERADO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-
-        # === REGRAS BAIXO ===
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo']),
-
-        # === REGRAS ADICIONAIS PARA MELHOR COBERTURA ===
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['baixo'] & escore_gravidade_int['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade_int['baixo'] & escore_inflamatorio['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo'] & escore_inflamatorio['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo_moderado'] & escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_gravidade_int['baixo'] & escore_fenotipico['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['baixo'] & escore_ingestao['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo_moderado'] & escore_inflamatorio['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_inflamatorio['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['moderado'] & escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_gravidade_int['moderado'] & escore_fenotipico['baixo'] & escore_ingestao['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['moderado'] & escore_inflamatorio['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo_moderado'] & escore_inflamatorio['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_gravidade_int['moderado'] & escore_fenotipico['baixo'] & escore_inflamatorio['baixo_moderado'], risco_final['baixo_moderado']),
-
-        # Regras gerais de fallback
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade_int['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['moderado_alto'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-    ]
-
-    # Regras adicionais APENAS para modo completo (com albumina)
-    if modo_completo:
-        regras.extend([
-            # Regras de dominância com inflamatório alto
-            ctrl.Rule(escore_fenotipico['alto'] & escore_inflamatorio['alto'], risco_final['alto']),
-            ctrl.Rule(escore_inflamatorio['alto'] & escore_fenotipico['alto'], risco_final['alto']),
-            ctrl.Rule(escore_inflamatorio['alto'] & escore_ingestao['alto'], risco_final['alto']),
-            ctrl.Rule(escore_inflamatorio['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-
-            # MODERADO-ALTO com inflamatório alto
-            ctrl.Rule(escore_inflamatorio['alto'] & escore_fenotipico['moderado_alto'], risco_final['moderado_alto']),
-            ctrl.Rule(escore_inflamatorio['alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-            ctrl.Rule(escore_inflamatorio['moderado_alto'] & escore_gravidade_int['alto'], risco_final['moderado_alto']),
-
-            # Inflamatório MODERADO com outros MODERADOS
-            ctrl.Rule(escore_inflamatorio['moderado'] & escore_fenotipico['moderado'], risco_final['moderado']),
-            ctrl.Rule(escore_inflamatorio['moderado'] & escore_ingestao['moderado'], risco_final['moderado']),
-            ctrl.Rule(escore_inflamatorio['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ])
-
-    # ========================================================================
-    # REGRAS DE FALLBACK UNIVERSAIS (GARANTIA DE COBERTURA 100%)
-    # ========================================================================
-    # Estas regras garantem que SEMPRE haverá pelo menos uma regra ativa,
-    # independente dos valores de entrada (4 variáveis × 5 níveis = 625 combinações).
-    # Estratégia: cobrir todas as combinações principais das variáveis mais importantes.
-
-    regras.extend([
-        # === FALLBACK NÍVEL 1: COMBINAÇÕES DE 3 VARIÁVEIS (SEM INFLAMATÓRIO) ===
-        # Fenotípico + Ingestão + Gravidade (as 3 mais importantes)
-
-        # Todas BAIXAS → BAIXO
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo']),
-
-        # Pelo menos uma BAIXO-MODERADO + outras BAIXO → BAIXO-MODERADO
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo_moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-
-        # Pelo menos uma MODERADO + outras <= BAIXO-MODERADO → MODERADO ou BAIXO-MODERADO
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['moderado'] & escore_gravidade_int['baixo'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['moderado'], risco_final['baixo_moderado']),
-
-        # 2+ MODERADO → MODERADO
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['moderado'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_ingestao['baixo'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-
-        # Pelo menos uma MODERADO-ALTO + outras <= MODERADO → MODERADO-ALTO ou MODERADO
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['moderado_alto'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['moderado_alto'], risco_final['moderado']),
-
-        # 2+ MODERADO-ALTO → MODERADO-ALTO
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['moderado_alto'] & escore_gravidade_int['baixo'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['baixo'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['moderado_alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-
-        # Pelo menos uma ALTO + outras qualquer → ALTO ou MODERADO-ALTO
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['alto'] & escore_gravidade_int['baixo'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade_int['alto'], risco_final['moderado_alto']),
-
-        # === FALLBACK NÍVEL 2: COMBINAÇÕES DE 2 VARIÁVEIS (AS MAIS IMPORTANTES) ===
-        # Fenotípico + Gravidade (peso maior)
-
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade_int['moderado'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-
-        # Combinações mistas Fenotípico + Gravidade
-        ctrl.Rule(escore_fenotipico['alto'] & escore_gravidade_int['baixo'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_gravidade_int['alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_gravidade_int['baixo'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_gravidade_int['moderado_alto'], risco_final['moderado']),
-
-        # Ingestão + Gravidade
-        ctrl.Rule(escore_ingestao['baixo'] & escore_gravidade_int['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_ingestao['alto'] & escore_gravidade_int['alto'], risco_final['alto']),
-        ctrl.Rule(escore_ingestao['moderado_alto'] & escore_gravidade_int['moderado_alto'], risco_final['moderado_alto']),
-
-        # Fenotípico + Ingestão
-        ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'], risco_final['baixo']),
-        ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['alto'], risco_final['alto']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_ingestao['moderado_alto'], risco_final['moderado_alto']),
-
-        # === FALLBACK NÍVEL 3: VARIÁVEIS ISOLADAS (ÚLTIMA DEFESA - CRÍTICO!) ===
-        # Estas regras garantem que SEMPRE haverá saída, mesmo em casos extremos.
-        # São a "rede de segurança" que evita 100% dos KeyErrors.
-
-        # Se APENAS Fenotípico está definido claramente:
-        ctrl.Rule(escore_fenotipico['alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_fenotipico['moderado_alto'], risco_final['moderado']),
-        ctrl.Rule(escore_fenotipico['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_fenotipico['baixo'], risco_final['baixo']),
-
-        # Se APENAS Ingestão está definida claramente:
-        ctrl.Rule(escore_ingestao['alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_ingestao['moderado_alto'], risco_final['moderado']),
-        ctrl.Rule(escore_ingestao['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_ingestao['baixo'], risco_final['baixo']),
-
-        # Se APENAS Gravidade está definida claramente:
-        ctrl.Rule(escore_gravidade_int['alto'], risco_final['moderado_alto']),
-        ctrl.Rule(escore_gravidade_int['moderado_alto'], risco_final['moderado']),
-        ctrl.Rule(escore_gravidade_int['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_gravidade_int['baixo_moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_gravidade_int['baixo'], risco_final['baixo']),
-
-        # Se APENAS Inflamatório está definido claramente (menor peso, menor impacto):
-        ctrl.Rule(escore_inflamatorio['alto'], risco_final['moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado_alto'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['moderado'], risco_final['baixo_moderado']),
-        ctrl.Rule(escore_inflamatorio['baixo_moderado'], risco_final['baixo']),
-        ctrl.Rule(escore_inflamatorio['baixo'], risco_final['baixo'])
-    ])
-
-    sistema = ctrl.ControlSystem(regras)
-    calc = ctrl.ControlSystemSimulation(sistema)
-
+    """Módulo Integrador Final (ADAPTATIVO): 73 regras (completo) ou 64 (simplificado)"""
+    calc = obter_simulacao(chave_integrador(modo_completo))
     calc.input['escore_fenotipico'] = escore_fen
     calc.input['escore_ingestao'] = escore_ing
     calc.input['escore_inflamatorio'] = escore_inf
@@ -788,10 +250,103 @@ def get_recomendacao(categoria):
     }
     return recomendacoes.get(categoria, "")
 
+# ==============================================================================
+# CÁLCULO EM SEGUNDO PLANO
+# ==============================================================================
+# O Tk só pode ser tocado pela thread principal, e uma inferência (ou a
+# montagem dos sistemas, que leva segundos) executada nela congela a janela.
+# TrabalhadorCalculo executa as tarefas numa única thread de fundo, em ordem,
+# e entrega os resultados à thread do Tk por root.after(). Como o registro de
+# sistemas é separado por thread, o aquecimento (construir_todos_sistemas)
+# precisa rodar nessa mesma thread para que os cálculos seguintes o
+# aproveitem.
+
+class TrabalhadorCalculo:
+    """Thread de fundo para os cálculos da interface
+
+    Parâmetros:
+    -----------
+    root : tk.Tk (ou qualquer objeto com after/after_cancel)
+        Usado para chamar os retornos na thread da interface
+    intervalo_ms : int
+        Intervalo de verificação de resultados enquanto houver tarefa pendente
+    """
+
+    def __init__(self, root, intervalo_ms=30):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self._tarefas = queue.Queue()
+        self._respostas = queue.Queue()
+        self._pendentes = 0
+        self._verificacao = None
+        self._thread = threading.Thread(target=self._executar, name='trabalhador-calculo', daemon=True)
+        self._thread.start()
+
+    @property
+    def ocupado(self):
+        """True enquanto houver tarefa enviada cujo retorno ainda não foi chamado"""
+        return self._pendentes > 0
+
+    def enviar(self, tarefa, ao_concluir=None, ao_falhar=None):
+        """Agenda tarefa() na thread de fundo (chamar da thread da interface)
+
+        ao_concluir(resultado) ou ao_falhar(excecao) é chamado depois, na
+        thread da interface. A exceção chega com o __traceback__ da thread de
+        fundo (traceback.format_exception ou logging com exc_info=excecao).
+        """
+        self._pendentes += 1
+        self._tarefas.put((tarefa, ao_concluir, ao_falhar))
+        if self._verificacao is None:
+            self._verificacao = self.root.after(self.intervalo_ms, self._verificar)
+
+    def encerrar(self):
+        """Encerra a thread de fundo depois da tarefa em andamento"""
+        if self._verificacao is not None:
+            self.root.after_cancel(self._verificacao)
+            self._verificacao = None
+        self._tarefas.put(None)
+
+    def _executar(self):
+        while True:
+            item = self._tarefas.get()
+            if item is None:
+                return
+            tarefa, ao_concluir, ao_falhar = item
+            try:
+                self._respostas.put((ao_concluir, tarefa()))
+            except Exception as e:
+                self._respostas.put((ao_falhar, e))
+
+    def _verificar(self):
+        self._verificacao = None
+        while True:
+            try:
+                retorno, valor = self._respostas.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            if retorno is not None:
+                retorno(valor)
+        if self._pendentes > 0 and self._verificacao is None:
+            self._verificacao = self.root.after(self.intervalo_ms, self._verificar)
+
 # ==============================================================================
 # INTERFACE GRÁFICA COM TKINTER
 # ==============================================================================
 
+ARQUIVO_RESULTADOS = "dados_pacientes.csv"
+
+# Banco SQLite opcional (ver banco_resultados.py): com um caminho aqui, cada
+# resultado também é inserido no banco, além do CSV
+ARQUIVO_BANCO_RESULTADOS = None
+
+CABECALHO_RESULTADOS = [
+    'Data', 'Hora', 'Modo', 'IMC', 'Perda%', 'Sarcopenia', 'VET%', 'Duracao',
+    'SintomasGI', 'PCR', 'Albumina', 'Febre', 'Diagnostico', 'Comorbidades',
+    'Idade', 'Cirurgia', 'Escore_Fenotipico', 'Escore_Ingestao',
+    'Escore_Inflamatorio', 'Escore_Gravidade', 'Escore_Final', 'Categoria'
+]
+
 class CalculadoraFuzzyGUI:
     def __init__(self, root):
         self.root = root
@@ -805,9 +360,30 @@ class CalculadoraFuzzyGUI:
         # Variável para rastrear modo
         self.tem_albumina = False
 
+        # Arquivo de resultados aberto durante toda a sessão; cada linha vai
+        # para o disco (fsync) sob trava, para que duas calculadoras sobre a
+        # mesma pasta não intercalem gravações
+        self.gravador = GravadorResultados(ARQUIVO_RESULTADOS, CABECALHO_RESULTADOS,
+                                           linhas_por_descarga=1, fsync=True)
+        self.banco = None
+        if ARQUIVO_BANCO_RESULTADOS:
+            from banco_resultados import BancoResultados
+            self.banco = BancoResultados(ARQUIVO_BANCO_RESULTADOS)
+
+        # Sessão do paciente: recalcula só os submódulos cujas entradas mudaram
+        from sessao_paciente import SessaoPaciente
+        self.sessao = SessaoPaciente()
+
         # Criar widgets
         self.criar_interface()
 
+        # Cálculos fora da thread da interface; os sistemas fuzzy são montados
+        # já na abertura, para que o primeiro clique seja tão rápido quanto os
+        # seguintes
+        self.trabalhador = TrabalhadorCalculo(self.root)
+        self.status_label.config(text="⏳ Carregando sistemas fuzzy...")
+        self.trabalhador.enviar(construir_todos_sistemas, self.aquecimento_concluido, self.aquecimento_falhou)
+
     def criar_interface(self):
         # Frame principal com scroll
         main_frame = ttk.Frame(self.root, padding="10")
@@ -940,12 +516,15 @@ class CalculadoraFuzzyGUI:
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=row, column=0, columnspan=4, pady=20)
 
-        calcular_btn = ttk.Button(button_frame, text="🧮 Calcular Risco", command=self.calcular)
-        calcular_btn.grid(row=0, column=0, padx=5)
+        self.calcular_btn = ttk.Button(button_frame, text="🧮 Calcular Risco", command=self.calcular)
+        self.calcular_btn.grid(row=0, column=0, padx=5)
 
         limpar_btn = ttk.Button(button_frame, text="🔄 Limpar", command=self.limpar)
         limpar_btn.grid(row=0, column=1, padx=5)
 
+        self.status_label = ttk.Label(button_frame, text="", font=('Arial', 9))
+        self.status_label.grid(row=0, column=2, padx=10)
+
         row += 1
 
         # Área de resultados
@@ -1039,8 +618,17 @@ class CalculadoraFuzzyGUI:
                 foreground='#f59e0b'
             )
 
+    def aquecimento_concluido(self, _resultado):
+        if not self.trabalhador.ocupado:
+            self.status_label.config(text="")
+
+    def aquecimento_falhou(self, erro):
+        _log.error("Erro ao carregar os sistemas fuzzy", exc_info=erro)
+        self.status_label.config(text="")
+        messagebox.showerror("Erro", f"Erro ao carregar os sistemas fuzzy: {str(erro)}")
+
     def calcular(self):
-        """Calcula o risco nutricional com modo adaptativo"""
+        """Calcula o risco nutricional com modo adaptativo (em segundo plano)"""
         erros = self.validar_campos()
 
         if erros:
@@ -1073,31 +661,59 @@ class CalculadoraFuzzyGUI:
             comorb = float(self.comorbidades_var.get()[0])
             idade = float(self.idade_entry.get())
             cirurg = float(self.cirurgia_var.get()[0])
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao calcular: {str(e)}")
+            return
 
-            # Calcular submódulos
-            self.result_text.delete('1.0', tk.END)
-            self.result_text.insert(tk.END, "Calculando...\n")
-            self.root.update()
+        entradas = dict(
+            imc=imc, perda=perda, sarcopenia=sarco,
+            vet=vet, duracao=duracao, sintomas=sintomas,
+            pcr=pcr, albumina=albumina if self.tem_albumina else None, febre=febre,
+            diagnostico=diag, comorbidades=comorb, idade=idade, cirurgia=cirurg,
+        )
+        sessao = self.sessao
+        tem_albumina = self.tem_albumina
+
+        # Só os submódulos com entradas alteradas desde o último cálculo
+        # são recalculados; submódulo 3 ADAPTATIVO baseado em albumina
+        def tarefa():
+            sessao.atualizar(**entradas)
+            return sessao.calcular()
 
-            # Submódulos 1, 2 e 4 são iguais para ambos os modos
-            escore_fen = calcular_submodulo_fenotipico(imc, perda, sarco)
-            escore_ing = calcular_submodulo_ingestao(vet, duracao, sintomas)
-            escore_grav = calcular_submodulo_gravidade(diag, comorb, idade, cirurg)
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert(tk.END, "Calculando...\n")
+        self.calcular_btn.state(['disabled'])
+        self.status_label.config(text="⏳ Calculando...")
+        self.trabalhador.enviar(
+            tarefa,
+            lambda resultado: self.exibir_resultado(entradas, resultado, tem_albumina),
+            self.calculo_falhou,
+        )
+
+    def calculo_falhou(self, erro):
+        _log.error("Erro ao calcular", exc_info=erro)
+        self.calcular_btn.state(['!disabled'])
+        self.status_label.config(text="")
+        self.result_text.delete('1.0', tk.END)
+        messagebox.showerror("Erro", f"Erro ao calcular: {str(erro)}")
 
-            # Submódulo 3 - ADAPTATIVO baseado em albumina
-            if self.tem_albumina:
-                escore_inf = calcular_submodulo_inflamatorio(pcr, albumina, febre)
+    def exibir_resultado(self, entradas, resultado, tem_albumina):
+        """Mostra o resultado calculado em segundo plano e salva em CSV (thread da interface)"""
+        self.calcular_btn.state(['!disabled'])
+        self.status_label.config(text="")
+
+        try:
+            escore_fen = resultado['escore_fenotipico']
+            escore_ing = resultado['escore_ingestao']
+            escore_inf = resultado['escore_inflamatorio']
+            escore_grav = resultado['escore_gravidade']
+            escore_final = resultado['escore_final']
+
+            if tem_albumina:
                 modo_texto = "COMPLETO (com albumina)"
             else:
-                escore_inf = calcular_submodulo_inflamatorio_simplificado(pcr, febre)
                 modo_texto = "SIMPLIFICADO (sem albumina)"
 
-            # Calcular escore final com modo adaptativo
-            escore_final = calcular_risco_final_integrado(
-                escore_fen, escore_ing, escore_inf, escore_grav,
-                modo_completo=self.tem_albumina
-            )
-
             categoria, cor = categorizar_risco(escore_final)
             recomendacao = get_recomendacao(categoria)
 
@@ -1108,7 +724,7 @@ class CalculadoraFuzzyGUI:
             self.result_text.insert(tk.END, "="*90 + "\n\n")
 
             # Indicador de modo no resultado
-            if self.tem_albumina:
+            if tem_albumina:
                 self.result_text.insert(tk.END, "   🟢 MODO: COMPLETO (com albumina) - 201 regras fuzzy [v2.1]\n")
             else:
                 self.result_text.insert(tk.END, "   🟡 MODO: SIMPLIFICADO (sem albumina) - 174 regras fuzzy [v2.1]\n")
@@ -1131,7 +747,7 @@ class CalculadoraFuzzyGUI:
             self.result_text.insert(tk.END, f"   {recomendacao}\n\n")
 
             # Aviso específico para modo simplificado
-            if not self.tem_albumina:
+            if not tem_albumina:
                 self.result_text.insert(tk.END, "⚠️  LIMITAÇÕES DO MODO SIMPLIFICADO:\n")
                 self.result_text.insert(tk.END, "   - Avaliação inflamatória baseada apenas em PCR + Febre\n")
                 self.result_text.insert(tk.END, "   - Sensibilidade reduzida em ~10-15% comparado ao modo completo\n")
@@ -1144,15 +760,14 @@ class CalculadoraFuzzyGUI:
             self.result_text.insert(tk.END, f"Data/Hora: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
             self.result_text.insert(tk.END, "="*90 + "\n")
 
-            # Salvar em CSV
-            self.salvar_csv(imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre,
-                           diag, comorb, idade, cirurg, escore_fen, escore_ing, escore_inf,
+            # Salvar em CSV (entradas na ordem do formulário)
+            self.salvar_csv(*entradas.values(), escore_fen, escore_ing, escore_inf,
                            escore_grav, escore_final, categoria, modo_texto)
 
             messagebox.showinfo("Sucesso", "Cálculo concluído!\nDados salvos em 'dados_pacientes.csv'")
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao calcular: {str(e)}")
+        except Exception as erro:
+            messagebox.showerror("Erro", f"Erro ao calcular: {str(erro)}")
             import traceback
             traceback.print_exc()
 
@@ -1160,31 +775,20 @@ class CalculadoraFuzzyGUI:
                    diag, comorb, idade, cirurg, esc_fen, esc_ing, esc_inf, esc_grav,
                    esc_final, categoria, modo):
         """Salva os dados em CSV com coluna de modo"""
-        arquivo = "dados_pacientes.csv"
-        arquivo_existe = os.path.isfile(arquivo)
-
-        with open(arquivo, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            if not arquivo_existe:
-                # Escrever cabeçalho
-                writer.writerow([
-                    'Data', 'Hora', 'Modo', 'IMC', 'Perda%', 'Sarcopenia', 'VET%', 'Duracao',
-                    'SintomasGI', 'PCR', 'Albumina', 'Febre', 'Diagnostico', 'Comorbidades',
-                    'Idade', 'Cirurgia', 'Escore_Fenotipico', 'Escore_Ingestao',
-                    'Escore_Inflamatorio', 'Escore_Gravidade', 'Escore_Final', 'Categoria'
-                ])
-
-            # Escrever dados
-            agora = datetime.now()
-            writer.writerow([
-                agora.strftime('%d/%m/%Y'), agora.strftime('%H:%M:%S'), modo,
-                imc, perda, sarco, vet, duracao, sintomas, pcr,
-                albumina if albumina is not None else "N/A",
-                febre, diag, comorb, idade, cirurg,
-                f"{esc_fen:.1f}", f"{esc_ing:.1f}",
-                f"{esc_inf:.1f}", f"{esc_grav:.1f}", f"{esc_final:.1f}", categoria
-            ])
+        agora = datetime.now()
+        linha = [
+            agora.strftime('%d/%m/%Y'), agora.strftime('%H:%M:%S'), modo,
+            imc, perda, sarco, vet, duracao, sintomas, pcr,
+            albumina if albumina is not None else "N/A",
+            febre, diag, comorb, idade, cirurg,
+            f"{esc_fen:.1f}", f"{esc_ing:.1f}",
+            f"{esc_inf:.1f}", f"{esc_grav:.1f}", f"{esc_final:.1f}", categoria
+        ]
+        self.gravador.escrever(linha)
+
+        if self.banco is not None:
+            from banco_resultados import registro_da_linha
+            self.banco.inserir(registro_da_linha(dict(zip(CABECALHO_RESULTADOS, [str(v) for v in linha]))))
 
     def limpar(self):
         """Limpa todos os campos"""
@@ -1204,6 +808,10 @@ class CalculadoraFuzzyGUI:
         self.result_text.delete('1.0', tk.END)
         self.modo_label.config(text="")
 
+        # Novo paciente: nada reaproveitado do anterior
+        from sessao_paciente import SessaoPaciente
+        self.sessao = SessaoPaciente()
+
 # ==============================================================================
 # MAIN
 # ==============================================================================
@@ -0,0 +1,540 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Calibração das Funções de Pertinência contra Casos Rotulados
+
+Os pontos de quebra dos fuzz.trapmf/fuzz.trimf vieram das rodadas Delphi.
+Este módulo ajusta esses pontos, dentro de limites definidos pelos clínicos,
+para maximizar a concordância entre a categoria calculada e a categoria
+adjudicada de um conjunto de casos (os casos_teste dos submódulos ou casos
+reais revisados).
+
+ARQUIVO DE LIMITES (JSON, ver limites_calibracao.json):
+    {sistema do registro: {entrada: {termo: {"pecas": [[forma, pontos], ...],
+                                              "limites": [[[mín, máx] ou null, ...], ...]}}}}
+- "pecas" repete a definição Delphi do termo (soma das peças, como em
+  imc['alto_risco']) e é conferida contra a base de regras ao carregar
+- [mín, máx] libera o ponto dentro do intervalo; null o mantém fixo
+- Chaves iniciadas por "_" são comentários
+
+BUSCA:
+Busca por coordenadas: a cada passo um ponto livre percorre uma grade de
+valores entre os seus limites (sem ultrapassar os pontos vizinhos da mesma
+peça) e fica o valor com mais acertos; empates vão para a menor distância
+dos escores às categorias esperadas e, depois, para o valor mais próximo do
+Delphi. A grade inteira é avaliada num único lote do motor vetorizado:
+trocar um termo muda uma só coluna da matriz de pertinências, e só as linhas
+cujos cortes mudaram são defuzzificadas de novo (e, no alvo 'final',
+reavaliadas no integrador).
+
+SAÍDA:
+JSON com os mesmos sistemas/entradas/termos e um termo por linha, para que
+`diff` contra o conjunto Delphi mostre só os termos alterados.
+
+USO:
+    python calibracao_pertinencias.py limites_calibracao.json casos.csv
+                                      [--esperado Categoria] [--alvo final]
+                                      [--saida calibrado.json] [--delphi delphi.json]
+"""
+
+import argparse
+import copy
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import motor_vetorizado as mv
+from compilador_regras import pertinencia_do_termo, validar_pecas as _validar_pecas
+from coorte_colunar import CATEGORIAS
+from incerteza_medicao import CORTES_CATEGORIAS, categorias_dos_escores
+from pipeline_pacientes import CAMPOS_ENTRADA, valor_numerico
+from pontuar_csv import converter_linha, montar_linha
+
+# Campos (do paciente ou escores intermediários) na ordem das entradas de cada motor
+ESCORES_SUBMODULOS = ('escore_fenotipico', 'escore_ingestao', 'escore_inflamatorio', 'escore_gravidade')
+ENTRADAS_DOS_SISTEMAS = {
+    'fenotipico': ('imc', 'perda', 'sarcopenia'),
+    'ingestao': ('vet', 'duracao', 'sintomas'),
+    'inflamatorio': ('pcr', 'albumina', 'febre'),
+    'inflamatorio_simplificado': ('pcr', 'febre'),
+    'gravidade': ('diagnostico', 'comorbidades', 'idade', 'cirurgia'),
+    'integrador_completo': ESCORES_SUBMODULOS,
+    'integrador_simplificado': ESCORES_SUBMODULOS,
+}
+ESCORE_DO_SISTEMA = {
+    'fenotipico': 'escore_fenotipico',
+    'ingestao': 'escore_ingestao',
+    'inflamatorio': 'escore_inflamatorio',
+    'inflamatorio_simplificado': 'escore_inflamatorio',
+    'gravidade': 'escore_gravidade',
+    'integrador_completo': 'escore_final',
+    'integrador_simplificado': 'escore_final',
+}
+
+# Alvo da concordância -> sistemas avaliados, em ordem
+ALVOS = {
+    'final': tuple(ENTRADAS_DOS_SISTEMAS),
+    'fenotipico': ('fenotipico',),
+    'ingestao': ('ingestao',),
+    'inflamatorio': ('inflamatorio', 'inflamatorio_simplificado'),
+    'gravidade': ('gravidade',),
+}
+
+# Faixa de escore de cada categoria (mesmos cortes de categorizar_risco)
+INICIO_CATEGORIAS = np.array((0,) + CORTES_CATEGORIAS, dtype=float)
+FIM_CATEGORIAS = np.array(CORTES_CATEGORIAS + (100,), dtype=float)
+
+PONTOS_GRADE_PADRAO = 21
+RODADAS_PADRAO = 10
+CASAS_DECIMAIS = 2
+
+# ==============================================================================
+# PARÂMETROS DAS FUNÇÕES DE PERTINÊNCIA
+# ==============================================================================
+
+def _numero(valor):
+    """Arredonda para CASAS_DECIMAIS; inteiros ficam sem casa decimal no JSON"""
+    valor = round(float(valor), CASAS_DECIMAIS)
+    return int(valor) if valor.is_integer() else valor
+
+
+def _termos(conjunto):
+    """Gera (sistema, entrada, termo, peças) de um conjunto de parâmetros"""
+    for sistema, entradas in conjunto.items():
+        for entrada, termos in entradas.items():
+            for termo, pecas in termos.items():
+                yield sistema, entrada, termo, pecas
+
+
+def _universo(motor, entrada):
+    if entrada not in motor.entradas:
+        raise ValueError(f"Entrada desconhecida: {entrada} (opções: {motor.entradas})")
+    return motor.universos[motor.entradas.index(entrada)]
+
+
+def carregar_limites(limites):
+    """Lê e confere o arquivo (ou dict) de limites
+
+    Parâmetros:
+    -----------
+    limites : str ou dict
+        Caminho do JSON ou o dict já carregado
+
+    Retorna:
+    --------
+    (delphi, livres) :
+        delphi : conjunto de parâmetros {sistema: {entrada: {termo: peças}}}
+        livres : list de (sistema, entrada, termo, peça, ponto, mínimo, máximo)
+
+    Raises:
+    -------
+    KeyError : sistema fora do registro da calculadora
+    ValueError : entrada/termo desconhecido, forma inválida, limites que não
+                 contêm o valor Delphi ou peças que não reproduzem a base
+    """
+    if isinstance(limites, str):
+        with open(limites, encoding='utf-8') as arquivo:
+            limites = json.load(arquivo)
+    delphi, livres = {}, []
+    for sistema, entradas in limites.items():
+        if sistema.startswith('_'):
+            continue
+        if sistema not in ENTRADAS_DOS_SISTEMAS:
+            raise KeyError(f"Sistema fuzzy desconhecido: {sistema}")
+        motor = mv.obter_motor(sistema)
+        for entrada, termos in entradas.items():
+            universo = _universo(motor, entrada)
+            for termo, definicao in termos.items():
+                rotulo = f"{sistema}.{entrada}.{termo}"
+                if (entrada, termo) not in motor.colunas:
+                    raise ValueError(f"Termo desconhecido: {rotulo}")
+                pecas = [[forma, [_numero(p) for p in pontos]] for forma, pontos in definicao['pecas']]
+                _validar_pecas(rotulo, pecas)
+                mf_base = dict(motor.termos[motor.entradas.index(entrada)])[termo]
+                if not np.allclose(pertinencia_do_termo(universo, pecas), mf_base, atol=1e-9):
+                    raise ValueError(f"{rotulo}: as peças não reproduzem a pertinência da base de regras")
+                faixas = definicao.get('limites') or [[None] * len(pontos) for _, pontos in pecas]
+                if [len(f) for f in faixas] != [len(pontos) for _, pontos in pecas]:
+                    raise ValueError(f"{rotulo}: 'limites' precisa de um item por ponto de cada peça")
+                for p, ((_, pontos), faixas_peca) in enumerate(zip(pecas, faixas)):
+                    for k, faixa in enumerate(faixas_peca):
+                        if faixa is None:
+                            continue
+                        minimo, maximo = float(faixa[0]), float(faixa[1])
+                        if not minimo <= pontos[k] <= maximo:
+                            raise ValueError(f"{rotulo}: limites [{minimo}, {maximo}] não contêm o valor "
+                                             f"Delphi {pontos[k]} (peça {p}, ponto {k})")
+                        livres.append((sistema, entrada, termo, p, k, minimo, maximo))
+                delphi.setdefault(sistema, {}).setdefault(entrada, {})[termo] = pecas
+    return delphi, livres
+
+
+def motores_com_parametros(conjunto):
+    """Motores do registro com os termos de `conjunto` substituídos ({nome: BaseRegrasVetorizada})"""
+    motores = {nome: mv.obter_motor(nome) for nome in ENTRADAS_DOS_SISTEMAS}
+    for sistema, entrada, termo, pecas in _termos(conjunto):
+        _validar_pecas(f"{sistema}.{entrada}.{termo}", pecas)
+        motor = motores[sistema]
+        mf = pertinencia_do_termo(_universo(motor, entrada), pecas)
+        motores[sistema] = motor.com_pertinencias({(entrada, termo): mf})
+    return motores
+
+
+def gravar_parametros(conjunto, caminho):
+    """Grava o conjunto em JSON com um termo por linha (diff mostra só os termos alterados)"""
+    linhas = ['{']
+    sistemas = list(conjunto.items())
+    for i, (sistema, entradas) in enumerate(sistemas):
+        linhas.append(f"  {json.dumps(sistema)}: {{")
+        for j, (entrada, termos) in enumerate(entradas.items()):
+            linhas.append(f"    {json.dumps(entrada)}: {{")
+            for k, (termo, pecas) in enumerate(termos.items()):
+                pecas = [[forma, [_numero(p) for p in pontos]] for forma, pontos in pecas]
+                virgula = ',' if k < len(termos) - 1 else ''
+                linhas.append(f"      {json.dumps(termo)}: {json.dumps(pecas, ensure_ascii=False)}{virgula}")
+            linhas.append('    }' + (',' if j < len(entradas) - 1 else ''))
+        linhas.append('  }' + (',' if i < len(sistemas) - 1 else ''))
+    linhas.append('}')
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('\n'.join(linhas) + '\n')
+    os.replace(temporario, caminho)
+
+
+def carregar_parametros(caminho):
+    """Lê um conjunto gravado por gravar_parametros"""
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+# ==============================================================================
+# CASOS ROTULADOS
+# ==============================================================================
+
+def categorias_aceitas(esperado):
+    """'MODERADO-ALTO ou ALTO' -> máscara booleana sobre CATEGORIAS"""
+    nomes = [nome.strip().upper() for nome in str(esperado).split(' ou ')]
+    desconhecidas = [nome for nome in nomes if nome not in CATEGORIAS]
+    if desconhecidas:
+        raise ValueError(f"Categoria esperada desconhecida: {desconhecidas} (opções: {CATEGORIAS})")
+    return np.array([categoria in nomes for categoria in CATEGORIAS])
+
+
+def _preparar_casos(casos, alvo):
+    """Colunas float dos campos usados pelo alvo e máscara de modo completo"""
+    if alvo not in ALVOS:
+        raise ValueError(f"Alvo inválido: {alvo} (opções: {tuple(ALVOS)})")
+    campos = sorted({campo for sistema in ALVOS[alvo] for campo in ENTRADAS_DOS_SISTEMAS[sistema]
+                     if campo in CAMPOS_ENTRADA}, key=CAMPOS_ENTRADA.index)
+    valores = {campo: np.array([valor_numerico(caso.get(campo)) for caso in casos], dtype=float)
+               for campo in campos}
+    obrigatorios = [campo for campo in campos if campo != 'albumina' and np.isnan(valores[campo]).any()]
+    if obrigatorios:
+        raise ValueError(f"Valores ausentes em campos obrigatórios: {obrigatorios}")
+    completo = ~np.isnan(valores['albumina']) if 'albumina' in valores else np.ones(len(casos), dtype=bool)
+    return valores, completo
+
+
+def _linhas_do_sistema(sistema, completo):
+    if sistema in ('inflamatorio', 'integrador_completo'):
+        return np.flatnonzero(completo)
+    if sistema in ('inflamatorio_simplificado', 'integrador_simplificado'):
+        return np.flatnonzero(~completo)
+    return np.arange(len(completo))
+
+
+def _entradas(motor, sistema, valores, linhas):
+    return {nome: valores[campo][linhas] for nome, campo in zip(motor.entradas, ENTRADAS_DOS_SISTEMAS[sistema])}
+
+
+def _pontuar(valores, completo, motores, alvo, defuzzificador):
+    """Preenche em `valores` os escores de todos os sistemas do alvo"""
+    for sistema in ALVOS[alvo]:
+        escore = ESCORE_DO_SISTEMA[sistema]
+        if escore not in valores:
+            valores[escore] = np.full(len(completo), np.nan)
+        linhas = _linhas_do_sistema(sistema, completo)
+        if len(linhas):
+            motor = motores[sistema]
+            valores[escore][linhas] = motor.avaliar(_entradas(motor, sistema, valores, linhas),
+                                                    defuzzificador=defuzzificador)
+    return valores
+
+
+def pontuar_com_parametros(casos, conjunto=None, alvo='final', defuzzificador='amostrado'):
+    """Escore do alvo de cada caso com os termos de `conjunto` (padrão: a base atual)"""
+    valores, completo = _preparar_casos(casos, alvo)
+    motores = motores_com_parametros(conjunto or {})
+    return _pontuar(valores, completo, motores, alvo, defuzzificador)[ESCORE_DO_SISTEMA[ALVOS[alvo][-1]]]
+
+# ==============================================================================
+# OTIMIZADOR
+# ==============================================================================
+
+class CalibradorPertinencias:
+    """Busca por coordenadas dos pontos livres, avaliada em lote no motor vetorizado
+
+    Parâmetros:
+    -----------
+    casos : list de dict
+        Campos de CAMPOS_ENTRADA usados pelo alvo e 'esperado' (categoria ou
+        'A ou B', como nos casos_teste dos submódulos)
+    limites : str ou dict
+        Arquivo de limites (ver carregar_limites)
+    alvo : str
+        'final' (escore integrado) ou um submódulo ('fenotipico', ...)
+    pontos_grade : int
+        Valores testados por ponto em cada passo
+    """
+
+    def __init__(self, casos, limites, alvo='final', defuzzificador='amostrado', pontos_grade=PONTOS_GRADE_PADRAO):
+        self.delphi, self.livres = carregar_limites(limites)
+        self.alvo = alvo
+        self.defuzzificador = defuzzificador
+        self.pontos_grade = pontos_grade
+        fora_do_alvo = sorted({sistema for sistema in self.delphi if sistema not in ALVOS.get(alvo, ())})
+        self.livres = [livre for livre in self.livres if livre[0] not in fora_do_alvo]
+        self.ignorados = fora_do_alvo
+
+        self.valores, self.completo = _preparar_casos(casos, alvo)
+        aceitas = np.array([categorias_aceitas(caso['esperado']) for caso in casos]).reshape(-1, len(CATEGORIAS))
+        # Coluna extra (índice -1 = sem regra) nunca é aceita
+        self._aceitas = np.column_stack([aceitas, np.zeros(len(casos), dtype=bool)])
+        self.parametros = copy.deepcopy(self.delphi)
+        self.motores = motores_com_parametros(self.parametros)
+        self.linhas = {sistema: _linhas_do_sistema(sistema, self.completo) for sistema in ALVOS[alvo]}
+        self.escore_alvo = ESCORE_DO_SISTEMA[ALVOS[alvo][-1]]
+        _pontuar(self.valores, self.completo, self.motores, alvo, defuzzificador)
+        self.avaliacoes = 0
+
+    @property
+    def n_casos(self):
+        return len(self._aceitas)
+
+    def objetivo(self, escores):
+        """(acertos, distância total às categorias esperadas) de cada linha de `escores` (G x casos)"""
+        escores = np.atleast_2d(escores)
+        categorias = categorias_dos_escores(escores)
+        acertos = self._aceitas[np.arange(self.n_casos), categorias].sum(axis=1)
+        fora = np.maximum(np.maximum(INICIO_CATEGORIAS - escores[..., None], escores[..., None] - FIM_CATEGORIAS), 0)
+        fora = np.where(self._aceitas[:, :-1], fora, np.inf).min(axis=2)
+        # Sem regra ativada: distância máxima
+        distancia = np.where(np.isnan(escores), 100.0, fora).sum(axis=1)
+        return acertos, distancia
+
+    def _defuzzificar(self, motor, cortes):
+        if self.defuzzificador == 'exato':
+            return motor.defuzzificar_exato(cortes)
+        return motor.defuzzificar(cortes)
+
+    def _candidatos(self, livre):
+        sistema, entrada, termo, p, k, minimo, maximo = livre
+        pontos = self.parametros[sistema][entrada][termo][p][1]
+        inferior = max(minimo, pontos[k - 1]) if k > 0 else minimo
+        superior = min(maximo, pontos[k + 1]) if k < len(pontos) - 1 else maximo
+        grade = np.round(np.linspace(inferior, superior, self.pontos_grade), CASAS_DECIMAIS)
+        return np.unique(np.clip(np.append(grade, pontos[k]), inferior, superior))
+
+    def avaliar_candidatos(self, livre, valores):
+        """Escores do alvo (G x casos) com o ponto `livre` em cada um dos G `valores`
+
+        Retorna também os escores do próprio sistema (G x linhas do sistema),
+        usados para atualizar o estado quando um candidato é aceito.
+        """
+        sistema, entrada, termo, p, k = livre[:5]
+        motor = self.motores[sistema]
+        linhas = self.linhas[sistema]
+        universo = _universo(motor, entrada)
+        mfs = []
+        for valor in valores:
+            pecas = copy.deepcopy(self.parametros[sistema][entrada][termo])
+            pecas[p][1][k] = float(valor)
+            mfs.append(pertinencia_do_termo(universo, pecas))
+
+        g, m = len(valores), len(linhas)
+        escore = ESCORE_DO_SISTEMA[sistema]
+        escores_sistema = np.tile(self.valores[escore][linhas], (g, 1))
+        if m:
+            entradas = _entradas(motor, sistema, self.valores, linhas)
+            pertinencias = motor.pertinencias(entradas)
+            cortes_base = motor.cortes(motor.forcas_regras(pertinencias))
+            x = np.clip(entradas[entrada], universo.min(), universo.max())
+            coluna_termo = np.array([np.interp(x, universo, mf) for mf in mfs]).ravel()
+            coluna = motor.colunas[(entrada, termo)]
+            saida = escores_sistema.ravel()
+            # Linhas (candidato, caso) em blocos; só defuzzifica onde algum corte mudou
+            for inicio in range(0, g * m, mv.TAMANHO_BLOCO_PADRAO):
+                bloco = np.arange(inicio, min(inicio + mv.TAMANHO_BLOCO_PADRAO, g * m))
+                casos_bloco = bloco % m
+                matriz = pertinencias[casos_bloco]
+                matriz[:, coluna] = coluna_termo[bloco]
+                cortes = motor.cortes(motor.forcas_regras(matriz))
+                mudou = (cortes != cortes_base[casos_bloco]).any(axis=1)
+                if mudou.any():
+                    saida[bloco[mudou]] = self._defuzzificar(motor, cortes[mudou])
+            self.avaliacoes += g * m
+        if escore == self.escore_alvo:
+            finais = np.tile(self.valores[escore], (g, 1))
+            finais[:, linhas] = escores_sistema
+            return finais, escores_sistema
+
+        # Alvo 'final' e sistema de um submódulo: integrador só onde o escore do submódulo mudou
+        finais = np.tile(self.valores['escore_final'], (g, 1))
+        base_sistema = self.valores[escore][linhas]
+        mudou = ~((escores_sistema == base_sistema) | (np.isnan(escores_sistema) & np.isnan(base_sistema)))
+        candidato, posicao = np.nonzero(mudou)
+        casos = linhas[posicao]
+        for integrador in ('integrador_completo', 'integrador_simplificado'):
+            dele = np.isin(casos, self.linhas[integrador])
+            if not dele.any():
+                continue
+            parciais = {nome: self.valores[nome][casos[dele]] for nome in ESCORES_SUBMODULOS}
+            parciais[escore] = escores_sistema[candidato[dele], posicao[dele]]
+            motor_integrador = self.motores[integrador]
+            finais[candidato[dele], casos[dele]] = motor_integrador.avaliar(
+                dict(zip(motor_integrador.entradas, (parciais[nome] for nome in ESCORES_SUBMODULOS))),
+                defuzzificador=self.defuzzificador)
+            self.avaliacoes += int(dele.sum())
+        return finais, escores_sistema
+
+    def _aceitar(self, livre, valor, finais, escores_sistema):
+        sistema, entrada, termo, p, k = livre[:5]
+        self.parametros[sistema][entrada][termo][p][1][k] = _numero(valor)
+        mf = pertinencia_do_termo(_universo(self.motores[sistema], entrada), self.parametros[sistema][entrada][termo])
+        self.motores[sistema] = self.motores[sistema].com_pertinencias({(entrada, termo): mf})
+        self.valores[ESCORE_DO_SISTEMA[sistema]][self.linhas[sistema]] = escores_sistema
+        self.valores[self.escore_alvo] = finais
+
+    def calibrar(self, rodadas=RODADAS_PADRAO):
+        """Executa a busca até uma rodada sem melhora (ou `rodadas` rodadas)
+
+        Retorna:
+        --------
+        dict com:
+            parametros : conjunto calibrado (mesma estrutura do Delphi)
+            acertos_inicial, acertos_final, casos : int
+            distancia_inicial, distancia_final : float
+            alteracoes : list de (rótulo do ponto, valor Delphi, valor calibrado)
+            historico : list de (rodada, rótulo do ponto, de, para, acertos)
+            rodadas, avaliacoes (linhas x base de regras), tempo (s)
+        """
+        inicio = time.perf_counter()
+        avaliacoes_antes = self.avaliacoes
+        acertos, distancia = (float(v[0]) for v in self.objetivo(self.valores[self.escore_alvo]))
+        acertos_inicial, distancia_inicial = acertos, distancia
+        historico = []
+        rodada = 0
+        for rodada in range(1, rodadas + 1):
+            melhorou = False
+            for livre in self.livres:
+                sistema, entrada, termo, p, k = livre[:5]
+                atual = self.parametros[sistema][entrada][termo][p][1][k]
+                delphi = self.delphi[sistema][entrada][termo][p][1][k]
+                valores = self._candidatos(livre)
+                finais, escores_sistema = self.avaliar_candidatos(livre, valores)
+                acertos_g, distancia_g = self.objetivo(finais)
+                melhor = np.lexsort((np.abs(valores - delphi), distancia_g, -acertos_g))[0]
+                if acertos_g[melhor] > acertos or (acertos_g[melhor] == acertos
+                                                   and distancia_g[melhor] < distancia - 1e-9):
+                    self._aceitar(livre, valores[melhor], finais[melhor], escores_sistema[melhor])
+                    acertos, distancia = float(acertos_g[melhor]), float(distancia_g[melhor])
+                    historico.append((rodada, _rotulo_ponto(livre), atual, _numero(valores[melhor]), int(acertos)))
+                    melhorou = True
+            if not melhorou:
+                break
+
+        alteracoes = [(_rotulo_ponto(livre), self.delphi[livre[0]][livre[1]][livre[2]][livre[3]][1][livre[4]],
+                       self.parametros[livre[0]][livre[1]][livre[2]][livre[3]][1][livre[4]])
+                      for livre in self.livres]
+        return {
+            'parametros': copy.deepcopy(self.parametros),
+            'casos': self.n_casos,
+            'acertos_inicial': int(acertos_inicial),
+            'acertos_final': int(acertos),
+            'distancia_inicial': distancia_inicial,
+            'distancia_final': distancia,
+            'alteracoes': [a for a in alteracoes if a[1] != a[2]],
+            'historico': historico,
+            'rodadas': rodada,
+            'avaliacoes': self.avaliacoes - avaliacoes_antes,
+            'tempo': time.perf_counter() - inicio,
+        }
+
+
+def _rotulo_ponto(livre):
+    sistema, entrada, termo, p, k = livre[:5]
+    return f"{sistema}.{entrada}.{termo}[{p}][{k}]"
+
+
+def calibrar_pertinencias(casos, limites, alvo='final', rodadas=RODADAS_PADRAO, defuzzificador='amostrado',
+                          pontos_grade=PONTOS_GRADE_PADRAO):
+    """Atalho: CalibradorPertinencias(...).calibrar(rodadas)"""
+    return CalibradorPertinencias(casos, limites, alvo, defuzzificador, pontos_grade).calibrar(rodadas)
+
+# ==============================================================================
+# LINHA DE COMANDO
+# ==============================================================================
+
+def _ler_casos(caminho, coluna_esperado, delimitador):
+    """Casos rotulados de um CSV com as colunas de dados_pacientes.csv e a coluna da categoria esperada"""
+    with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = [coluna.strip() for coluna in next(leitor, [])]
+        if coluna_esperado not in cabecalho:
+            raise ValueError(f"Coluna da categoria esperada ausente no CSV: {coluna_esperado}")
+        casos = []
+        for campos in leitor:
+            if not campos:
+                continue
+            try:
+                linha = montar_linha(cabecalho, campos)
+                caso = converter_linha(linha, parcial=True)
+            except ValueError as e:
+                print(f"  linha {leitor.line_num} ignorada: {e}", file=sys.stderr)
+                continue
+            caso['esperado'] = linha[coluna_esperado]
+            casos.append(caso)
+    return casos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibra pontos de quebra das pertinências contra casos rotulados")
+    parser.add_argument('limites', help="JSON de limites (ver limites_calibracao.json)")
+    parser.add_argument('casos', help="CSV de casos (colunas de dados_pacientes.csv + categoria esperada)")
+    parser.add_argument('--esperado', default='Esperado', help="coluna da categoria esperada (padrão: Esperado)")
+    parser.add_argument('--alvo', default='final', choices=tuple(ALVOS))
+    parser.add_argument('--rodadas', type=int, default=RODADAS_PADRAO)
+    parser.add_argument('--pontos-grade', type=int, default=PONTOS_GRADE_PADRAO)
+    parser.add_argument('--saida', default='parametros_calibrados.json',
+                        help="JSON do conjunto calibrado (padrão: parametros_calibrados.json)")
+    parser.add_argument('--delphi', help="grava também o conjunto Delphi, para comparar com diff")
+    parser.add_argument('--delimitador', default=',', help="separador de campos (padrão: ',')")
+    args = parser.parse_args(argv)
+
+    try:
+        casos = _ler_casos(args.casos, args.esperado, args.delimitador)
+        calibrador = CalibradorPertinencias(casos, args.limites, args.alvo, pontos_grade=args.pontos_grade)
+    except (KeyError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    if calibrador.ignorados:
+        print(f"Sistemas fora do alvo '{args.alvo}' (não calibrados): {', '.join(calibrador.ignorados)}")
+    resultado = calibrador.calibrar(args.rodadas)
+
+    gravar_parametros(resultado['parametros'], args.saida)
+    if args.delphi:
+        gravar_parametros(calibrador.delphi, args.delphi)
+    casos_total = resultado['casos']
+    print(f"Concordância: {resultado['acertos_inicial']}/{casos_total} -> {resultado['acertos_final']}/{casos_total}"
+          f" em {resultado['rodadas']} rodada(s)")
+    for rotulo, antes, depois in resultado['alteracoes']:
+        print(f"  {rotulo}: {antes} -> {depois}")
+    print(f"{resultado['avaliacoes']:,} avaliações em {resultado['tempo']:.2f} s "
+          f"({resultado['avaliacoes'] / max(resultado['tempo'], 1e-9):,.0f}/s) -> {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
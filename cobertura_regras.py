@@ -0,0 +1,269 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Varredura de Zonas Mortas e Cobertura das Regras (todas as bases)
+
+test_zona_morta.py e test_caso_extremo.py procuram entradas que não ativam
+nenhuma regra (o KeyError de SOLUCAO_KEYERROR_v21.md) reconstruindo à mão o
+sistema de gravidade e testando alguns pontos. Este módulo varre a grade de
+entradas inteira de cada base de regras do registro da calculadora (os
+quatro submódulos e o integrador, nos dois modos de albumina) com as
+matrizes de pertinência e de força das regras do motor vetorizado, em
+blocos de milhares de pontos por vez.
+
+A GRADE NÃO DEIXA ZONAS DE FORA:
+Em cada eixo, além dos pontos uniformes, entram os pontos onde alguma
+função de pertinência passa de zero a positiva (QUEBRAS) e o ponto médio
+entre quebras consecutivas. Entre duas quebras o conjunto de termos ativos
+não muda, e uma regra é ativada se e só se todos os seus termos são
+positivos; logo cada combinação de (quebra ou intervalo entre quebras) dos
+eixos é decidida por um único ponto, e a lista de zonas mortas é EXATA, não
+uma amostra.
+
+RELATÓRIO de cada base:
+- Regiões sem regra ativada, agrupadas em caixas (intervalo por entrada)
+- Regras (conjunções, após expandir os OU) que nunca são ativadas
+- Fração dos pontos da grade cobertos e a menor ativação entre eles
+
+USO:
+    python cobertura_regras.py                       # todas as bases
+    python cobertura_regras.py gravidade fenotipico --pontos 61
+Sai com código 1 se alguma base tiver zona morta.
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+import motor_vetorizado as mv
+from compilador_regras import compilar
+from pipeline_pacientes import MODO_COMPLETO, MODO_SIMPLIFICADO
+
+# Bases de regras usadas em cada modo de albumina
+SISTEMAS_POR_MODO = {
+    MODO_COMPLETO: ('fenotipico', 'ingestao', 'inflamatorio', 'gravidade', 'integrador_completo'),
+    MODO_SIMPLIFICADO: ('fenotipico', 'ingestao', 'inflamatorio_simplificado', 'gravidade',
+                        'integrador_simplificado'),
+}
+SISTEMAS = tuple(dict.fromkeys(nome for nomes in SISTEMAS_POR_MODO.values() for nome in nomes))
+
+# Pontos uniformes por eixo, por número de entradas; quebras e pontos médios são acrescentados
+PONTOS_POR_EIXO_PADRAO = {2: 401, 3: 101, 4: 21}
+
+# ==============================================================================
+# GRADE DE CADA EIXO
+# ==============================================================================
+
+def pontos_de_quebra(universo, termos):
+    """Pontos onde alguma pertinência do eixo passa de zero a positiva (ou o contrário)
+
+    Inclui as extremidades do universo. Entre duas quebras consecutivas o
+    conjunto de termos com pertinência positiva é constante.
+    """
+    quebras = [universo[:1], universo[-1:]]
+    for _, mf in termos:
+        zero = mf <= 0
+        vizinho_positivo = np.r_[False, ~zero[:-1]] | np.r_[~zero[1:], False]
+        quebras.append(universo[zero & vizinho_positivo])
+    return np.unique(np.concatenate(quebras))
+
+
+def eixo_de_varredura(universo, termos, pontos):
+    """Pontos uniformes + quebras + pontos médios entre quebras, e a célula de cada ponto
+
+    A célula 2k é a quebra k; a célula 2k+1 é o intervalo aberto entre as
+    quebras k e k+1.
+    """
+    quebras = pontos_de_quebra(universo, termos)
+    medios = (quebras[:-1] + quebras[1:]) / 2
+    valores = np.union1d(np.union1d(np.linspace(universo.min(), universo.max(), pontos), quebras), medios)
+    posicao = np.searchsorted(quebras, valores, side='left')
+    na_quebra = quebras[np.minimum(posicao, len(quebras) - 1)] == valores
+    celulas = np.where(na_quebra, 2 * posicao, 2 * posicao - 1)
+    return valores, celulas, quebras
+
+# ==============================================================================
+# VARREDURA
+# ==============================================================================
+
+def _agrupar_celulas(celulas):
+    """Une células vizinhas em caixas ((início, fim) de células por eixo)"""
+    caixas = {tuple((c, c) for c in celula) for celula in celulas}
+    dimensao = len(next(iter(caixas))) if caixas else 0
+    mudou = True
+    while mudou:
+        mudou = False
+        for eixo in range(dimensao):
+            grupos = defaultdict(list)
+            for caixa in caixas:
+                grupos[caixa[:eixo] + caixa[eixo + 1:]].append(caixa[eixo])
+            novas = set()
+            for resto, faixas in grupos.items():
+                faixas.sort()
+                inicio, fim = faixas[0]
+                for a, b in faixas[1:]:
+                    if a <= fim + 1:
+                        fim = max(fim, b)
+                    else:
+                        novas.add(resto[:eixo] + ((inicio, fim),) + resto[eixo:])
+                        inicio, fim = a, b
+                novas.add(resto[:eixo] + ((inicio, fim),) + resto[eixo:])
+            mudou = mudou or len(novas) < len(caixas)
+            caixas = novas
+    return sorted(caixas)
+
+
+def _intervalo(quebras, inicio, fim):
+    """(mínimo, máximo, fechado à esquerda, fechado à direita) das células inicio..fim"""
+    return (float(quebras[inicio // 2]), float(quebras[(fim + 1) // 2]), inicio % 2 == 0, fim % 2 == 0)
+
+
+def _descrever_regra(motor, indice):
+    nomes = {coluna: f"{variavel}[{rotulo}]" for (variavel, rotulo), coluna in motor.colunas.items()}
+    termos = [nomes[c] for c in motor.antecedentes[indice] if c != motor.n_termos]
+    return f"{' & '.join(termos)} -> {motor.rotulos_saida[motor.consequentes[indice]]}"
+
+
+def varrer_sistema(sistema, pontos_por_eixo=None, tamanho_bloco=mv.TAMANHO_BLOCO_PADRAO):
+    """Varre a grade de entradas de uma base de regras
+
+    Parâmetros:
+    -----------
+    sistema : str ou skfuzzy.control.ControlSystem
+        Nome no registro da calculadora ('fenotipico', 'ingestao',
+        'inflamatorio', 'inflamatorio_simplificado', 'gravidade',
+        'integrador_completo', 'integrador_simplificado') ou um sistema
+        montado à parte (ex.: uma versão candidata das regras)
+    pontos_por_eixo : int, opcional
+        Pontos uniformes por eixo (padrão: PONTOS_POR_EIXO_PADRAO)
+
+    Retorna:
+    --------
+    dict : sistema, entradas, limites [(mín, máx) do universo de cada
+           entrada], pontos (da grade), pontos_sem_regra,
+           fracao_coberta, ativacao_minima (entre os pontos cobertos),
+           regioes [tupla de (mín, máx, fechado_esq, fechado_dir) por
+           entrada; mín == máx é um ponto isolado], regras_nunca_ativadas
+           [descrições], tempo (s)
+    """
+    inicio = time.perf_counter()
+    if isinstance(sistema, str):
+        # Base declarada: a minimizada (mv.obter_motor) já não tem as conjunções
+        # cobertas por outras, que podem ser justamente as nunca ativadas
+        nome, motor = sistema, mv.BaseRegrasVetorizada.da_base_compilada(compilar(sistema))
+    else:
+        motor = mv.BaseRegrasVetorizada(sistema)
+        nome = motor.saida
+    if pontos_por_eixo is None:
+        pontos_por_eixo = PONTOS_POR_EIXO_PADRAO[len(motor.entradas)]
+    eixos = [eixo_de_varredura(universo, termos, pontos_por_eixo)
+             for universo, termos in zip(motor.universos, motor.termos)]
+    forma = tuple(len(valores) for valores, _, _ in eixos)
+    total = int(np.prod(forma))
+
+    forca_maxima = np.zeros(motor.n_regras)
+    ativacao_minima = np.inf
+    sem_regra = 0
+    celulas_mortas = set()
+    for bloco in range(0, total, tamanho_bloco):
+        indices = np.unravel_index(np.arange(bloco, min(bloco + tamanho_bloco, total)), forma)
+        entradas = {entrada: valores[i] for entrada, (valores, _, _), i in zip(motor.entradas, eixos, indices)}
+        forcas = motor.forcas_regras(motor.pertinencias(entradas))
+        ativacao = forcas.max(axis=1)
+        np.maximum(forca_maxima, forcas.max(axis=0), out=forca_maxima)
+        mortos = ativacao <= 0
+        if not mortos.all():
+            ativacao_minima = min(ativacao_minima, ativacao[~mortos].min())
+        if mortos.any():
+            sem_regra += int(mortos.sum())
+            celulas = np.column_stack([celulas_eixo[i[mortos]] for (_, celulas_eixo, _), i in zip(eixos, indices)])
+            celulas_mortas.update(map(tuple, np.unique(celulas, axis=0).tolist()))
+
+    regioes = [tuple(_intervalo(quebras, a, b) for (_, _, quebras), (a, b) in zip(eixos, caixa))
+               for caixa in _agrupar_celulas(celulas_mortas)]
+    return {
+        'sistema': nome,
+        'entradas': list(motor.entradas),
+        'limites': [(float(universo.min()), float(universo.max())) for universo in motor.universos],
+        'pontos': total,
+        'pontos_sem_regra': sem_regra,
+        'fracao_coberta': 1 - sem_regra / total,
+        'ativacao_minima': float(ativacao_minima) if np.isfinite(ativacao_minima) else None,
+        'regioes': regioes,
+        'regras_nunca_ativadas': [_descrever_regra(motor, i) for i in np.flatnonzero(forca_maxima <= 0)],
+        'tempo': time.perf_counter() - inicio,
+    }
+
+
+def varrer_todos(sistemas=SISTEMAS, pontos_por_eixo=None):
+    """varrer_sistema() de cada base; dict nome -> relatório"""
+    return {nome: varrer_sistema(nome, pontos_por_eixo) for nome in sistemas}
+
+# ==============================================================================
+# RELATÓRIO
+# ==============================================================================
+
+def formatar_intervalo(minimo, maximo, fechado_esq, fechado_dir):
+    if minimo == maximo:
+        return f"= {minimo:g}"
+    return f"{'[' if fechado_esq else '('}{minimo:g}, {maximo:g}{']' if fechado_dir else ')'}"
+
+
+def formatar_regiao(entradas, regiao, limites=None):
+    """'imc ∈ [10, 12.5) e febre = 0' (entradas que cobrem o universo todo são omitidas)"""
+    partes = []
+    for i, (entrada, intervalo) in enumerate(zip(entradas, regiao)):
+        minimo, maximo, fechado_esq, fechado_dir = intervalo
+        if limites is not None and fechado_esq and fechado_dir and (minimo, maximo) == limites[i]:
+            continue
+        texto = formatar_intervalo(*intervalo)
+        partes.append(f"{entrada} {texto}" if texto.startswith('=') else f"{entrada} ∈ {texto}")
+    return ' e '.join(partes) if partes else "todo o domínio"
+
+
+def imprimir_relatorio(relatorio):
+    ativacao = relatorio['ativacao_minima']
+    print(f"\n{relatorio['sistema']} ({', '.join(relatorio['entradas'])}): {relatorio['pontos']:,} pontos, "
+          f"{100*relatorio['fracao_coberta']:.3f}% cobertos, menor ativação "
+          f"{'-' if ativacao is None else f'{ativacao:.3f}'} ({relatorio['tempo']:.2f} s)")
+    if relatorio['regioes']:
+        print(f"  ✗ {len(relatorio['regioes'])} região(ões) sem regra ativada:")
+        for regiao in relatorio['regioes']:
+            print(f"      {formatar_regiao(relatorio['entradas'], regiao, relatorio['limites'])}")
+    else:
+        print("  ✓ Nenhuma zona morta")
+    for regra in relatorio['regras_nunca_ativadas']:
+        print(f"  ! Regra nunca ativada: {regra}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zonas mortas e cobertura das regras das bases fuzzy")
+    parser.add_argument('sistemas', nargs='*', default=list(SISTEMAS), help="bases a varrer (padrão: todas)")
+    parser.add_argument('--pontos', type=int, default=None,
+                        help="pontos uniformes por eixo (padrão: 401/101/21 para 2/3/4 entradas)")
+    args = parser.parse_args(argv)
+    desconhecidos = [nome for nome in args.sistemas if nome not in SISTEMAS]
+    if desconhecidos:
+        parser.error(f"bases desconhecidas: {desconhecidos} (opções: {', '.join(SISTEMAS)})")
+
+    print("="*80)
+    print("ZONAS MORTAS E COBERTURA DAS REGRAS")
+    print("="*80)
+    for modo, nomes in SISTEMAS_POR_MODO.items():
+        print(f"Modo {modo}: {', '.join(nomes)}")
+    inicio = time.perf_counter()
+    relatorios = varrer_todos(args.sistemas, args.pontos)
+    for relatorio in relatorios.values():
+        imprimir_relatorio(relatorio)
+    com_zona_morta = [nome for nome, relatorio in relatorios.items() if relatorio['regioes']]
+    print(f"\n{'='*80}")
+    print(f"{sum(r['pontos'] for r in relatorios.values()):,} pontos em {time.perf_counter() - inicio:.1f} s; "
+          f"bases com zona morta: {', '.join(com_zona_morta) if com_zona_morta else 'nenhuma'}")
+    print("="*80)
+    return 1 if com_zona_morta else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Compilador das Bases de Regras Declarativas
+
+Transforma uma definição de bases_regras.py em arrays NumPy:
+- universos / pertinencias: por entrada, o universo amostrado e a matriz
+  (termos x pontos) das funções de pertinência
+- universo_saida / pertinencias_saida: o mesmo para a saída
+- antecedentes: int (conjunções x entradas), índice do termo de cada
+  entrada na conjunção; -1 onde a entrada não participa
+- consequentes: int (conjunções,), índice do termo de saída
+- regra_da_conjuncao: int (conjunções,), regra declarada de origem. Uma regra OU vira
+  uma conjunção por termo do OU, o que é exato sob acumulação por máximo
+
+Cada base é compilada uma única vez por processo (compilar); o motor
+vetorizado (BaseRegrasVetorizada.da_base_compilada) e os ControlSystems
+do skfuzzy (construir_sistema_skfuzzy), usados pela calculadora e pelos
+protótipos, partem desses mesmos arrays. Compilar todas as bases leva
+algumas dezenas de milissegundos, então não há cache em disco.
+
+MINIMIZAÇÃO (compilar(nome, minimizada=True)):
+Com AND = mínimo e acumulação por máximo, uma conjunção repetida (ex.:
+fenotípico alto & gravidade alta -> alto, na dominância e no fallback do
+integrador) não muda nada, e uma conjunção cujos termos incluem todos os de
+outra com o mesmo consequente (fenotípico alto & ingestão moderada &
+gravidade moderada -> moderado_alto, coberta por fenotípico alto ->
+moderado_alto) tem força sempre menor ou igual à dela. As duas podem ser
+removidas sem alterar nenhum escore nem os pontos sem regra ativada;
+minimizacao_regras.py confere isso numa grade densa e mede o tempo
+economizado.
+
+ATIVAÇÃO ESPARSA (SimulacaoEsparsa):
+Os ControlSystems montados aqui levam um índice termo -> conjunções; a
+cada compute() só são calculadas as regras cujos termos têm todos
+pertinência positiva. O motor vetorizado continua denso: em lote, o mínimo
+sobre todas as regras num único gather do NumPy sai mais barato que separar
+os pares (paciente, regra) ativos.
+"""
+
+import copy
+import threading
+
+import numpy as np
+import skfuzzy as fuzz
+from skfuzzy import control as ctrl
+
+from bases_regras import BASES
+
+# Formas aceitas nas peças dos termos e o número de pontos de cada uma
+FORMAS = {'trimf': 3, 'trapmf': 4}
+
+# ==============================================================================
+# FUNÇÕES DE PERTINÊNCIA
+# ==============================================================================
+
+def universo_da_variavel(variavel):
+    """np.arange(início, fim, passo) do 'universo' de uma variável"""
+    return np.arange(*variavel['universo'])
+
+
+def pertinencia_do_termo(universo, pecas):
+    """Soma das peças [[forma, pontos], ...] amostrada no universo (como nos construtores da calculadora)"""
+    mf = np.zeros(len(universo))
+    for forma, pontos in pecas:
+        mf = mf + getattr(fuzz, forma)(universo, list(pontos))
+    return mf
+
+
+def validar_pecas(rotulo, pecas):
+    """Confere forma, número e ordem dos pontos de cada peça
+
+    Raises:
+    -------
+    ValueError : forma desconhecida, número de pontos errado ou pontos fora de ordem
+    """
+    for forma, pontos in pecas:
+        if forma not in FORMAS:
+            raise ValueError(f"{rotulo}: forma desconhecida {forma!r} (opções: {tuple(FORMAS)})")
+        if len(pontos) != FORMAS[forma]:
+            raise ValueError(f"{rotulo}: {forma} exige {FORMAS[forma]} pontos, recebeu {len(pontos)}")
+        if any(a > b for a, b in zip(pontos, pontos[1:])):
+            raise ValueError(f"{rotulo}: pontos fora de ordem {list(pontos)}")
+
+
+def _somente_leitura(arr):
+    arr.flags.writeable = False
+    return arr
+
+# ==============================================================================
+# BASE COMPILADA
+# ==============================================================================
+
+class BaseCompilada:
+    """Arrays de índices de uma base de regras declarativa (somente leitura)
+
+    Parâmetros:
+    -----------
+    nome : str
+        Nome da base (usado nas mensagens de erro)
+    definicao : dict
+        Base no formato de bases_regras.py
+
+    Raises:
+    -------
+    ValueError : termo, forma ou regra inválidos na definição
+    """
+
+    def __init__(self, nome, definicao):
+        self.nome = nome
+        self.entradas = [rotulo for rotulo, _ in definicao['entradas']]
+        if len(set(self.entradas)) != len(self.entradas):
+            raise ValueError(f"{nome}: entradas repetidas {self.entradas}")
+        self.universos, self.rotulos, self.pertinencias = [], [], []
+        for rotulo, variavel in definicao['entradas']:
+            universo, rotulos, mfs = self._compilar_variavel(f"{nome}.{rotulo}", variavel)
+            self.universos.append(universo)
+            self.rotulos.append(rotulos)
+            self.pertinencias.append(mfs)
+
+        self.saida, variavel_saida = definicao['saida']
+        self.universo_saida, self.rotulos_saida, self.pertinencias_saida = \
+            self._compilar_variavel(f"{nome}.{self.saida}", variavel_saida)
+
+        antecedentes, consequentes, regras = [], [], []
+        for r, (antecedente, consequente) in enumerate(definicao['regras']):
+            if consequente not in self.rotulos_saida:
+                raise ValueError(f"{nome}, regra {r + 1}: termo de saída desconhecido {consequente!r}")
+            conjuncoes = antecedente if isinstance(antecedente, list) else [antecedente]
+            for conjuncao in conjuncoes:
+                antecedentes.append(self._indices_conjuncao(r, conjuncao))
+                consequentes.append(self.rotulos_saida.index(consequente))
+                regras.append(r)
+        self.n_regras = len(definicao['regras'])
+        self.antecedentes = _somente_leitura(np.array(antecedentes, dtype=np.intp).reshape(-1, len(self.entradas)))
+        self.consequentes = _somente_leitura(np.array(consequentes, dtype=np.intp))
+        self.regra_da_conjuncao = _somente_leitura(np.array(regras, dtype=np.intp))
+
+    @staticmethod
+    def _compilar_variavel(nome, variavel):
+        universo = _somente_leitura(universo_da_variavel(variavel))
+        rotulos = list(variavel['termos'])
+        for rotulo, pecas in variavel['termos'].items():
+            validar_pecas(f"{nome}[{rotulo}]", pecas)
+        mfs = np.array([pertinencia_do_termo(universo, pecas) for pecas in variavel['termos'].values()])
+        return universo, rotulos, _somente_leitura(mfs)
+
+    def _indices_conjuncao(self, r, conjuncao):
+        if len(conjuncao) != len(self.entradas):
+            raise ValueError(f"{self.nome}, regra {r + 1}: {len(conjuncao)} termos para "
+                             f"{len(self.entradas)} entradas {self.entradas}")
+        if all(termo is None for termo in conjuncao):
+            raise ValueError(f"{self.nome}, regra {r + 1}: conjunção sem nenhum termo")
+        indices = []
+        for entrada, rotulos, termo in zip(self.entradas, self.rotulos, conjuncao):
+            if termo is not None and termo not in rotulos:
+                raise ValueError(f"{self.nome}, regra {r + 1}: termo desconhecido {entrada}[{termo!r}]")
+            indices.append(-1 if termo is None else rotulos.index(termo))
+        return indices
+
+    @property
+    def n_conjuncoes(self):
+        return len(self.consequentes)
+
+    def conjuncoes_da_regra(self, r):
+        """Índices das conjunções geradas pela regra declarada `r`"""
+        return np.flatnonzero(self.regra_da_conjuncao == r)
+
+
+# ==============================================================================
+# MINIMIZAÇÃO
+# ==============================================================================
+
+def cobre(base, a, b):
+    """True se a conjunção `a` cobre a `b`: mesmo consequente e termos de `a` todos em `b`"""
+    usados = base.antecedentes[a] >= 0
+    return (base.consequentes[a] == base.consequentes[b]
+            and bool(np.all(base.antecedentes[a][usados] == base.antecedentes[b][usados])))
+
+
+def minimizar(base):
+    """Cópia da base sem as conjunções repetidas ou cobertas por outra (ver cobre)
+
+    As conjunções são visitadas da menor para a maior (em número de
+    termos) e, entre iguais, na ordem declarada; cada uma é removida se
+    alguma conjunção já mantida a cobre. Assim a primeira de duas conjunções
+    iguais é a mantida, e a cobertura nunca depende de uma conjunção removida.
+    Uma entrada que ficaria sem nenhuma conjunção recupera a primeira
+    removida que a usa (inócua, pois é coberta): o skfuzzy rejeita entradas
+    que nenhuma regra referencia.
+
+    Retorna:
+    --------
+    BaseCompilada : mesmos universos e pertinências; antecedentes,
+                    consequentes e regra_da_conjuncao só das conjunções
+                    mantidas (regras declaradas mantêm o número original,
+                    n_regras conta as que sobraram). Atributos extras:
+                    original (a base recebida), mantidas (índices das
+                    conjunções mantidas na original) e removidas
+                    [(conjunção removida, conjunção que a cobre)]
+    """
+    ordem = sorted(range(base.n_conjuncoes), key=lambda c: (int((base.antecedentes[c] >= 0).sum()), c))
+    mantidas, removidas = [], []
+    for c in ordem:
+        cobridora = next((m for m in mantidas if cobre(base, m, c)), None)
+        if cobridora is None:
+            mantidas.append(c)
+        else:
+            removidas.append((c, cobridora))
+    for entrada in range(len(base.entradas)):
+        if not any(base.antecedentes[c, entrada] >= 0 for c in mantidas):
+            recuperada = min(removida for removida in removidas if base.antecedentes[removida[0], entrada] >= 0)
+            removidas.remove(recuperada)
+            mantidas.append(recuperada[0])
+
+    minimizada = copy.copy(base)
+    minimizada.original = base
+    minimizada.mantidas = _somente_leitura(np.array(sorted(mantidas), dtype=np.intp))
+    minimizada.removidas = sorted(removidas)
+    minimizada.antecedentes = _somente_leitura(base.antecedentes[minimizada.mantidas])
+    minimizada.consequentes = _somente_leitura(base.consequentes[minimizada.mantidas])
+    minimizada.regra_da_conjuncao = _somente_leitura(base.regra_da_conjuncao[minimizada.mantidas])
+    minimizada.n_regras = len(np.unique(minimizada.regra_da_conjuncao))
+    return minimizada
+
+
+_COMPILADAS = {}
+_TRAVA = threading.Lock()
+
+def compilar(nome, minimizada=False):
+    """Retorna a BaseCompilada de bases_regras.BASES[nome], compilando-a na primeira chamada
+
+    Parâmetros:
+    -----------
+    nome : str
+    minimizada : bool
+        True: sem conjunções repetidas ou cobertas (ver minimizar); é a
+        versão usada pela calculadora, pelos protótipos e pelo motor
+
+    Raises:
+    -------
+    KeyError : base desconhecida
+    """
+    with _TRAVA:
+        if nome not in _COMPILADAS:
+            if nome not in BASES:
+                raise KeyError(f"Base de regras desconhecida: {nome} (opções: {sorted(BASES)})")
+            declarada = BaseCompilada(nome, BASES[nome])
+            _COMPILADAS[nome] = (declarada, minimizar(declarada))
+        return _COMPILADAS[nome][1 if minimizada else 0]
+
+# ==============================================================================
+# CONTROLSYSTEM DO SKFUZZY
+# ==============================================================================
+
+class SistemaFuzzyCompilado(ctrl.ControlSystem):
+    """ControlSystem que resolve a ordem de disparo das regras uma única vez
+
+    O skfuzzy recalcula essa ordem (compondo grafos do networkx) a cada acesso
+    a `rules`: a cada regra adicionada durante a montagem e duas vezes por
+    compute(). Aqui a ordem é resolvida na primeira inferência e reaproveitada
+    enquanto o grafo do sistema não mudar.
+
+    Parâmetros:
+    -----------
+    regras : list de skfuzzy.control.Rule
+    indice_termos : tuple, opcional
+        (termos, regra_da_conjuncao): termos é uma lista de (Term de
+        antecedente, bits das conjunções que o usam) e regra_da_conjuncao a
+        Rule de cada conjunção. Montado por construir_sistema_skfuzzy; com ele
+        as simulações são SimulacaoEsparsa (ver classe_simulacao)
+    """
+
+    def __init__(self, regras, indice_termos=None):
+        self._regras_ordenadas = None
+        self._grafo_ordenado = None
+        self._indice_termos = indice_termos
+        self._montando = True
+        super().__init__(regras)
+        self._montando = False
+
+    @property
+    def classe_simulacao(self):
+        """SimulacaoEsparsa se o sistema tem o índice de termos, senão a simulação do skfuzzy"""
+        return SimulacaoEsparsa if self._indice_termos is not None else ctrl.ControlSystemSimulation
+
+    def regras_ativas(self, simulacao):
+        """Regras com alguma conjunção cujos termos têm todos pertinência positiva
+
+        Parte de todas as conjunções e retira as de cada termo com pertinência
+        zero na simulação (já fuzzificada); as demais regras têm força zero.
+        """
+        termos, regra_da_conjuncao = self._indice_termos
+        conjuncoes = (1 << len(regra_da_conjuncao)) - 1
+        for termo, bits in termos:
+            if not termo.membership_value[simulacao] > 0:
+                conjuncoes &= ~bits
+        ativas = set()
+        while conjuncoes:
+            bit = conjuncoes & -conjuncoes
+            ativas.add(regra_da_conjuncao[bit.bit_length() - 1])
+            conjuncoes ^= bit
+        return ativas
+
+    @property
+    def rules(self):
+        if self._montando:
+            # Durante a montagem o skfuzzy só confere rótulos duplicados
+            return [no for no in self.graph.nodes() if isinstance(no, ctrl.Rule)]
+        if self._grafo_ordenado is not self.graph:
+            self._regras_ordenadas = list(ctrl.ControlSystem.rules.fget(self))
+            self._grafo_ordenado = self.graph
+        return self._regras_ordenadas
+
+
+class SimulacaoEsparsa(ctrl.ControlSystemSimulation):
+    """ControlSystemSimulation que só dispara as regras ativas
+
+    Para cada entrada só um ou dois termos têm pertinência positiva, então a
+    maior parte das regras tem força zero; no skfuzzy cada uma ainda custa a
+    agregação do antecedente, a ativação e a acumulação. Depois da
+    fuzzificação, SistemaFuzzyCompilado.regras_ativas consulta o índice
+    termo -> conjunções e só essas regras são calculadas. Uma regra de força
+    zero só acumularia max(0, corte) nos termos de saída, então os escores
+    não mudam (teste_ativacao_esparsa.py confere contra a simulação densa).
+    """
+
+    def compute(self):
+        self._regras_ativas = None
+        super().compute()
+
+    def compute_rule(self, rule):
+        # Primeira regra de cada compute(): as entradas já foram fuzzificadas
+        if self._regras_ativas is None:
+            self._regras_ativas = self.ctrl.regras_ativas(self)
+        if rule in self._regras_ativas:
+            super().compute_rule(rule)
+
+
+def construir_sistema_skfuzzy(base, classe=SistemaFuzzyCompilado):
+    """Monta um ControlSystem do skfuzzy a partir de uma BaseCompilada
+
+    Os arrays são copiados: cada sistema (um por thread no registro da
+    calculadora) tem as próprias variáveis, sem compartilhar estado de
+    inferência.
+
+    Parâmetros:
+    -----------
+    base : BaseCompilada
+    classe : type
+        SistemaFuzzyCompilado ou subclasse; recebe as regras e o índice
+        termo -> conjunções da ativação esparsa
+    """
+    variaveis = []
+    for rotulo, universo, rotulos, mfs in zip(base.entradas, base.universos, base.rotulos, base.pertinencias):
+        variavel = ctrl.Antecedent(universo.copy(), rotulo)
+        for termo, mf in zip(rotulos, mfs):
+            variavel[termo] = mf.copy()
+        variaveis.append(variavel)
+    saida = ctrl.Consequent(base.universo_saida.copy(), base.saida)
+    for termo, mf in zip(base.rotulos_saida, base.pertinencias_saida):
+        saida[termo] = mf.copy()
+
+    def conjuncao(indices):
+        termos = [variavel[variavel_rotulos[i]]
+                  for variavel, variavel_rotulos, i in zip(variaveis, base.rotulos, indices) if i >= 0]
+        antecedente = termos[0]
+        for termo in termos[1:]:
+            antecedente = antecedente & termo
+        return antecedente
+
+    regras = {}
+    for r in dict.fromkeys(base.regra_da_conjuncao.tolist()):
+        conjuncoes = base.conjuncoes_da_regra(r)
+        antecedente = conjuncao(base.antecedentes[conjuncoes[0]])
+        for c in conjuncoes[1:]:
+            antecedente = antecedente | conjuncao(base.antecedentes[c])
+        regras[r] = ctrl.Rule(antecedente, saida[base.rotulos_saida[base.consequentes[conjuncoes[0]]]])
+
+    # Índice da ativação esparsa: termo -> bits das conjunções que o usam
+    termos = []
+    for i, (variavel, rotulos) in enumerate(zip(variaveis, base.rotulos)):
+        for t, termo in enumerate(rotulos):
+            bits = sum(1 << c for c in np.flatnonzero(base.antecedentes[:, i] == t).tolist())
+            if bits:
+                termos.append((variavel[termo], bits))
+    regra_da_conjuncao = [regras[r] for r in base.regra_da_conjuncao.tolist()]
+    return classe(list(regras.values()), (termos, regra_da_conjuncao))
@@ -0,0 +1,452 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Formato Colunar de Coortes (um arquivo mapeado na memória por coluna)
+
+Exportações para pesquisa leem anos de dados_pacientes.csv, e quase todo o
+tempo vai em interpretar texto: separar campos, converter números e datas.
+Este módulo grava a coorte em formato binário colunar:
+
+- Uma pasta com um arquivo binário por coluna (data/hora, modo, as 13
+  entradas, os cinco escores e o código da categoria) e um metadados.json
+  com o número de linhas e o dtype de cada coluna
+- Leitura com np.memmap (somente leitura): abrir a coorte não copia nem
+  converte nada, e as estatísticas percorrem os arrays direto da página de
+  cache do sistema, na velocidade da memória
+- Conversão em fluxo a partir do formato de salvar_csv (com ou sem a coluna
+  Modo, inclusive misturados): os blocos são ACRESCENTADOS ao fim de cada
+  coluna, então uma coorte pode receber novos CSVs depois
+- Linhas inválidas (data/hora, valor não finito, entrada fora das faixas do
+  formulário, escore fora de 0-100) são puladas e apontadas com a mesma
+  validação da migração para o banco (banco_resultados.registro_da_linha)
+
+Entradas e escores ficam em float32 (7 dígitos significativos, muito além
+dos do CSV); albumina ausente e escores 'N/A' são NaN; categoria é o índice
+em CATEGORIAS (-1 = sem regra ativada); modo_completo é 1 quando a albumina
+foi usada. O metadados.json só é regravado (de forma atômica) depois que os
+dados de um bloco estão nos arquivos: um leitor nunca vê linhas pela metade.
+
+USO:
+    python coorte_colunar.py converter dados_pacientes.csv coorte/
+    python coorte_colunar.py estatisticas coorte/ --desde 2025-12-01
+    python coorte_colunar.py benchmark [--linhas 1000000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from banco_resultados import CAMPOS_ESCORE, gerar_registros, registro_da_linha, texto_iso
+from pipeline_pacientes import CAMPOS_ENTRADA, MODO_COMPLETO
+from pontuar_csv import COLUNAS_ENTRADA, montar_linha
+
+# Categorias na ordem de risco; o código gravado é o índice nesta tupla
+CATEGORIAS = ("BAIXO", "BAIXO-MODERADO", "MODERADO", "MODERADO-ALTO", "ALTO")
+SEM_CATEGORIA = -1
+
+# Coluna -> dtype (little-endian explícito: a pasta pode ir para outra máquina)
+COLUNAS_COORTE = {
+    'data_hora': np.dtype('<M8[s]'),
+    'modo_completo': np.dtype('u1'),
+    **{campo: np.dtype('<f4') for campo in CAMPOS_ENTRADA + CAMPOS_ESCORE},
+    'categoria': np.dtype('i1'),
+}
+
+ARQUIVO_METADADOS = 'metadados.json'
+TAMANHO_BLOCO_PADRAO = 50000
+
+# Incrementar quando o formato dos arquivos mudar
+VERSAO_FORMATO = 1
+
+# ==============================================================================
+# GRAVAÇÃO
+# ==============================================================================
+
+def _caminho_coluna(pasta, coluna):
+    return os.path.join(pasta, f"{coluna}.bin")
+
+
+def _ler_metadados(pasta):
+    with open(os.path.join(pasta, ARQUIVO_METADADOS), encoding='utf-8') as f:
+        metadados = json.load(f)
+    if metadados.get('versao') != VERSAO_FORMATO:
+        raise ValueError(f"Versão de formato não suportada em {pasta}: {metadados.get('versao')}")
+    return metadados
+
+
+def _colunas_do_bloco(registros):
+    """Arrays das colunas da coorte a partir de registros de registro_da_linha()"""
+    categorias = {nome: codigo for codigo, nome in enumerate(CATEGORIAS)}
+    colunas = {
+        'data_hora': np.array([r['data_hora'] for r in registros], dtype=COLUNAS_COORTE['data_hora']),
+        'modo_completo': np.array([r['modo'] == MODO_COMPLETO for r in registros], dtype='u1'),
+        'categoria': np.array([categorias.get(r['categoria'], SEM_CATEGORIA) for r in registros], dtype='i1'),
+    }
+    for campo in CAMPOS_ENTRADA + CAMPOS_ESCORE:
+        colunas[campo] = np.array([np.nan if r[campo] is None else r[campo] for r in registros], dtype='<f4')
+    return colunas
+
+
+class GravadorCoorte:
+    """Acrescenta linhas a uma coorte colunar (cria a pasta se não existir)
+
+    Parâmetros:
+    -----------
+    pasta : str
+        Pasta da coorte
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+        try:
+            metadados = _ler_metadados(pasta)
+            self.linhas = metadados['linhas']
+            self.ordenado = metadados['ordenado']
+            self._ultima = np.datetime64(metadados['ultima_data_hora']) if metadados['ultima_data_hora'] else None
+        except FileNotFoundError:
+            self.linhas, self.ordenado, self._ultima = 0, True, None
+        # Descarta o que uma gravação interrompida deixou além das linhas registradas
+        for coluna, dtype in COLUNAS_COORTE.items():
+            with open(_caminho_coluna(pasta, coluna), 'ab') as f:
+                f.truncate(self.linhas * dtype.itemsize)
+        self._gravar_metadados()
+
+    def acrescentar(self, colunas):
+        """Acrescenta um bloco (dict coluna -> array, todas as colunas, mesmo tamanho)"""
+        n = len(colunas['data_hora'])
+        if n == 0:
+            return
+        for coluna, dtype in COLUNAS_COORTE.items():
+            valores = np.ascontiguousarray(colunas[coluna], dtype=dtype)
+            if len(valores) != n:
+                raise ValueError(f"Coluna {coluna} com {len(valores)} linhas (esperadas {n})")
+            with open(_caminho_coluna(self.pasta, coluna), 'ab') as f:
+                valores.tofile(f)
+        datas = colunas['data_hora']
+        self.ordenado = bool(self.ordenado and (self._ultima is None or datas[0] >= self._ultima)
+                             and np.all(datas[1:] >= datas[:-1]))
+        self._ultima = datas[-1] if self._ultima is None else max(self._ultima, datas.max())
+        self.linhas += n
+        self._gravar_metadados()
+
+    def acrescentar_registros(self, registros):
+        """Acrescenta registros no formato de banco_resultados.registro_da_linha()"""
+        self.acrescentar(_colunas_do_bloco(list(registros)))
+
+    def _gravar_metadados(self):
+        metadados = {
+            'versao': VERSAO_FORMATO,
+            'linhas': self.linhas,
+            'ordenado': self.ordenado,
+            'ultima_data_hora': str(self._ultima) if self._ultima is not None else None,
+            'categorias': list(CATEGORIAS),
+            'colunas': {coluna: dtype.str for coluna, dtype in COLUNAS_COORTE.items()},
+        }
+        temporario = os.path.join(self.pasta, f".{ARQUIVO_METADADOS}.tmp")
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(metadados, f, indent=2)
+        os.replace(temporario, os.path.join(self.pasta, ARQUIVO_METADADOS))
+
+
+def _registros_validos(leitor, cabecalho, erros):
+    """Registros das linhas válidas; as inválidas vão para `erros` como (linha, motivo)"""
+    for campos in leitor:
+        if not campos:
+            continue
+        try:
+            yield registro_da_linha(montar_linha(cabecalho, campos))
+        except ValueError as e:
+            erros.append((leitor.line_num, str(e)))
+
+
+def converter_csv(caminho_csv, pasta, tamanho_bloco=TAMANHO_BLOCO_PADRAO, delimitador=','):
+    """Acrescenta à coorte em `pasta` um CSV da calculadora (com ou sem a coluna Modo)
+
+    Retorna:
+    --------
+    dict : linhas (convertidas), erros [(linha, motivo)]
+    """
+    resumo = {'linhas': 0, 'erros': []}
+    gravador = GravadorCoorte(pasta)
+    with open(caminho_csv, newline='', encoding='utf-8-sig') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = [coluna.strip() for coluna in next(leitor, [])]
+        if not cabecalho:
+            raise ValueError(f"Arquivo vazio: {caminho_csv}")
+        faltando = [coluna for coluna in ('Data', 'Hora', *COLUNAS_ENTRADA) if coluna not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas ausentes no CSV: {faltando}")
+        bloco = []
+        for registro in _registros_validos(leitor, cabecalho, resumo['erros']):
+            bloco.append(registro)
+            if len(bloco) == tamanho_bloco:
+                gravador.acrescentar_registros(bloco)
+                resumo['linhas'] += len(bloco)
+                bloco = []
+        gravador.acrescentar_registros(bloco)
+        resumo['linhas'] += len(bloco)
+    return resumo
+
+# ==============================================================================
+# LEITURA
+# ==============================================================================
+
+class CoorteColunar:
+    """Coorte gravada por GravadorCoorte, mapeada na memória sem cópia
+
+    coorte['escore_final'] (ou coorte.escore_final) é um np.memmap somente
+    leitura com `len(coorte)` valores.
+
+    Parâmetros:
+    -----------
+    pasta : str
+        Pasta da coorte
+
+    Raises:
+    -------
+    FileNotFoundError : pasta sem metadados.json
+    ValueError : versão de formato ou dtype incompatível
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        metadados = _ler_metadados(pasta)
+        self.linhas = metadados['linhas']
+        self.ordenado = metadados['ordenado']
+        self.categorias = tuple(metadados['categorias'])
+        self.colunas = {}
+        for coluna, dtype in metadados['colunas'].items():
+            dtype = np.dtype(dtype)
+            if coluna in COLUNAS_COORTE and dtype != COLUNAS_COORTE[coluna]:
+                raise ValueError(f"Coluna {coluna} com dtype {dtype} (esperado {COLUNAS_COORTE[coluna]})")
+            if self.linhas == 0:
+                # np.memmap não mapeia arquivos vazios
+                self.colunas[coluna] = np.empty(0, dtype=dtype)
+            else:
+                self.colunas[coluna] = np.memmap(_caminho_coluna(pasta, coluna), dtype=dtype, mode='r',
+                                                 shape=(self.linhas,))
+
+    def __len__(self):
+        return self.linhas
+
+    def __getitem__(self, coluna):
+        return self.colunas[coluna]
+
+    def __getattr__(self, coluna):
+        try:
+            return self.__dict__['colunas'][coluna]
+        except KeyError:
+            raise AttributeError(coluna) from None
+
+    def __contains__(self, coluna):
+        return coluna in self.colunas
+
+    def periodo(self, desde=None, ate=None):
+        """Colunas restritas ao período [desde, ate)
+
+        Com a coorte em ordem de data/hora (o caso de arquivos da calculadora),
+        o período é localizado por busca binária e as colunas devolvidas são
+        fatias do mapeamento, sem cópia; senão, filtra por máscara.
+
+        Retorna:
+        --------
+        dict (coluna -> array)
+        """
+        if desde is None and ate is None:
+            return dict(self.colunas)
+        datas = self.colunas['data_hora']
+        inicio = np.datetime64(texto_iso(desde)) if desde is not None else None
+        fim = np.datetime64(texto_iso(ate)) if ate is not None else None
+        if self.ordenado:
+            i = np.searchsorted(datas, inicio, 'left') if inicio is not None else 0
+            j = np.searchsorted(datas, fim, 'left') if fim is not None else len(datas)
+            return {coluna: valores[i:j] for coluna, valores in self.colunas.items()}
+        mascara = np.ones(len(datas), dtype=bool)
+        if inicio is not None:
+            mascara &= datas >= inicio
+        if fim is not None:
+            mascara &= datas < fim
+        return {coluna: valores[mascara] for coluna, valores in self.colunas.items()}
+
+
+def colunas_do_csv(caminho_csv, delimitador=','):
+    """Lê um CSV da calculadora direto para arrays (mesmas colunas da coorte)
+
+    É o caminho que a coorte colunar substitui; serve de referência para
+    os testes e o benchmark. Pula as mesmas linhas inválidas que
+    converter_csv.
+    """
+    with open(caminho_csv, newline='', encoding='utf-8-sig') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = [coluna.strip() for coluna in next(leitor, [])]
+        registros = list(_registros_validos(leitor, cabecalho, []))
+    return _colunas_do_bloco(registros)
+
+# ==============================================================================
+# ESTATÍSTICAS DA COORTE
+# ==============================================================================
+
+def estatisticas(colunas):
+    """Resumo de uma coorte (CoorteColunar, periodo() ou colunas_do_csv())
+
+    Retorna:
+    --------
+    dict : pacientes, modo_completo (fração), por_categoria {categoria: n}
+           (inclui 'SEM REGRA ATIVADA'), escore_final_por_categoria
+           {categoria: média}, escores {campo: {media, desvio, p10, p50, p90}}
+    """
+    n = len(colunas['data_hora'])
+    categoria = np.asarray(colunas['categoria'])
+    final = np.asarray(colunas['escore_final'])
+    rotulos = ('SEM REGRA ATIVADA',) + CATEGORIAS
+    # bincount sobre o código + 1: uma passada por coluna, sem agrupar em Python
+    contagens = np.bincount(categoria.astype(np.intp) + 1, minlength=len(rotulos))
+    validos = ~np.isnan(final)
+    somas = np.bincount(categoria[validos].astype(np.intp) + 1, weights=final[validos], minlength=len(rotulos))
+    com_escore = np.bincount(categoria[validos].astype(np.intp) + 1, minlength=len(rotulos))
+
+    escores = {}
+    for campo in CAMPOS_ESCORE:
+        valores = np.asarray(colunas[campo], dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            escores[campo] = None
+            continue
+        p10, p50, p90 = np.percentile(valores, [10, 50, 90])
+        escores[campo] = {'media': float(valores.mean()), 'desvio': float(valores.std()),
+                          'p10': float(p10), 'p50': float(p50), 'p90': float(p90)}
+    return {
+        'pacientes': n,
+        'modo_completo': float(np.count_nonzero(colunas['modo_completo']) / n) if n else None,
+        'por_categoria': {rotulo: int(c) for rotulo, c in zip(rotulos, contagens)},
+        'escore_final_por_categoria': {rotulo: float(s / c) for rotulo, s, c in zip(rotulos, somas, com_escore) if c},
+        'escores': escores,
+    }
+
+# ==============================================================================
+# BENCHMARK
+# ==============================================================================
+
+def gravar_csv_sintetico(caminho, n, semente=0):
+    """CSV no formato de salvar_csv com `n` linhas de banco_resultados.gerar_registros()"""
+    from calculadora_desktop_albumina_opcional import CABECALHO_RESULTADOS
+    with open(caminho, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(CABECALHO_RESULTADOS)
+        for r in gerar_registros(n, semente):
+            momento = datetime.strptime(r['data_hora'], '%Y-%m-%d %H:%M:%S')
+            escritor.writerow([momento.strftime('%d/%m/%Y'), momento.strftime('%H:%M:%S'), r['modo']]
+                              + ["N/A" if r[c] is None else r[c] for c in CAMPOS_ENTRADA]
+                              + [f"{r['escore_final']:.1f}"] * len(CAMPOS_ESCORE) + [r['categoria']])
+
+
+def executar_benchmark(caminho_csv, pasta):
+    """Tempos (s) da mesma análise partindo do CSV e da coorte colunar
+
+    Retorna:
+    --------
+    dict : csv (ler + estatísticas), abrir (coorte), coorte (abrir + estatísticas),
+           estatisticas_csv, estatisticas_coorte
+    """
+    inicio = time.perf_counter()
+    resumo_csv = estatisticas(colunas_do_csv(caminho_csv))
+    tempo_csv = time.perf_counter() - inicio
+
+    melhor_abrir, melhor_total = float('inf'), float('inf')
+    for _ in range(3):
+        inicio = time.perf_counter()
+        coorte = CoorteColunar(pasta)
+        aberta = time.perf_counter()
+        resumo_coorte = estatisticas(coorte)
+        fim = time.perf_counter()
+        melhor_abrir, melhor_total = min(melhor_abrir, aberta - inicio), min(melhor_total, fim - inicio)
+    return {'csv': tempo_csv, 'abrir': melhor_abrir, 'coorte': melhor_total,
+            'estatisticas_csv': resumo_csv, 'estatisticas_coorte': resumo_coorte}
+
+
+def _imprimir_estatisticas(resumo):
+    print(f"Pacientes: {resumo['pacientes']:,}")
+    if not resumo['pacientes']:
+        return
+    print(f"Modo completo (com albumina): {100*resumo['modo_completo']:.1f}%")
+    print(f"{'Categoria':<22}{'Pacientes':>12}{'Escore final médio':>22}")
+    for rotulo, n in resumo['por_categoria'].items():
+        media = resumo['escore_final_por_categoria'].get(rotulo)
+        print(f"{rotulo:<22}{n:>12,}{'' if media is None else f'{media:.1f}':>22}")
+    print(f"{'Escore':<22}{'Média':>9}{'Desvio':>9}{'P10':>9}{'P50':>9}{'P90':>9}")
+    for campo, valores in resumo['escores'].items():
+        if valores is not None:
+            print(f"{campo:<22}" + ''.join(f"{valores[k]:>9.1f}" for k in ('media', 'desvio', 'p10', 'p50', 'p90')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coorte colunar (memmap) dos resultados da calculadora fuzzy")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    converter = sub.add_parser('converter', help="acrescenta CSVs da calculadora a uma coorte")
+    converter.add_argument('csv', nargs='+', help="arquivos CSV (ex.: dados_pacientes.csv)")
+    converter.add_argument('pasta', help="pasta da coorte (criada se não existir)")
+    converter.add_argument('--delimitador', default=',', help="separador de campos (padrão: ',')")
+
+    resumo = sub.add_parser('estatisticas', help="resumo da coorte num período")
+    resumo.add_argument('pasta')
+    resumo.add_argument('--desde', help="AAAA-MM-DD[ HH:MM:SS], inclusivo")
+    resumo.add_argument('--ate', help="AAAA-MM-DD[ HH:MM:SS], exclusivo")
+
+    benchmark = sub.add_parser('benchmark', help="CSV x coorte colunar numa coorte sintética")
+    benchmark.add_argument('--linhas', type=int, default=1000000)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'converter':
+        erros = 0
+        for caminho in args.csv:
+            resultado = converter_csv(caminho, args.pasta, delimitador=args.delimitador)
+            for numero, motivo in resultado['erros']:
+                print(f"  {caminho}, linha {numero} ignorada: {motivo}", file=sys.stderr)
+            print(f"{caminho}: {resultado['linhas']} linhas convertidas, {len(resultado['erros'])} inválidas",
+                  file=sys.stderr)
+            erros += len(resultado['erros'])
+        return 1 if erros else 0
+
+    if args.comando == 'estatisticas':
+        coorte = CoorteColunar(args.pasta)
+        inicio = time.perf_counter()
+        resultado = estatisticas(coorte.periodo(args.desde, args.ate))
+        tempo = time.perf_counter() - inicio
+        _imprimir_estatisticas(resultado)
+        print(f"Calculado em {1000*tempo:.1f} ms", file=sys.stderr)
+        return 0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'sintetico.csv')
+        gravar_csv_sintetico(caminho, args.linhas)
+        inicio = time.perf_counter()
+        converter_csv(caminho, os.path.join(pasta, 'coorte'))
+        tempo_conversao = time.perf_counter() - inicio
+        tempos = executar_benchmark(caminho, os.path.join(pasta, 'coorte'))
+        tamanho_csv = os.path.getsize(caminho)
+        tamanho_coorte = sum(os.path.getsize(os.path.join(pasta, 'coorte', a))
+                             for a in os.listdir(os.path.join(pasta, 'coorte')))
+    print("="*80)
+    print(f"COORTE COLUNAR - {args.linhas:,} linhas")
+    print("="*80)
+    print(f"Conversão (uma vez): {tempo_conversao:.1f} s | CSV {tamanho_csv/2**20:.0f} MB -> "
+          f"coorte {tamanho_coorte/2**20:.0f} MB")
+    print(f"{'Ler CSV + estatísticas':<45}{tempos['csv']:>10.3f} s")
+    print(f"{'Abrir coorte (memmap)':<45}{tempos['abrir']:>10.4f} s")
+    print(f"{'Abrir coorte + estatísticas':<45}{tempos['coorte']:>10.3f} s")
+    print(f"{'Ganho':<45}{tempos['csv']/tempos['coorte']:>10.0f}x")
+    print("="*80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Propagação de Incerteza de Medição por Monte Carlo
+
+IMC, perda ponderal, PCR e albumina têm erro de medição conhecido, e um
+paciente perto de um corte de categorizar_risco (25, 40, 60, 70) pode mudar
+de categoria só pelo ruído. Para cada paciente, K amostras das entradas são
+sorteadas a partir de MODELOS DE ERRO configuráveis e pontuadas todas num
+único lote vetorizado. O resultado é a distribuição do escore final e a
+probabilidade de cada categoria.
+
+MODELOS DE ERRO (dict campo -> (distribuição, parâmetro)):
+- ('normal', desvio)           desvio padrão absoluto, na unidade do campo
+- ('normal_relativo', cv)      desvio padrão = cv x valor medido
+- ('uniforme', meia_largura)   valor medido +- meia_largura
+Valores sorteados abaixo de zero viram zero; acima do universo, o motor os
+recorta como o skfuzzy. Albumina ausente continua ausente (modo
+simplificado). ERROS_PADRAO traz ordens de grandeza ilustrativas: ajuste
+aos instrumentos e ao laboratório do serviço.
+
+DESEMPENHO:
+Só os submódulos com alguma entrada perturbada são reavaliados nas N x K
+linhas (com os erros padrão, fenotípico e inflamatório); ingestão e
+gravidade são calculados uma vez por paciente e repetidos.
+
+USO:
+    python incerteza_medicao.py pacientes.csv [--amostras 1000] [--semente 0]
+                                [--erro pcr=normal_relativo:0.15 --erro imc=normal:0.5]
+"""
+
+import argparse
+import math
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from coorte_colunar import CATEGORIAS
+from pipeline_pacientes import (CAMPOS_ENTRADA, calcular_escore_final, calcular_escore_submodulo, normalizar_lote,
+                                pontuar_pacientes)
+from pontuar_csv import ler_pacientes_csv
+from sensibilidade_lote import SUBMODULOS
+
+AMOSTRAS_PADRAO = 1000
+
+# Ordens de grandeza ilustrativas do erro de cada medida
+ERROS_PADRAO = {
+    'imc': ('normal', 0.5),                 # kg/m² (peso e altura medidos à beira do leito)
+    'perda': ('normal', 1.0),               # pontos percentuais (peso habitual referido)
+    'pcr': ('normal_relativo', 0.10),       # CV analítico
+    'albumina': ('normal', 0.2),            # g/dL
+}
+
+DISTRIBUICOES = ('normal', 'normal_relativo', 'uniforme')
+
+# Limites inferiores de cada categoria em calculadora.categorizar_risco
+CORTES_CATEGORIAS = (25, 40, 60, 70)
+
+# Linhas (pacientes x amostras) pontuadas por vez
+LINHAS_POR_BLOCO_PADRAO = 200000
+
+# ==============================================================================
+# MODELOS DE ERRO
+# ==============================================================================
+
+def validar_erros(erros):
+    """Confere campos e distribuições de um dict de modelos de erro
+
+    Raises:
+    -------
+    ValueError : campo desconhecido, distribuição desconhecida, parâmetro não
+                 finito (NaN/inf) ou negativo
+    """
+    for campo, (distribuicao, parametro) in erros.items():
+        if campo not in CAMPOS_ENTRADA:
+            raise ValueError(f"Campo desconhecido no modelo de erro: {campo}")
+        if distribuicao not in DISTRIBUICOES:
+            raise ValueError(f"Distribuição desconhecida para {campo}: {distribuicao} (opções: {DISTRIBUICOES})")
+        if not math.isfinite(parametro):
+            raise ValueError(f"Parâmetro não finito no erro de {campo}: {parametro}")
+        if parametro < 0:
+            raise ValueError(f"Parâmetro negativo no erro de {campo}: {parametro}")
+
+
+def _sortear(valores, modelo, rng):
+    distribuicao, parametro = modelo
+    if distribuicao == 'normal':
+        sorteados = valores + rng.normal(0.0, parametro, len(valores))
+    elif distribuicao == 'normal_relativo':
+        sorteados = valores * (1.0 + rng.normal(0.0, parametro, len(valores)))
+    else:
+        sorteados = valores + rng.uniform(-parametro, parametro, len(valores))
+    # np.maximum mantém NaN (albumina ausente)
+    return np.maximum(sorteados, 0.0)
+
+
+def categorias_dos_escores(escores):
+    """Índice em CATEGORIAS de cada escore (mesmos cortes de categorizar_risco); -1 = sem regra"""
+    return np.where(np.isnan(escores), -1, np.digitize(escores, CORTES_CATEGORIAS))
+
+# ==============================================================================
+# PROPAGAÇÃO
+# ==============================================================================
+
+def propagar_incerteza(lote, amostras=AMOSTRAS_PADRAO, erros=None, semente=None, defuzzificador='amostrado',
+                       guardar_entradas=False, linhas_por_bloco=LINHAS_POR_BLOCO_PADRAO):
+    """Distribuição do escore final de cada paciente sob erro de medição
+
+    Parâmetros:
+    -----------
+    lote : dict ou list de dict
+        Como em pontuar_pacientes (albumina pode faltar)
+    amostras : int
+        Amostras (K) por paciente
+    erros : dict, opcional
+        Modelos de erro por campo (padrão: ERROS_PADRAO); campos fora do dict
+        são considerados exatos
+    semente : int, opcional
+        Semente do gerador (mesma semente, mesmo resultado)
+    guardar_entradas : bool
+        Inclui no resultado as entradas sorteadas (n x K por campo)
+
+    Retorna:
+    --------
+    dict com (n = pacientes):
+        base : resultado de pontuar_pacientes com os valores medidos
+        escores : np.ndarray (n, K) do escore final de cada amostra
+        media, desvio, p05, p50, p95 : np.ndarray (n,) (ignorando amostras sem regra)
+        probabilidades : np.ndarray (n, 5), na ordem de CATEGORIAS
+        sem_regra : np.ndarray (n,) fração de amostras sem regra ativada
+        prob_mudar : np.ndarray (n,) probabilidade de sair da categoria medida
+        entradas : dict campo -> np.ndarray (n, K) (só com guardar_entradas)
+    """
+    if amostras < 1:
+        raise ValueError("amostras deve ser >= 1")
+    erros = ERROS_PADRAO if erros is None else erros
+    validar_erros(erros)
+    c = normalizar_lote(lote)
+    n = len(c['imc'])
+    base = pontuar_pacientes(c, defuzzificador, validar=False)  # c já validado acima
+    completo = base['modo_completo']
+    rng = np.random.default_rng(semente)
+
+    escores = np.empty((n, amostras))
+    entradas = {campo: np.empty((n, amostras)) for campo in erros} if guardar_entradas else None
+    por_bloco = max(1, linhas_por_bloco // amostras)
+    for inicio in range(0, n, por_bloco):
+        trecho = slice(inicio, inicio + por_bloco)
+        m = len(completo[trecho])
+        linhas = {campo: np.repeat(c[campo][trecho], amostras) for campo in CAMPOS_ENTRADA}
+        for campo, modelo in erros.items():
+            linhas[campo] = _sortear(linhas[campo], modelo, rng)
+            if guardar_entradas:
+                entradas[campo][trecho] = linhas[campo].reshape(m, amostras)
+        completo_linhas = np.repeat(completo[trecho], amostras)
+        parciais = []
+        for submodulo, campos in SUBMODULOS.items():
+            if any(campo in erros for campo in campos):
+                parciais.append(calcular_escore_submodulo(submodulo, linhas, completo_linhas, defuzzificador))
+            else:
+                parciais.append(np.repeat(base[f"escore_{submodulo}"][trecho], amostras))
+        escores[trecho] = calcular_escore_final(tuple(parciais), completo_linhas, defuzzificador).reshape(m, amostras)
+
+    categorias = categorias_dos_escores(escores)
+    probabilidades = np.stack([(categorias == k).mean(axis=1) for k in range(len(CATEGORIAS))], axis=1)
+    medida = categorias_dos_escores(base['escore_final'])
+    resultado = {
+        'base': base,
+        'escores': escores,
+        'probabilidades': probabilidades,
+        'sem_regra': (categorias == -1).mean(axis=1),
+        'prob_mudar': np.where(medida >= 0, 1.0 - probabilidades[np.arange(n), np.maximum(medida, 0)], np.nan),
+    }
+    with warnings.catch_warnings():
+        # Pacientes sem nenhuma amostra com regra ativada ficam NaN, sem aviso
+        warnings.simplefilter('ignore', RuntimeWarning)
+        resultado['media'] = np.nanmean(escores, axis=1)
+        resultado['desvio'] = np.nanstd(escores, axis=1)
+        resultado['p05'], resultado['p50'], resultado['p95'] = np.nanpercentile(escores, [5, 50, 95], axis=1)
+    if guardar_entradas:
+        resultado['entradas'] = entradas
+    return resultado
+
+# ==============================================================================
+# LINHA DE COMANDO
+# ==============================================================================
+
+def _modelo_da_linha(texto):
+    """'pcr=normal_relativo:0.15' -> ('pcr', ('normal_relativo', 0.15))"""
+    try:
+        campo, modelo = texto.split('=', 1)
+        distribuicao, parametro = modelo.split(':', 1)
+        return campo.strip(), (distribuicao.strip(), float(parametro))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Modelo de erro inválido: {texto!r} (ex.: pcr=normal_relativo:0.15)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incerteza do escore por erro de medição (Monte Carlo)")
+    parser.add_argument('entrada', help="CSV de pacientes (colunas de dados_pacientes.csv)")
+    parser.add_argument('--amostras', type=int, default=AMOSTRAS_PADRAO,
+                        help=f"amostras por paciente (padrão: {AMOSTRAS_PADRAO})")
+    parser.add_argument('--semente', type=int, default=None)
+    parser.add_argument('--erro', type=_modelo_da_linha, action='append', default=[],
+                        help="campo=distribuição:parâmetro; substitui o padrão desse campo (repetível)")
+    parser.add_argument('--somente', action='store_true', help="usa só os erros dados em --erro")
+    parser.add_argument('--delimitador', default=',', help="separador de campos (padrão: ',')")
+    args = parser.parse_args(argv)
+
+    erros = {} if args.somente else dict(ERROS_PADRAO)
+    erros.update(args.erro)
+    try:
+        validar_erros(erros)
+    except ValueError as e:
+        parser.error(str(e))
+    registros, numeros = ler_pacientes_csv(args.entrada, args.delimitador)
+    if not registros:
+        print("Nenhum paciente válido no arquivo", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    resultado = propagar_incerteza(registros, args.amostras, erros, args.semente)
+    tempo = time.perf_counter() - inicio
+
+    print("Erros: " + ", ".join(f"{campo} {d} {p:g}" for campo, (d, p) in erros.items()))
+    print(f"{'Linha':>6}{'Escore':>8}  {'Categoria':<16}{'Média':>7}{'P5':>7}{'P95':>7}"
+          f"{'P(mudar)':>10}  Mais provável")
+    for i, numero in enumerate(numeros):
+        final = resultado['base']['escore_final'][i]
+        if np.isnan(final):
+            print(f"{numero:>6}{'N/A':>8}  {'SEM REGRA':<16}")
+            continue
+        provavel = CATEGORIAS[int(np.argmax(resultado['probabilidades'][i]))]
+        print(f"{numero:>6}{final:>8.1f}  {resultado['base']['categoria'][i]:<16}{resultado['media'][i]:>7.1f}"
+              f"{resultado['p05'][i]:>7.1f}{resultado['p95'][i]:>7.1f}{100*resultado['prob_mudar'][i]:>9.1f}%"
+              f"  {provavel}")
+    print(f"{len(registros)} pacientes x {args.amostras} amostras em {tempo:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Minimização das Bases de Regras: Prova de Equivalência e Relatório
+
+compilador_regras.minimizar remove as conjunções repetidas (a mesma regra
+na dominância e no fallback do integrador) e as cobertas por outra com o
+mesmo consequente e menos termos. Sob AND = mínimo e acumulação por máximo
+isso não muda nenhum escore; este módulo confere essa afirmação base a base
+em vez de confiar nela:
+
+- GRADE DENSA: a mesma grade de cobertura_regras.py (pontos uniformes, os
+  pontos onde alguma pertinência passa de zero a positiva e os pontos médios
+  entre eles), avaliada pelo motor vetorizado com a base declarada e com a
+  minimizada. Os escores têm de ser IDÊNTICOS, bit a bit, inclusive os NaN
+  (pontos sem regra ativada).
+- SKFUZZY: os ControlSystems das duas versões, num sorteio de pontos da
+  grade, também têm de coincidir exatamente.
+
+RELATÓRIO de cada base:
+- Regras e conjunções (após expandir os OU) antes e depois
+- Conjunções repetidas e cobertas, com a conjunção que as substitui
+- Tempo da grade no motor vetorizado e de um compute() do skfuzzy, antes e
+  depois
+
+USO:
+    python minimizacao_regras.py                        # todas as bases
+    python minimizacao_regras.py integrador_completo gravidade --pontos 41
+Sai com código 1 se alguma base minimizada não coincidir com a declarada.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+from skfuzzy import control as ctrl
+
+import motor_vetorizado as mv
+from bases_regras import BASES
+from cobertura_regras import eixo_de_varredura
+from compilador_regras import compilar, construir_sistema_skfuzzy
+
+# Pontos uniformes por eixo, por número de entradas (quebras e pontos médios são
+# acrescentados); cada ponto é avaliado duas vezes, com a defuzzificação completa
+PONTOS_POR_EIXO_PADRAO = {2: 401, 3: 41, 4: 9}
+
+# compute() do skfuzzy cronometrados por versão da base (melhor de REPETICOES_SKFUZZY passadas)
+CHAMADAS_SKFUZZY_PADRAO = 30
+REPETICOES_SKFUZZY = 3
+
+# ==============================================================================
+# DESCRIÇÃO DAS CONJUNÇÕES
+# ==============================================================================
+
+def descrever_conjuncao(base, indice):
+    """'escore_fenotipico[alto] & escore_gravidade[alto] -> alto (regra 88)'"""
+    termos = [f"{entrada}[{rotulos[t]}]"
+              for entrada, rotulos, t in zip(base.entradas, base.rotulos, base.antecedentes[indice]) if t >= 0]
+    return (f"{' & '.join(termos)} -> {base.rotulos_saida[base.consequentes[indice]]} "
+            f"(regra {base.regra_da_conjuncao[indice] + 1})")
+
+# ==============================================================================
+# PROVA DE EQUIVALÊNCIA
+# ==============================================================================
+
+def _comparar_grade(declarado, minimizado, pontos_por_eixo, tamanho_bloco):
+    """Avalia a grade densa nos dois motores; (pontos, idênticos, diferença máxima, tempos, eixos)"""
+    eixos = [eixo_de_varredura(universo, termos, pontos_por_eixo)[0]
+             for universo, termos in zip(declarado.universos, declarado.termos)]
+    forma = tuple(len(valores) for valores in eixos)
+    total = int(np.prod(forma))
+    identicos, diferenca, tempos = True, 0.0, [0.0, 0.0]
+    for bloco in range(0, total, tamanho_bloco):
+        indices = np.unravel_index(np.arange(bloco, min(bloco + tamanho_bloco, total)), forma)
+        entradas = {entrada: valores[i] for entrada, valores, i in zip(declarado.entradas, eixos, indices)}
+        escores = []
+        for k, motor in enumerate((declarado, minimizado)):
+            inicio = time.perf_counter()
+            escores.append(motor.avaliar(entradas, tamanho_bloco))
+            tempos[k] += time.perf_counter() - inicio
+        identicos = identicos and np.array_equal(escores[0], escores[1], equal_nan=True)
+        if np.array_equal(np.isnan(escores[0]), np.isnan(escores[1])):
+            diferenca = max(diferenca, float(np.nanmax(np.abs(escores[0] - escores[1]), initial=0.0)))
+        else:
+            diferenca = np.inf
+    return total, identicos, diferenca, tuple(tempos), eixos
+
+
+def _cronometrar_skfuzzy(base, pontos):
+    """Escores (NaN sem regra ativada) e tempo médio de um compute() por ponto"""
+    simulacao = ctrl.ControlSystemSimulation(construir_sistema_skfuzzy(base), cache=False)
+    escores = np.empty(len(pontos))
+    melhor = np.inf
+    for _ in range(REPETICOES_SKFUZZY):
+        inicio = time.perf_counter()
+        for i, ponto in enumerate(pontos):
+            for entrada, valor in zip(base.entradas, ponto):
+                simulacao.input[entrada] = valor
+            try:
+                simulacao.compute()
+                escores[i] = simulacao.output[base.saida]
+            except KeyError:
+                escores[i] = np.nan
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return escores, melhor / max(len(pontos), 1)
+
+
+def provar_base(nome, pontos_por_eixo=None, chamadas_skfuzzy=CHAMADAS_SKFUZZY_PADRAO,
+                tamanho_bloco=mv.TAMANHO_BLOCO_PADRAO):
+    """Compara a base declarada com a minimizada e mede o tempo economizado
+
+    Parâmetros:
+    -----------
+    nome : str
+        Base de bases_regras.BASES
+    pontos_por_eixo : int, opcional
+        Pontos uniformes por eixo (padrão: PONTOS_POR_EIXO_PADRAO)
+    chamadas_skfuzzy : int
+        Pontos da grade sorteados para o skfuzzy (0 pula essa comparação)
+
+    Retorna:
+    --------
+    dict : sistema, entradas, regras / conjuncoes (declaradas),
+           regras_minimizadas / conjuncoes_minimizadas, repetidas e
+           cobertas [(descrição da removida, descrição da que a substitui)],
+           pontos, identicos, diferenca_maxima, tempo_grade (declarada,
+           minimizada; s), identicos_skfuzzy, tempo_skfuzzy (declarada,
+           minimizada; s por compute()), tempo (s)
+    """
+    inicio = time.perf_counter()
+    declarada, minimizada = compilar(nome), compilar(nome, minimizada=True)
+    motores = [mv.BaseRegrasVetorizada.da_base_compilada(base) for base in (declarada, minimizada)]
+    if pontos_por_eixo is None:
+        pontos_por_eixo = PONTOS_POR_EIXO_PADRAO[len(declarada.entradas)]
+    pontos, identicos, diferenca, tempo_grade, eixos = _comparar_grade(*motores, pontos_por_eixo, tamanho_bloco)
+
+    repetidas, cobertas = [], []
+    for removida, mantida in minimizada.removidas:
+        par = (descrever_conjuncao(declarada, removida), descrever_conjuncao(declarada, mantida))
+        igual = np.array_equal(declarada.antecedentes[removida], declarada.antecedentes[mantida])
+        (repetidas if igual else cobertas).append(par)
+
+    identicos_skfuzzy, tempo_skfuzzy = None, None
+    if chamadas_skfuzzy:
+        rng = np.random.default_rng(0)
+        amostra = [[valores[rng.integers(len(valores))] for valores in eixos] for _ in range(chamadas_skfuzzy)]
+        (escores_declarada, tempo_declarada), (escores_minimizada, tempo_minimizada) = (
+            _cronometrar_skfuzzy(base, amostra) for base in (declarada, minimizada))
+        identicos_skfuzzy = np.array_equal(escores_declarada, escores_minimizada, equal_nan=True)
+        tempo_skfuzzy = (tempo_declarada, tempo_minimizada)
+
+    return {
+        'sistema': nome,
+        'entradas': list(declarada.entradas),
+        'regras': declarada.n_regras,
+        'conjuncoes': declarada.n_conjuncoes,
+        'regras_minimizadas': minimizada.n_regras,
+        'conjuncoes_minimizadas': minimizada.n_conjuncoes,
+        'repetidas': repetidas,
+        'cobertas': cobertas,
+        'pontos': pontos,
+        'identicos': identicos,
+        'diferenca_maxima': diferenca,
+        'tempo_grade': tempo_grade,
+        'identicos_skfuzzy': identicos_skfuzzy,
+        'tempo_skfuzzy': tempo_skfuzzy,
+        'tempo': time.perf_counter() - inicio,
+    }
+
+
+def provar_todas(bases=tuple(BASES), pontos_por_eixo=None, chamadas_skfuzzy=CHAMADAS_SKFUZZY_PADRAO):
+    """provar_base() de cada base; dict nome -> relatório"""
+    return {nome: provar_base(nome, pontos_por_eixo, chamadas_skfuzzy) for nome in bases}
+
+# ==============================================================================
+# RELATÓRIO
+# ==============================================================================
+
+def _economia(antes, depois):
+    return f"{1000*antes:.1f} -> {1000*depois:.1f} ms ({100*(depois/antes - 1):+.0f}%)" if antes > 0 else "-"
+
+
+def imprimir_relatorio(relatorio, detalhes=False):
+    ok = relatorio['identicos'] and relatorio['identicos_skfuzzy'] is not False
+    print(f"\n{relatorio['sistema']}: {relatorio['regras']} regras / {relatorio['conjuncoes']} conjunções -> "
+          f"{relatorio['regras_minimizadas']} / {relatorio['conjuncoes_minimizadas']} "
+          f"({len(relatorio['repetidas'])} repetidas, {len(relatorio['cobertas'])} cobertas)")
+    print(f"  {'✓' if ok else '✗'} {relatorio['pontos']:,} pontos da grade "
+          f"{'idênticos' if relatorio['identicos'] else 'DIFERENTES'} "
+          f"(diferença máxima {relatorio['diferenca_maxima']:.1e})"
+          + ("" if relatorio['identicos_skfuzzy'] is None else
+             f"; skfuzzy {'idêntico' if relatorio['identicos_skfuzzy'] else 'DIFERENTE'}"))
+    print(f"  Grade (motor vetorizado): {_economia(*relatorio['tempo_grade'])}")
+    if relatorio['tempo_skfuzzy'] is not None:
+        print(f"  compute() do skfuzzy: {_economia(*relatorio['tempo_skfuzzy'])}")
+    if detalhes:
+        for rotulo, pares in (('Repetida', relatorio['repetidas']), ('Coberta', relatorio['cobertas'])):
+            for removida, mantida in pares:
+                print(f"    {rotulo}: {removida}\n      por {mantida}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minimização das bases de regras fuzzy com prova de equivalência")
+    parser.add_argument('bases', nargs='*', default=list(BASES), help="bases a minimizar (padrão: todas)")
+    parser.add_argument('--pontos', type=int, default=None,
+                        help="pontos uniformes por eixo (padrão: 401/41/9 para 2/3/4 entradas)")
+    parser.add_argument('--chamadas', type=int, default=CHAMADAS_SKFUZZY_PADRAO,
+                        help="compute() do skfuzzy por versão da base (0 = não comparar no skfuzzy)")
+    parser.add_argument('--detalhes', action='store_true', help="lista cada conjunção removida")
+    args = parser.parse_args(argv)
+    desconhecidas = [nome for nome in args.bases if nome not in BASES]
+    if desconhecidas:
+        parser.error(f"bases desconhecidas: {desconhecidas} (opções: {', '.join(BASES)})")
+
+    print("="*80)
+    print("MINIMIZAÇÃO DAS BASES DE REGRAS")
+    print("="*80)
+    inicio = time.perf_counter()
+    relatorios = provar_todas(args.bases, args.pontos, args.chamadas)
+    for relatorio in relatorios.values():
+        imprimir_relatorio(relatorio, args.detalhes)
+    divergentes = [nome for nome, r in relatorios.items()
+                   if not r['identicos'] or r['identicos_skfuzzy'] is False]
+    removidas = sum(r['conjuncoes'] - r['conjuncoes_minimizadas'] for r in relatorios.values())
+    print(f"\n{'='*80}")
+    print(f"{removidas} conjunções removidas de {sum(r['conjuncoes'] for r in relatorios.values())} "
+          f"em {time.perf_counter() - inicio:.1f} s; bases divergentes: "
+          f"{', '.join(divergentes) if divergentes else 'nenhuma'}")
+    print("="*80)
+    return 1 if divergentes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
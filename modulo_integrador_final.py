@@ -16,122 +16,38 @@ SAIDA: ESCORE FINAL DE RISCO NUTRICIONAL (0-100)
 Categorias: Baixo / Baixo-Moderado / Moderado / Moderado-Alto / Alto
 """
 
-import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-import matplotlib.pyplot as plt
+from simulacao_por_thread import SimulacaoPorThread
 
 # ==============================================================================
-# PASSO 1: DEFINIR AS VARIAVEIS FUZZY (ANTECEDENTES E CONSEQUENTE)
+# PASSOS 1 A 3: CONSTRUCAO DO SISTEMA (SOB DEMANDA)
 # ==============================================================================
+# O skfuzzy e o sistema fuzzy so sao carregados no primeiro calculo;
+# importar este modulo nao monta variaveis, regras nem simulacoes.
 
-# ANTECEDENTE 1: Escore Fenotipico (0-100) - Peso 30%
-escore_fenotipico = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_fenotipico')
-
-escore_fenotipico['baixo'] = fuzz.trapmf(escore_fenotipico.universe, [0, 0, 20, 30])
-escore_fenotipico['baixo_moderado'] = fuzz.trimf(escore_fenotipico.universe, [25, 35, 45])
-escore_fenotipico['moderado'] = fuzz.trimf(escore_fenotipico.universe, [40, 50, 60])
-escore_fenotipico['moderado_alto'] = fuzz.trimf(escore_fenotipico.universe, [55, 65, 75])
-escore_fenotipico['alto'] = fuzz.trapmf(escore_fenotipico.universe, [70, 80, 100, 100])
-
-# ANTECEDENTE 2: Escore Ingestao (0-100) - Peso 25%
-escore_ingestao = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_ingestao')
-
-escore_ingestao['baixo'] = fuzz.trapmf(escore_ingestao.universe, [0, 0, 20, 30])
-escore_ingestao['baixo_moderado'] = fuzz.trimf(escore_ingestao.universe, [25, 35, 45])
-escore_ingestao['moderado'] = fuzz.trimf(escore_ingestao.universe, [40, 50, 60])
-escore_ingestao['moderado_alto'] = fuzz.trimf(escore_ingestao.universe, [55, 65, 75])
-escore_ingestao['alto'] = fuzz.trapmf(escore_ingestao.universe, [70, 80, 100, 100])
-
-# ANTECEDENTE 3: Escore Inflamatorio (0-100) - Peso 15%
-escore_inflamatorio = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_inflamatorio')
-
-escore_inflamatorio['baixo'] = fuzz.trapmf(escore_inflamatorio.universe, [0, 0, 20, 30])
-escore_inflamatorio['baixo_moderado'] = fuzz.trimf(escore_inflamatorio.universe, [25, 35, 45])
-escore_inflamatorio['moderado'] = fuzz.trimf(escore_inflamatorio.universe, [40, 50, 60])
-escore_inflamatorio['moderado_alto'] = fuzz.trimf(escore_inflamatorio.universe, [55, 65, 75])
-escore_inflamatorio['alto'] = fuzz.trapmf(escore_inflamatorio.universe, [70, 80, 100, 100])
-
-# ANTECEDENTE 4: Escore Gravidade (0-100) - Peso 30%
-escore_gravidade = ctrl.Antecedent(np.arange(0, 101, 1), 'escore_gravidade')
-
-escore_gravidade['baixo'] = fuzz.trapmf(escore_gravidade.universe, [0, 0, 20, 30])
-escore_gravidade['baixo_moderado'] = fuzz.trimf(escore_gravidade.universe, [25, 35, 45])
-escore_gravidade['moderado'] = fuzz.trimf(escore_gravidade.universe, [40, 50, 60])
-escore_gravidade['moderado_alto'] = fuzz.trimf(escore_gravidade.universe, [55, 65, 75])
-escore_gravidade['alto'] = fuzz.trapmf(escore_gravidade.universe, [70, 80, 100, 100])
-
-# CONSEQUENTE: ESCORE FINAL DE RISCO NUTRICIONAL (0-100)
-risco_final = ctrl.Consequent(np.arange(0, 101, 1), 'risco_final')
-
-risco_final['baixo'] = fuzz.trapmf(risco_final.universe, [0, 0, 15, 25])
-risco_final['baixo_moderado'] = fuzz.trimf(risco_final.universe, [20, 32, 40])
-risco_final['moderado'] = fuzz.trimf(risco_final.universe, [35, 50, 60])
-risco_final['moderado_alto'] = fuzz.trimf(risco_final.universe, [55, 67, 75])
-risco_final['alto'] = fuzz.trapmf(risco_final.universe, [70, 80, 100, 100])
-
-# ==============================================================================
-# PASSO 2: DEFINIR AS REGRAS FUZZY (BASE DE CONHECIMENTO)
-# ==============================================================================
-
-# Total: 8 regras de integracao + 2 regras de ajuste sinergico + 1 regra default = 11 regras
-
-# REGRAS DE ALTO RISCO
-# Fenotipico e Gravidade tem peso 30% cada - se ambos altos, risco final e alto
-regra1 = ctrl.Rule(escore_fenotipico['alto'] & escore_gravidade['alto'], 
-                   risco_final['alto'])
-
-regra2 = ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['alto'], 
-                   risco_final['alto'])
-
-# REGRAS DE MODERADO-ALTO RISCO
-regra3 = ctrl.Rule(escore_fenotipico['moderado_alto'] & escore_gravidade['moderado_alto'], 
-                   risco_final['moderado_alto'])
-
-regra4 = ctrl.Rule(escore_ingestao['alto'] & escore_gravidade['moderado_alto'], 
-                   risco_final['moderado_alto'])
-
-regra5 = ctrl.Rule(escore_fenotipico['alto'] | escore_ingestao['alto'] | escore_gravidade['alto'], 
-                   risco_final['moderado_alto'])
-
-# REGRAS DE MODERADO RISCO
-regra6 = ctrl.Rule(escore_fenotipico['moderado'] & escore_gravidade['moderado'], 
-                   risco_final['moderado'])
-
-regra7 = ctrl.Rule(escore_ingestao['moderado'] & escore_inflamatorio['moderado'], 
-                   risco_final['moderado'])
-
-regra8 = ctrl.Rule(escore_fenotipico['moderado'] | escore_ingestao['moderado'] | escore_gravidade['moderado'], 
-                   risco_final['moderado'])
-
-# REGRAS DE BAIXO-MODERADO RISCO
-regra9 = ctrl.Rule(escore_fenotipico['baixo_moderado'] & escore_gravidade['baixo_moderado'], 
-                   risco_final['baixo_moderado'])
-
-# REGRAS DE BAIXO RISCO
-regra10 = ctrl.Rule(escore_fenotipico['baixo'] & escore_ingestao['baixo'] & escore_gravidade['baixo'], 
-                    risco_final['baixo'])
-
-# REGRAS DE AJUSTE SINERGICO
-# Quando desnutricao grave (fenotipico alto) + deficit alimentar grave (ingestao alta)
-# = SINERGIA que amplifica risco
-regra11 = ctrl.Rule(escore_fenotipico['alto'] & escore_ingestao['moderado_alto'], 
-                    risco_final['alto'])
+def _construir_sistema_integrador():
+    """
+    Monta o ControlSystem integrador a partir da base 'integrador_delphi'
+    (variaveis e regras em bases_regras.py).
+    """
+    from compilador_regras import compilar, construir_sistema_skfuzzy
 
-# Quando inflamacao grave (inflamatorio alto) + gravidade alta + qualquer deficit nutricional
-# = SINERGIA (catabolismo acelerado)
-regra12 = ctrl.Rule(escore_inflamatorio['alto'] & escore_gravidade['alto'], 
-                    risco_final['moderado_alto'])
+    return construir_sistema_skfuzzy(compilar('integrador_delphi', minimizada=True))
 
-# ==============================================================================
-# PASSO 3: CRIAR O SISTEMA DE CONTROLE FUZZY
-# ==============================================================================
+# Simulacao exclusiva de cada thread (ver simulacao_por_thread.py), sem o
+# cache do skfuzzy, cujo resultado depende da ordem das chamadas anteriores;
+# o sistema e construido na primeira chamada
+_simulacoes_final = SimulacaoPorThread(_construir_sistema_integrador, cache=False)
 
-sistema_integrador = ctrl.ControlSystem([
-    regra1, regra2, regra3, regra4, regra5, regra6, regra7, regra8, regra9, regra10, regra11, regra12
-])
-
-calculadora_final = ctrl.ControlSystemSimulation(sistema_integrador)
+def __getattr__(nome):
+    """
+    Compatibilidade: sistema_integrador e calculadora_final (simulacao global,
+    NAO segura entre threads) sao construidos no primeiro acesso.
+    """
+    if nome in ('sistema_integrador', 'calculadora_final'):
+        globals().setdefault('calculadora_final', _simulacoes_final.nova_simulacao())
+        globals().setdefault('sistema_integrador', globals()['calculadora_final'].ctrl)
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # ==============================================================================
 # PASSO 4: FUNCAO DE CALCULO DO ESCORE FINAL
@@ -165,16 +81,17 @@ def calcular_risco_final(fenotipico, ingestao, inflamatorio, gravidade, debug=Fa
         if not (0 <= valor <= 100):
             raise ValueError(f"Escore {nome} fora do intervalo valido (0-100): {valor}")
     
-    # Inserir valores no sistema
-    calculadora_final.input['escore_fenotipico'] = fenotipico
-    calculadora_final.input['escore_ingestao'] = ingestao
-    calculadora_final.input['escore_inflamatorio'] = inflamatorio
-    calculadora_final.input['escore_gravidade'] = gravidade
+    # Inserir valores na simulacao desta thread
+    calculadora = _simulacoes_final.obter()
+    calculadora.input['escore_fenotipico'] = fenotipico
+    calculadora.input['escore_ingestao'] = ingestao
+    calculadora.input['escore_inflamatorio'] = inflamatorio
+    calculadora.input['escore_gravidade'] = gravidade
     
     # Computar o resultado
-    calculadora_final.compute()
+    calculadora.compute()
     
-    escore = calculadora_final.output['risco_final']
+    escore = calculadora.output['risco_final']
     
     if debug:
         print(f"\n{'='*70}")
@@ -0,0 +1,467 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Motor Mamdani Vetorizado (NumPy)
+
+Avalia N pacientes em uma única chamada, sem o laço de
+ControlSystemSimulation.compute() por linha. Os motores partem das MESMAS
+bases compiladas (compilador_regras.py) que geram os ControlSystems de
+calculadora_desktop_albumina_opcional.py, portanto não há uma segunda cópia
+das funções de pertinência ou das regras; um ControlSystem qualquer também
+pode ser convertido (BaseRegrasVetorizada(sistema)).
+
+ETAPAS (todas como operações sobre arrays inteiros):
+1. Fuzzificação: matriz de pertinências (N pacientes x termos)
+2. Força das regras: mínimo (AND) das pertinências de cada regra
+3. Acumulação: máximo das forças por termo de saída (cortes)
+4. Agregação: máximo dos termos de saída recortados no universo 0-100
+5. Defuzzificação: centroide da agregação
+
+DEFUZZIFICADORES (parâmetro `defuzzificador`):
+- 'amostrado': reproduz o skfuzzy (grade do universo + cruzamentos com o corte)
+- 'exato': centroide em forma fechada, calculado apenas nos vértices da
+  agregação linear por trechos (ver BaseRegrasVetorizada.defuzzificar_exato)
+
+EQUIVALÊNCIA COM O SKFUZZY:
+O universo de saída é reamostrado como no skfuzzy (pontos onde cada termo
+cruza o seu nível de corte) e o centroide usa a mesma integração linear por
+trechos, logo os escores coincidem com os do skfuzzy até o arredondamento de
+ponto flutuante (TOLERANCIA_SKFUZZY, verificada em teste_motor_vetorizado.py).
+
+Pacientes para os quais nenhuma regra é ativada recebem NaN (no caminho
+skfuzzy o mesmo caso gera o KeyError descrito em SOLUCAO_KEYERROR_v21.md).
+"""
+
+import copy
+
+import numpy as np
+from skfuzzy.control.term import Term, TermAggregate
+
+import calculadora_desktop_albumina_opcional as calculadora
+from compilador_regras import compilar
+
+# Diferença máxima admitida entre este motor e o skfuzzy (pontos de escore)
+TOLERANCIA_SKFUZZY = 1e-6
+
+# Linhas avaliadas por bloco (limita a memória dos arrays intermediários)
+TAMANHO_BLOCO_PADRAO = 20000
+
+DEFUZZIFICADORES = ('amostrado', 'exato')
+
+# ==============================================================================
+# COMPILAÇÃO DE UM CONTROLSYSTEM EM ARRAYS
+# ==============================================================================
+
+def _expandir_antecedente(antecedente, colunas):
+    """Converte o antecedente de uma regra em forma normal disjuntiva
+
+    Retorna uma lista de conjunções, cada uma um conjunto de colunas da matriz
+    de pertinências. Como min/max formam um reticulado distributivo,
+    min(a, max(b, c)) == max(min(a, b), min(a, c)) e a expansão é exata sob
+    acumulação por máximo.
+    """
+    if isinstance(antecedente, Term):
+        return [frozenset([colunas[(antecedente.parent.label, antecedente.label)]])]
+
+    if isinstance(antecedente, TermAggregate):
+        if antecedente.kind == 'and':
+            esquerda = _expandir_antecedente(antecedente.term1, colunas)
+            direita = _expandir_antecedente(antecedente.term2, colunas)
+            return [a | b for a in esquerda for b in direita]
+        if antecedente.kind == 'or':
+            return (_expandir_antecedente(antecedente.term1, colunas)
+                    + _expandir_antecedente(antecedente.term2, colunas))
+        raise ValueError("Regras com negação (~) não são suportadas pelo motor vetorizado")
+
+    raise ValueError(f"Antecedente não reconhecido: {antecedente!r}")
+
+
+class BaseRegrasVetorizada:
+    """Base de regras Mamdani compilada em arrays NumPy
+
+    Parâmetros:
+    -----------
+    sistema : skfuzzy.control.ControlSystem
+        Sistema com um único consequente, AND = mínimo, OR = máximo,
+        acumulação por máximo e defuzzificação por centroide
+    ordem_entradas : list de str, opcional
+        Ordem dos antecedentes (padrão: ordem do grafo do skfuzzy)
+    defuzzificador : str
+        'amostrado' (igual ao skfuzzy) ou 'exato' (centroide em forma fechada)
+    """
+
+    def __init__(self, sistema, ordem_entradas=None, defuzzificador='amostrado'):
+        antecedentes = {a.label: a for a in sistema.antecedents}
+        consequentes = list(sistema.consequents)
+        if len(consequentes) != 1:
+            raise ValueError("O motor vetorizado exige exatamente um consequente")
+        saida = consequentes[0]
+        if saida.defuzzify_method != 'centroid':
+            raise ValueError(f"Defuzzificação não suportada: {saida.defuzzify_method}")
+
+        entradas = list(ordem_entradas) if ordem_entradas is not None else list(antecedentes)
+        if sorted(entradas) != sorted(antecedentes):
+            raise ValueError(f"Entradas esperadas: {sorted(antecedentes)}")
+        self._montar_variaveis(
+            entradas,
+            [np.asarray(antecedentes[nome].universe, dtype=float) for nome in entradas],
+            [[(rotulo, np.asarray(termo.mf, dtype=float)) for rotulo, termo in antecedentes[nome].terms.items()]
+             for nome in entradas],
+            saida.label, np.asarray(saida.universe, dtype=float),
+            [(rotulo, np.asarray(termo.mf, dtype=float)) for rotulo, termo in saida.terms.items()],
+            defuzzificador)
+
+        # Regras -> conjunções de colunas + termo de saída + peso
+        conjuncoes, consequentes_regras, pesos = [], [], []
+        for regra in sistema.rules:
+            if regra.and_func is not np.fmin or regra.or_func is not np.fmax:
+                raise ValueError("O motor vetorizado exige AND = mínimo e OR = máximo")
+            for conjuncao in _expandir_antecedente(regra.antecedent, self.colunas):
+                for termo_ponderado in regra.consequent:
+                    conjuncoes.append(sorted(conjuncao))
+                    consequentes_regras.append(self.rotulos_saida.index(termo_ponderado.term.label))
+                    pesos.append(float(termo_ponderado.weight))
+        self._montar_regras(conjuncoes, consequentes_regras, pesos)
+
+    @classmethod
+    def da_base_compilada(cls, base, defuzzificador='amostrado'):
+        """Motor a partir de uma compilador_regras.BaseCompilada, sem passar pelo skfuzzy
+
+        As entradas ficam na ordem da definição em bases_regras.py e todas as
+        regras têm peso 1.
+        """
+        motor = cls.__new__(cls)
+        motor._montar_variaveis(
+            base.entradas,
+            [np.asarray(universo, dtype=float) for universo in base.universos],
+            [list(zip(rotulos, np.asarray(mfs, dtype=float))) for rotulos, mfs in zip(base.rotulos, base.pertinencias)],
+            base.saida, np.asarray(base.universo_saida, dtype=float),
+            list(zip(base.rotulos_saida, np.asarray(base.pertinencias_saida, dtype=float))),
+            defuzzificador)
+        conjuncoes = [sorted(motor.colunas[(nome, rotulos[t])]
+                             for nome, rotulos, t in zip(base.entradas, base.rotulos, indices) if t >= 0)
+                      for indices in base.antecedentes]
+        motor._montar_regras(conjuncoes, base.consequentes, np.ones(base.n_conjuncoes))
+        return motor
+
+    def _montar_variaveis(self, entradas, universos, termos, saida, universo_saida, termos_saida, defuzzificador):
+        if defuzzificador not in DEFUZZIFICADORES:
+            raise ValueError(f"Defuzzificador inválido: {defuzzificador} (opções: {DEFUZZIFICADORES})")
+        self.defuzzificador = defuzzificador
+        self.entradas = list(entradas)
+        self.saida = saida
+
+        # Termos dos antecedentes -> colunas da matriz de pertinências
+        self.universos = list(universos)
+        self.termos = [list(termos_variavel) for termos_variavel in termos]
+        self.colunas = {}
+        for nome, termos_variavel in zip(self.entradas, self.termos):
+            for rotulo, _ in termos_variavel:
+                self.colunas[(nome, rotulo)] = len(self.colunas)
+        self.n_termos = len(self.colunas)
+
+        # Termos do consequente
+        self.universo_saida = universo_saida
+        self.rotulos_saida = [rotulo for rotulo, _ in termos_saida]
+        self.mfs_saida = np.array([mf for _, mf in termos_saida])
+        self._preparar_cruzamentos()
+        self._preparar_vertices()
+
+    def _montar_regras(self, conjuncoes, consequentes, pesos):
+        # Conjunções mais curtas são completadas com a coluna de uns (neutra no mínimo)
+        largura = max(len(c) for c in conjuncoes)
+        self.antecedentes = np.full((len(conjuncoes), largura), self.n_termos, dtype=np.intp)
+        for i, conjuncao in enumerate(conjuncoes):
+            self.antecedentes[i, :len(conjuncao)] = conjuncao
+        self.consequentes = np.array(consequentes, dtype=np.intp)
+        self.pesos = np.array(pesos, dtype=float)
+        self._regras_por_saida = [np.flatnonzero(self.consequentes == k)
+                                  for k in range(len(self.rotulos_saida))]
+
+    @property
+    def n_regras(self):
+        return len(self.consequentes)
+
+    def com_pertinencias(self, substituicoes):
+        """Cópia do motor com as pertinências de alguns termos de ENTRADA trocadas
+
+        Parâmetros:
+        -----------
+        substituicoes : dict
+            {(entrada, rótulo do termo): pertinência amostrada no universo da entrada}
+
+        Retorna:
+        --------
+        BaseRegrasVetorizada : regras e saída compartilhadas com o original
+        """
+        desconhecidos = [chave for chave in substituicoes if chave not in self.colunas]
+        if desconhecidos:
+            raise KeyError(f"Termos de entrada desconhecidos: {desconhecidos}")
+        termos = []
+        for nome, universo, termos_variavel in zip(self.entradas, self.universos, self.termos):
+            novos = []
+            for rotulo, mf in termos_variavel:
+                if (nome, rotulo) in substituicoes:
+                    mf = np.asarray(substituicoes[(nome, rotulo)], dtype=float)
+                    if mf.shape != universo.shape:
+                        raise ValueError(f"Pertinência de {nome}[{rotulo}] com {mf.shape[0]} pontos "
+                                         f"(universo tem {len(universo)})")
+                novos.append((rotulo, mf))
+            termos.append(novos)
+        copia = copy.copy(self)
+        copia.termos = termos
+        return copia
+
+    def _preparar_cruzamentos(self):
+        """Separa o trecho crescente e o decrescente de cada termo de saída
+
+        São usados para achar os pontos onde cada termo cruza o seu nível de
+        corte, com a mesma fórmula de skfuzzy.fuzzymath._interp_universe_fast
+        (assim os pontos reamostrados coincidem bit a bit com os do skfuzzy).
+        """
+        x = self.universo_saida
+        self._trechos_saida = []
+        for mf in self.mfs_saida:
+            topo = np.flatnonzero(mf == mf.max())
+            inicio, fim = topo[0], topo[-1]
+            zeros_antes = np.flatnonzero(mf[:inicio + 1] == 0)
+            zeros_depois = np.flatnonzero(mf[fim:] == 0)
+            z0 = zeros_antes[-1] if len(zeros_antes) else 0
+            z1 = fim + zeros_depois[0] if len(zeros_depois) else len(mf) - 1
+            trechos = []
+            if inicio > z0:
+                trechos.append((x[z0:inicio + 1], mf[z0:inicio + 1], True))
+            if z1 > fim:
+                trechos.append((x[fim:z1 + 1], mf[fim:z1 + 1], False))
+            self._trechos_saida.append(trechos)
+
+    @staticmethod
+    def _cruzamento(x_trecho, mf_trecho, crescente, corte):
+        """Ponto onde um trecho monotônico do termo atinge o nível `corte`
+
+        Quando o corte está acima do trecho devolve uma extremidade da grade
+        (ponto repetido, que não altera o centroide).
+        """
+        n = len(mf_trecho)
+        if crescente:
+            # Primeiro segmento com mf[i] < corte <= mf[i+1] (corte 0: mf[i] == 0)
+            idx = np.searchsorted(mf_trecho, corte, side='left') - 1
+            fora = corte > mf_trecho[-1]
+            extremidade = x_trecho[-1]
+        else:
+            # Último ponto com mf >= corte (corte 0: mf > 0), como no skfuzzy
+            invertido = mf_trecho[::-1]
+            acima = np.where(corte > 0,
+                             n - np.searchsorted(invertido, corte, side='left'),
+                             n - np.searchsorted(invertido, corte, side='right'))
+            idx = acima - 1
+            fora = corte > mf_trecho[0]
+            extremidade = x_trecho[0]
+        idx = np.clip(idx, 0, n - 2)
+        x0, x1 = x_trecho[idx], x_trecho[idx + 1]
+        y0, y1 = mf_trecho[idx], mf_trecho[idx + 1]
+        return np.where(fora, extremidade, x0 + (corte - y0) * (x1 - x0) / (y1 - y0))
+
+    def _preparar_vertices(self):
+        """Pré-calcula o que o centroide exato precisa e que não depende do corte
+
+        Cada termo de saída é linear entre os seus vértices (pontos onde a
+        inclinação muda). Depois do corte e da agregação por máximo, os vértices
+        da agregação só podem estar em:
+        - vértices dos termos (fixos)
+        - interseções entre arestas de termos diferentes (fixas)
+        - pontos onde a aresta de um termo cruza o corte de um termo que se
+          sobrepõe a ele (dependem do paciente; ver _pares_sobrepostos)
+        """
+        x = self.universo_saida
+        arestas = []
+        vertices = [x[:1], x[-1:]]
+        for k, mf in enumerate(self.mfs_saida):
+            inclinacao = np.diff(mf) / np.diff(x)
+            quebras = np.flatnonzero(np.abs(np.diff(inclinacao)) > 1e-12) + 1
+            indices = np.concatenate([[0], quebras, [len(x) - 1]])
+            vertices.append(x[indices])
+            for i, j in zip(indices[:-1], indices[1:]):
+                a = (mf[j] - mf[i]) / (x[j] - x[i])
+                arestas.append((k, x[i], x[j], a, mf[i] - a * x[i]))
+
+        for n, (k1, ini1, fim1, a1, b1) in enumerate(arestas):
+            for k2, ini2, fim2, a2, b2 in arestas[n + 1:]:
+                if k1 == k2 or a1 == a2:
+                    continue
+                ponto = (b2 - b1) / (a1 - a2)
+                if max(ini1, ini2) <= ponto <= min(fim1, fim2):
+                    vertices.append(np.array([ponto]))
+        self._vertices_fixos = np.unique(np.concatenate(vertices))
+
+        # Pares (termo da aresta, termo do corte) cujos suportes abertos se sobrepõem
+        suportes = []
+        for mf in self.mfs_saida:
+            positivos = np.flatnonzero(mf > 0)
+            suportes.append((x[max(positivos[0] - 1, 0)], x[min(positivos[-1] + 1, len(x) - 1)]))
+        self._pares_sobrepostos = [
+            (j, k) for j in range(len(suportes)) for k in range(len(suportes))
+            if max(suportes[j][0], suportes[k][0]) < min(suportes[j][1], suportes[k][1])
+        ]
+
+    # --------------------------------------------------------------------------
+    # Etapas da inferência
+    # --------------------------------------------------------------------------
+
+    def colunas_entrada(self, entradas):
+        """Colunas float das entradas, na ordem de self.entradas (escalares viram arrays de 1)"""
+        colunas = [np.atleast_1d(np.asarray(entradas[nome], dtype=float)) for nome in self.entradas]
+        return np.broadcast_arrays(*colunas)
+
+    def pertinencias(self, entradas):
+        """Matriz de pertinências (N x termos + 1); a última coluna vale 1"""
+        colunas = self.colunas_entrada(entradas)
+        n = len(colunas[0])
+        matriz = np.ones((n, self.n_termos + 1))
+        for nome, valores, universo, termos in zip(self.entradas, colunas, self.universos, self.termos):
+            # Como o skfuzzy (clip_to_bounds=True), entradas fora do universo são recortadas
+            valores = np.clip(valores, universo.min(), universo.max())
+            for rotulo, mf in termos:
+                matriz[:, self.colunas[(nome, rotulo)]] = np.interp(valores, universo, mf)
+        return matriz
+
+    def forcas_regras(self, pertinencias):
+        """Força de ativação de cada regra (N x regras)"""
+        return pertinencias[:, self.antecedentes].min(axis=2) * self.pesos
+
+    def cortes(self, forcas):
+        """Nível de corte de cada termo de saída (N x termos de saída)"""
+        cortes = np.zeros((forcas.shape[0], len(self.rotulos_saida)))
+        for k, regras in enumerate(self._regras_por_saida):
+            if len(regras):
+                cortes[:, k] = forcas[:, regras].max(axis=1)
+        return cortes
+
+    def defuzzificar(self, cortes):
+        """Centroide da agregação dos termos recortados (NaN se tudo for zero)"""
+        x = self.universo_saida
+        n = cortes.shape[0]
+
+        # Universo reamostrado: grade original + cruzamentos de cada termo com o corte.
+        # Pontos repetidos geram trechos de largura zero e não alteram o centroide.
+        cruzamentos = [self._cruzamento(x_trecho, mf_trecho, crescente, cortes[:, k])
+                       for k, trechos in enumerate(self._trechos_saida)
+                       for x_trecho, mf_trecho, crescente in trechos]
+        pontos = np.concatenate([np.broadcast_to(x, (n, len(x))), np.column_stack(cruzamentos)], axis=1)
+        pontos.sort(axis=1)
+
+        agregado = np.zeros_like(pontos)
+        for k, mf in enumerate(self.mfs_saida):
+            np.maximum(agregado, np.minimum(cortes[:, k:k + 1], np.interp(pontos, x, mf)), out=agregado)
+
+        return centroide_linear_por_trechos(pontos, agregado)
+
+    def defuzzificar_exato(self, cortes):
+        """Centroide exato da agregação, em forma fechada
+
+        A agregação é linear entre vértices consecutivos, então o centroide
+        calculado só nesses pontos é exato (sem a grade de 101 pontos). Difere
+        do skfuzzy apenas onde este interpola sobre um vértice que cai entre
+        dois pontos da grade.
+        """
+        n = cortes.shape[0]
+        cruzamentos = [self._cruzamento(x_trecho, mf_trecho, crescente, cortes[:, k])
+                       for j, k in self._pares_sobrepostos
+                       for x_trecho, mf_trecho, crescente in self._trechos_saida[j]]
+        pontos = np.concatenate([np.broadcast_to(self._vertices_fixos, (n, len(self._vertices_fixos))),
+                                 np.column_stack(cruzamentos)], axis=1)
+        pontos.sort(axis=1)
+
+        agregado = np.zeros_like(pontos)
+        for k, mf in enumerate(self.mfs_saida):
+            np.maximum(agregado, np.minimum(cortes[:, k:k + 1], np.interp(pontos, self.universo_saida, mf)),
+                       out=agregado)
+
+        return centroide_linear_por_trechos(pontos, agregado)
+
+    def avaliar(self, entradas, tamanho_bloco=TAMANHO_BLOCO_PADRAO, defuzzificador=None):
+        """Escore defuzzificado de cada paciente
+
+        Parâmetros:
+        -----------
+        entradas : dict
+            {rótulo do antecedente: array de valores}; escalares são
+            propagados para o comprimento das demais colunas
+        defuzzificador : str, opcional
+            'amostrado' ou 'exato' (padrão: o da instância)
+
+        Retorna:
+        --------
+        np.ndarray : escores (0-100), NaN onde nenhuma regra foi ativada
+        """
+        defuzzificador = defuzzificador or self.defuzzificador
+        if defuzzificador not in DEFUZZIFICADORES:
+            raise ValueError(f"Defuzzificador inválido: {defuzzificador} (opções: {DEFUZZIFICADORES})")
+        defuzzificar = self.defuzzificar_exato if defuzzificador == 'exato' else self.defuzzificar
+
+        colunas = self.colunas_entrada(entradas)
+        n = len(colunas[0])
+        escores = np.empty(n)
+        for inicio in range(0, n, tamanho_bloco):
+            bloco = {nome: valores[inicio:inicio + tamanho_bloco]
+                     for nome, valores in zip(self.entradas, colunas)}
+            forcas = self.forcas_regras(self.pertinencias(bloco))
+            escores[inicio:inicio + tamanho_bloco] = defuzzificar(self.cortes(forcas))
+        return escores
+
+
+def centroide_linear_por_trechos(pontos, pertinencia):
+    """Centroide de funções lineares por trechos, uma por linha
+
+    Mesma integração do skfuzzy.defuzzify.centroid: entre dois pontos
+    consecutivos a pertinência é linear, logo área e momento de cada trapézio
+    são exatos.
+    """
+    x1, x2 = pontos[:, :-1], pontos[:, 1:]
+    y1, y2 = pertinencia[:, :-1], pertinencia[:, 1:]
+    dx = x2 - x1
+    area = (0.5 * dx * (y1 + y2)).sum(axis=1)
+    momento = (dx * (y1 * (2 * x1 + x2) + y2 * (x1 + 2 * x2)) / 6.0).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(area > 0, momento / np.where(area > 0, area, 1.0), np.nan)
+
+# ==============================================================================
+# MOTORES DA CALCULADORA (COMPILADOS UMA ÚNICA VEZ POR PROCESSO)
+# ==============================================================================
+
+_MOTORES = {}
+
+def obter_motor(nome):
+    """Retorna a BaseRegrasVetorizada da base `nome`, minimizada (ver compilador_regras.compilar)"""
+    if nome not in _MOTORES:
+        _MOTORES[nome] = BaseRegrasVetorizada.da_base_compilada(compilar(nome, minimizada=True))
+    return _MOTORES[nome]
+
+def _avaliar(nome, colunas, defuzzificador):
+    motor = obter_motor(nome)
+    return motor.avaliar(dict(zip(motor.entradas, colunas)), defuzzificador=defuzzificador)
+
+def calcular_fenotipico_vetorizado(imc, perda, sarcopenia, defuzzificador='amostrado'):
+    """Submódulo 1 para arrays de pacientes (mesma semântica de calcular_submodulo_fenotipico)"""
+    return _avaliar('fenotipico', (imc, perda, sarcopenia), defuzzificador)
+
+def calcular_ingestao_vetorizado(vet, duracao, sintomas, defuzzificador='amostrado'):
+    """Submódulo 2 para arrays de pacientes"""
+    return _avaliar('ingestao', (vet, duracao, sintomas), defuzzificador)
+
+def calcular_inflamatorio_vetorizado(pcr, albumina, febre, defuzzificador='amostrado'):
+    """Submódulo 3 (modo completo, com albumina) para arrays de pacientes"""
+    return _avaliar('inflamatorio', (pcr, albumina, febre), defuzzificador)
+
+def calcular_inflamatorio_simplificado_vetorizado(pcr, febre, defuzzificador='amostrado'):
+    """Submódulo 3 (modo simplificado, sem albumina) para arrays de pacientes"""
+    return _avaliar('inflamatorio_simplificado', (pcr, febre), defuzzificador)
+
+def calcular_gravidade_vetorizado(diagnostico, comorbidades, idade, cirurgia, defuzzificador='amostrado'):
+    """Submódulo 4 para arrays de pacientes"""
+    return _avaliar('gravidade', (diagnostico, comorbidades, idade, cirurgia), defuzzificador)
+
+def calcular_risco_final_vetorizado(escore_fen, escore_ing, escore_inf, escore_grav, modo_completo=True,
+                                    defuzzificador='amostrado'):
+    """Módulo integrador para arrays de escores dos submódulos"""
+    return _avaliar(calculadora.chave_integrador(modo_completo),
+                    (escore_fen, escore_ing, escore_inf, escore_grav), defuzzificador)
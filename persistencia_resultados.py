@@ -0,0 +1,278 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Persistência dos Resultados em CSV (arquivo aberto, gravação em lotes, trava)
+
+salvar_csv reabria dados_pacientes.csv, consultava os.path.isfile e gravava
+uma linha a cada cálculo, sem nada que impedisse duas calculadoras abertas
+sobre a mesma pasta de rede de intercalar gravações (ou de gravarem, as
+duas, o cabeçalho num arquivo novo). GravadorResultados:
+
+- Mantém o arquivo aberto em modo de acréscimo entre gravações
+- Acumula as linhas em memória e as grava em lotes de `linhas_por_descarga`
+  (1 = toda linha vai para o disco na hora), com os.fsync opcional a cada
+  descarga
+- Grava cada lote sob uma TRAVA CONSULTIVA do arquivo (fcntl.flock no
+  Linux/Mac, msvcrt.locking no Windows): lotes de processos diferentes nunca
+  se misturam, e o cabeçalho é escrito só se o arquivo estiver vazio no
+  momento da gravação
+- Reabre o arquivo se ele tiver sido apagado ou substituído por outro
+  processo enquanto estava aberto
+
+Linhas ainda em memória são gravadas em fechar() e na saída do programa.
+
+BENCHMARK DE VAZÃO:
+    python persistencia_resultados.py [--linhas 20000]
+compara a gravação antiga (reabrir a cada linha) com as políticas de
+descarga/fsync do gravador.
+"""
+
+import argparse
+import atexit
+import csv
+import io
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:          # Windows
+    fcntl = None
+    import msvcrt
+
+TEMPO_LIMITE_TRAVA_PADRAO = 10.0
+
+# ==============================================================================
+# TRAVA CONSULTIVA DO ARQUIVO
+# ==============================================================================
+
+def _tentar_travar(arquivo):
+    """Tenta obter a trava exclusiva sem bloquear; True se conseguiu"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            # msvcrt trava uma faixa de bytes a partir da posição atual: o
+            # primeiro byte do arquivo serve de trava para o arquivo todo
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _destravar(arquivo):
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def travar(arquivo, tempo_limite=TEMPO_LIMITE_TRAVA_PADRAO):
+    """Obtém a trava exclusiva do arquivo, esperando até `tempo_limite` segundos
+
+    Raises:
+    -------
+    TimeoutError : outro processo manteve a trava por todo o tempo limite
+    """
+    prazo = time.monotonic() + tempo_limite
+    espera = 0.001
+    while not _tentar_travar(arquivo):
+        if time.monotonic() >= prazo:
+            raise TimeoutError(f"Arquivo travado por outro processo: {arquivo.name}")
+        time.sleep(espera)
+        espera = min(espera * 2, 0.05)
+
+# ==============================================================================
+# GRAVADOR
+# ==============================================================================
+
+class GravadorResultados:
+    """Acréscimo de linhas a um CSV compartilhado, em lotes e sob trava
+
+    Parâmetros:
+    -----------
+    caminho : str
+        Arquivo CSV (criado na primeira descarga)
+    cabecalho : list de str, opcional
+        Escrito antes da primeira linha quando o arquivo está vazio
+    linhas_por_descarga : int
+        Linhas acumuladas antes de gravar; 1 grava cada linha imediatamente
+    fsync : bool
+        Força os dados até o disco (os.fsync) a cada descarga
+    tempo_limite_trava : float
+        Espera máxima, em segundos, pela trava de outro processo
+    """
+
+    def __init__(self, caminho, cabecalho=None, linhas_por_descarga=1, fsync=True,
+                 tempo_limite_trava=TEMPO_LIMITE_TRAVA_PADRAO):
+        if linhas_por_descarga < 1:
+            raise ValueError("linhas_por_descarga deve ser >= 1")
+        self.caminho = caminho
+        self.cabecalho = list(cabecalho) if cabecalho is not None else None
+        self.linhas_por_descarga = linhas_por_descarga
+        self.fsync = fsync
+        self.tempo_limite_trava = tempo_limite_trava
+        self._arquivo = None
+        self._pendentes = []
+        self._trava = threading.Lock()
+        self.linhas_gravadas = 0
+        self.descargas = 0
+        atexit.register(self.fechar)
+
+    @property
+    def pendentes(self):
+        """Linhas ainda em memória"""
+        return len(self._pendentes)
+
+    def escrever(self, linha):
+        """Acrescenta uma linha (lista de valores); grava o lote se ele completou"""
+        with self._trava:
+            self._pendentes.append(list(linha))
+            if len(self._pendentes) >= self.linhas_por_descarga:
+                self._descarregar()
+
+    def escrever_varias(self, linhas):
+        with self._trava:
+            self._pendentes.extend(list(linha) for linha in linhas)
+            if len(self._pendentes) >= self.linhas_por_descarga:
+                self._descarregar()
+
+    def descarregar(self):
+        """Grava imediatamente as linhas em memória"""
+        with self._trava:
+            self._descarregar()
+
+    def fechar(self):
+        """Grava o que estiver em memória e fecha o arquivo"""
+        with self._trava:
+            try:
+                self._descarregar()
+            finally:
+                if self._arquivo is not None:
+                    self._arquivo.close()
+                    self._arquivo = None
+        atexit.unregister(self.fechar)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def _substituido(self):
+        """True se o arquivo aberto foi apagado ou substituído por outro processo"""
+        try:
+            return not os.path.samestat(os.fstat(self._arquivo.fileno()), os.stat(self.caminho))
+        except FileNotFoundError:
+            return True
+
+    def _abrir_travado(self):
+        """Abre (ou reabre) o arquivo e obtém a trava do arquivo que está em `caminho`"""
+        while True:
+            if self._arquivo is not None and self._substituido():
+                self._arquivo.close()
+                self._arquivo = None
+            if self._arquivo is None:
+                self._arquivo = open(self.caminho, 'a', newline='', encoding='utf-8')
+            travar(self._arquivo, self.tempo_limite_trava)
+            if not self._substituido():
+                return
+            # Apagado ou substituído enquanto esperávamos a trava
+            _destravar(self._arquivo)
+
+    def _descarregar(self):
+        if not self._pendentes:
+            return
+        texto = io.StringIO()
+        escritor = csv.writer(texto)
+        self._abrir_travado()
+        try:
+            if self.cabecalho is not None and os.fstat(self._arquivo.fileno()).st_size == 0:
+                escritor.writerow(self.cabecalho)
+            escritor.writerows(self._pendentes)
+            self._arquivo.write(texto.getvalue())
+            self._arquivo.flush()
+            if self.fsync:
+                os.fsync(self._arquivo.fileno())
+        finally:
+            _destravar(self._arquivo)
+        self.linhas_gravadas += len(self._pendentes)
+        self.descargas += 1
+        self._pendentes = []
+
+# ==============================================================================
+# BENCHMARK DE VAZÃO
+# ==============================================================================
+
+CABECALHO_BENCHMARK = ['Data', 'Hora', 'Modo', 'IMC', 'Perda%', 'Sarcopenia', 'VET%', 'Duracao',
+                       'SintomasGI', 'PCR', 'Albumina', 'Febre', 'Diagnostico', 'Comorbidades',
+                       'Idade', 'Cirurgia', 'Escore_Fenotipico', 'Escore_Ingestao',
+                       'Escore_Inflamatorio', 'Escore_Gravidade', 'Escore_Final', 'Categoria']
+
+
+def _linha_exemplo(i):
+    return ['18/10/2026', '14:00:00', 'COMPLETO (com albumina)', 22.0 + i % 10, 5.0, 1.0, 60.0, 10.0,
+            1.0, 40.0, 3.2, 1.0, 2.0, 2.0, 70.0, 0.0, '42.2', '38.1', '35.0', '51.7', '45.3', 'MODERADO']
+
+
+def _gravar_como_antes(caminho, linha):
+    """Gravação original de salvar_csv: abre, confere o arquivo e grava uma linha"""
+    arquivo_existe = os.path.isfile(caminho)
+    with open(caminho, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not arquivo_existe:
+            writer.writerow(CABECALHO_BENCHMARK)
+        writer.writerow(linha)
+
+
+def medir_vazao(caminho, linhas, linhas_por_descarga=None, fsync=False):
+    """Linhas por segundo ao acrescentar `linhas` linhas em `caminho`
+
+    linhas_por_descarga=None mede a gravação antiga (reabrir a cada linha).
+    """
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    inicio = time.perf_counter()
+    if linhas_por_descarga is None:
+        for i in range(linhas):
+            _gravar_como_antes(caminho, _linha_exemplo(i))
+    else:
+        with GravadorResultados(caminho, CABECALHO_BENCHMARK, linhas_por_descarga, fsync) as gravador:
+            for i in range(linhas):
+                gravador.escrever(_linha_exemplo(i))
+    return linhas / (time.perf_counter() - inicio)
+
+
+POLITICAS_BENCHMARK = (
+    # (descrição, linhas_por_descarga, fsync)
+    ("Antigo: reabrir a cada linha", None, False),
+    ("Gravador: 1 linha por descarga", 1, False),
+    ("Gravador: 1 linha por descarga + fsync", 1, True),
+    ("Gravador: 100 linhas por descarga", 100, False),
+    ("Gravador: 100 linhas por descarga + fsync", 100, True),
+    ("Gravador: 1000 linhas por descarga + fsync", 1000, True),
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vazão de gravação contínua de resultados em CSV")
+    parser.add_argument('--linhas', type=int, default=20000, help="linhas gravadas por política (padrão: 20000)")
+    parser.add_argument('--pasta', default=None, help="pasta do arquivo de teste (padrão: temporária)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.pasta) as pasta:
+        caminho = os.path.join(pasta, 'vazao.csv')
+        print("="*80)
+        print(f"VAZÃO DE GRAVAÇÃO - {args.linhas} linhas em {pasta}")
+        print("="*80)
+        print(f"{'Política':<48}{'Linhas/s':>14}")
+        print("-"*80)
+        for descricao, linhas_por_descarga, fsync in POLITICAS_BENCHMARK:
+            # fsync por linha é ordens de grandeza mais lento: mede menos linhas
+            linhas = args.linhas if not (fsync and linhas_por_descarga == 1) else max(args.linhas // 20, 100)
+            vazao = medir_vazao(caminho, linhas, linhas_por_descarga, fsync)
+            print(f"{descricao:<48}{vazao:>14,.0f}")
+        print("="*80)
@@ -0,0 +1,261 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Pipeline de Pontuação de Pacientes (ponta a ponta, vetorizado)
+
+Um único ponto de entrada, pontuar_pacientes(lote), executa os 4 submódulos
+e o módulo integrador para um lote inteiro de pacientes, com o modo escolhido
+linha a linha:
+
+- Albumina informada  -> inflamatório COMPLETO + integrador completo
+- Albumina ausente    -> inflamatório SIMPLIFICADO + integrador simplificado
+  (None, NaN ou string vazia/"N/A", como gravado no CSV da calculadora)
+
+Os resultados voltam na mesma ordem das linhas de entrada.
+"""
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calculadora
+import motor_vetorizado as mv
+
+# Campos de entrada de cada paciente (mesma ordem do formulário da calculadora)
+CAMPOS_ENTRADA = ('imc', 'perda', 'sarcopenia', 'vet', 'duracao', 'sintomas',
+                  'pcr', 'albumina', 'febre', 'diagnostico', 'comorbidades', 'idade', 'cirurgia')
+
+MODO_COMPLETO = "COMPLETO (com albumina)"
+MODO_SIMPLIFICADO = "SIMPLIFICADO (sem albumina)"
+
+# Faixas aceitas de cada campo: as do formulário da calculadora (validar_campos)
+# e, nos campos escolhidos em lista, os códigos das opções
+FAIXAS_ENTRADA = {
+    'imc': (12, 50), 'perda': (0, 30), 'sarcopenia': (0, 3),
+    'vet': (0, 100), 'duracao': (0, 30), 'sintomas': (0, 3),
+    'pcr': (0, 400), 'albumina': (1.5, 5.0), 'febre': (0, 3),
+    'diagnostico': (0, 3), 'comorbidades': (0, 5), 'idade': (18, 100), 'cirurgia': (0, 1),
+}
+
+# ==============================================================================
+# NORMALIZAÇÃO DO LOTE
+# ==============================================================================
+
+def valor_numerico(valor):
+    """Converte um valor de entrada em float; ausente (None, '', 'N/A') vira NaN"""
+    if valor is None:
+        return np.nan
+    if isinstance(valor, str):
+        valor = valor.strip()
+        if valor == '' or valor.upper() == 'N/A':
+            return np.nan
+    return float(valor)
+
+def normalizar_lote(lote, validar=True):
+    """Colunas float (NaN = albumina ausente) de um dict de colunas ou lista de dicts
+
+    Parâmetros:
+    -----------
+    lote : dict ou list de dict
+    validar : bool
+        Se True, campo obrigatório ausente e pacientes com valor não finito
+        ou fora de FAIXAS_ENTRADA levantam ValueError (com os índices); com
+        False quem chama confere com linhas_invalidas() (que também aponta os
+        obrigatórios ausentes) e decide o que fazer com eles
+
+    Raises:
+    -------
+    KeyError : campo ausente num lote em colunas
+    ValueError : colunas de tamanhos diferentes ou (com validar) campo
+                 obrigatório ausente ou pacientes fora das faixas
+    """
+    if isinstance(lote, dict):
+        faltando = [campo for campo in CAMPOS_ENTRADA if campo not in lote]
+        if faltando:
+            raise KeyError(f"Campos ausentes no lote: {faltando}")
+        colunas = {}
+        for campo in CAMPOS_ENTRADA:
+            valores = lote[campo]
+            if isinstance(valores, np.ndarray) and valores.dtype.kind == 'f':
+                colunas[campo] = np.atleast_1d(valores).astype(float, copy=False)
+            else:
+                colunas[campo] = np.array([valor_numerico(v) for v in np.atleast_1d(valores)], dtype=float)
+    else:
+        registros = list(lote)
+        colunas = {campo: np.array([valor_numerico(r.get(campo)) for r in registros], dtype=float)
+                   for campo in CAMPOS_ENTRADA}
+
+    tamanhos = {len(valores) for valores in colunas.values()}
+    if len(tamanhos) > 1:
+        raise ValueError(f"Colunas do lote com tamanhos diferentes: {sorted(tamanhos)}")
+
+    if not validar:
+        return colunas
+    obrigatorios = [campo for campo in CAMPOS_ENTRADA if campo != 'albumina' and np.isnan(colunas[campo]).any()]
+    if obrigatorios:
+        raise ValueError(f"Valores ausentes em campos obrigatórios: {obrigatorios}")
+    invalidas = linhas_invalidas(colunas)
+    if invalidas:
+        exemplos = "; ".join(f"paciente {i}: {motivo}" for i, motivo in list(invalidas.items())[:5])
+        restantes = f" (e mais {len(invalidas) - 5})" if len(invalidas) > 5 else ""
+        raise ValueError(f"{len(invalidas)} paciente(s) com valores inválidos: {exemplos}{restantes}")
+    return colunas
+
+def validar_faixas(valores, rotulos=None):
+    """Confere os campos de um paciente contra FAIXAS_ENTRADA
+
+    Sem isso normalizar_lote aceita qualquer número e os motores recortam os
+    valores fora do universo (IMC 80 é pontuado como IMC 50).
+
+    Parâmetros:
+    -----------
+    valores : dict
+        {campo: float}; campos ausentes do dict não são conferidos, albumina
+        NaN (não dosada) é aceita
+    rotulos : dict, opcional
+        {campo: nome usado na mensagem} (ex.: a coluna do CSV)
+
+    Raises:
+    -------
+    ValueError : primeiro campo não finito ou fora da faixa
+    """
+    rotulos = rotulos or {}
+    for campo, (minimo, maximo) in FAIXAS_ENTRADA.items():
+        if campo not in valores:
+            continue
+        valor = valores[campo]
+        if campo == 'albumina' and np.isnan(valor):
+            continue
+        if np.isnan(valor):
+            raise ValueError(f"{rotulos.get(campo, campo)} ausente")
+        if not np.isfinite(valor):
+            raise ValueError(f"{rotulos.get(campo, campo)} não finito: {valor}")
+        if not minimo <= valor <= maximo:
+            raise ValueError(f"{rotulos.get(campo, campo)} fora da faixa {minimo}-{maximo}: {valor}")
+
+
+def linhas_invalidas(colunas):
+    """Pacientes com valor não finito ou fora de FAIXAS_ENTRADA
+
+    Parâmetros:
+    -----------
+    colunas : dict
+        Saída de normalizar_lote (albumina NaN = não dosada)
+
+    Retorna:
+    --------
+    dict : {índice do paciente: motivo}, em ordem de índice
+    """
+    n = len(colunas['imc'])
+    invalidas = np.zeros(n, dtype=bool)
+    for campo, (minimo, maximo) in FAIXAS_ENTRADA.items():
+        valores = colunas[campo]
+        fora = ~((valores >= minimo) & (valores <= maximo))
+        if campo == 'albumina':
+            fora &= ~np.isnan(valores)
+        invalidas |= fora
+    motivos = {}
+    for i in np.flatnonzero(invalidas).tolist():
+        try:
+            validar_faixas({campo: float(colunas[campo][i]) for campo in CAMPOS_ENTRADA})
+        except ValueError as e:
+            motivos[i] = str(e)
+    return motivos
+
+# ==============================================================================
+# ESCORES POR MODO (usados também pela sensibilidade e pela incerteza)
+# ==============================================================================
+
+def _por_modo(completo, calcular_completo, calcular_simplificado, colunas):
+    """Avalia cada linha no motor do seu modo (colunas: tupla de arrays)"""
+    escores = np.full(len(completo), np.nan)
+    simplificado = ~completo
+    if completo.any():
+        escores[completo] = calcular_completo(*(c[completo] for c in colunas))
+    if simplificado.any():
+        escores[simplificado] = calcular_simplificado(*(c[simplificado] for c in colunas))
+    return escores
+
+
+def calcular_escore_submodulo(submodulo, c, completo, defuzzificador='amostrado'):
+    """Escore de um submódulo para cada linha das colunas `c`
+
+    Parâmetros:
+    -----------
+    submodulo : str
+        'fenotipico', 'ingestao', 'inflamatorio' ou 'gravidade'
+    c : dict
+        Colunas já normalizadas (ver normalizar_lote), sem nova validação
+    completo : np.ndarray de bool
+        Linhas no modo completo (só muda o inflamatório)
+    """
+    if submodulo == 'fenotipico':
+        return mv.calcular_fenotipico_vetorizado(c['imc'], c['perda'], c['sarcopenia'], defuzzificador)
+    if submodulo == 'ingestao':
+        return mv.calcular_ingestao_vetorizado(c['vet'], c['duracao'], c['sintomas'], defuzzificador)
+    if submodulo == 'gravidade':
+        return mv.calcular_gravidade_vetorizado(c['diagnostico'], c['comorbidades'], c['idade'], c['cirurgia'],
+                                                defuzzificador)
+    return _por_modo(completo,
+                     lambda pcr, albumina, febre: mv.calcular_inflamatorio_vetorizado(
+                         pcr, albumina, febre, defuzzificador),
+                     lambda pcr, albumina, febre: mv.calcular_inflamatorio_simplificado_vetorizado(
+                         pcr, febre, defuzzificador),
+                     (c['pcr'], c['albumina'], c['febre']))
+
+
+def calcular_escore_final(escores, completo, defuzzificador='amostrado'):
+    """Integrador de cada linha no seu modo (escores: fen, ing, inf, grav)"""
+    return _por_modo(completo,
+                     lambda *e: mv.calcular_risco_final_vetorizado(*e, modo_completo=True,
+                                                                   defuzzificador=defuzzificador),
+                     lambda *e: mv.calcular_risco_final_vetorizado(*e, modo_completo=False,
+                                                                   defuzzificador=defuzzificador),
+                     escores)
+
+# ==============================================================================
+# PONTUAÇÃO DO LOTE
+# ==============================================================================
+
+def pontuar_pacientes(lote, defuzzificador='amostrado', validar=True):
+    """Pontua um lote de pacientes numa única passagem vetorizada
+
+    Parâmetros:
+    -----------
+    lote : dict ou list de dict
+        Colunas (ou registros) com os campos de CAMPOS_ENTRADA; albumina
+        pode faltar em qualquer linha
+    defuzzificador : str
+        'amostrado' (igual ao skfuzzy) ou 'exato' (ver motor_vetorizado)
+    validar : bool
+        Rejeita pacientes fora de FAIXAS_ENTRADA (ver normalizar_lote); False
+        só para pontos de varredura que saem de propósito das faixas clínicas
+
+    Retorna:
+    --------
+    dict com, para cada paciente na ordem de entrada:
+        escore_fenotipico, escore_ingestao, escore_inflamatorio,
+        escore_gravidade, escore_final : np.ndarray
+        modo_completo : np.ndarray de bool
+        modo : list de str (MODO_COMPLETO / MODO_SIMPLIFICADO)
+        categoria : list de str (None quando nenhuma regra foi ativada)
+    """
+    c = normalizar_lote(lote, validar)
+    completo = ~np.isnan(c['albumina'])
+
+    # Submódulos 1, 2 e 4 são iguais para ambos os modos; inflamatório e
+    # integrador - ADAPTATIVOS por linha
+    escore_fen = calcular_escore_submodulo('fenotipico', c, completo, defuzzificador)
+    escore_ing = calcular_escore_submodulo('ingestao', c, completo, defuzzificador)
+    escore_inf = calcular_escore_submodulo('inflamatorio', c, completo, defuzzificador)
+    escore_grav = calcular_escore_submodulo('gravidade', c, completo, defuzzificador)
+    escore_final = calcular_escore_final((escore_fen, escore_ing, escore_inf, escore_grav), completo,
+                                         defuzzificador)
+
+    return {
+        'escore_fenotipico': escore_fen,
+        'escore_ingestao': escore_ing,
+        'escore_inflamatorio': escore_inf,
+        'escore_gravidade': escore_grav,
+        'escore_final': escore_final,
+        'modo_completo': completo,
+        'modo': [MODO_COMPLETO if m else MODO_SIMPLIFICADO for m in completo],
+        'categoria': [None if np.isnan(e) else calculadora.categorizar_risco(e)[0] for e in escore_final],
+    }
@@ -0,0 +1,201 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Pontuação Paralela pelo Caminho de Referência (skfuzzy)
+
+Para auditorias os escores precisam vir da inferência de referência do
+skfuzzy (ControlSystemSimulation.compute), não do motor vetorizado. Esse
+caminho usa um único núcleo; este módulo distribui os pacientes entre
+processos com ProcessPoolExecutor:
+
+- Cada processo compila as bases de regras UMA vez, no inicializador
+  (construir_todos_sistemas)
+- O trabalho é enviado em blocos de pacientes, não uma tarefa por paciente
+- Os resultados voltam na ordem de entrada, no mesmo formato de
+  pipeline_pacientes.pontuar_pacientes
+- Cada paciente é validado (valores finitos, dentro de FAIXAS_ENTRADA) antes
+  de ir para o pool; os rejeitados não derrubam o lote: ficam com escores
+  NaN e são apontados em 'rejeitados' com o motivo
+
+RELATÓRIO DE ESCALABILIDADE:
+    python pontuacao_paralela.py [--pacientes N] [--max-trabalhadores K]
+mostra a vazão com 1, 2, ..., K processos.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calculadora
+from pipeline_pacientes import CAMPOS_ENTRADA, MODO_COMPLETO, MODO_SIMPLIFICADO, linhas_invalidas, normalizar_lote
+
+TAMANHO_BLOCO_PADRAO = 64
+
+# ==============================================================================
+# TRABALHO DE CADA PROCESSO
+# ==============================================================================
+
+def _inicializar_trabalhador():
+    """Compila as 7 bases de regras uma única vez por processo"""
+    calculadora.construir_todos_sistemas()
+
+def _ou_nan(funcao, *valores):
+    """Escore da função; NaN na zona sem regra ativada (KeyError, ver SOLUCAO_KEYERROR_v21.md)"""
+    try:
+        return funcao(*valores)
+    except KeyError:
+        return np.nan
+
+def _pontuar_paciente(imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre,
+                      diag, comorb, idade, cirurg):
+    """Escores de um paciente pela calculadora (skfuzzy), com a mesma convenção
+    de NaN do pipeline vetorizado"""
+    modo_completo = not np.isnan(albumina)
+    escore_fen = _ou_nan(calculadora.calcular_submodulo_fenotipico, imc, perda, sarco)
+    escore_ing = _ou_nan(calculadora.calcular_submodulo_ingestao, vet, duracao, sintomas)
+    if modo_completo:
+        escore_inf = _ou_nan(calculadora.calcular_submodulo_inflamatorio, pcr, albumina, febre)
+    else:
+        escore_inf = _ou_nan(calculadora.calcular_submodulo_inflamatorio_simplificado, pcr, febre)
+    escore_grav = _ou_nan(calculadora.calcular_submodulo_gravidade, diag, comorb, idade, cirurg)
+
+    escores = [escore_fen, escore_ing, escore_inf, escore_grav]
+    if np.isnan(escores).any():
+        return escores + [np.nan]
+    return escores + [_ou_nan(calculadora.calcular_risco_final_integrado, *escores, modo_completo)]
+
+def _pontuar_bloco(bloco):
+    """Pontua um bloco (array pacientes x 13 campos) e devolve array pacientes x 5 escores"""
+    return np.array([_pontuar_paciente(*linha) for linha in bloco.tolist()]).reshape(-1, 5)
+
+# ==============================================================================
+# DISTRIBUIÇÃO DO LOTE
+# ==============================================================================
+
+def pontuar_pacientes_paralelo(lote, trabalhadores=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, executor=None):
+    """Pontua um lote pelo caminho skfuzzy, distribuído entre processos
+
+    Parâmetros:
+    -----------
+    lote : dict ou list de dict
+        Mesmo formato de pipeline_pacientes.pontuar_pacientes
+    trabalhadores : int, opcional
+        Número de processos (padrão: os.cpu_count())
+    tamanho_bloco : int
+        Pacientes por tarefa enviada a um processo
+    executor : ProcessPoolExecutor, opcional
+        Pool já iniciado (com _inicializar_trabalhador) para reutilizar entre lotes
+
+    Retorna:
+    --------
+    dict : mesmas chaves de pipeline_pacientes.pontuar_pacientes, na ordem de
+           entrada, e rejeitados {índice: motivo} dos pacientes com valor não
+           finito ou fora de FAIXAS_ENTRADA (escores NaN, categoria None)
+    """
+    if tamanho_bloco < 1:
+        raise ValueError("tamanho_bloco deve ser >= 1")
+    colunas = normalizar_lote(lote, validar=False)
+    rejeitados = linhas_invalidas(colunas)
+    validos = np.ones(len(colunas['imc']), dtype=bool)
+    validos[list(rejeitados)] = False
+    matriz = np.column_stack([colunas[campo] for campo in CAMPOS_ENTRADA])[validos]
+    blocos = [matriz[i:i + tamanho_bloco] for i in range(0, len(matriz), tamanho_bloco)]
+
+    if executor is None:
+        with criar_executor(trabalhadores) as executor:
+            partes = list(executor.map(_pontuar_bloco, blocos))
+    else:
+        partes = list(executor.map(_pontuar_bloco, blocos))
+    escores = np.full((len(validos), 5), np.nan)
+    if partes:
+        escores[validos] = np.concatenate(partes)
+
+    completo = ~np.isnan(colunas['albumina'])
+    return {
+        'escore_fenotipico': escores[:, 0],
+        'escore_ingestao': escores[:, 1],
+        'escore_inflamatorio': escores[:, 2],
+        'escore_gravidade': escores[:, 3],
+        'escore_final': escores[:, 4],
+        'modo_completo': completo,
+        'modo': [MODO_COMPLETO if m else MODO_SIMPLIFICADO for m in completo],
+        'categoria': [None if np.isnan(e) else calculadora.categorizar_risco(e)[0] for e in escores[:, 4]],
+        'rejeitados': rejeitados,
+    }
+
+def criar_executor(trabalhadores=None):
+    """ProcessPoolExecutor cujos processos já compilam as bases de regras ao iniciar"""
+    return ProcessPoolExecutor(max_workers=trabalhadores or os.cpu_count(),
+                               initializer=_inicializar_trabalhador)
+
+# ==============================================================================
+# RELATÓRIO DE ESCALABILIDADE (1 A N NÚCLEOS)
+# ==============================================================================
+
+def _lote_aleatorio(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return {
+        'imc': rng.uniform(13, 45, n), 'perda': rng.uniform(0, 30, n), 'sarcopenia': rng.uniform(0, 3, n),
+        'vet': rng.uniform(0, 100, n), 'duracao': rng.uniform(0, 30, n), 'sintomas': rng.uniform(0, 3, n),
+        'pcr': rng.uniform(0, 300, n),
+        'albumina': np.where(rng.random(n) < 0.4, np.nan, rng.uniform(1.5, 5.0, n)),
+        'febre': rng.uniform(0, 3, n), 'diagnostico': rng.uniform(0, 3, n), 'comorbidades': rng.uniform(0, 5, n),
+        'idade': rng.uniform(18, 100, n), 'cirurgia': rng.integers(0, 2, n).astype(float),
+    }
+
+def relatorio_escalabilidade(n_pacientes=500, max_trabalhadores=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """Vazão (pacientes/s) com 1..max_trabalhadores processos
+
+    O tempo de iniciar o pool e compilar as regras em cada processo é medido
+    à parte, para que a vazão reflita só a pontuação.
+
+    Retorna:
+    --------
+    list de dict : trabalhadores, tempo_inicio, tempo, vazao, aceleracao, escores
+    """
+    lote = _lote_aleatorio(n_pacientes)
+    resultados = []
+    for trabalhadores in range(1, (max_trabalhadores or os.cpu_count()) + 1):
+        inicio = time.perf_counter()
+        with criar_executor(trabalhadores) as executor:
+            # Garante que todos os processos terminaram o inicializador
+            list(executor.map(_pontuar_bloco, [np.empty((0, 13))] * trabalhadores))
+            tempo_inicio = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            resultado = pontuar_pacientes_paralelo(lote, tamanho_bloco=tamanho_bloco, executor=executor)
+            tempo = time.perf_counter() - inicio
+
+        resultados.append({
+            'trabalhadores': trabalhadores,
+            'tempo_inicio': tempo_inicio,
+            'tempo': tempo,
+            'vazao': n_pacientes / tempo,
+            'aceleracao': resultados[0]['tempo'] / tempo if resultados else 1.0,
+            'escores': resultado['escore_final'],
+        })
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escalabilidade da pontuação paralela (caminho skfuzzy)")
+    parser.add_argument('--pacientes', type=int, default=500, help="pacientes pontuados em cada medição")
+    parser.add_argument('--max-trabalhadores', type=int, default=None,
+                        help=f"maior número de processos (padrão: {os.cpu_count()})")
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO_PADRAO, help="pacientes por tarefa")
+    args = parser.parse_args()
+
+    print("="*80)
+    print(f"PONTUAÇÃO PARALELA (SKFUZZY) - {args.pacientes} pacientes, blocos de {args.bloco}")
+    print(f"Núcleos disponíveis: {os.cpu_count()}")
+    print("="*80)
+    print(f"{'Processos':>10}{'Início (s)':>12}{'Tempo (s)':>11}{'Pacientes/s':>13}{'Aceleração':>12}{'Eficiência':>12}")
+    resultados = relatorio_escalabilidade(args.pacientes, args.max_trabalhadores, args.bloco)
+    for r in resultados:
+        print(f"{r['trabalhadores']:>10}{r['tempo_inicio']:>12.2f}{r['tempo']:>11.2f}{r['vazao']:>13.1f}"
+              f"{r['aceleracao']:>11.2f}x{100*r['aceleracao']/r['trabalhadores']:>11.0f}%")
+    identicos = all(np.array_equal(r['escores'], resultados[0]['escores'], equal_nan=True) for r in resultados)
+    print("="*80)
+    print("✓ Escores idênticos em todas as configurações" if identicos else "✗ Escores divergentes entre configurações!")
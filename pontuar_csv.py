@@ -0,0 +1,266 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Pontuação em Lote de Arquivos CSV (linha de comando, sem interface gráfica)
+
+Lê um CSV com as mesmas colunas de entrada que a calculadora grava em
+dados_pacientes.csv (IMC, Perda%, Sarcopenia, VET%, Duracao, SintomasGI, PCR,
+Albumina, Febre, Diagnostico, Comorbidades, Idade, Cirurgia), pontua em
+blocos com o pipeline vetorizado e grava, linha a linha, um CSV com as colunas
+de entrada seguidas de Modo, Escore_* e Categoria.
+
+Só um bloco fica em memória por vez, então o uso de memória não depende do
+tamanho do arquivo.
+
+USO:
+    python pontuar_csv.py admissoes.csv admissoes_pontuadas.csv
+    python pontuar_csv.py admissoes.csv - --bloco 2000 > saida.csv
+
+Albumina vazia ou "N/A" usa o modo SIMPLIFICADO, como na calculadora.
+Linhas com campos obrigatórios inválidos, não finitos ("nan", "inf") ou fora
+das faixas do formulário da calculadora (pipeline_pacientes.FAIXAS_ENTRADA)
+são ignoradas e listadas no stderr.
+
+Arquivos antigos (cabeçalho sem Modo) que receberam linhas da versão com
+albumina opcional (Modo logo após Hora) são lidos nos dois formatos.
+"""
+
+import argparse
+import csv
+import math
+import sys
+import time
+
+import numpy as np
+
+from pipeline_pacientes import CAMPOS_ENTRADA, pontuar_pacientes, validar_faixas
+
+# Coluna do CSV da calculadora -> campo do pipeline
+COLUNAS_ENTRADA = {
+    'IMC': 'imc', 'Perda%': 'perda', 'Sarcopenia': 'sarcopenia',
+    'VET%': 'vet', 'Duracao': 'duracao', 'SintomasGI': 'sintomas',
+    'PCR': 'pcr', 'Albumina': 'albumina', 'Febre': 'febre',
+    'Diagnostico': 'diagnostico', 'Comorbidades': 'comorbidades',
+    'Idade': 'idade', 'Cirurgia': 'cirurgia',
+}
+
+# Colunas calculadas (substituídas se já existirem no arquivo de entrada)
+COLUNAS_SAIDA = {
+    'Modo': 'modo',
+    'Escore_Fenotipico': 'escore_fenotipico',
+    'Escore_Ingestao': 'escore_ingestao',
+    'Escore_Inflamatorio': 'escore_inflamatorio',
+    'Escore_Gravidade': 'escore_gravidade',
+    'Escore_Final': 'escore_final',
+    'Categoria': 'categoria',
+}
+
+# Campo do pipeline -> coluna do CSV (mensagens de erro)
+_COLUNA_DO_CAMPO = {campo: coluna for coluna, campo in COLUNAS_ENTRADA.items()}
+
+TAMANHO_BLOCO_PADRAO = 5000
+
+# ==============================================================================
+# LEITURA E VALIDAÇÃO
+# ==============================================================================
+
+def converter_linha(linha, parcial=False):
+    """Converte os campos de entrada de uma linha do CSV em floats
+
+    Parâmetros:
+    -----------
+    linha : dict
+        Coluna -> texto
+    parcial : bool
+        Se True, colunas ausentes da linha são puladas em vez de tratadas
+        como vazias (casos de calibração com só as colunas de um submódulo)
+
+    Retorna:
+    --------
+    dict : {campo: float}; albumina ausente vira NaN
+
+    Raises:
+    -------
+    ValueError : campo obrigatório vazio, não numérico, não finito ou fora
+                 da faixa do formulário da calculadora
+    """
+    valores = {}
+    for coluna, campo in COLUNAS_ENTRADA.items():
+        if parcial and coluna not in linha:
+            continue
+        texto = (linha.get(coluna) or '').strip().replace(',', '.')
+        if campo == 'albumina' and texto.upper() in ('', 'N/A'):
+            valores[campo] = np.nan
+            continue
+        try:
+            valores[campo] = float(texto)
+        except ValueError:
+            raise ValueError(f"{coluna} inválido: {texto!r}") from None
+        if not math.isfinite(valores[campo]):
+            raise ValueError(f"{coluna} inválido: {texto!r}")
+    validar_faixas(valores, _COLUNA_DO_CAMPO)
+    return valores
+
+def montar_linha(cabecalho, campos):
+    """Associa os campos de uma linha às colunas do cabeçalho
+
+    Aceita também linhas com Modo logo após Hora num arquivo cujo cabeçalho
+    não tem Modo (formato gravado pela calculadora com albumina opcional).
+    """
+    if len(campos) == len(cabecalho):
+        return dict(zip(cabecalho, campos))
+    if len(campos) == len(cabecalho) + 1 and 'Modo' not in cabecalho and 'Hora' in cabecalho:
+        posicao = cabecalho.index('Hora') + 1
+        return dict(zip(cabecalho[:posicao] + ['Modo'] + cabecalho[posicao:], campos))
+    raise ValueError(f"{len(campos)} campos (cabeçalho tem {len(cabecalho)})")
+
+def _ler_blocos(leitor, cabecalho, tamanho_bloco, erros):
+    """Gera blocos de (linhas originais, valores convertidos)
+
+    Linhas inválidas são registradas em `erros` como (número da linha, motivo).
+    """
+    linhas, valores = [], []
+    for campos in leitor:
+        if not campos:
+            continue
+        try:
+            linha = montar_linha(cabecalho, campos)
+            valores.append(converter_linha(linha))
+            linhas.append(linha)
+        except ValueError as e:
+            erros.append((leitor.line_num, str(e)))
+            continue
+        if len(linhas) == tamanho_bloco:
+            yield linhas, valores
+            linhas, valores = [], []
+    if linhas:
+        yield linhas, valores
+
+
+def ler_pacientes_csv(caminho, delimitador=','):
+    """Entradas de todas as linhas válidas de um CSV da calculadora
+
+    Linhas inválidas (ver converter_linha) são ignoradas e listadas no stderr.
+
+    Retorna:
+    --------
+    tuple : (list de dict {campo: float}, list com o número de cada linha lida)
+
+    Raises:
+    -------
+    ValueError : coluna de entrada ausente no cabeçalho
+    """
+    with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = [coluna.strip() for coluna in next(leitor, [])]
+        faltando = [coluna for coluna in COLUNAS_ENTRADA if coluna not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas ausentes no CSV: {faltando}")
+        registros, numeros = [], []
+        for campos in leitor:
+            if not campos:
+                continue
+            try:
+                registros.append(converter_linha(montar_linha(cabecalho, campos)))
+                numeros.append(leitor.line_num)
+            except ValueError as e:
+                print(f"  linha {leitor.line_num} ignorada: {e}", file=sys.stderr)
+    return registros, numeros
+
+# ==============================================================================
+# PONTUAÇÃO DO ARQUIVO
+# ==============================================================================
+
+def _formatar(campo, valor):
+    if campo.startswith('escore_'):
+        return "N/A" if np.isnan(valor) else f"{valor:.1f}"
+    if campo == 'categoria':
+        return valor if valor is not None else "SEM REGRA ATIVADA"
+    return valor
+
+def pontuar_arquivo(entrada, saida, tamanho_bloco=TAMANHO_BLOCO_PADRAO, defuzzificador='amostrado',
+                    delimitador=',', progresso=None):
+    """Pontua o CSV aberto em `entrada` e grava o resultado em `saida`
+
+    Parâmetros:
+    -----------
+    entrada, saida : arquivos de texto abertos (newline='')
+    tamanho_bloco : int
+        Linhas pontuadas por vez
+    progresso : callable, opcional
+        Chamada após cada bloco com o total de linhas gravadas
+
+    Retorna:
+    --------
+    dict : linhas (pontuadas), sem_regra (NaN), erros [(linha, motivo)]
+    """
+    if tamanho_bloco < 1:
+        raise ValueError("tamanho_bloco deve ser >= 1")
+
+    leitor = csv.reader(entrada, delimiter=delimitador)
+    cabecalho = [coluna.strip() for coluna in next(leitor, [])]
+    if not cabecalho:
+        raise ValueError("Arquivo de entrada vazio")
+    faltando = [coluna for coluna in COLUNAS_ENTRADA if coluna not in cabecalho]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no CSV de entrada: {faltando}")
+
+    # Mantém a ordem das colunas de entrada; colunas calculadas novas vão para o fim
+    colunas = cabecalho + [c for c in COLUNAS_SAIDA if c not in cabecalho]
+    escritor = csv.DictWriter(saida, fieldnames=colunas, delimiter=delimitador, extrasaction='ignore')
+    escritor.writeheader()
+
+    resumo = {'linhas': 0, 'sem_regra': 0, 'erros': []}
+    for linhas, valores in _ler_blocos(leitor, cabecalho, tamanho_bloco, resumo['erros']):
+        lote = {campo: np.array([v[campo] for v in valores]) for campo in CAMPOS_ENTRADA}
+        resultado = pontuar_pacientes(lote, defuzzificador)
+
+        for i, linha in enumerate(linhas):
+            for coluna, campo in COLUNAS_SAIDA.items():
+                linha[coluna] = _formatar(campo, resultado[campo][i])
+        escritor.writerows(linhas)
+
+        resumo['linhas'] += len(linhas)
+        resumo['sem_regra'] += int(np.isnan(resultado['escore_final']).sum())
+        if progresso is not None:
+            progresso(resumo['linhas'])
+    return resumo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pontua em lote um CSV de pacientes com a calculadora fuzzy de risco nutricional")
+    parser.add_argument('entrada', help="CSV de entrada (colunas de dados_pacientes.csv)")
+    parser.add_argument('saida', help="CSV de saída ('-' para a saída padrão)")
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO_PADRAO,
+                        help=f"linhas pontuadas por vez (padrão: {TAMANHO_BLOCO_PADRAO})")
+    parser.add_argument('--delimitador', default=',', help="separador de campos (padrão: ',')")
+    parser.add_argument('--defuzzificador', choices=['amostrado', 'exato'], default='amostrado',
+                        help="'amostrado' reproduz a calculadora; 'exato' usa o centroide em forma fechada")
+    parser.add_argument('--silencioso', action='store_true', help="não mostra o progresso no stderr")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    progresso = None
+    if not args.silencioso:
+        progresso = lambda total: print(f"  {total} linhas pontuadas...", file=sys.stderr)
+
+    with open(args.entrada, newline='', encoding='utf-8-sig') as entrada:
+        if args.saida == '-':
+            resumo = pontuar_arquivo(entrada, sys.stdout, args.bloco, args.defuzzificador,
+                                     args.delimitador, progresso)
+        else:
+            with open(args.saida, 'w', newline='', encoding='utf-8') as saida:
+                resumo = pontuar_arquivo(entrada, saida, args.bloco, args.defuzzificador,
+                                         args.delimitador, progresso)
+
+    tempo = time.perf_counter() - inicio
+    for numero, motivo in resumo['erros']:
+        print(f"  linha {numero} ignorada: {motivo}", file=sys.stderr)
+    print(f"{resumo['linhas']} pacientes pontuados em {tempo:.1f} s "
+          f"({resumo['sem_regra']} sem regra ativada, {len(resumo['erros'])} linhas inválidas)",
+          file=sys.stderr)
+    return 1 if resumo['erros'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Análise de Sensibilidade em Lote (qual entrada move o escore de cada paciente)
+
+Para cada paciente de um lote, cada uma das 13 entradas (IMC ... cirurgia)
+é percorrida numa grade de `passos` valores sobre o seu universo, com as
+demais entradas fixas nos valores do paciente. Para cada entrada devolve:
+
+- Faixa (mínimo, máximo, amplitude) do escore do SUBMÓDULO da entrada e do
+  ESCORE FINAL ao longo da grade
+- Inclinação local (pontos de escore por unidade da entrada) no valor atual
+  do paciente, por diferença central com passo de PASSO_RELATIVO_DERIVADA
+  do universo
+
+Uma entrada só altera o escore do seu próprio submódulo; os outros três
+ficam iguais aos do paciente. Por isso cada submódulo é avaliado UMA vez
+sobre todas as linhas perturbadas das suas entradas (pacientes x entradas x
+pontos) e o integrador UMA vez sobre o conjunto inteiro, no motor
+vetorizado, sem laços por paciente, entrada ou passo.
+
+O modo de cada paciente é mantido: variar a albumina de um paciente sem
+albumina mudaria o modo, então essa entrada fica NaN para ele.
+
+USO:
+    python sensibilidade_lote.py pacientes.csv [--passos 21] [--saida sensibilidade.csv]
+"""
+
+import argparse
+import csv
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import motor_vetorizado as mv
+from pipeline_pacientes import (CAMPOS_ENTRADA, calcular_escore_final, calcular_escore_submodulo, normalizar_lote,
+                                pontuar_pacientes)
+from pontuar_csv import ler_pacientes_csv
+
+PASSOS_PADRAO = 21
+PASSO_RELATIVO_DERIVADA = 0.01
+PACIENTES_POR_BLOCO_PADRAO = 1000
+
+# Submódulo -> campos de entrada, na ordem das entradas do motor
+SUBMODULOS = {
+    'fenotipico': ('imc', 'perda', 'sarcopenia'),
+    'ingestao': ('vet', 'duracao', 'sintomas'),
+    'inflamatorio': ('pcr', 'albumina', 'febre'),
+    'gravidade': ('diagnostico', 'comorbidades', 'idade', 'cirurgia'),
+}
+SUBMODULO_DO_CAMPO = {campo: submodulo for submodulo, campos in SUBMODULOS.items() for campo in campos}
+
+# ==============================================================================
+# UNIVERSOS DAS ENTRADAS
+# ==============================================================================
+
+def limites_entradas():
+    """(mínimo, máximo) de cada campo, dos universos dos motores que o usam
+
+    PCR e febre entram nos dois inflamatórios: vale a união dos universos.
+    """
+    usos = list(SUBMODULOS.items()) + [('inflamatorio_simplificado', ('pcr', 'febre'))]
+    limites = {}
+    for nome, campos in usos:
+        for campo, universo in zip(campos, mv.obter_motor(nome).universos):
+            minimo, maximo = limites.get(campo, (np.inf, -np.inf))
+            limites[campo] = (min(minimo, float(universo.min())), max(maximo, float(universo.max())))
+    return limites
+
+# ==============================================================================
+# AVALIAÇÃO DAS LINHAS PERTURBADAS
+# ==============================================================================
+
+def _perturbar_bloco(c, base, valores, defuzzificador):
+    """Escores do submódulo e finais de todas as linhas perturbadas de um bloco
+
+    Parâmetros:
+    -----------
+    c : dict de colunas (n pacientes)
+    base : resultado de pontuar_pacientes(c)
+    valores : np.ndarray (n, campos, pontos)
+        Valor que o campo j assume no ponto k do paciente i
+
+    Retorna:
+    --------
+    (escores do submódulo, escores finais) : np.ndarray (n, campos, pontos)
+    """
+    n, _, pontos = valores.shape
+    completo = base['modo_completo']
+    indice = {campo: j for j, campo in enumerate(CAMPOS_ENTRADA)}
+    escores_sub = np.empty(valores.shape)
+    parciais = {f"escore_{submodulo}": np.broadcast_to(base[f"escore_{submodulo}"][:, None, None],
+                                                       valores.shape).copy()
+                for submodulo in SUBMODULOS}
+
+    for submodulo, campos in SUBMODULOS.items():
+        # Linhas (paciente, campo do submódulo, ponto): o próprio campo varia, os outros ficam
+        colunas_campos = [indice[campo] for campo in campos]
+        forma = (n, len(campos), pontos)
+        linhas = {campo: np.broadcast_to(c[campo][:, None, None], forma).copy() for campo in campos}
+        for q, campo in enumerate(campos):
+            linhas[campo][:, q, :] = valores[:, indice[campo], :]
+        completo_linhas = np.broadcast_to(completo[:, None, None], forma).ravel()
+        escores = calcular_escore_submodulo(submodulo, {campo: v.ravel() for campo, v in linhas.items()},
+                                    completo_linhas, defuzzificador).reshape(forma)
+        escores_sub[:, colunas_campos, :] = escores
+        parciais[f"escore_{submodulo}"][:, colunas_campos, :] = escores
+
+    completo_linhas = np.broadcast_to(completo[:, None, None], valores.shape).ravel()
+    finais = calcular_escore_final(tuple(parciais[f"escore_{s}"].ravel() for s in SUBMODULOS),
+                           completo_linhas, defuzzificador).reshape(valores.shape)
+    return escores_sub, finais
+
+# ==============================================================================
+# ANÁLISE DE SENSIBILIDADE
+# ==============================================================================
+
+def analisar_sensibilidade(lote, passos=PASSOS_PADRAO, defuzzificador='amostrado',
+                           passo_relativo=PASSO_RELATIVO_DERIVADA, pacientes_por_bloco=PACIENTES_POR_BLOCO_PADRAO):
+    """Faixas e inclinações do escore de cada paciente em relação a cada entrada
+
+    Parâmetros:
+    -----------
+    lote : dict ou list de dict
+        Como em pontuar_pacientes (albumina pode faltar)
+    passos : int
+        Pontos da grade de cada entrada, de ponta a ponta do universo
+    passo_relativo : float
+        Passo da diferença central, em fração do universo da entrada
+    pacientes_por_bloco : int
+        Pacientes perturbados por vez (limita a memória: cada paciente gera
+        13 x (passos + 2) linhas)
+
+    Retorna:
+    --------
+    dict com (n = pacientes, campos = CAMPOS_ENTRADA):
+        campos : tuple; submodulo : tuple (submódulo de cada campo)
+        grade : dict campo -> np.ndarray (passos)
+        base : resultado de pontuar_pacientes
+        escore_submodulo, escore_final : np.ndarray (n, campos, passos)
+        minimo_submodulo, maximo_submodulo, amplitude_submodulo, inclinacao_submodulo,
+        minimo_final, maximo_final, amplitude_final, inclinacao_final : np.ndarray (n, campos)
+        principal : list (campo de maior amplitude do escore final; None se não houver)
+    NaN onde não se aplica: albumina de pacientes sem albumina, pontos sem regra ativada.
+    """
+    if passos < 2:
+        raise ValueError("passos deve ser >= 2")
+    c = normalizar_lote(lote)
+    n = len(c['imc'])
+    limites = limites_entradas()
+    grade = {campo: np.linspace(*limites[campo], passos) for campo in CAMPOS_ENTRADA}
+    base = pontuar_pacientes(c, defuzzificador, validar=False)  # c já validado acima
+
+    # Valores de cada campo: a grade + (x - h, x + h) em torno do valor do paciente
+    valores = np.empty((n, len(CAMPOS_ENTRADA), passos + 2))
+    for j, campo in enumerate(CAMPOS_ENTRADA):
+        minimo, maximo = limites[campo]
+        h = passo_relativo * (maximo - minimo)
+        atual = np.clip(c[campo], minimo, maximo)
+        valores[:, j, :passos] = grade[campo]
+        valores[:, j, passos] = np.clip(atual - h, minimo, maximo)
+        valores[:, j, passos + 1] = np.clip(atual + h, minimo, maximo)
+
+    escores_sub = np.empty(valores.shape)
+    finais = np.empty(valores.shape)
+    for inicio in range(0, n, pacientes_por_bloco):
+        trecho = slice(inicio, inicio + pacientes_por_bloco)
+        base_bloco = {chave: np.asarray(v)[trecho] for chave, v in base.items()}
+        escores_sub[trecho], finais[trecho] = _perturbar_bloco(
+            {campo: v[trecho] for campo, v in c.items()}, base_bloco, valores[trecho], defuzzificador)
+
+    # Albumina não se aplica a quem está no modo simplificado
+    sem_albumina = ~base['modo_completo']
+    j_albumina = CAMPOS_ENTRADA.index('albumina')
+    escores_sub[sem_albumina, j_albumina] = np.nan
+    finais[sem_albumina, j_albumina] = np.nan
+
+    resultado = {
+        'campos': CAMPOS_ENTRADA,
+        'submodulo': tuple(SUBMODULO_DO_CAMPO[campo] for campo in CAMPOS_ENTRADA),
+        'grade': grade,
+        'base': base,
+        'escore_submodulo': escores_sub[:, :, :passos],
+        'escore_final': finais[:, :, :passos],
+    }
+    delta = valores[:, :, passos + 1] - valores[:, :, passos]
+    with warnings.catch_warnings():
+        # Linhas inteiras sem regra ativada (ou albumina ausente) dão NaN, sem aviso
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for sufixo, escores in (('submodulo', escores_sub), ('final', finais)):
+            resultado[f'minimo_{sufixo}'] = np.nanmin(escores[:, :, :passos], axis=2)
+            resultado[f'maximo_{sufixo}'] = np.nanmax(escores[:, :, :passos], axis=2)
+            resultado[f'amplitude_{sufixo}'] = resultado[f'maximo_{sufixo}'] - resultado[f'minimo_{sufixo}']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                resultado[f'inclinacao_{sufixo}'] = np.where(
+                    delta > 0, (escores[:, :, passos + 1] - escores[:, :, passos]) / np.where(delta > 0, delta, 1),
+                    np.nan)
+    amplitude = resultado['amplitude_final']
+    resultado['principal'] = [None if np.isnan(linha).all() else CAMPOS_ENTRADA[int(np.nanargmax(linha))]
+                              for linha in amplitude]
+    return resultado
+
+# ==============================================================================
+# LINHA DE COMANDO
+# ==============================================================================
+
+COLUNAS_RELATORIO = ['Linha', 'Campo', 'Submodulo', 'Valor', 'Escore_Submodulo_Min', 'Escore_Submodulo_Max',
+                     'Inclinacao_Submodulo', 'Escore_Final_Min', 'Escore_Final_Max', 'Inclinacao_Final']
+
+
+def _numero(valor):
+    return "N/A" if np.isnan(valor) else f"{valor:.2f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sensibilidade do escore de cada paciente a cada entrada")
+    parser.add_argument('entrada', help="CSV de pacientes (colunas de dados_pacientes.csv)")
+    parser.add_argument('--saida', help="CSV com uma linha por paciente e entrada (padrão: só o resumo)")
+    parser.add_argument('--passos', type=int, default=PASSOS_PADRAO,
+                        help=f"pontos da grade de cada entrada (padrão: {PASSOS_PADRAO})")
+    parser.add_argument('--delimitador', default=',', help="separador de campos (padrão: ',')")
+    args = parser.parse_args(argv)
+
+    registros, numeros = ler_pacientes_csv(args.entrada, args.delimitador)
+    if not registros:
+        print("Nenhum paciente válido no arquivo", file=sys.stderr)
+        return 1
+    inicio = time.perf_counter()
+    resultado = analisar_sensibilidade(registros, args.passos)
+    tempo = time.perf_counter() - inicio
+
+    print(f"{'Linha':>6}  {'Escore':>7}  {'Entrada principal':<18}{'Amplitude':>10}  Submódulo")
+    for i, numero in enumerate(numeros):
+        principal = resultado['principal'][i]
+        final = resultado['base']['escore_final'][i]
+        if principal is None:
+            print(f"{numero:>6}  {_numero(final):>7}  -")
+            continue
+        j = CAMPOS_ENTRADA.index(principal)
+        print(f"{numero:>6}  {_numero(final):>7}  {principal:<18}{resultado['amplitude_final'][i, j]:>10.1f}  "
+              f"{resultado['submodulo'][j]}")
+
+    if args.saida:
+        with open(args.saida, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(COLUNAS_RELATORIO)
+            for i, numero in enumerate(numeros):
+                for j, campo in enumerate(CAMPOS_ENTRADA):
+                    escritor.writerow([numero, campo, resultado['submodulo'][j], _numero(registros[i][campo])]
+                                      + [_numero(resultado[chave][i, j]) for chave in
+                                         ('minimo_submodulo', 'maximo_submodulo', 'inclinacao_submodulo',
+                                          'minimo_final', 'maximo_final', 'inclinacao_final')])
+    linhas = len(registros) * len(CAMPOS_ENTRADA) * (args.passos + 2)
+    print(f"{len(registros)} pacientes x {len(CAMPOS_ENTRADA)} entradas x {args.passos + 2} pontos "
+          f"= {linhas:,} avaliações em {tempo:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Serviço HTTP Local de Pontuação com Micro-Lotes
+
+Ponto de acesso em rede para a integração com o prontuário eletrônico, sem
+interface gráfica. Só usa a biblioteca padrão (http.server):
+
+    POST /pontuar    corpo JSON: um paciente (objeto) ou vários (lista), com
+                     os campos de pipeline_pacientes.CAMPOS_ENTRADA; albumina
+                     pode ser omitida, null ou "N/A" (modo SIMPLIFICADO)
+                     -> mesmo formato: escores dos 4 submódulos, escore
+                        final, modo e categoria de cada paciente
+    GET  /metricas   latência (p50/p95/p99), requisições, pacientes e
+                     histograma do tamanho dos lotes
+    GET  /saude      {"status": "ok"}
+
+MICRO-LOTES: o pipeline vetorizado custa quase o mesmo para 1 ou 200
+pacientes. As requisições que chegam dentro de `janela_ms` milissegundos
+da primeira são juntadas num único lote e pontuadas numa só chamada de
+pontuar_pacientes(); cada requisição recebe de volta só as suas linhas.
+
+Paciente em zona sem regra ativada volta com escores null e categoria null.
+Campos obrigatórios ausentes, não numéricos, não finitos ou fora das faixas
+do formulário da calculadora (pipeline_pacientes.FAIXAS_ENTRADA), e
+Content-Length ausente do intervalo aceito: 400 com {"erro": ...}.
+
+USO:
+    python servidor_pontuacao.py [--porta 8765] [--janela-ms 5] [--lote-maximo 256]
+    curl -d '{"imc": 22, "perda": 5, ...}' http://127.0.0.1:8765/pontuar
+"""
+
+import argparse
+import json
+import math
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from pipeline_pacientes import normalizar_lote, pontuar_pacientes
+
+PORTA_PADRAO = 8765
+JANELA_MS_PADRAO = 5.0
+LOTE_MAXIMO_PADRAO = 256
+TAMANHO_MAXIMO_CORPO = 10 * 1024 * 1024
+AMOSTRAS_LATENCIA = 10000
+
+CAMPOS_RESULTADO = ('escore_fenotipico', 'escore_ingestao', 'escore_inflamatorio',
+                    'escore_gravidade', 'escore_final', 'modo_completo', 'modo', 'categoria')
+
+# ==============================================================================
+# MÉTRICAS
+# ==============================================================================
+
+class MetricasServico:
+    """Latências das requisições e tamanhos dos lotes (seguro entre threads)"""
+
+    def __init__(self, amostras=AMOSTRAS_LATENCIA):
+        self._trava = threading.Lock()
+        self._latencias = deque(maxlen=amostras)
+        self._lotes = Counter()
+        self.requisicoes = 0
+        self.pacientes = 0
+        self.erros = 0
+
+    def registrar_requisicao(self, latencia_s, pacientes):
+        with self._trava:
+            self._latencias.append(latencia_s)
+            self.requisicoes += 1
+            self.pacientes += pacientes
+
+    def registrar_erro(self):
+        with self._trava:
+            self.erros += 1
+
+    def registrar_lote(self, requisicoes):
+        with self._trava:
+            self._lotes[requisicoes] += 1
+
+    def resumo(self):
+        """Retorna dict com contadores, latência em ms e histograma {requisições no lote: lotes}"""
+        with self._trava:
+            latencias = np.array(self._latencias) * 1000
+            lotes = dict(sorted(self._lotes.items()))
+            resumo = {'requisicoes': self.requisicoes, 'pacientes': self.pacientes, 'erros': self.erros}
+
+        if len(latencias):
+            p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+            resumo['latencia_ms'] = {'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                                     'max': float(latencias.max())}
+        else:
+            resumo['latencia_ms'] = None
+        total_lotes = sum(lotes.values())
+        resumo['lotes'] = total_lotes
+        resumo['requisicoes_por_lote'] = (sum(t * n for t, n in lotes.items()) / total_lotes) if total_lotes else 0.0
+        resumo['histograma_lotes'] = {str(t): n for t, n in lotes.items()}
+        return resumo
+
+# ==============================================================================
+# AGRUPADOR DE MICRO-LOTES
+# ==============================================================================
+
+class _Pendente:
+    """Pacientes de uma requisição aguardando o lote"""
+
+    def __init__(self, registros):
+        self.registros = registros
+        self.resultados = None
+        self.erro = None
+        self.pronto = threading.Event()
+
+
+class AgrupadorLotes:
+    """Junta as requisições de uma janela curta num único lote vetorizado
+
+    Parâmetros:
+    -----------
+    janela_ms : float
+        Tempo máximo de espera por mais requisições depois da primeira
+    lote_maximo : int
+        Número máximo de pacientes num lote (o lote fecha antes da janela)
+    metricas : MetricasServico, opcional
+    """
+
+    def __init__(self, janela_ms=JANELA_MS_PADRAO, lote_maximo=LOTE_MAXIMO_PADRAO, metricas=None):
+        self.janela_s = janela_ms / 1000
+        self.lote_maximo = lote_maximo
+        self.metricas = metricas if metricas is not None else MetricasServico()
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._executar, name='agrupador-lotes', daemon=True)
+        self._thread.start()
+
+    def pontuar(self, registros):
+        """Pontua uma lista de pacientes (dicts) no próximo lote; bloqueia até o resultado"""
+        pendente = _Pendente(registros)
+        self._fila.put(pendente)
+        pendente.pronto.wait()
+        if pendente.erro is not None:
+            raise pendente.erro
+        return pendente.resultados
+
+    def parar(self):
+        self._fila.put(None)
+        self._thread.join()
+
+    def _coletar(self, primeira):
+        lote, pacientes = [primeira], len(primeira.registros)
+        prazo = time.monotonic() + self.janela_s
+        while pacientes < self.lote_maximo:
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                pendente = self._fila.get(timeout=restante)
+            except queue.Empty:
+                break
+            if pendente is None:
+                self._fila.put(None)
+                break
+            lote.append(pendente)
+            pacientes += len(pendente.registros)
+        return lote
+
+    def _executar(self):
+        while True:
+            primeira = self._fila.get()
+            if primeira is None:
+                return
+            lote = self._coletar(primeira)
+            registros = [registro for pendente in lote for registro in pendente.registros]
+            try:
+                resultado = pontuar_pacientes(registros)
+            except Exception as e:
+                for pendente in lote:
+                    pendente.erro = e
+                    pendente.pronto.set()
+                continue
+
+            self.metricas.registrar_lote(len(lote))
+            inicio = 0
+            for pendente in lote:
+                fim = inicio + len(pendente.registros)
+                pendente.resultados = [_resultado_paciente(resultado, i) for i in range(inicio, fim)]
+                inicio = fim
+                pendente.pronto.set()
+
+
+def _json_valor(valor):
+    """Tipos numpy em tipos JSON; NaN vira null"""
+    if isinstance(valor, (np.bool_, bool)):
+        return bool(valor)
+    if isinstance(valor, (np.floating, float)):
+        return None if math.isnan(valor) else float(valor)
+    return valor
+
+
+def _resultado_paciente(resultado, i):
+    return {campo: _json_valor(resultado[campo][i]) for campo in CAMPOS_RESULTADO}
+
+# ==============================================================================
+# SERVIDOR HTTP
+# ==============================================================================
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'NutriFuzzy/2.2'
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _erro(self, status, mensagem):
+        self.server.agrupador.metricas.registrar_erro()
+        self._responder(status, {'erro': mensagem})
+
+    def do_GET(self):
+        if self.path == '/metricas':
+            self._responder(200, self.server.agrupador.metricas.resumo())
+        elif self.path == '/saude':
+            self._responder(200, {'status': 'ok'})
+        else:
+            self._erro(404, f"Caminho desconhecido: {self.path}")
+
+    def do_POST(self):
+        if self.path != '/pontuar':
+            self._erro(404, f"Caminho desconhecido: {self.path}")
+            return
+        inicio = time.perf_counter()
+        try:
+            tamanho = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            tamanho = -1
+        # O corpo não é lido: a conexão não pode ser reaproveitada
+        if tamanho < 0:
+            self.close_connection = True
+            self._erro(400, f"Content-Length inválido: {self.headers.get('Content-Length')!r}")
+            return
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            self.close_connection = True
+            self._erro(413, f"Corpo maior que {TAMANHO_MAXIMO_CORPO} bytes")
+            return
+
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b'null')
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._erro(400, f"JSON inválido: {e}")
+            return
+        unico = isinstance(corpo, dict)
+        registros = [corpo] if unico else corpo
+        if not isinstance(registros, list) or not registros or not all(isinstance(r, dict) for r in registros):
+            self._erro(400, "O corpo deve ser um paciente (objeto) ou uma lista não vazia de pacientes")
+            return
+
+        # Valida aqui (inclusive as faixas) para que um paciente inválido não derrube o lote dos outros
+        try:
+            normalizar_lote(registros)
+        except (ValueError, TypeError) as e:
+            self._erro(400, str(e))
+            return
+
+        try:
+            resultados = self.server.agrupador.pontuar(registros)
+        except Exception as e:
+            self._erro(500, f"Falha na pontuação: {e}")
+            return
+        self.server.agrupador.metricas.registrar_requisicao(time.perf_counter() - inicio, len(registros))
+        self._responder(200, resultados[0] if unico else resultados)
+
+    def log_message(self, formato, *args):
+        if not self.server.silencioso:
+            super().log_message(formato, *args)
+
+
+class _ServidorHTTP(ThreadingHTTPServer):
+    daemon_threads = True
+    # A fila de conexões padrão (5) recusa rajadas de clientes simultâneos
+    request_queue_size = 128
+
+
+class ServicoPontuacao:
+    """Servidor HTTP de pontuação rodando numa thread própria
+
+    Parâmetros:
+    -----------
+    host, porta : str, int
+        Endereço de escuta (porta 0 escolhe uma porta livre; ver self.url)
+    janela_ms, lote_maximo :
+        Ver AgrupadorLotes
+    silencioso : bool
+        Não registra cada requisição no stderr
+    """
+
+    def __init__(self, host='127.0.0.1', porta=PORTA_PADRAO, janela_ms=JANELA_MS_PADRAO,
+                 lote_maximo=LOTE_MAXIMO_PADRAO, silencioso=True):
+        self.agrupador = AgrupadorLotes(janela_ms, lote_maximo)
+        self.servidor = _ServidorHTTP((host, porta), _Manipulador)
+        self.servidor.agrupador = self.agrupador
+        self.servidor.silencioso = silencioso
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self.servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self.servidor.serve_forever, name='servidor-pontuacao', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self.agrupador.parar()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *excecao):
+        self.parar()
+
+# ==============================================================================
+# TESTE DE CARGA
+# ==============================================================================
+
+def _postar(url, corpo, tempo_limite=30):
+    requisicao = urllib.request.Request(url + '/pontuar', data=json.dumps(corpo).encode('utf-8'),
+                                        headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(requisicao, timeout=tempo_limite) as resposta:
+        return json.loads(resposta.read())
+
+
+def obter_metricas(url, tempo_limite=30):
+    with urllib.request.urlopen(url + '/metricas', timeout=tempo_limite) as resposta:
+        return json.loads(resposta.read())
+
+
+def executar_carga(url, pacientes, clientes=16, requisicoes_por_cliente=50):
+    """Dispara requisições simultâneas de um paciente cada contra o serviço
+
+    Parâmetros:
+    -----------
+    url : str
+        Endereço do serviço (ex.: ServicoPontuacao.url)
+    pacientes : list de dict
+        Pacientes enviados em rodízio
+    clientes : int
+        Threads clientes simultâneas
+    requisicoes_por_cliente : int
+
+    Retorna:
+    --------
+    dict : tempo_s, requisicoes, vazao (req/s), latencia_ms (p50/p95/p99 vistas
+           pelo cliente), falhas e respostas ({índice do paciente: [respostas]})
+    """
+    latencias, respostas, falhas = [], {}, []
+    trava = threading.Lock()
+    largada = threading.Barrier(clientes)
+
+    def cliente(c):
+        largada.wait()
+        for r in range(requisicoes_por_cliente):
+            indice = (c * requisicoes_por_cliente + r) % len(pacientes)
+            inicio = time.perf_counter()
+            try:
+                resposta = _postar(url, pacientes[indice])
+            except Exception as e:
+                with trava:
+                    falhas.append(repr(e))
+                continue
+            with trava:
+                latencias.append(time.perf_counter() - inicio)
+                respostas.setdefault(indice, []).append(resposta)
+
+    threads = [threading.Thread(target=cliente, args=(c,)) for c in range(clientes)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tempo = time.perf_counter() - inicio
+
+    latencias_ms = np.array(latencias) * 1000
+    p50, p95, p99 = np.percentile(latencias_ms, [50, 95, 99]) if len(latencias_ms) else (np.nan,) * 3
+    return {
+        'tempo_s': tempo,
+        'requisicoes': len(latencias),
+        'vazao': len(latencias) / tempo,
+        'latencia_ms': {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)},
+        'falhas': falhas,
+        'respostas': respostas,
+    }
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de pontuação de risco nutricional")
+    parser.add_argument('--host', default='127.0.0.1', help="endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help=f"porta (padrão: {PORTA_PADRAO})")
+    parser.add_argument('--janela-ms', type=float, default=JANELA_MS_PADRAO,
+                        help=f"espera máxima para juntar requisições num lote (padrão: {JANELA_MS_PADRAO})")
+    parser.add_argument('--lote-maximo', type=int, default=LOTE_MAXIMO_PADRAO,
+                        help=f"pacientes por lote (padrão: {LOTE_MAXIMO_PADRAO})")
+    parser.add_argument('--verboso', action='store_true', help="registra cada requisição no stderr")
+    args = parser.parse_args()
+
+    servico = ServicoPontuacao(args.host, args.porta, args.janela_ms, args.lote_maximo, not args.verboso)
+    print(f"Serviço de pontuação em {servico.url} (Ctrl+C para encerrar)", file=sys.stderr)
+    try:
+        servico.servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servico.servidor.server_close()
+        servico.agrupador.parar()
+        print(json.dumps(servico.agrupador.metricas.resumo(), indent=2), file=sys.stderr)
@@ -0,0 +1,176 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Sessão de Paciente com Recálculo Incremental
+
+Quando chega um novo resultado de laboratório (PCR, albumina), só o
+submódulo inflamatório e o integrador mudam; recalcular os cinco sistemas é
+desperdício. SessaoPaciente guarda as entradas e o escore de cada etapa e
+recalcula apenas o que depende do que mudou:
+
+    ENTRADA                               ETAPA
+    imc, perda, sarcopenia            ->  fenotipico   --+
+    vet, duracao, sintomas            ->  ingestao     --+
+    pcr, albumina, febre              ->  inflamatorio --+-> integrador
+    diagnostico, comorbidades,        ->  gravidade    --+
+    idade, cirurgia
+
+- Atualizar um campo com o MESMO valor não suja nada
+- Albumina ausente (None, '', 'N/A' ou NaN) usa o inflamatório simplificado e o
+  integrador simplificado; informar ou retirar a albumina troca o modo
+- O integrador só é recalculado se algum dos 4 escores ou o modo mudou de
+  fato (um submódulo recalculado pode devolver o mesmo escore)
+- Valores não finitos ou fora de pipeline_pacientes.FAIXAS_ENTRADA levantam
+  ValueError e não alteram a sessão
+
+USO:
+    sessao = SessaoPaciente(imc=22, perda=5, ..., albumina=None, ...)
+    sessao.calcular()                    # 5 sistemas
+    sessao.atualizar(pcr=80, albumina=3.1)
+    sessao.calcular()                    # só inflamatório + integrador
+"""
+
+import math
+
+import calculadora_desktop_albumina_opcional as calculadora
+from pipeline_pacientes import CAMPOS_ENTRADA, MODO_COMPLETO, MODO_SIMPLIFICADO, validar_faixas
+
+# Etapas (submódulos) e as entradas de que cada uma depende, na ordem dos argumentos
+ENTRADAS_ETAPA = {
+    'fenotipico': ('imc', 'perda', 'sarcopenia'),
+    'ingestao': ('vet', 'duracao', 'sintomas'),
+    'inflamatorio': ('pcr', 'albumina', 'febre'),
+    'gravidade': ('diagnostico', 'comorbidades', 'idade', 'cirurgia'),
+}
+ETAPA_DA_ENTRADA = {campo: etapa for etapa, campos in ENTRADAS_ETAPA.items() for campo in campos}
+INTEGRADOR = 'integrador'
+
+
+def _normalizar(campo, valor):
+    """float dentro de FAIXAS_ENTRADA; albumina ausente (None, '', 'N/A', NaN) vira None
+
+    Raises:
+    -------
+    ValueError : campo obrigatório sem valor, não numérico, não finito ou
+                 fora da faixa
+    """
+    if campo == 'albumina' and (valor is None or (isinstance(valor, str) and valor.strip().upper() in ('', 'N/A'))):
+        return None
+    if valor is None:
+        raise ValueError(f"Campo obrigatório sem valor: {campo}")
+    try:
+        valor = float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"{campo} inválido: {valor!r}") from None
+    if campo == 'albumina' and math.isnan(valor):
+        return None
+    validar_faixas({campo: valor})
+    return valor
+
+
+class SessaoPaciente:
+    """Entradas e escores de um paciente, recalculados só onde algo mudou
+
+    Parâmetros:
+    -----------
+    funcoes : módulo ou objeto, opcional
+        Fornece calcular_submodulo_* e calcular_risco_final_integrado com as
+        assinaturas da calculadora (padrão: calculadora_desktop_albumina_opcional;
+        servem também cache_escores e superficies_lut)
+    **entradas
+        Valores iniciais dos campos de CAMPOS_ENTRADA
+    """
+
+    def __init__(self, funcoes=None, **entradas):
+        self.funcoes = funcoes if funcoes is not None else calculadora
+        self.entradas = dict.fromkeys(CAMPOS_ENTRADA)
+        self.escores = dict.fromkeys(list(ENTRADAS_ETAPA) + [INTEGRADOR])
+        self._sujas = set(ENTRADAS_ETAPA) | {INTEGRADOR}
+        self._entradas_integrador = None
+        self.recalculos = dict.fromkeys(self.escores, 0)
+        self.atualizar(**entradas)
+
+    @property
+    def modo_completo(self):
+        return self.entradas['albumina'] is not None
+
+    @property
+    def pendentes(self):
+        """Etapas que serão recalculadas na próxima chamada de calcular()"""
+        return set(self._sujas)
+
+    def atualizar(self, **entradas):
+        """Altera campos do paciente e marca como sujas as etapas afetadas
+
+        Retorna:
+        --------
+        set : etapas marcadas por esta atualização (vazio se nada mudou)
+        """
+        desconhecidos = [campo for campo in entradas if campo not in self.entradas]
+        if desconhecidos:
+            raise KeyError(f"Campos desconhecidos: {desconhecidos} (válidos: {list(CAMPOS_ENTRADA)})")
+        # Normaliza tudo antes de alterar: um valor inválido não deixa a sessão pela metade
+        normalizadas = {campo: _normalizar(campo, valor) for campo, valor in entradas.items()}
+        marcadas = set()
+        for campo, valor in normalizadas.items():
+            if valor != self.entradas[campo]:
+                self.entradas[campo] = valor
+                marcadas.add(ETAPA_DA_ENTRADA[campo])
+        if marcadas:
+            marcadas.add(INTEGRADOR)
+        self._sujas |= marcadas
+        return marcadas
+
+    def _calcular_etapa(self, etapa):
+        valores = [self.entradas[campo] for campo in ENTRADAS_ETAPA[etapa]]
+        if etapa == 'fenotipico':
+            return self.funcoes.calcular_submodulo_fenotipico(*valores)
+        if etapa == 'ingestao':
+            return self.funcoes.calcular_submodulo_ingestao(*valores)
+        if etapa == 'gravidade':
+            return self.funcoes.calcular_submodulo_gravidade(*valores)
+        pcr, albumina, febre = valores
+        if albumina is not None:
+            return self.funcoes.calcular_submodulo_inflamatorio(pcr, albumina, febre)
+        return self.funcoes.calcular_submodulo_inflamatorio_simplificado(pcr, febre)
+
+    def calcular(self):
+        """Recalcula as etapas sujas e devolve o resultado do paciente
+
+        Uma zona sem regra ativada propaga o KeyError da calculadora; a etapa
+        continua suja e é tentada de novo na próxima chamada.
+
+        Retorna:
+        --------
+        dict : escore_fenotipico, escore_ingestao, escore_inflamatorio,
+               escore_gravidade, escore_final, modo_completo, modo, categoria
+        """
+        faltando = [campo for campo, valor in self.entradas.items() if valor is None and campo != 'albumina']
+        if faltando:
+            raise ValueError(f"Valores ausentes em campos obrigatórios: {faltando}")
+
+        for etapa in ENTRADAS_ETAPA:
+            if etapa in self._sujas:
+                self.escores[etapa] = self._calcular_etapa(etapa)
+                self.recalculos[etapa] += 1
+                self._sujas.discard(etapa)
+
+        if INTEGRADOR in self._sujas:
+            entradas_integrador = tuple(self.escores[etapa] for etapa in ENTRADAS_ETAPA) + (self.modo_completo,)
+            if entradas_integrador != self._entradas_integrador:
+                self.escores[INTEGRADOR] = self.funcoes.calcular_risco_final_integrado(
+                    *entradas_integrador[:4], modo_completo=self.modo_completo)
+                self.recalculos[INTEGRADOR] += 1
+                self._entradas_integrador = entradas_integrador
+            self._sujas.discard(INTEGRADOR)
+
+        escore_final = self.escores[INTEGRADOR]
+        return {
+            'escore_fenotipico': self.escores['fenotipico'],
+            'escore_ingestao': self.escores['ingestao'],
+            'escore_inflamatorio': self.escores['inflamatorio'],
+            'escore_gravidade': self.escores['gravidade'],
+            'escore_final': escore_final,
+            'modo_completo': self.modo_completo,
+            'modo': MODO_COMPLETO if self.modo_completo else MODO_SIMPLIFICADO,
+            'categoria': calculadora.categorizar_risco(escore_final)[0],
+        }
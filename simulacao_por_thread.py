@@ -0,0 +1,65 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Simulações Fuzzy Independentes por Thread
+
+Uma ControlSystemSimulation não pode ser compartilhada entre threads: as
+entradas são gravadas em `.input[...]` e o resultado lido de `.output`, então
+duas chamadas simultâneas trocam os pacientes. Também não basta uma
+simulação por thread sobre o MESMO ControlSystem, porque o skfuzzy guarda
+estado da inferência nos próprios termos (`term._cut`) e limpa, ao fim de
+cada compute(), os dados de TODAS as simulações daquele sistema.
+
+SimulacaoPorThread entrega a cada thread uma simulação sobre uma cópia
+própria e completa do sistema (variáveis, termos e regras), criada no
+primeiro uso da thread e reaproveitada nas chamadas seguintes.
+
+O skfuzzy só é importado quando a primeira simulação é criada.
+"""
+
+import copy
+import threading
+
+
+class SimulacaoPorThread:
+    """Simulação fuzzy exclusiva da thread atual
+
+    Parâmetros:
+    -----------
+    sistema : skfuzzy.control.ControlSystem ou função
+        Sistema-modelo, ou função sem argumentos que o constrói (chamada uma
+        única vez, na primeira simulação criada). O modelo nunca é usado para
+        inferência, então pode ser copiado com segurança depois
+    **opcoes_simulacao
+        Repassadas à simulação (ex.: cache=False); sistemas de
+        compilador_regras usam a sua classe_simulacao (SimulacaoEsparsa)
+    """
+
+    def __init__(self, sistema, **opcoes_simulacao):
+        if callable(sistema):
+            self._construir = sistema
+            self._modelo = None
+        else:
+            self._construir = None
+            self._modelo = copy.deepcopy(sistema)
+        self._opcoes = opcoes_simulacao
+        self._trava_copia = threading.Lock()
+        self._local = threading.local()
+
+    def nova_simulacao(self):
+        """Cria uma simulação sobre uma cópia nova do sistema (construindo o modelo se preciso)"""
+        from skfuzzy import control as ctrl
+
+        with self._trava_copia:
+            if self._modelo is None:
+                self._modelo = self._construir()
+            sistema = copy.deepcopy(self._modelo)
+        # Sistemas de compilador_regras indicam a própria simulação (ativação esparsa)
+        classe = getattr(sistema, 'classe_simulacao', ctrl.ControlSystemSimulation)
+        return classe(sistema, **self._opcoes)
+
+    def obter(self):
+        """Retorna a simulação da thread atual, criando-a no primeiro uso"""
+        simulacao = getattr(self._local, 'simulacao', None)
+        if simulacao is None:
+            simulacao = self._local.simulacao = self.nova_simulacao()
+        return simulacao
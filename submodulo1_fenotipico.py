@@ -14,123 +14,38 @@ VARIÁVEIS DE ENTRADA:
 SAÍDA: Escore de Risco Fenotípico (0-100)
 """
 
-import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-import matplotlib.pyplot as plt
+from simulacao_por_thread import SimulacaoPorThread
 
 # ==============================================================================
-# PASSO 1: DEFINIR AS VARIÁVEIS FUZZY (ANTECEDENTES E CONSEQUENTE)
+# PASSOS 1 A 3: CONSTRUÇÃO DO SISTEMA (SOB DEMANDA)
 # ==============================================================================
+# O skfuzzy e o sistema fuzzy só são carregados no primeiro cálculo;
+# importar este módulo não monta variáveis, regras nem simulações.
 
-# ANTECEDENTE 1: IMC (kg/m²)
-# Universo de discurso: 12 a 50 kg/m²
-imc = ctrl.Antecedent(np.arange(12, 50.1, 0.1), 'imc')
-
-# Funções de Pertinência do IMC (conforme Rodada 2 Delphi):
-# - Baixo Risco: IMC ideal (22-25 kg/m²)
-# - Médio Risco: Baixo peso limítrofe ou sobrepeso
-# - Alto Risco: Desnutrição grave (<18) ou obesidade mórbida (>30)
-
-imc['baixo_risco'] = fuzz.trapmf(imc.universe, [20, 22, 25, 28])
-imc['medio_risco'] = fuzz.trimf(imc.universe, [17, 20, 30])
-imc['alto_risco'] = fuzz.trapmf(imc.universe, [12, 14, 16, 18]) + fuzz.trapmf(imc.universe, [30, 35, 45, 50])
-
-# ANTECEDENTE 2: Perda Ponderal (% em 3 meses)
-# Universo de discurso: 0 a 30%
-perda_ponderal = ctrl.Antecedent(np.arange(0, 30.1, 0.1), 'perda_ponderal')
-
-# Funções de Pertinência da Perda Ponderal:
-# - Baixo Risco: Sem perda ou perda mínima (<5%)
-# - Médio Risco: Perda moderada (5-10%, critério GLIM)
-# - Alto Risco: Perda grave (>10%)
-
-perda_ponderal['baixo_risco'] = fuzz.trapmf(perda_ponderal.universe, [0, 0, 2, 5])
-perda_ponderal['medio_risco'] = fuzz.trimf(perda_ponderal.universe, [3, 7, 12])
-perda_ponderal['alto_risco'] = fuzz.trapmf(perda_ponderal.universe, [10, 12, 20, 30])
-
-# ANTECEDENTE 3: Sarcopenia Clínica (escala 0-3)
-# 0 = Ausente, 1 = Leve, 2 = Moderada, 3 = Grave
-sarcopenia = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'sarcopenia')
-
-# Funções de Pertinência da Sarcopenia:
-# - Baixo Risco: Ausente ou muito leve
-# - Médio Risco: Leve a moderada
-# - Alto Risco: Moderada a grave
-
-sarcopenia['baixo_risco'] = fuzz.trapmf(sarcopenia.universe, [0, 0, 0.5, 1])
-sarcopenia['medio_risco'] = fuzz.trimf(sarcopenia.universe, [0.5, 1.5, 2.5])
-sarcopenia['alto_risco'] = fuzz.trapmf(sarcopenia.universe, [2, 2.5, 3, 3])
-
-# CONSEQUENTE: Escore de Risco Fenotípico (0-100)
-risco_fenotipico = ctrl.Consequent(np.arange(0, 101, 1), 'risco_fenotipico')
-
-# Funções de Pertinência da Saída:
-risco_fenotipico['baixo'] = fuzz.trapmf(risco_fenotipico.universe, [0, 0, 15, 30])
-risco_fenotipico['baixo_moderado'] = fuzz.trimf(risco_fenotipico.universe, [20, 32, 45])
-risco_fenotipico['moderado'] = fuzz.trimf(risco_fenotipico.universe, [35, 50, 65])
-risco_fenotipico['moderado_alto'] = fuzz.trimf(risco_fenotipico.universe, [55, 67, 80])
-risco_fenotipico['alto'] = fuzz.trapmf(risco_fenotipico.universe, [70, 85, 100, 100])
-
-# ==============================================================================
-# PASSO 2: DEFINIR AS REGRAS FUZZY (BASE DE CONHECIMENTO)
-# ==============================================================================
-
-# Total: 12 regras principais + 1 override (obesidade estável)
-
-# REGRAS DE ALTO RISCO (prioridade alta)
-regra1 = ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], 
-                   risco_fenotipico['alto'])
-
-regra2 = ctrl.Rule(imc['alto_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], 
-                   risco_fenotipico['alto'])
-
-regra3 = ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['alto_risco'], 
-                   risco_fenotipico['alto'])
-
-regra4 = ctrl.Rule(imc['alto_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], 
-                   risco_fenotipico['moderado_alto'])
-
-# REGRAS DE MÉDIO/MODERADO RISCO
-regra5 = ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'], 
-                   risco_fenotipico['baixo_moderado'])  # Override obesidade estável
-
-regra6 = ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['alto_risco'], 
-                   risco_fenotipico['moderado_alto'])
-
-regra7 = ctrl.Rule(imc['medio_risco'] & perda_ponderal['alto_risco'] & sarcopenia['medio_risco'], 
-                   risco_fenotipico['moderado'])
-
-regra8 = ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['medio_risco'], 
-                   risco_fenotipico['moderado'])
-
-regra9 = ctrl.Rule(imc['medio_risco'] & perda_ponderal['medio_risco'] & sarcopenia['baixo_risco'], 
-                   risco_fenotipico['baixo_moderado'])
-
-# REGRAS DE BAIXO RISCO
-regra10 = ctrl.Rule(imc['baixo_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], 
-                    risco_fenotipico['baixo'])
-
-regra11 = ctrl.Rule(imc['medio_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], 
-                    risco_fenotipico['baixo'])
-
-regra12 = ctrl.Rule(imc['alto_risco'] & perda_ponderal['baixo_risco'] & sarcopenia['baixo_risco'], 
-                    risco_fenotipico['baixo_moderado'])
-
-# REGRA DEFAULT (caso não coberto)
-regra13 = ctrl.Rule(imc['medio_risco'] | perda_ponderal['medio_risco'] | sarcopenia['medio_risco'], 
-                    risco_fenotipico['moderado'])
+def _construir_sistema_fenotipico():
+    """
+    Monta o ControlSystem fenotípico a partir da base 'fenotipico_delphi'
+    (variáveis e regras em bases_regras.py).
+    """
+    from compilador_regras import compilar, construir_sistema_skfuzzy
 
-# ==============================================================================
-# PASSO 3: CRIAR O SISTEMA DE CONTROLE FUZZY
-# ==============================================================================
+    return construir_sistema_skfuzzy(compilar('fenotipico_delphi', minimizada=True))
 
-sistema_fenotipico = ctrl.ControlSystem([
-    regra1, regra2, regra3, regra4, regra5, regra6, 
-    regra7, regra8, regra9, regra10, regra11, regra12, regra13
-])
+# Simulação exclusiva de cada thread (ver simulacao_por_thread.py), sem o
+# cache do skfuzzy, cujo resultado depende da ordem das chamadas anteriores;
+# o sistema é construído na primeira chamada
+_simulacoes_fenotipicas = SimulacaoPorThread(_construir_sistema_fenotipico, cache=False)
 
-calculadora_fenotipica = ctrl.ControlSystemSimulation(sistema_fenotipico)
+def __getattr__(nome):
+    """
+    Compatibilidade: sistema_fenotipico e calculadora_fenotipica (simulação global,
+    NÃO segura entre threads) são construídos no primeiro acesso.
+    """
+    if nome in ('sistema_fenotipico', 'calculadora_fenotipica'):
+        globals().setdefault('calculadora_fenotipica', _simulacoes_fenotipicas.nova_simulacao())
+        globals().setdefault('sistema_fenotipico', globals()['calculadora_fenotipica'].ctrl)
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # ==============================================================================
 # PASSO 4: FUNÇÃO DE CÁLCULO DO ESCORE
@@ -164,15 +79,16 @@ def calcular_risco_fenotipico(imc_valor, perda_valor, sarcopenia_valor, debug=Fa
     if not (0 <= sarcopenia_valor <= 3):
         raise ValueError(f"Sarcopenia fora do intervalo válido (0-3): {sarcopenia_valor}")
     
-    # Inserir valores no sistema
-    calculadora_fenotipica.input['imc'] = imc_valor
-    calculadora_fenotipica.input['perda_ponderal'] = perda_valor
-    calculadora_fenotipica.input['sarcopenia'] = sarcopenia_valor
+    # Inserir valores na simulação desta thread
+    calculadora = _simulacoes_fenotipicas.obter()
+    calculadora.input['imc'] = imc_valor
+    calculadora.input['perda_ponderal'] = perda_valor
+    calculadora.input['sarcopenia'] = sarcopenia_valor
     
     # Computar o resultado
-    calculadora_fenotipica.compute()
+    calculadora.compute()
     
-    escore = calculadora_fenotipica.output['risco_fenotipico']
+    escore = calculadora.output['risco_fenotipico']
     
     if debug:
         print(f"\n{'='*60}")
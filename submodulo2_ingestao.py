@@ -14,131 +14,38 @@ VARIAVEIS DE ENTRADA:
 SAIDA: Escore de Risco de Ingestao (0-100)
 """
 
-import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-import matplotlib.pyplot as plt
+from simulacao_por_thread import SimulacaoPorThread
 
 # ==============================================================================
-# PASSO 1: DEFINIR AS VARIAVEIS FUZZY (ANTECEDENTES E CONSEQUENTE)
+# PASSOS 1 A 3: CONSTRUÇÃO DO SISTEMA (SOB DEMANDA)
 # ==============================================================================
+# O skfuzzy e o sistema fuzzy só são carregados no primeiro cálculo;
+# importar este módulo não monta variáveis, regras nem simulações.
 
-# ANTECEDENTE 1: % VET Consumido (0-100%)
-# Universo de discurso: 0 a 100%
-vet_consumido = ctrl.Antecedent(np.arange(0, 101, 1), 'vet_consumido')
-
-# Funcoes de Pertinencia do % VET:
-# - Baixo Risco: Consumo adequado (>=75% VET)
-# - Medio Risco: Consumo subotimo (50-74% VET)
-# - Alto Risco: Consumo muito insuficiente (<50% VET) ou jejum
-
-vet_consumido['baixo_risco'] = fuzz.trapmf(vet_consumido.universe, [75, 85, 100, 100])
-vet_consumido['medio_risco'] = fuzz.trimf(vet_consumido.universe, [40, 60, 80])
-vet_consumido['alto_risco'] = fuzz.trapmf(vet_consumido.universe, [0, 0, 25, 50])
-
-# ANTECEDENTE 2: Duracao do Deficit Alimentar (dias)
-# Universo de discurso: 0 a 30 dias
-duracao_deficit = ctrl.Antecedent(np.arange(0, 31, 1), 'duracao_deficit')
-
-# Funcoes de Pertinencia da Duracao:
-# - Baixo Risco: Deficit curto (<7 dias)
-# - Medio Risco: Deficit moderado (7-14 dias)
-# - Alto Risco: Deficit prolongado (>14 dias)
-
-duracao_deficit['baixo_risco'] = fuzz.trapmf(duracao_deficit.universe, [0, 0, 3, 7])
-duracao_deficit['medio_risco'] = fuzz.trimf(duracao_deficit.universe, [5, 10, 16])
-duracao_deficit['alto_risco'] = fuzz.trapmf(duracao_deficit.universe, [12, 14, 30, 30])
-
-# ANTECEDENTE 3: Sintomas Gastrointestinais (escala 0-3)
-# 0 = Ausentes, 1 = Leves, 2 = Moderados, 3 = Graves
-# Exemplos: nauseas, vomitos, diarreia, distensao abdominal
-sintomas_gi = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'sintomas_gi')
-
-# Funcoes de Pertinencia dos Sintomas GI:
-# - Baixo Risco: Ausentes ou muito leves
-# - Medio Risco: Leves a moderados
-# - Alto Risco: Moderados a graves (impedem alimentacao)
-
-sintomas_gi['baixo_risco'] = fuzz.trapmf(sintomas_gi.universe, [0, 0, 0.3, 0.8])
-sintomas_gi['medio_risco'] = fuzz.trimf(sintomas_gi.universe, [0.5, 1.5, 2.3])
-sintomas_gi['alto_risco'] = fuzz.trapmf(sintomas_gi.universe, [2, 2.5, 3, 3])
-
-# CONSEQUENTE: Escore de Risco de Ingestao (0-100)
-risco_ingestao = ctrl.Consequent(np.arange(0, 101, 1), 'risco_ingestao')
-
-# Funcoes de Pertinencia da Saida:
-risco_ingestao['baixo'] = fuzz.trapmf(risco_ingestao.universe, [0, 0, 15, 30])
-risco_ingestao['baixo_moderado'] = fuzz.trimf(risco_ingestao.universe, [20, 32, 45])
-risco_ingestao['moderado'] = fuzz.trimf(risco_ingestao.universe, [35, 50, 65])
-risco_ingestao['moderado_alto'] = fuzz.trimf(risco_ingestao.universe, [55, 67, 80])
-risco_ingestao['alto'] = fuzz.trapmf(risco_ingestao.universe, [70, 85, 100, 100])
-
-# ==============================================================================
-# PASSO 2: DEFINIR AS REGRAS FUZZY (BASE DE CONHECIMENTO)
-# ==============================================================================
-
-# Total: 15 regras (conforme Rodada 3 Delphi)
-
-# REGRAS DE ALTO RISCO (deficit grave e prolongado)
-regra1 = ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], 
-                   risco_ingestao['alto'])
-
-regra2 = ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['medio_risco'], 
-                   risco_ingestao['alto'])
-
-regra3 = ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['alto_risco'], 
-                   risco_ingestao['alto'])
-
-regra4 = ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], 
-                   risco_ingestao['moderado_alto'])
-
-# REGRAS DE MODERADO-ALTO RISCO
-regra5 = ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['alto_risco'], 
-                   risco_ingestao['moderado_alto'])
-
-regra6 = ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], 
-                   risco_ingestao['moderado_alto'])
-
-regra7 = ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['alto_risco'], 
-                   risco_ingestao['moderado_alto'])
-
-# REGRAS DE MODERADO RISCO
-regra8 = ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], 
-                   risco_ingestao['moderado'])
-
-regra9 = ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['alto_risco'] & sintomas_gi['baixo_risco'], 
-                   risco_ingestao['moderado'])
-
-regra10 = ctrl.Rule(vet_consumido['alto_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], 
-                    risco_ingestao['moderado'])
-
-regra11 = ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['baixo_risco'], 
-                    risco_ingestao['baixo_moderado'])
-
-# REGRAS DE BAIXO-MODERADO RISCO
-regra12 = ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['medio_risco'] & sintomas_gi['medio_risco'], 
-                    risco_ingestao['baixo_moderado'])
-
-regra13 = ctrl.Rule(vet_consumido['medio_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], 
-                    risco_ingestao['baixo_moderado'])
-
-# REGRAS DE BAIXO RISCO
-regra14 = ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['baixo_risco'], 
-                    risco_ingestao['baixo'])
-
-regra15 = ctrl.Rule(vet_consumido['baixo_risco'] & duracao_deficit['baixo_risco'] & sintomas_gi['medio_risco'], 
-                    risco_ingestao['baixo'])
+def _construir_sistema_ingestao():
+    """
+    Monta o ControlSystem de ingestão a partir da base 'ingestao_delphi'
+    (variáveis e regras em bases_regras.py).
+    """
+    from compilador_regras import compilar, construir_sistema_skfuzzy
 
-# ==============================================================================
-# PASSO 3: CRIAR O SISTEMA DE CONTROLE FUZZY
-# ==============================================================================
+    return construir_sistema_skfuzzy(compilar('ingestao_delphi', minimizada=True))
 
-sistema_ingestao = ctrl.ControlSystem([
-    regra1, regra2, regra3, regra4, regra5, regra6, regra7, regra8,
-    regra9, regra10, regra11, regra12, regra13, regra14, regra15
-])
+# Simulação exclusiva de cada thread (ver simulacao_por_thread.py), sem o
+# cache do skfuzzy, cujo resultado depende da ordem das chamadas anteriores;
+# o sistema é construído na primeira chamada
+_simulacoes_ingestao = SimulacaoPorThread(_construir_sistema_ingestao, cache=False)
 
-calculadora_ingestao = ctrl.ControlSystemSimulation(sistema_ingestao)
+def __getattr__(nome):
+    """
+    Compatibilidade: sistema_ingestao e calculadora_ingestao (simulação global,
+    NÃO segura entre threads) são construídos no primeiro acesso.
+    """
+    if nome in ('sistema_ingestao', 'calculadora_ingestao'):
+        globals().setdefault('calculadora_ingestao', _simulacoes_ingestao.nova_simulacao())
+        globals().setdefault('sistema_ingestao', globals()['calculadora_ingestao'].ctrl)
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # ==============================================================================
 # PASSO 4: FUNCAO DE CALCULO DO ESCORE
@@ -172,15 +79,16 @@ def calcular_risco_ingestao(vet_valor, duracao_valor, sintomas_valor, debug=Fals
     if not (0 <= sintomas_valor <= 3):
         raise ValueError(f"Sintomas GI fora do intervalo valido (0-3): {sintomas_valor}")
     
-    # Inserir valores no sistema
-    calculadora_ingestao.input['vet_consumido'] = vet_valor
-    calculadora_ingestao.input['duracao_deficit'] = duracao_valor
-    calculadora_ingestao.input['sintomas_gi'] = sintomas_valor
+    # Inserir valores na simulação desta thread
+    calculadora = _simulacoes_ingestao.obter()
+    calculadora.input['vet_consumido'] = vet_valor
+    calculadora.input['duracao_deficit'] = duracao_valor
+    calculadora.input['sintomas_gi'] = sintomas_valor
     
     # Computar o resultado
-    calculadora_ingestao.compute()
+    calculadora.compute()
     
-    escore = calculadora_ingestao.output['risco_ingestao']
+    escore = calculadora.output['risco_ingestao']
     
     if debug:
         print(f"\n{'='*60}")
@@ -14,119 +14,38 @@ VARIAVEIS DE ENTRADA:
 SAIDA: Escore de Risco Inflamatorio (0-100)
 """
 
-import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-import matplotlib.pyplot as plt
+from simulacao_por_thread import SimulacaoPorThread
 
 # ==============================================================================
-# PASSO 1: DEFINIR AS VARIAVEIS FUZZY (ANTECEDENTES E CONSEQUENTE)
+# PASSOS 1 A 3: CONSTRUÇÃO DO SISTEMA (SOB DEMANDA)
 # ==============================================================================
+# O skfuzzy e o sistema fuzzy só são carregados no primeiro cálculo;
+# importar este módulo não monta variáveis, regras nem simulações.
 
-# ANTECEDENTE 1: PCR - Proteina C Reativa (mg/L)
-# Universo de discurso: 0 a 400 mg/L
-pcr = ctrl.Antecedent(np.arange(0, 401, 1), 'pcr')
-
-# Funcoes de Pertinencia da PCR:
-# - Baixo Risco: PCR normal (<10 mg/L)
-# - Medio Risco: PCR elevada (10-100 mg/L)
-# - Alto Risco: PCR muito elevada (>100 mg/L)
-# REGRA DE DOMINANCIA: PCR >200 sempre indica alto risco inflamatorio
-
-pcr['baixo_risco'] = fuzz.trapmf(pcr.universe, [0, 0, 5, 10])
-pcr['medio_risco'] = fuzz.trimf(pcr.universe, [5, 50, 120])
-pcr['alto_risco'] = fuzz.trapmf(pcr.universe, [80, 100, 400, 400])
-
-# ANTECEDENTE 2: Albumina Serica (g/dL)
-# Universo de discurso: 1.5 a 5.0 g/dL
-albumina = ctrl.Antecedent(np.arange(1.5, 5.1, 0.1), 'albumina')
-
-# Funcoes de Pertinencia da Albumina:
-# - Baixo Risco: Albumina normal (>=3.5 g/dL)
-# - Medio Risco: Albumina reduzida leve (3.0-3.4 g/dL)
-# - Alto Risco: Albumina reduzida moderada/grave (<3.0 g/dL)
-# NOTA: Albumina e marcador negativo de fase aguda, nao estado nutricional isolado
-
-albumina['baixo_risco'] = fuzz.trapmf(albumina.universe, [3.5, 4.0, 5.0, 5.0])
-albumina['medio_risco'] = fuzz.trimf(albumina.universe, [2.8, 3.2, 3.7])
-albumina['alto_risco'] = fuzz.trapmf(albumina.universe, [1.5, 1.5, 2.5, 3.0])
-
-# ANTECEDENTE 3: Febre (escala 0-3)
-# 0 = Ausente, 1 = Subfebril (<38C), 2 = Febre (38-39C), 3 = Hipertermia (>39C)
-febre = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'febre')
-
-# Funcoes de Pertinencia da Febre:
-# - Baixo Risco: Ausente ou subfebril
-# - Medio Risco: Febre leve a moderada
-# - Alto Risco: Febre alta ou hipertermia
-
-febre['baixo_risco'] = fuzz.trapmf(febre.universe, [0, 0, 0.5, 1.2])
-febre['medio_risco'] = fuzz.trimf(febre.universe, [0.8, 1.8, 2.5])
-febre['alto_risco'] = fuzz.trapmf(febre.universe, [2.2, 2.7, 3, 3])
-
-# CONSEQUENTE: Escore de Risco Inflamatorio (0-100)
-risco_inflamatorio = ctrl.Consequent(np.arange(0, 101, 1), 'risco_inflamatorio')
-
-# Funcoes de Pertinencia da Saida:
-risco_inflamatorio['baixo'] = fuzz.trapmf(risco_inflamatorio.universe, [0, 0, 15, 30])
-risco_inflamatorio['baixo_moderado'] = fuzz.trimf(risco_inflamatorio.universe, [20, 32, 45])
-risco_inflamatorio['moderado'] = fuzz.trimf(risco_inflamatorio.universe, [35, 50, 65])
-risco_inflamatorio['moderado_alto'] = fuzz.trimf(risco_inflamatorio.universe, [55, 67, 80])
-risco_inflamatorio['alto'] = fuzz.trapmf(risco_inflamatorio.universe, [70, 85, 100, 100])
-
-# ==============================================================================
-# PASSO 2: DEFINIR AS REGRAS FUZZY (BASE DE CONHECIMENTO)
-# ==============================================================================
-
-# Total: 10 regras (conforme Rodada 3 Delphi)
-# INCLUI REGRA DE DOMINANCIA: PCR >200 sempre alto risco
-
-# REGRAS DE ALTO RISCO (inflamacao grave)
-regra1 = ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['alto_risco'], 
-                   risco_inflamatorio['alto'])
-
-regra2 = ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'] & febre['medio_risco'], 
-                   risco_inflamatorio['alto'])
-
-regra3 = ctrl.Rule(pcr['alto_risco'] & albumina['medio_risco'] & febre['alto_risco'], 
-                   risco_inflamatorio['alto'])
-
-# REGRA DE DOMINANCIA: PCR extremamente elevada (>200) sempre alto risco
-# Nota: Esta regra e capturada pela MF de alto_risco da PCR (>100)
-# mas enfatizamos que valores >200 tem pertinencia maxima
-regra4 = ctrl.Rule(pcr['alto_risco'] & albumina['alto_risco'], 
-                   risco_inflamatorio['alto'])
-
-# REGRAS DE MODERADO-ALTO RISCO
-regra5 = ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['medio_risco'], 
-                   risco_inflamatorio['moderado_alto'])
-
-regra6 = ctrl.Rule(pcr['medio_risco'] & albumina['alto_risco'] & febre['alto_risco'], 
-                   risco_inflamatorio['moderado_alto'])
-
-# REGRAS DE MODERADO RISCO
-regra7 = ctrl.Rule(pcr['medio_risco'] & albumina['medio_risco'] & febre['medio_risco'], 
-                   risco_inflamatorio['moderado'])
-
-regra8 = ctrl.Rule(pcr['alto_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], 
-                   risco_inflamatorio['moderado'])
-
-# REGRAS DE BAIXO-MODERADO E BAIXO RISCO
-regra9 = ctrl.Rule(pcr['medio_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], 
-                   risco_inflamatorio['baixo_moderado'])
+def _construir_sistema_inflamatorio():
+    """
+    Monta o ControlSystem inflamatório a partir da base 'inflamatorio_delphi'
+    (variáveis e regras em bases_regras.py).
+    """
+    from compilador_regras import compilar, construir_sistema_skfuzzy
 
-regra10 = ctrl.Rule(pcr['baixo_risco'] & albumina['baixo_risco'] & febre['baixo_risco'], 
-                    risco_inflamatorio['baixo'])
+    return construir_sistema_skfuzzy(compilar('inflamatorio_delphi', minimizada=True))
 
-# ==============================================================================
-# PASSO 3: CRIAR O SISTEMA DE CONTROLE FUZZY
-# ==============================================================================
+# Simulação exclusiva de cada thread (ver simulacao_por_thread.py), sem o
+# cache do skfuzzy, cujo resultado depende da ordem das chamadas anteriores;
+# o sistema é construído na primeira chamada
+_simulacoes_inflamatorio = SimulacaoPorThread(_construir_sistema_inflamatorio, cache=False)
 
-sistema_inflamatorio = ctrl.ControlSystem([
-    regra1, regra2, regra3, regra4, regra5, regra6, regra7, regra8, regra9, regra10
-])
-
-calculadora_inflamatorio = ctrl.ControlSystemSimulation(sistema_inflamatorio)
+def __getattr__(nome):
+    """
+    Compatibilidade: sistema_inflamatorio e calculadora_inflamatorio (simulação global,
+    NÃO segura entre threads) são construídos no primeiro acesso.
+    """
+    if nome in ('sistema_inflamatorio', 'calculadora_inflamatorio'):
+        globals().setdefault('calculadora_inflamatorio', _simulacoes_inflamatorio.nova_simulacao())
+        globals().setdefault('sistema_inflamatorio', globals()['calculadora_inflamatorio'].ctrl)
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # ==============================================================================
 # PASSO 4: FUNCAO DE CALCULO DO ESCORE
@@ -160,15 +79,16 @@ def calcular_risco_inflamatorio(pcr_valor, albumina_valor, febre_valor, debug=Fa
     if not (0 <= febre_valor <= 3):
         raise ValueError(f"Febre fora do intervalo valido (0-3): {febre_valor}")
     
-    # Inserir valores no sistema
-    calculadora_inflamatorio.input['pcr'] = pcr_valor
-    calculadora_inflamatorio.input['albumina'] = albumina_valor
-    calculadora_inflamatorio.input['febre'] = febre_valor
+    # Inserir valores na simulação desta thread
+    calculadora = _simulacoes_inflamatorio.obter()
+    calculadora.input['pcr'] = pcr_valor
+    calculadora.input['albumina'] = albumina_valor
+    calculadora.input['febre'] = febre_valor
     
     # Computar o resultado
-    calculadora_inflamatorio.compute()
+    calculadora.compute()
     
-    escore = calculadora_inflamatorio.output['risco_inflamatorio']
+    escore = calculadora.output['risco_inflamatorio']
     
     if debug:
         print(f"\n{'='*60}")
@@ -15,137 +15,38 @@ VARIAVEIS DE ENTRADA:
 SAIDA: Escore de Risco de Gravidade/Morbidade (0-100)
 """
 
-import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-import matplotlib.pyplot as plt
+from simulacao_por_thread import SimulacaoPorThread
 
 # ==============================================================================
-# PASSO 1: DEFINIR AS VARIAVEIS FUZZY (ANTECEDENTES E CONSEQUENTE)
+# PASSOS 1 A 3: CONSTRUÇÃO DO SISTEMA (SOB DEMANDA)
 # ==============================================================================
+# O skfuzzy e o sistema fuzzy só são carregados no primeiro cálculo;
+# importar este módulo não monta variáveis, regras nem simulações.
 
-# ANTECEDENTE 1: Diagnostico/Estresse Metabolico (escala 0-3)
-# 0 = Baixo (cirurgia eletiva pequeno porte, condicao clinica estavel)
-# 1 = Moderado (fratura quadril, pneumonia, cirurgia abdominal)
-# 2 = Alto (politrauma, TCE grave, sepse, pos-op grande porte)
-# 3 = Muito Alto (choque septico, transplante, neoplasia avancada)
-diagnostico = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'diagnostico')
-
-# Funcoes de Pertinencia do Diagnostico:
-diagnostico['baixo_risco'] = fuzz.trapmf(diagnostico.universe, [0, 0, 0.3, 0.8])
-diagnostico['medio_risco'] = fuzz.trimf(diagnostico.universe, [0.5, 1.5, 2.3])
-diagnostico['alto_risco'] = fuzz.trapmf(diagnostico.universe, [2, 2.5, 3, 3])
-
-# ANTECEDENTE 2: Comorbidades (escala 0-5)
-# 0 = Nenhuma
-# 1-2 = 1-2 comorbidades leves/moderadas
-# 3-5 = 3+ comorbidades OU presenca de comorbidade critica:
-#   - IRC em dialise
-#   - ICC classe IV (NYHA)
-#   - DPOC O2-dependente
-#   - Cirrose hepatica Child C
-# NOTA: Comorbidades criticas sempre elevam risco para minimo MODERADO
-comorbidades = ctrl.Antecedent(np.arange(0, 5.1, 0.1), 'comorbidades')
-
-# Funcoes de Pertinencia das Comorbidades:
-comorbidades['baixo_risco'] = fuzz.trapmf(comorbidades.universe, [0, 0, 0.3, 1.0])
-comorbidades['medio_risco'] = fuzz.trimf(comorbidades.universe, [0.5, 2.0, 3.5])
-comorbidades['alto_risco'] = fuzz.trapmf(comorbidades.universe, [3, 3.5, 5, 5])
-
-# ANTECEDENTE 3: Idade (anos)
-# Universo de discurso: 18 a 100 anos
-idade = ctrl.Antecedent(np.arange(18, 101, 1), 'idade')
-
-# Funcoes de Pertinencia da Idade:
-# - Baixo Risco: <65 anos
-# - Medio Risco: 65-74 anos
-# - Alto Risco: >=75 anos (fragilidade, sarcopenia, reserva funcional reduzida)
-
-idade['baixo_risco'] = fuzz.trapmf(idade.universe, [18, 18, 55, 65])
-idade['medio_risco'] = fuzz.trimf(idade.universe, [60, 70, 78])
-idade['alto_risco'] = fuzz.trapmf(idade.universe, [73, 75, 100, 100])
-
-# ANTECEDENTE 4: Cirurgia de Grande Porte Recente (binario)
-# 0 = Nao, 1 = Sim (nos ultimos 7 dias)
-# Exemplos: esofagectomia, gastrectomia, duodenopancreatectomia, colectomia
-cirurgia = ctrl.Antecedent(np.arange(0, 1.1, 0.1), 'cirurgia')
-
-# Funcoes de Pertinencia da Cirurgia:
-cirurgia['nao'] = fuzz.trapmf(cirurgia.universe, [0, 0, 0.2, 0.4])
-cirurgia['sim'] = fuzz.trapmf(cirurgia.universe, [0.6, 0.8, 1, 1])
-
-# CONSEQUENTE: Escore de Risco de Gravidade/Morbidade (0-100)
-risco_gravidade = ctrl.Consequent(np.arange(0, 101, 1), 'risco_gravidade')
-
-# Funcoes de Pertinencia da Saida:
-risco_gravidade['baixo'] = fuzz.trapmf(risco_gravidade.universe, [0, 0, 15, 30])
-risco_gravidade['baixo_moderado'] = fuzz.trimf(risco_gravidade.universe, [20, 32, 45])
-risco_gravidade['moderado'] = fuzz.trimf(risco_gravidade.universe, [35, 50, 65])
-risco_gravidade['moderado_alto'] = fuzz.trimf(risco_gravidade.universe, [55, 67, 80])
-risco_gravidade['alto'] = fuzz.trapmf(risco_gravidade.universe, [70, 85, 100, 100])
-
-# ==============================================================================
-# PASSO 2: DEFINIR AS REGRAS FUZZY (BASE DE CONHECIMENTO)
-# ==============================================================================
-
-# Total: 13 regras (conforme Rodada 3 Delphi)
-# ENFASE: Comorbidades criticas (IRC dialise, ICC IV, DPOC O2, cirrose C) sempre >= MODERADO
-
-# REGRAS DE ALTO RISCO
-regra1 = ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & idade['alto_risco'], 
-                   risco_gravidade['alto'])
-
-regra2 = ctrl.Rule(diagnostico['alto_risco'] & comorbidades['alto_risco'] & cirurgia['sim'], 
-                   risco_gravidade['alto'])
-
-regra3 = ctrl.Rule(diagnostico['alto_risco'] & idade['alto_risco'] & cirurgia['sim'], 
-                   risco_gravidade['alto'])
-
-# REGRAS DE MODERADO-ALTO RISCO
-regra4 = ctrl.Rule(diagnostico['alto_risco'] & comorbidades['medio_risco'] & idade['medio_risco'], 
-                   risco_gravidade['moderado_alto'])
-
-regra5 = ctrl.Rule(diagnostico['medio_risco'] & comorbidades['alto_risco'] & cirurgia['sim'], 
-                   risco_gravidade['moderado_alto'])
-
-regra6 = ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & cirurgia['sim'], 
-                   risco_gravidade['moderado_alto'])
-
-# REGRAS DE MODERADO RISCO
-# IMPORTANTE: Comorbidades criticas sempre >= MODERADO
-regra7 = ctrl.Rule(comorbidades['alto_risco'], 
-                   risco_gravidade['moderado'])  # Regra de dominancia para comorbidades criticas
-
-regra8 = ctrl.Rule(diagnostico['medio_risco'] & comorbidades['medio_risco'] & idade['medio_risco'], 
-                   risco_gravidade['moderado'])
-
-regra9 = ctrl.Rule(diagnostico['alto_risco'] & comorbidades['baixo_risco'] & idade['baixo_risco'] & cirurgia['nao'], 
-                   risco_gravidade['moderado'])
-
-regra10 = ctrl.Rule(idade['alto_risco'] & cirurgia['sim'], 
-                    risco_gravidade['moderado'])
-
-# REGRAS DE BAIXO-MODERADO RISCO
-regra11 = ctrl.Rule(diagnostico['medio_risco'] & comorbidades['baixo_risco'] & idade['medio_risco'], 
-                    risco_gravidade['baixo_moderado'])
-
-regra12 = ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['medio_risco'] & idade['medio_risco'], 
-                    risco_gravidade['baixo_moderado'])
-
-# REGRAS DE BAIXO RISCO
-regra13 = ctrl.Rule(diagnostico['baixo_risco'] & comorbidades['baixo_risco'] & idade['baixo_risco'] & cirurgia['nao'], 
-                    risco_gravidade['baixo'])
+def _construir_sistema_gravidade():
+    """
+    Monta o ControlSystem de gravidade a partir da base 'gravidade_delphi'
+    (variáveis e regras em bases_regras.py).
+    """
+    from compilador_regras import compilar, construir_sistema_skfuzzy
 
-# ==============================================================================
-# PASSO 3: CRIAR O SISTEMA DE CONTROLE FUZZY
-# ==============================================================================
+    return construir_sistema_skfuzzy(compilar('gravidade_delphi', minimizada=True))
 
-sistema_gravidade = ctrl.ControlSystem([
-    regra1, regra2, regra3, regra4, regra5, regra6, regra7, 
-    regra8, regra9, regra10, regra11, regra12, regra13
-])
+# Simulação exclusiva de cada thread (ver simulacao_por_thread.py), sem o
+# cache do skfuzzy, cujo resultado depende da ordem das chamadas anteriores;
+# o sistema é construído na primeira chamada
+_simulacoes_gravidade = SimulacaoPorThread(_construir_sistema_gravidade, cache=False)
 
-calculadora_gravidade = ctrl.ControlSystemSimulation(sistema_gravidade)
+def __getattr__(nome):
+    """
+    Compatibilidade: sistema_gravidade e calculadora_gravidade (simulação global,
+    NÃO segura entre threads) são construídos no primeiro acesso.
+    """
+    if nome in ('sistema_gravidade', 'calculadora_gravidade'):
+        globals().setdefault('calculadora_gravidade', _simulacoes_gravidade.nova_simulacao())
+        globals().setdefault('sistema_gravidade', globals()['calculadora_gravidade'].ctrl)
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # ==============================================================================
 # PASSO 4: FUNCAO DE CALCULO DO ESCORE
@@ -184,16 +85,17 @@ def calcular_risco_gravidade(diagnostico_valor, comorbidades_valor, idade_valor,
     if cirurgia_valor not in [0, 1]:
         raise ValueError(f"Cirurgia deve ser 0 ou 1: {cirurgia_valor}")
     
-    # Inserir valores no sistema
-    calculadora_gravidade.input['diagnostico'] = diagnostico_valor
-    calculadora_gravidade.input['comorbidades'] = comorbidades_valor
-    calculadora_gravidade.input['idade'] = idade_valor
-    calculadora_gravidade.input['cirurgia'] = cirurgia_valor
+    # Inserir valores na simulação desta thread
+    calculadora = _simulacoes_gravidade.obter()
+    calculadora.input['diagnostico'] = diagnostico_valor
+    calculadora.input['comorbidades'] = comorbidades_valor
+    calculadora.input['idade'] = idade_valor
+    calculadora.input['cirurgia'] = cirurgia_valor
     
     # Computar o resultado
-    calculadora_gravidade.compute()
+    calculadora.compute()
     
-    escore = calculadora_gravidade.output['risco_gravidade']
+    escore = calculadora.output['risco_gravidade']
     
     if debug:
         print(f"\n{'='*60}")
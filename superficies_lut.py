@@ -0,0 +1,434 @@
+"""
+CALCULADORA FUZZY DE RISCO NUTRICIONAL
+Backend Opcional de Superfícies Tabeladas (LUT)
+
+Cada submódulo é uma função pura de 2 a 4 entradas limitadas (IMC 12-50,
+perda 0-30, PCR 0-400...). Este módulo tabela cada base de regras UMA vez numa
+grade regular (usando o motor_vetorizado) e responde às consultas por
+interpolação multilinear, em tempo praticamente constante.
+
+USO:
+    import superficies_lut as backend
+    escore = backend.calcular_submodulo_fenotipico(imc, perda, sarcopenia)
+
+As funções têm as mesmas assinaturas das de
+calculadora_desktop_albumina_opcional.py e aceitam escalares ou arrays.
+
+ZONAS MORTAS:
+Perto de uma zona sem regra ativada o centroide é a razão de cortes quase
+nulos e a superfície salta (ex.: IMC = 30 no fenotípico). Células com algum
+vértice de ativação total abaixo de LIMIAR_ATIVACAO não são interpoladas;
+esses pacientes são calculados pelo motor exato.
+
+ORÇAMENTO DE ERRO:
+As superfícies dobram onde duas pertinências se cruzam (mínimo das regras,
+máximo da acumulação), em geral fora dos pontos da grade; numa célula
+atravessada por uma dobra a interpolação multilinear erra até vários pontos
+de escore, o bastante para mudar a categoria (cortes 25/40/60/70). Por isso
+cada célula é CERTIFICADA ao tabelar, contra ERRO_MAXIMO_PADRAO (0.5 ponto):
+
+- a interpolação no centro da célula é comparada com o motor exato
+- o salto de inclinação da tabela em cada vértice, ao longo de cada eixo,
+  estima o erro de uma dobra dentro da célula (salto x largura / 4)
+
+Células que passam de ERRO_MAXIMO_PADRAO em qualquer dos dois testes vão
+para o motor exato, como as zonas mortas. A certificação é por amostragem,
+não uma cota rigorosa: no relatório abaixo (20 000 pontos aleatórios) o
+erro máximo fica abaixo de 1 ponto em todas as bases e o p99 abaixo de 0.4
+(teste_superficies_lut.py confere). O preço é a fração de pacientes
+calculados pelo motor exato (coluna "% exato"): de 4% a 55% nos submódulos.
+
+INTEGRADORES:
+As superfícies dos integradores dobram em quase todas as células da grade:
+perto de 90% dos pacientes cairiam no motor exato, e refinar a grade não
+resolve (41 pontos por eixo, 2,8 milhões de vértices, ainda 56%). Por isso
+calcular_risco_final_integrado usa o motor exato diretamente, sem LUT; as
+tabelas dos integradores só aparecem no relatório de erro, para comparação.
+
+ENTRADAS:
+Valores NaN, infinitos ou fora do universo de cada entrada (mais uma folga
+de arredondamento) levantam ValueError nos dois caminhos de consulta, em
+vez de serem saturados na borda da grade.
+
+CACHE EM DISCO:
+As tabelas ficam gravadas em .cache_compilado/ (ver cache_compilado.py),
+identificadas pela assinatura das funções de pertinência e das regras; a
+partir da segunda execução elas são apenas mapeadas na memória.
+
+RELATÓRIO DE ERRO:
+    python superficies_lut.py [--pontos N] [--amostras M]
+mostra o erro máximo e médio de cada superfície contra o motor exato.
+"""
+
+import argparse
+import bisect
+import itertools
+import math
+import time
+
+import numpy as np
+
+import cache_compilado
+import calculadora_desktop_albumina_opcional as calculadora
+import motor_vetorizado as mv
+
+# Pontos uniformes por eixo, por número de entradas do sistema (2, 3 ou 4);
+# os vértices das funções de pertinência de entrada são sempre acrescentados
+PONTOS_POR_EIXO_PADRAO = {2: 201, 3: 61, 4: 21}
+
+# Erro de interpolação tolerado numa célula (pontos de escore); acima dele a
+# célula usa o motor exato (ver ORÇAMENTO DE ERRO)
+ERRO_MAXIMO_PADRAO = 0.5
+
+# Ativação (maior corte de saída) abaixo da qual a célula usa o motor exato
+LIMIAR_ATIVACAO = 0.1
+
+# Folga relativa à largura do universo aceita nas bordas (o np.arange dos
+# universos termina em 49.999999999999865 em vez de 50, por exemplo)
+FOLGA_UNIVERSO = 1e-9
+
+# ==============================================================================
+# SUPERFÍCIE TABELADA DE UMA BASE DE REGRAS
+# ==============================================================================
+
+def _vertices_entrada(universo, termos):
+    """Pontos do universo onde alguma função de pertinência muda de inclinação"""
+    vertices = []
+    for _, mf in termos:
+        inclinacao = np.diff(mf) / np.diff(universo)
+        vertices.append(universo[np.flatnonzero(np.abs(np.diff(inclinacao)) > 1e-9) + 1])
+    return np.concatenate(vertices) if vertices else np.empty(0)
+
+
+def _limites_universos(universos):
+    """(mínimo, máximo) aceitos em cada entrada, com FOLGA_UNIVERSO"""
+    limites = []
+    for universo in universos:
+        folga = FOLGA_UNIVERSO * (universo.max() - universo.min())
+        limites.append((float(universo.min() - folga), float(universo.max() + folga)))
+    return limites
+
+
+def _validar_colunas(nomes, colunas, limites):
+    """Levanta ValueError se alguma coluna tiver NaN, infinito ou valor fora do universo"""
+    for nome, valores, (minimo, maximo) in zip(nomes, colunas, limites):
+        if not np.isfinite(valores).all():
+            raise ValueError(f"Valores ausentes ou não finitos (NaN/inf) em {nome}")
+        fora = (valores < minimo) | (valores > maximo)
+        if fora.any():
+            raise ValueError(f"{nome} fora do universo {minimo:g}-{maximo:g}: {valores[fora][0]}")
+
+
+class SuperficieLUT:
+    """Base de regras tabelada numa grade regular + interpolação multilinear
+
+    Parâmetros:
+    -----------
+    nome : str
+        Sistema do registro da calculadora ('fenotipico', 'gravidade', ...)
+    pontos_por_eixo : int ou list de int, opcional
+        Resolução da grade (padrão: PONTOS_POR_EIXO_PADRAO)
+    diretorio_cache : str, opcional
+        Pasta do cache em disco (ver cache_compilado.py); None desliga o cache
+    erro_maximo : float ou None
+        Erro tolerado por célula (padrão: ERRO_MAXIMO_PADRAO); None desliga a
+        certificação e só as zonas mortas usam o motor exato
+    """
+
+    def __init__(self, nome, pontos_por_eixo=None, diretorio_cache=None, erro_maximo=ERRO_MAXIMO_PADRAO):
+        self.nome = nome
+        self.erro_maximo = erro_maximo
+        self.motor = mv.obter_motor(nome)
+        self.entradas = self.motor.entradas
+        self.limites = _limites_universos(self.motor.universos)
+
+        dimensao = len(self.entradas)
+        if pontos_por_eixo is None:
+            pontos_por_eixo = PONTOS_POR_EIXO_PADRAO[dimensao]
+        if np.isscalar(pontos_por_eixo):
+            pontos_por_eixo = [pontos_por_eixo] * dimensao
+        if len(pontos_por_eixo) != dimensao or min(pontos_por_eixo) < 2:
+            raise ValueError(f"pontos_por_eixo deve ter {dimensao} valores >= 2")
+
+        # Grade uniforme nos limites que o skfuzzy usa para recortar as entradas,
+        # acrescida dos vértices das funções de pertinência (onde a superfície dobra)
+        self.eixos = [np.union1d(np.linspace(universo.min(), universo.max(), int(n)),
+                                 _vertices_entrada(universo, termos))
+                      for universo, termos, n in zip(self.motor.universos, self.motor.termos, pontos_por_eixo)]
+
+        inicio = time.perf_counter()
+        self.assinatura = cache_compilado.assinatura(cache_compilado.assinatura_motor(self.motor), self.eixos,
+                                                     -1.0 if erro_maximo is None else float(erro_maximo))
+        artefato = f"superficie-{nome}-{'x'.join(str(int(n)) for n in pontos_por_eixo)}"
+        arrays = None
+        if diretorio_cache is not None:
+            arrays = cache_compilado.carregar_artefato(artefato, self.assinatura, diretorio_cache)
+        self.carregada_do_cache = arrays is not None
+        if arrays is None:
+            arrays = self._tabelar()
+            if diretorio_cache is not None:
+                cache_compilado.salvar_artefato(artefato, self.assinatura, arrays, diretorio_cache)
+        # np.asarray: a consulta indexa um ndarray comum (ainda mapeado do arquivo)
+        self.tabela = np.asarray(arrays['tabela'])
+        self.ativacao = np.asarray(arrays['ativacao'])
+        self.celula_exata = np.asarray(arrays['celula_exata'])
+        self.tempo_construcao = time.perf_counter() - inicio
+
+        # Cópias em listas Python para a consulta de um único paciente
+        self._eixos_lista = [eixo.tolist() for eixo in self.eixos]
+        self._vertices_celula = list(itertools.product((0, 1), repeat=dimensao))
+
+    def _tabelar(self):
+        """Escores e ativação (maior corte de saída) em todos os pontos da grade"""
+        malha = [m.ravel() for m in np.meshgrid(*self.eixos, indexing='ij')]
+        escores = np.empty(len(malha[0]))
+        ativacao = np.empty(len(malha[0]))
+        for bloco in range(0, len(escores), mv.TAMANHO_BLOCO_PADRAO):
+            trecho = slice(bloco, bloco + mv.TAMANHO_BLOCO_PADRAO)
+            entradas = {nome: valores[trecho] for nome, valores in zip(self.entradas, malha)}
+            cortes = self.motor.cortes(self.motor.forcas_regras(self.motor.pertinencias(entradas)))
+            escores[trecho] = self.motor.defuzzificar(cortes)
+            ativacao[trecho] = cortes.max(axis=1)
+        forma = tuple(len(eixo) for eixo in self.eixos)
+        tabela = escores.reshape(forma)
+        if self.erro_maximo is None:
+            celula_exata = np.zeros(tuple(n - 1 for n in forma), dtype=bool)
+        else:
+            celula_exata = self._certificar(tabela)
+        return {'tabela': tabela, 'ativacao': ativacao.reshape(forma), 'celula_exata': celula_exata}
+
+    def _certificar(self, tabela):
+        """Células cujo erro de interpolação estimado passa de erro_maximo (ver ORÇAMENTO DE ERRO)"""
+        dimensao = tabela.ndim
+        forma_celulas = tuple(n - 1 for n in tabela.shape)
+
+        # 1. Salto de inclinação nos vértices: dobra dentro da célula
+        estimativa = np.zeros(forma_celulas)
+        for k, eixo in enumerate(self.eixos):
+            forma_eixo = [1] * dimensao
+            forma_eixo[k] = -1
+            largura = np.diff(eixo).reshape(forma_eixo)
+            saltos = np.nan_to_num(np.abs(np.diff(np.diff(tabela, axis=k) / largura, axis=k)), nan=np.inf)
+            bordas = [(0, 0)] * dimensao
+            bordas[k] = (1, 1)
+            saltos = np.pad(saltos, bordas)
+            # Cada célula olha os saltos dos seus 2^d vértices
+            for j in range(dimensao):
+                saltos = np.maximum(np.delete(saltos, -1, axis=j), np.delete(saltos, 0, axis=j))
+            np.maximum(estimativa, saltos * largura / 4, out=estimativa)
+        celula_exata = estimativa > self.erro_maximo
+
+        # 2. Interpolação no centro da célula (média dos vértices) x motor exato
+        centros = [(eixo[:-1] + eixo[1:]) / 2 for eixo in self.eixos]
+        malha = [m.ravel() for m in np.meshgrid(*centros, indexing='ij')]
+        exatos = np.empty(len(malha[0]))
+        for bloco in range(0, len(exatos), mv.TAMANHO_BLOCO_PADRAO):
+            trecho = slice(bloco, bloco + mv.TAMANHO_BLOCO_PADRAO)
+            exatos[trecho] = self.motor.avaliar({nome: valores[trecho] for nome, valores in zip(self.entradas, malha)})
+        media = tabela
+        for k in range(dimensao):
+            media = (np.delete(media, -1, axis=k) + np.delete(media, 0, axis=k)) / 2
+        erro_centro = np.nan_to_num(np.abs(media.ravel() - exatos), nan=np.inf).reshape(forma_celulas)
+        return celula_exata | (erro_centro > self.erro_maximo)
+
+    @property
+    def n_pontos(self):
+        return self.tabela.size
+
+    def _validar(self, colunas):
+        _validar_colunas(self.entradas, colunas, self.limites)
+
+    def _interpolar(self, colunas):
+        """Escores interpolados e máscara dos pacientes que precisam do motor exato
+
+        (célula certificada como exata ou com algum vértice de ativação
+        abaixo de LIMIAR_ATIVACAO)
+        """
+        n = len(colunas[0])
+
+        indices, fracoes = [], []
+        for valores, eixo in zip(colunas, self.eixos):
+            valores = np.clip(valores, eixo[0], eixo[-1])
+            i = np.clip(np.searchsorted(eixo, valores, side='right') - 1, 0, len(eixo) - 2)
+            indices.append(i)
+            fracoes.append((valores - eixo[i]) / (eixo[i + 1] - eixo[i]))
+
+        # Soma ponderada dos 2^d vértices da célula
+        escores = np.zeros(n)
+        ativacao = np.ones(n)
+        for vertice in itertools.product((0, 1), repeat=len(colunas)):
+            peso = np.ones(n)
+            for lado, fracao in zip(vertice, fracoes):
+                peso *= fracao if lado else 1.0 - fracao
+            canto = tuple(i + lado for i, lado in zip(indices, vertice))
+            escores += peso * self.tabela[canto]
+            np.minimum(ativacao, self.ativacao[canto], out=ativacao)
+        return escores, (ativacao < LIMIAR_ATIVACAO) | self.celula_exata[tuple(indices)]
+
+    def avaliar_paciente(self, *valores):
+        """Escore de um único paciente, sem criar arrays (consultas da interface)
+
+        Raises:
+        -------
+        ValueError : valor ausente (NaN), infinito ou fora do universo
+        """
+        indices, fracoes = [], []
+        for nome, valor, eixo, (minimo, maximo) in zip(self.entradas, valores, self._eixos_lista, self.limites):
+            valor = float(valor)
+            if not math.isfinite(valor):
+                raise ValueError(f"Valor ausente ou não finito (NaN/inf) em {nome}: {valor}")
+            if not minimo <= valor <= maximo:
+                raise ValueError(f"{nome} fora do universo {minimo:g}-{maximo:g}: {valor}")
+            valor = min(max(valor, eixo[0]), eixo[-1])
+            i = min(max(bisect.bisect_right(eixo, valor) - 1, 0), len(eixo) - 2)
+            indices.append(i)
+            fracoes.append((valor - eixo[i]) / (eixo[i + 1] - eixo[i]))
+
+        if self.celula_exata[tuple(indices)]:
+            return float(self.motor.avaliar(dict(zip(self.entradas, valores)))[0])
+        escore = 0.0
+        for vertice in self._vertices_celula:
+            peso = 1.0
+            for lado, fracao in zip(vertice, fracoes):
+                peso *= fracao if lado else 1.0 - fracao
+            canto = tuple(i + lado for i, lado in zip(indices, vertice))
+            if self.ativacao[canto] < LIMIAR_ATIVACAO:
+                return float(self.motor.avaliar(dict(zip(self.entradas, valores)))[0])
+            escore += peso * self.tabela[canto]
+        return float(escore)
+
+    def avaliar(self, entradas):
+        """Escores interpolados (mesma interface de BaseRegrasVetorizada.avaliar)
+
+        Raises:
+        -------
+        ValueError : valor ausente (NaN), infinito ou fora do universo em
+                     alguma coluna
+        """
+        colunas = self.motor.colunas_entrada(entradas)
+        self._validar(colunas)
+        escores, invalidos = self._interpolar(colunas)
+
+        # Células que tocam uma zona morta ou sem certificação: usa o motor exato
+        if invalidos.any():
+            escores[invalidos] = self.motor.avaliar({nome: valores[invalidos]
+                                                     for nome, valores in zip(self.entradas, colunas)})
+        return escores
+
+# ==============================================================================
+# SUPERFÍCIES DA CALCULADORA (TABELADAS UMA ÚNICA VEZ POR PROCESSO)
+# ==============================================================================
+
+_SUPERFICIES = {}
+
+def obter_superficie(nome, pontos_por_eixo=None, diretorio_cache=cache_compilado.DIRETORIO_CACHE_PADRAO):
+    """Retorna a superfície do sistema `nome`, tabelada (ou lida do cache em
+    disco) na primeira chamada do processo"""
+    chave = (nome, None if pontos_por_eixo is None else tuple(np.atleast_1d(pontos_por_eixo)))
+    if chave not in _SUPERFICIES:
+        _SUPERFICIES[chave] = SuperficieLUT(nome, pontos_por_eixo, diretorio_cache)
+    return _SUPERFICIES[chave]
+
+def _consultar(nome, colunas):
+    superficie = obter_superficie(nome)
+    if all(np.ndim(c) == 0 for c in colunas):
+        return superficie.avaliar_paciente(*colunas)
+    return superficie.avaliar(dict(zip(superficie.entradas, colunas)))
+
+def calcular_submodulo_fenotipico(imc, perda, sarcopenia):
+    """Submódulo 1 - Fenotípico (LUT)"""
+    return _consultar('fenotipico', (imc, perda, sarcopenia))
+
+def calcular_submodulo_ingestao(vet, duracao, sintomas):
+    """Submódulo 2 - Ingestão (LUT)"""
+    return _consultar('ingestao', (vet, duracao, sintomas))
+
+def calcular_submodulo_inflamatorio(pcr, albumina, febre):
+    """Submódulo 3 - Inflamatório, modo completo (LUT)"""
+    return _consultar('inflamatorio', (pcr, albumina, febre))
+
+def calcular_submodulo_inflamatorio_simplificado(pcr, febre):
+    """Submódulo 3 - Inflamatório, modo simplificado (LUT)"""
+    return _consultar('inflamatorio_simplificado', (pcr, febre))
+
+def calcular_submodulo_gravidade(diagnostico, comorbidades, idade, cirurgia):
+    """Submódulo 4 - Gravidade (LUT)"""
+    return _consultar('gravidade', (diagnostico, comorbidades, idade, cirurgia))
+
+def calcular_risco_final_integrado(escore_fen, escore_ing, escore_inf, escore_grav, modo_completo=True):
+    """Módulo integrador (motor exato, sem LUT: ver INTEGRADORES)"""
+    motor = mv.obter_motor(calculadora.chave_integrador(modo_completo))
+    colunas = (escore_fen, escore_ing, escore_inf, escore_grav)
+    escalar = all(np.ndim(c) == 0 for c in colunas)
+    colunas = [np.atleast_1d(np.asarray(c, dtype=float)) for c in colunas]
+    _validar_colunas(motor.entradas, colunas, _limites_universos(motor.universos))
+    escores = motor.avaliar(dict(zip(motor.entradas, colunas)))
+    return float(escores[0]) if escalar else escores
+
+# ==============================================================================
+# RELATÓRIO DE ERRO CONTRA O MOTOR EXATO
+# ==============================================================================
+
+def relatorio_erro(nome, pontos_por_eixo=None, n_amostras=20000, semente=0):
+    """Erro da superfície em pontos aleatórios do domínio
+
+    Retorna:
+    --------
+    dict : erro_maximo, erro_medio, erro_p99, pior_entrada, fracao_exata
+           (pacientes enviados ao motor exato), tempos (s) e tamanho da grade
+    """
+    superficie = obter_superficie(nome, pontos_por_eixo)
+    rng = np.random.default_rng(semente)
+    amostras = {entrada: rng.uniform(universo.min(), universo.max(), n_amostras)
+                for entrada, universo in zip(superficie.entradas, superficie.motor.universos)}
+
+    inicio = time.perf_counter()
+    exatos = superficie.motor.avaliar(amostras)
+    tempo_exato = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    interpolados = superficie.avaliar(amostras)
+    tempo_lut = time.perf_counter() - inicio
+
+    _, exatos_motor = superficie._interpolar(superficie.motor.colunas_entrada(amostras))
+    erros = np.abs(interpolados - exatos)
+    validos = ~np.isnan(erros)
+    pior = np.flatnonzero(validos)[np.argmax(erros[validos])]
+    return {
+        'erro_maximo': float(erros[validos].max()),
+        'erro_medio': float(erros[validos].mean()),
+        'erro_p99': float(np.percentile(erros[validos], 99)),
+        'fracao_exata': float(np.mean(exatos_motor)),
+        'pior_entrada': {entrada: float(valores[pior]) for entrada, valores in amostras.items()},
+        'n_pontos_grade': superficie.n_pontos,
+        'tempo_construcao': superficie.tempo_construcao,
+        'tempo_exato': tempo_exato,
+        'tempo_lut': tempo_lut,
+        'n_amostras': n_amostras,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Erro das superfícies LUT contra o motor exato")
+    parser.add_argument('--pontos', type=int, default=None,
+                        help="pontos por eixo da grade (padrão: %s)" % PONTOS_POR_EIXO_PADRAO)
+    parser.add_argument('--amostras', type=int, default=20000, help="pontos aleatórios avaliados")
+    args = parser.parse_args()
+
+    print("="*124)
+    print("ERRO DAS SUPERFÍCIES LUT CONTRA O MOTOR EXATO")
+    print("="*124)
+    print(f"{'Sistema':<28}{'Grade':>10}{'Erro máx.':>11}{'Erro p99':>10}{'Erro médio':>12}{'% exato':>9}"
+          f"{'Construir (s)':>13}{'Exato (µs/pac)':>16}{'LUT (µs/pac)':>14}")
+    for nome in calculadora._CONSTRUTORES_SISTEMAS:
+        r = relatorio_erro(nome, args.pontos, args.amostras)
+        print(f"{nome:<28}{r['n_pontos_grade']:>10}{r['erro_maximo']:>11.3f}{r['erro_p99']:>10.3f}"
+              f"{r['erro_medio']:>12.4f}{100*r['fracao_exata']:>9.1f}"
+              f"{r['tempo_construcao']:>13.2f}{1e6*r['tempo_exato']/r['n_amostras']:>16.2f}"
+              f"{1e6*r['tempo_lut']/r['n_amostras']:>14.2f}")
+        print(f"{'':<28}pior ponto: " + ", ".join(f"{k}={v:.2f}" for k, v in r['pior_entrada'].items()))
+    print("="*124)
+    print(f"% exato: pacientes em células com ativação < {LIMIAR_ATIVACAO} ou erro estimado > "
+          f"{ERRO_MAXIMO_PADRAO} (calculados pelo motor exato)")
+    print("Integradores: só para comparação; calcular_risco_final_integrado usa o motor exato direto")
+    print("Construir: tabelar a grade ou, se já gravada em disco, só carregar (cache_compilado.py)")
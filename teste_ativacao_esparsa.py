@@ -0,0 +1,115 @@
+"""
+Teste e benchmark da ativação esparsa das regras (compilador_regras.SimulacaoEsparsa)
+
+Para os integradores e a gravidade, nas bases declaradas e minimizadas,
+compara a simulação densa do skfuzzy com a esparsa nos mesmos pacientes
+sorteados: os escores têm de ser idênticos (inclusive os pontos sem regra
+ativada), e o compute() esparso tem de ser mais rápido no integrador e na
+gravidade. Confere também que a calculadora e o SimulacaoPorThread já usam
+a simulação esparsa e que um sistema sem o índice de termos volta à densa.
+"""
+import sys
+import io
+import copy
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+from skfuzzy import control as ctrl
+
+import calculadora_desktop_albumina_opcional as calc
+from compilador_regras import SimulacaoEsparsa, SistemaFuzzyCompilado, compilar, construir_sistema_skfuzzy
+from simulacao_por_thread import SimulacaoPorThread
+
+BASES_MEDIDAS = ('integrador_completo', 'integrador_simplificado', 'gravidade')
+AMOSTRAS = 150
+REPETICOES = 3
+
+
+def pacientes(base, rng):
+    """Entradas uniformes nos universos; um terço arredondado (cai nos vértices dos termos)"""
+    pontos = np.column_stack([rng.uniform(universo[0], universo[-1], AMOSTRAS) for universo in base.universos])
+    pontos[:AMOSTRAS // 3] = np.round(pontos[:AMOSTRAS // 3])
+    return pontos
+
+
+def cronometrar(simulacao, base, pontos):
+    """Escores (NaN sem regra ativada), melhor tempo por compute() e regras calculadas por compute()"""
+    escores = np.empty(len(pontos))
+    calculadas = []
+    melhor = np.inf
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        for i, ponto in enumerate(pontos):
+            for entrada, valor in zip(base.entradas, ponto):
+                simulacao.input[entrada] = valor
+            try:
+                simulacao.compute()
+                escores[i] = simulacao.output[base.saida]
+            except KeyError:
+                escores[i] = np.nan
+            if isinstance(simulacao, SimulacaoEsparsa):
+                calculadas.append(len(simulacao._regras_ativas))
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return escores, melhor / len(pontos), np.mean(calculadas) if calculadas else None
+
+
+if __name__ == "__main__":
+    print("="*96)
+    print(f"ATIVAÇÃO ESPARSA DAS REGRAS - {AMOSTRAS} pacientes por base, melhor de {REPETICOES} passadas")
+    print("="*96)
+    print(f"{'Base':<34} {'Regras':>7} {'Calculadas':>11} {'Densa (ms)':>11} {'Esparsa (ms)':>13} {'Ganho':>7}  Iguais")
+    print("-"*96)
+
+    rng = np.random.default_rng(25)
+    resultados = {}
+    for nome in BASES_MEDIDAS:
+        for minimizada in (False, True):
+            base = compilar(nome, minimizada=minimizada)
+            sistema = construir_sistema_skfuzzy(base)
+            pontos = pacientes(base, rng)
+            densa = cronometrar(ctrl.ControlSystemSimulation(copy.deepcopy(sistema), cache=False), base, pontos)
+            esparsa = cronometrar(SimulacaoEsparsa(copy.deepcopy(sistema), cache=False), base, pontos)
+            iguais = np.array_equal(densa[0], esparsa[0], equal_nan=True)
+            resultados[nome, minimizada] = {'iguais': iguais, 'tempos': (densa[1], esparsa[1])}
+            rotulo = f"{nome} ({'minimizada' if minimizada else 'declarada'})"
+            print(f"{rotulo:<34} {base.n_regras:>7} {esparsa[2]:>11.1f} {1000*densa[1]:>11.2f} "
+                  f"{1000*esparsa[1]:>13.2f} {densa[1]/esparsa[1]:>6.1f}x  {'✓' if iguais else '✗'}")
+
+    # Caminhos de produção: registro da calculadora e simulações por thread
+    simulacao_calculadora = calc.obter_simulacao('integrador_completo')
+    por_thread = SimulacaoPorThread(lambda: construir_sistema_skfuzzy(compilar('gravidade', minimizada=True)),
+                                    cache=False)
+    escore_calculadora = calc.calcular_risco_final_integrado(60, 40, 20, 80)
+    sem_indice = SistemaFuzzyCompilado(list(construir_sistema_skfuzzy(compilar('fenotipico')).rules))
+
+    def ganho(nome):
+        densa, esparsa = resultados[nome, True]['tempos']
+        return esparsa < 0.8 * densa
+
+    print()
+    verificacoes = [
+        ("Escores idênticos à simulação densa em todas as bases",
+         all(r['iguais'] for r in resultados.values())),
+        ("Integrador completo (minimizado) ao menos 20% mais rápido", ganho('integrador_completo')),
+        ("Integrador simplificado (minimizado) ao menos 20% mais rápido", ganho('integrador_simplificado')),
+        ("Gravidade (minimizada) ao menos 20% mais rápida", ganho('gravidade')),
+        ("Calculadora usa a simulação esparsa", isinstance(simulacao_calculadora, SimulacaoEsparsa)),
+        ("Calculadora continua pontuando", np.isfinite(escore_calculadora)),
+        ("SimulacaoPorThread usa a simulação esparsa", isinstance(por_thread.obter(), SimulacaoEsparsa)),
+        ("Sistema sem índice de termos volta à simulação densa",
+         sem_indice.classe_simulacao is ctrl.ControlSystemSimulation),
+    ]
+
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*96}")
+    if falhas == 0:
+        print("✓ Ativação esparsa idêntica à simulação densa e mais rápida.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*96}")
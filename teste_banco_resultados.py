@@ -0,0 +1,204 @@
+"""
+Teste do banco SQLite de resultados (banco_resultados.py)
+
+Migra o dados_pacientes.csv do repositório (linhas sem Modo seguidas de
+linhas com Modo logo após Hora) e arquivos nos dois formatos puros,
+confere os valores migrados, que migrar de novo não duplica nada (e só
+acrescenta as linhas novas de um arquivo que cresceu), que arquivos de
+mesmo nome em pastas diferentes são migrados por inteiro, que linhas
+inválidas (inclusive nan/inf, entradas fora das faixas do formulário,
+escores fora de 0-100 e modo COMPLETO sem albumina) são apontadas sem
+derrubar a migração e que salvar_csv também
+grava no banco. Por fim carrega um milhão de linhas sintéticas e confere
+que as consultas por período/categoria/modo usam os índices, devolvem o
+mesmo que uma varredura completa e levam milissegundos.
+"""
+import sys
+import io
+import csv
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import calculadora_desktop_albumina_opcional as calc
+import banco_resultados as br
+from banco_resultados import BancoResultados, migrar_csv
+from pipeline_pacientes import MODO_COMPLETO, MODO_SIMPLIFICADO
+from persistencia_resultados import GravadorResultados
+
+LINHAS_ESCALA = 1000000
+ORCAMENTO_CONSULTA_MS = 100
+
+# Cabeçalho gravado por calculadora_desktop.py (sem Modo)
+CABECALHO_ANTIGO = ['Data', 'Hora', 'IMC', 'Perda%', 'Sarcopenia', 'VET%', 'Duracao', 'SintomasGI', 'PCR',
+                    'Albumina', 'Febre', 'Diagnostico', 'Comorbidades', 'Idade', 'Cirurgia',
+                    'Escore_Fenotipico', 'Escore_Ingestao', 'Escore_Inflamatorio', 'Escore_Gravidade',
+                    'Escore_Final', 'Categoria']
+
+
+def gravar(caminho, cabecalho, linhas):
+    with open(caminho, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(cabecalho)
+        escritor.writerows(linhas)
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("BANCO SQLITE DE RESULTADOS - migração dos CSVs e consultas indexadas")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = BancoResultados(os.path.join(pasta, 'resultados.db'))
+
+        # 1. Arquivo real do repositório: formatos misturados
+        misto = migrar_csv('dados_pacientes.csv', banco)
+        migrados = banco.consultar()
+        de_novo = migrar_csv('dados_pacientes.csv', banco)
+
+        # 2. Formato antigo puro (com uma linha inválida) e formato novo puro
+        antigo = os.path.join(pasta, 'antigo.csv')
+        gravar(antigo, CABECALHO_ANTIGO, [
+            ['01/02/2026', '08:00:00', 30.0, 1.0, 0.0, 90.0, 0.0, 0.0, 2.0, 4.1, 0.0, 0.0, 0.0, 40, 0.0,
+             '11.7', '11.7', '11.7', '11.7', '12.0', 'BAIXO'],
+            ['01/02/2026', '08:05:00', 'abc', 1.0, 0.0, 90.0, 0.0, 0.0, 2.0, 4.1, 0.0, 0.0, 0.0, 40, 0.0,
+             '11.7', '11.7', '11.7', '11.7', '12.0', 'BAIXO'],
+        ])
+        resumo_antigo = migrar_csv(antigo, banco)
+        novo = os.path.join(pasta, 'novo.csv')
+        gravar(novo, calc.CABECALHO_RESULTADOS, [
+            ['02/02/2026', '09:30:00', MODO_SIMPLIFICADO, 17.0, 12.0, 2.0, 20.0, 14.0, 2.0, 150.0, 'N/A',
+             2.0, 2.0, 3.0, 88, 1.0, '75.1', '80.2', '70.3', '77.4', '78.5', 'ALTO'],
+        ])
+        resumo_novo = migrar_csv(novo, banco)
+
+        # 2a. Valores não finitos ou fora das faixas: linhas puladas e apontadas
+        def linha_invalida(minuto, **trocas):
+            linha = dict(zip(calc.CABECALHO_RESULTADOS, [
+                '03/02/2026', f'09:{minuto:02d}:00', MODO_COMPLETO, 22.0, 5.0, 1.0, 70.0, 7.0, 1.0, 30.0, 3.5,
+                1.0, 1.0, 1.0, 65, 0.0, '40.0', '40.0', '40.0', '40.0', '40.0', 'MODERADO']))
+            linha.update(trocas)
+            return list(linha.values())
+
+        invalidas = os.path.join(pasta, 'invalidas.csv')
+        gravar(invalidas, calc.CABECALHO_RESULTADOS, [
+            linha_invalida(0),
+            linha_invalida(1, IMC='nan'),
+            linha_invalida(2, Albumina='nan'),
+            linha_invalida(3, IMC='80'),
+            linha_invalida(4, PCR='-inf'),
+            linha_invalida(5, Escore_Final='inf'),
+            linha_invalida(6, Escore_Final='-5'),
+            linha_invalida(7, Albumina='N/A'),
+            linha_invalida(8, Idade='5'),
+        ])
+        resumo_invalidas = migrar_csv(invalidas, banco)
+        print("Linhas inválidas apontadas:")
+        for numero, motivo in resumo_invalidas['erros']:
+            print(f"  linha {numero}: {motivo}")
+        alto_fevereiro = banco.consultar(categoria='ALTO', desde=date(2026, 2, 1), ate=date(2026, 3, 1))
+
+        # 2b. Mesmo nome em pastas diferentes; arquivo que cresce; rótulo de origem
+        def linha_marco(dia, imc):
+            return [f'{dia:02d}/03/2026', '10:00:00', MODO_SIMPLIFICADO, imc, 5.0, 0.0, 80.0, 0.0, 0.0, 5.0,
+                    'N/A', 0.0, 0.0, 0.0, 50, 0.0, '20.0', '20.0', '20.0', '20.0', '20.0', 'BAIXO']
+
+        sites = []
+        for site, imc in (('siteA', 21.0), ('siteB', 22.0)):
+            os.mkdir(os.path.join(pasta, site))
+            sites.append(os.path.join(pasta, site, 'dados_pacientes.csv'))
+            gravar(sites[-1], calc.CABECALHO_RESULTADOS, [linha_marco(1, imc), linha_marco(2, imc)])
+        resumos_sites = [migrar_csv(caminho, banco) for caminho in sites]
+        imcs_marco = sorted(r['imc'] for r in banco.consultar(desde=date(2026, 3, 1), ate=date(2026, 4, 1)))
+        gravar(sites[0], calc.CABECALHO_RESULTADOS, [linha_marco(1, 21.0), linha_marco(2, 21.0),
+                                                     linha_marco(3, 21.0)])
+        cresceu = migrar_csv(os.path.relpath(sites[0]), banco)
+        rotulado = migrar_csv(sites[1], banco, origem='siteB-reenvio')
+        origens_rotulo = {r['origem'] for r in banco.consultar(desde=date(2026, 3, 1), ate=date(2026, 4, 1))}
+
+        # 3. salvar_csv da calculadora com o banco ligado
+        interface = SimpleNamespace(gravador=GravadorResultados(os.path.join(pasta, 'gui.csv'),
+                                                                calc.CABECALHO_RESULTADOS),
+                                    banco=banco)
+        antes_gui = banco.contar()
+        calc.CalculadoraFuzzyGUI.salvar_csv(interface, 22.0, 8.0, 1.0, 60.0, 10.0, 1.0, 40.0, None, 1.0,
+                                            2.0, 2.0, 70.0, 0.0, 42.17, 38.1, 35.0, 51.66, 45.3,
+                                            'MODERADO', MODO_SIMPLIFICADO)
+        interface.gravador.fechar()
+        ultimo_gui = banco.consultar(limite=1, desde=date.today())
+        banco.fechar()
+
+        # 4. Escala: um milhão de linhas
+        escala = BancoResultados(os.path.join(pasta, 'escala.db'))
+        inicio = time.perf_counter()
+        escala.inserir_varios(br.gerar_registros(LINHAS_ESCALA))
+        tempo_carga = time.perf_counter() - inicio
+        semana = date(2023, 6, 5)
+        tempos = br.executar_benchmark(escala, semana)
+        fim_semana = semana + timedelta(days=7)
+        planos = [escala.plano(categoria='ALTO', desde=semana, ate=fim_semana),
+                  escala.plano(modo=MODO_SIMPLIFICADO, desde=semana, ate=fim_semana),
+                  escala.plano(desde=semana, ate=fim_semana)]
+        inicio = time.perf_counter()
+        varredura = escala.conexao.execute(
+            "SELECT id FROM resultados NOT INDEXED WHERE categoria = 'ALTO' AND data_hora >= ? AND data_hora < ? "
+            "ORDER BY data_hora, id", (semana.isoformat(), fim_semana.isoformat())).fetchall()
+        tempo_varredura = 1000 * (time.perf_counter() - inicio)
+        indexada = [r['id'] for r in escala.consultar(categoria='ALTO', desde=semana, ate=fim_semana)]
+        escala.fechar()
+
+    print(f"dados_pacientes.csv: {misto['inseridas']} linhas migradas; nova migração: {de_novo['inseridas']}")
+    print(f"{LINHAS_ESCALA:,} linhas carregadas em {tempo_carga:.1f} s")
+    for descricao, ms, linhas in tempos:
+        print(f"  {descricao:<40}{ms:>8.2f} ms{linhas:>10,} linhas")
+    print(f"  {'ALTO desta semana sem índice':<40}{tempo_varredura:>8.2f} ms")
+
+    sexta = migrados[5]
+    verificacoes = [
+        ("Arquivo misto migrado por inteiro", misto['inseridas'] == 9 and not misto['erros']),
+        ("Linhas sem Modo recebem o modo pela albumina",
+         all(r['modo'] == MODO_COMPLETO for r in migrados[:5])),
+        ("Linhas com Modo alinhadas (Modo logo após Hora)",
+         sexta['modo'] == MODO_SIMPLIFICADO and sexta['albumina'] is None and sexta['imc'] == 19.0
+         and sexta['idade'] == 84.0 and sexta['escore_final'] == 30.6),
+        ("Data/hora em ISO e em ordem",
+         migrados[0]['data_hora'] == '2025-12-18 19:43:12'
+         and [r['data_hora'] for r in migrados] == sorted(r['data_hora'] for r in migrados)),
+        ("Migrar de novo não duplica", de_novo['inseridas'] == 0 and de_novo['repetidas'] == 9),
+        ("Formato antigo: linha inválida apontada, as outras migradas",
+         resumo_antigo['inseridas'] == 1 and [n for n, _ in resumo_antigo['erros']] == [3]),
+        ("Arquivos de mesmo nome em pastas diferentes migrados por inteiro",
+         [r['inseridas'] for r in resumos_sites] == [2, 2] and imcs_marco == [21.0, 21.0, 22.0, 22.0]),
+        ("Arquivo que cresceu: só a linha nova (caminho relativo = mesma origem)",
+         cresceu['inseridas'] == 1 and cresceu['repetidas'] == 2),
+        ("Rótulo de origem explícito é uma origem nova",
+         rotulado['inseridas'] == 2 and 'siteB-reenvio' in origens_rotulo
+         and os.path.realpath(sites[0]) in origens_rotulo),
+        ("nan/inf, faixas, escores e modo sem albumina: linhas puladas e apontadas",
+         resumo_invalidas['inseridas'] == 1
+         and [n for n, _ in resumo_invalidas['erros']] == [3, 4, 5, 6, 7, 8, 9, 10]),
+        ("Formato novo: albumina N/A vira NULL",
+         resumo_novo['inseridas'] == 1 and len(alto_fevereiro) == 1 and alto_fevereiro[0]['albumina'] is None),
+        ("salvar_csv também grava no banco",
+         len(ultimo_gui) == 1 and ultimo_gui[0]['escore_final'] == 45.3 and ultimo_gui[0]['origem'] is None),
+        ("Consultas usam os índices",
+         all(any('USING INDEX' in passo for passo in plano) for plano in planos)),
+        ("Consulta indexada = varredura completa", indexada == [r[0] for r in varredura] and indexada),
+        (f"Consultas em 1 milhão de linhas abaixo de {ORCAMENTO_CONSULTA_MS} ms",
+         all(ms < ORCAMENTO_CONSULTA_MS for _, ms, _ in tempos)),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Banco SQLite de resultados funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,137 @@
+"""
+Teste das bases de regras declarativas (bases_regras.py) e do compilador
+(compilador_regras.py)
+
+Confere a forma dos arrays de índices de todas as bases, que cada base é
+compilada uma única vez, que definições inválidas são rejeitadas com a regra
+culpada na mensagem, e que o ControlSystem do skfuzzy e o motor vetorizado
+montados a partir da mesma base compilada dão os mesmos escores.
+"""
+import sys
+import io
+import copy
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+from skfuzzy import control as ctrl
+
+import calculadora_desktop_albumina_opcional as calc
+import motor_vetorizado as mv
+from bases_regras import BASES
+from compilador_regras import BaseCompilada, compilar, construir_sistema_skfuzzy
+
+AMOSTRAS = 150
+
+
+def arrays_coerentes(base):
+    """Forma, faixa dos índices e somente leitura dos arrays de uma base"""
+    antecedentes = base.antecedentes
+    n_termos = np.array([len(rotulos) for rotulos in base.rotulos])
+    return (antecedentes.shape == (base.n_conjuncoes, len(base.entradas))
+            and bool(np.all((antecedentes >= -1) & (antecedentes < n_termos)))
+            and bool(np.all((antecedentes >= 0).any(axis=1)))
+            and bool(np.all((base.consequentes >= 0) & (base.consequentes < len(base.rotulos_saida))))
+            and np.array_equal(np.unique(base.regra_da_conjuncao), np.arange(base.n_regras))
+            and all(mfs.shape == (len(rotulos), len(universo))
+                    for universo, rotulos, mfs in zip(base.universos, base.rotulos, base.pertinencias))
+            and not any(arr.flags.writeable for arr in
+                        (antecedentes, base.consequentes, base.regra_da_conjuncao, *base.pertinencias)))
+
+
+def rejeita(definicao, trecho):
+    """True se compilar a definição levanta ValueError citando `trecho`"""
+    try:
+        BaseCompilada('teste', definicao)
+    except ValueError as erro:
+        return trecho in str(erro)
+    return False
+
+
+def base_desconhecida_rejeitada():
+    try:
+        compilar('inexistente')
+    except KeyError:
+        return True
+    return False
+
+
+def escores_skfuzzy(sistema, entradas, saida):
+    """Um compute() por paciente; NaN onde o skfuzzy não ativa nenhuma regra"""
+    simulacao = ctrl.ControlSystemSimulation(sistema, cache=False)
+    escores = []
+    for i in range(len(next(iter(entradas.values())))):
+        for nome, valores in entradas.items():
+            simulacao.input[nome] = valores[i]
+        try:
+            simulacao.compute()
+            escores.append(simulacao.output[saida])
+        except (KeyError, ValueError):
+            escores.append(np.nan)
+    return np.array(escores)
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print(f"BASES DE REGRAS DECLARATIVAS - {len(BASES)} bases, {AMOSTRAS} pacientes por base")
+    print("="*80)
+
+    rng = np.random.default_rng(23)
+    compiladas = {nome: compilar(nome) for nome in BASES}
+    diferencas = {}
+    for nome, base in compiladas.items():
+        entradas = {}
+        for rotulo, universo in zip(base.entradas, base.universos):
+            valores = rng.uniform(universo[0], universo[-1], AMOSTRAS)
+            valores[:AMOSTRAS // 3] = np.round(valores[:AMOSTRAS // 3])
+            entradas[rotulo] = valores
+        referencia = escores_skfuzzy(construir_sistema_skfuzzy(base), entradas, base.saida)
+        vetorizado = mv.BaseRegrasVetorizada.da_base_compilada(base).avaliar(entradas)
+        mesmos_nan = np.array_equal(np.isnan(referencia), np.isnan(vetorizado))
+        diferencas[nome] = np.nanmax(np.abs(referencia - vetorizado)) if mesmos_nan else np.inf
+        print(f"  {nome:<26} {base.n_regras:>4} regras -> {base.n_conjuncoes:>4} conjunções | "
+              f"diferença máxima {diferencas[nome]:.1e}")
+
+    # Definições inválidas (a partir de uma cópia da base fenotípica)
+    def alterada(indice, regra):
+        definicao = copy.deepcopy(BASES['fenotipico'])
+        definicao['regras'][indice] = regra
+        return definicao
+
+    forma_invalida = copy.deepcopy(BASES['fenotipico'])
+    forma_invalida['entradas'][0][1]['termos']['baixo_risco'] = [('trimf', (20, 25))]
+
+    # Sistema do registro da calculadora = sistema montado da base compilada
+    paciente = {'imc': 17.5, 'perda_ponderal': 8.0, 'sarcopenia': 2.0}
+    escore_calculadora = calc.calcular_submodulo_fenotipico(*paciente.values())
+    escore_motor = mv.obter_motor('fenotipico').avaliar(paciente)[0]
+
+    verificacoes = [
+        ("Arrays de índices coerentes em todas as bases",
+         all(arrays_coerentes(base) for base in compiladas.values())),
+        ("Regras OU viram uma conjunção por termo (integrador Delphi)",
+         compiladas['integrador_delphi'].n_conjuncoes > compiladas['integrador_delphi'].n_regras),
+        ("Cada base é compilada uma única vez", all(compilar(nome) is base for nome, base in compiladas.items())),
+        ("Base desconhecida levanta KeyError", base_desconhecida_rejeitada()),
+        ("Termo desconhecido rejeitado", rejeita(alterada(0, (('obeso', None, None), 'baixo')), "regra 1")),
+        ("Número de termos errado rejeitado", rejeita(alterada(2, (('baixo_risco', None), 'baixo')), "regra 3")),
+        ("Termo de saída desconhecido rejeitado",
+         rejeita(alterada(4, (('baixo_risco', None, None), 'critico')), "regra 5")),
+        ("Conjunção vazia rejeitada", rejeita(alterada(1, ((None, None, None), 'baixo')), "regra 2")),
+        ("Peça com número de pontos errado rejeitada", rejeita(forma_invalida, "trimf exige 3 pontos")),
+        ("skfuzzy e motor vetorizado iguais em todas as bases",
+         all(diferenca < 1e-6 for diferenca in diferencas.values())),
+        ("Calculadora e motor partem da mesma base", abs(escore_calculadora - escore_motor) < 1e-6),
+    ]
+
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Bases de regras declarativas compiladas corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,86 @@
+"""
+Teste do benchmark de pontuação (benchmark_pontuacao.py)
+
+Confere que todo calcular_* dos módulos de pontuação está coberto, que as
+métricas de uma medição curta são coerentes, que a referência JSON
+sobrevive à ida e volta do disco e que a comparação acusa uma regressão
+artificial (e não acusa nada contra a própria medição).
+"""
+import sys
+import io
+import os
+import copy
+import inspect
+import importlib
+import tempfile
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import benchmark_pontuacao as bp
+
+MODULOS_PONTUACAO = ['submodulo1_fenotipico', 'submodulo2_ingestao', 'submodulo3_inflamatorio',
+                     'submodulo4_gravidade', 'modulo_integrador_final',
+                     'calculadora_desktop', 'calculadora_desktop_albumina_opcional']
+
+if __name__ == "__main__":
+    print("="*80)
+    print("BENCHMARK DE PONTUAÇÃO - medição curta")
+    print("="*80)
+
+    cobertos = {(modulo, funcao) for _, modulo, funcao, _, _ in bp.PONTOS_ENTRADA}
+    faltando = []
+    for nome_modulo in MODULOS_PONTUACAO:
+        modulo = importlib.import_module(nome_modulo)
+        for nome, funcao in inspect.getmembers(modulo, inspect.isfunction):
+            if nome.startswith('calcular_') and funcao.__module__ == nome_modulo and (nome_modulo, nome) not in cobertos:
+                faltando.append(f"{nome_modulo}.{nome}")
+
+    relatorio = bp.executar_benchmark(filtro='albumina.calcular_submodulo_inflamatorio', amostras=40, lote=40)
+    resultados = relatorio['resultados']
+    for nome, m in resultados.items():
+        print(f"  {nome:<56} p50 {m['p50_ms']:.3f} ms  p99 {m['p99_ms']:.3f} ms  {m['vazao']:.0f}/s")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'referencia.json')
+        bp.salvar_referencia(relatorio, caminho)
+        recarregado = bp.carregar_referencia(caminho)
+
+    sem_regressao = bp.comparar_relatorios(recarregado, relatorio)
+    mais_rapido = copy.deepcopy(recarregado)
+    nome_alvo = 'albumina.calcular_submodulo_inflamatorio'
+    mais_rapido['resultados'][nome_alvo]['p50_ms'] /= 2
+    mais_rapido['resultados'][nome_alvo]['vazao'] *= 2
+    del mais_rapido['resultados']['albumina.calcular_submodulo_inflamatorio_simplificado']
+    com_regressao = bp.comparar_relatorios(mais_rapido, relatorio)
+    regressoes = {(c['nome'], c['metrica']) for c in com_regressao if c['regressao']}
+
+    verificacoes = [
+        (f"Todo calcular_* coberto ({len(cobertos)} pontos de entrada)", not faltando),
+        ("Filtro seleciona os 2 pontos de entrada pedidos",
+         sorted(resultados) == ['albumina.calcular_submodulo_inflamatorio',
+                                'albumina.calcular_submodulo_inflamatorio_simplificado']),
+        ("Percentis ordenados (p50 <= p95 <= p99)",
+         all(m['p50_ms'] <= m['p95_ms'] <= m['p99_ms'] for m in resultados.values())),
+        ("Vazão e pico de memória positivos",
+         all(m['vazao'] > 0 and m['pico_memoria_kb'] > 0 for m in resultados.values())),
+        ("Referência JSON idêntica após gravar e ler", recarregado == relatorio),
+        ("Sem regressão contra a própria medição",
+         sem_regressao and not any(c['regressao'] for c in sem_regressao)),
+        ("Regressão artificial de latência e vazão detectada",
+         regressoes == {(nome_alvo, 'p50_ms'), (nome_alvo, 'vazao')}),
+        ("Ponto de entrada ausente na referência é ignorado",
+         all(c['nome'] == nome_alvo for c in com_regressao)),
+    ]
+    if faltando:
+        print(f"  Sem benchmark: {faltando}")
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Benchmark e comparação com a referência funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
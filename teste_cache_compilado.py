@@ -0,0 +1,101 @@
+"""
+Teste do cache em disco das superfícies compiladas (cache_compilado.py)
+
+Confere que a segunda construção de uma superfície só mapeia os arquivos
+gravados (mesmos escores), que mudar uma função de pertinência ou uma regra
+muda a assinatura e força uma nova tabela (apagando a antiga), e que um
+arquivo corrompido é reconstruído em vez de derrubar o programa.
+"""
+import sys
+import io
+import os
+import copy
+import tempfile
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import cache_compilado
+import calculadora_desktop_albumina_opcional as calc
+import motor_vetorizado as mv
+from superficies_lut import SuperficieLUT
+
+NOME = 'inflamatorio_simplificado'
+PONTOS = 51
+
+if __name__ == "__main__":
+    print("="*80)
+    print(f"CACHE EM DISCO DAS SUPERFÍCIES - {NOME}, {PONTOS} pontos por eixo")
+    print("="*80)
+
+    rng = np.random.default_rng(4)
+    consulta = {'pcr': rng.uniform(0, 400, 2000), 'febre': rng.uniform(0, 3, 2000)}
+    motor_original = mv.obter_motor(NOME)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        fria = SuperficieLUT(NOME, PONTOS, pasta)
+        artefatos_frios = sorted(os.listdir(pasta))
+        quente = SuperficieLUT(NOME, PONTOS, pasta)
+        print(f"Tabelar: {1000*fria.tempo_construcao:.0f} ms | carregar do cache: {1000*quente.tempo_construcao:.1f} ms")
+
+        # Função de pertinência alterada (PCR alto começa em 60 em vez de 70)
+        sistema = copy.deepcopy(calc.obter_sistema(NOME))
+        pcr = next(a for a in sistema.antecedents if a.label == 'pcr')
+        pcr['alto_risco'].mf = np.interp(pcr.universe, [60, 85, 400], [0, 1, 1])
+        motor_mf = mv.BaseRegrasVetorizada(sistema, motor_original.entradas)
+
+        # Base com uma regra a menos
+        sistema_regras = calc._SistemaFuzzyCompilado(list(calc.obter_sistema(NOME).rules)[:-1])
+        motor_regras = mv.BaseRegrasVetorizada(sistema_regras, motor_original.entradas)
+
+        mv._MOTORES[NOME] = motor_mf
+        try:
+            alterada = SuperficieLUT(NOME, PONTOS, pasta)
+        finally:
+            mv._MOTORES[NOME] = motor_original
+        artefatos_alterados = sorted(os.listdir(pasta))
+
+        # Arquivo corrompido: reconstrói e grava de novo
+        restaurada_antes = SuperficieLUT(NOME, PONTOS, pasta)
+        pasta_artefato = os.path.join(pasta, sorted(os.listdir(pasta))[0])
+        with open(os.path.join(pasta_artefato, 'tabela.npy'), 'wb') as arquivo:
+            arquivo.write(b'corrompido')
+        reconstruida = SuperficieLUT(NOME, PONTOS, pasta)
+        recarregada = SuperficieLUT(NOME, PONTOS, pasta)
+
+        verificacoes = [
+            ("Primeira construção tabela e grava o artefato",
+             not fria.carregada_do_cache and len(artefatos_frios) == 1),
+            ("Segunda construção carrega do cache", quente.carregada_do_cache),
+            ("Tabela mapeada do arquivo (memmap)", isinstance(quente.tabela.base, np.memmap)),
+            ("Escores idênticos (tabelada x carregada)",
+             np.array_equal(fria.avaliar(consulta), quente.avaliar(consulta), equal_nan=True)),
+            ("Consulta de um paciente idêntica",
+             fria.avaliar_paciente(85.0, 1.0) == quente.avaliar_paciente(85.0, 1.0)),
+            ("Função de pertinência alterada muda a assinatura",
+             cache_compilado.assinatura_motor(motor_mf) != cache_compilado.assinatura_motor(motor_original)),
+            ("Regra removida muda a assinatura",
+             cache_compilado.assinatura_motor(motor_regras) != cache_compilado.assinatura_motor(motor_original)),
+            ("Base alterada não usa o cache antigo", not alterada.carregada_do_cache),
+            ("Artefato antigo apagado ao gravar o novo",
+             len(artefatos_alterados) == 1 and artefatos_alterados != artefatos_frios),
+            ("Superfície da base alterada difere da original",
+             not np.array_equal(alterada.tabela, fria.tabela)),
+            ("Base original volta a ser tabelada", not restaurada_antes.carregada_do_cache),
+            ("Arquivo corrompido é reconstruído e regravado",
+             not reconstruida.carregada_do_cache and recarregada.carregada_do_cache
+             and np.array_equal(recarregada.tabela, fria.tabela, equal_nan=True)),
+        ]
+
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Cache em disco das superfícies funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,123 @@
+"""
+Teste da memoização dos escores (cache_escores.py)
+
+Confere que, para entradas sobre a grade (as que a interface produz), o
+escore com cache é idêntico ao da calculadora; que valores próximos caem na
+mesma chave quantizada; que o descarte LRU e os contadores funcionam; que
+entradas em zona sem regra ativada não são guardadas; e que entradas NaN ou
+infinitas são recusadas com o nome do campo.
+"""
+import sys
+import io
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calc
+import cache_escores
+
+if __name__ == "__main__":
+    print("="*80)
+    print("MEMOIZAÇÃO DOS ESCORES - chave quantizada + LRU")
+    print("="*80)
+
+    rng = np.random.default_rng(11)
+    caches = cache_escores.criar_caches()
+
+    # Entradas como a interface produz: uma casa decimal e escalas inteiras
+    pacientes = [(round(rng.uniform(14, 45), 1), round(rng.uniform(0, 30), 1), int(rng.integers(0, 4)),
+                  int(rng.integers(0, 101)), int(rng.integers(0, 31)), int(rng.integers(0, 4)),
+                  int(rng.integers(0, 301)), round(rng.uniform(1.5, 5.0), 1), int(rng.integers(0, 4)),
+                  int(rng.integers(0, 4)), int(rng.integers(0, 6)), int(rng.integers(18, 101)),
+                  int(rng.integers(0, 2))) for _ in range(40)]
+
+    def pontuar(funcoes, p):
+        imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre, diag, comorb, idade, cirurg = p
+        escores = [funcoes['calcular_submodulo_fenotipico'](imc, perda, sarco),
+                   funcoes['calcular_submodulo_ingestao'](vet, duracao, sintomas),
+                   funcoes['calcular_submodulo_inflamatorio'](pcr, albumina, febre),
+                   funcoes['calcular_submodulo_gravidade'](diag, comorb, idade, cirurg)]
+        simplificado = funcoes['calcular_submodulo_inflamatorio_simplificado'](pcr, febre)
+        return escores + [simplificado, funcoes['calcular_risco_final_integrado'](*escores, modo_completo=True)]
+
+    diretas = {nome: getattr(calc, nome) for nome in caches}
+    esperados, validos = [], []
+    for p in pacientes:
+        try:
+            esperados.append(pontuar(diretas, p))
+            validos.append(p)
+        except KeyError:
+            pass
+
+    inicio = time.perf_counter()
+    primeira = [pontuar(caches, p) for p in validos]
+    tempo_falta = (time.perf_counter() - inicio) / len(validos)
+    inicio = time.perf_counter()
+    repetida = [pontuar(caches, p) for p in validos]
+    tempo_acerto = (time.perf_counter() - inicio) / len(validos)
+    stats = caches['calcular_submodulo_fenotipico'].estatisticas()
+    print(f"{len(validos)} pacientes na grade: {1000*tempo_falta:.2f} ms (faltas) -> "
+          f"{1000*tempo_acerto:.3f} ms (acertos) por paciente")
+
+    # Quantização: 23.54 e 23.46 caem no ponto 23.5 da grade do IMC
+    fen = caches['calcular_submodulo_fenotipico']
+    quantizados = {fen.quantizar((v, 5.0, 1.0)) for v in (23.54, 23.46, 23.5)}
+    escore_proximo = fen(23.54, 5.0, 1.0)
+
+    # LRU com capacidade 3
+    lru = cache_escores.CacheEscores(calc.calcular_submodulo_ingestao, cache_escores.grades_do_sistema('ingestao'), 3)
+    for entrada in [(10, 5, 1), (20, 5, 1), (30, 5, 1), (10, 5, 1), (40, 5, 1)]:
+        lru(*entrada)
+    chaves_lru = [chave[0] for chave in lru._resultados]
+    stats_lru = lru.estatisticas()
+
+    # Zona sem regra ativada (IMC 12): KeyError a cada chamada, nada guardado
+    zona = cache_escores.CacheEscores(calc.calcular_submodulo_fenotipico, cache_escores.grades_do_sistema('fenotipico'))
+    erros = 0
+    for _ in range(2):
+        try:
+            zona(12.0, 0.0, 0.0)
+        except KeyError:
+            erros += 1
+
+    verificacoes = [
+        ("Escores idênticos à calculadora (primeira passagem)", primeira == esperados),
+        ("Escores idênticos à calculadora (repetição)", repetida == esperados),
+        ("Repetições contadas como acertos",
+         stats['acertos'] >= len(validos) and stats['faltas'] <= len(validos)),
+        ("Valores próximos caem na mesma chave quantizada", quantizados == {(23.5, 5.0, 1.0)}),
+        ("Escore quantizado = escore do ponto da grade",
+         escore_proximo == calc.calcular_submodulo_fenotipico(23.5, 5.0, 1.0)),
+        ("LRU descarta o menos usado recentemente",
+         chaves_lru == [(30.0, 5.0, 1.0), (10.0, 5.0, 1.0), (40.0, 5.0, 1.0)]),
+        ("Contadores do LRU (1 acerto, 4 faltas, 1 descarte)",
+         (stats_lru['acertos'], stats_lru['faltas'], stats_lru['descartes'], stats_lru['tamanho']) == (1, 4, 1, 3)),
+        ("Zona sem regra ativada não é guardada",
+         erros == 2 and zona.estatisticas()['tamanho'] == 0),
+        ("Acerto ao menos 20x mais rápido que o cálculo", tempo_acerto * 20 < tempo_falta),
+    ]
+    # Entradas NaN/inf: ValueError com o nome do campo, em vez do erro opaco do round()
+    mensagens = []
+    for entrada in [(float('nan'), 5.0, 1.0), (23.5, float('inf'), 1.0), (23.5, 5.0, float('-inf'))]:
+        try:
+            fen(*entrada)
+        except ValueError as e:
+            mensagens.append(str(e))
+    print(f"Entradas não finitas: {mensagens}")
+    verificacoes.append(("NaN/inf recusados com o nome do campo",
+                         len(mensagens) == 3 and mensagens[0].startswith('imc ')
+                         and mensagens[1].startswith('perda_ponderal ') and mensagens[2].startswith('sarcopenia ')))
+
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Memoização dos escores funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
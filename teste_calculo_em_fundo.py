@@ -0,0 +1,144 @@
+"""
+Teste do cálculo em segundo plano da interface (TrabalhadorCalculo)
+
+Sem display disponível, o Tk é substituído por uma raiz falsa que executa os
+root.after() num laço da thread principal (o mainloop). Confere que o laço
+continua girando enquanto os sistemas são montados em segundo plano, que os
+retornos rodam na thread principal, na ordem de envio, que o aquecimento
+torna o primeiro cálculo tão rápido quanto os seguintes e que um erro de
+cálculo chega ao retorno de falha com o traceback da thread de fundo, sem
+nada impresso pela thread de fundo.
+"""
+import sys
+import io
+import contextlib
+import threading
+import time
+import traceback
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import calculadora_desktop_albumina_opcional as calc
+from sessao_paciente import SessaoPaciente
+
+PACIENTE = dict(imc=22.0, perda=8.0, sarcopenia=1, vet=60, duracao=10, sintomas=1,
+                pcr=40, albumina=3.2, febre=1, diagnostico=2, comorbidades=2, idade=70, cirurgia=0)
+
+
+class RaizFalsa:
+    """after/after_cancel do Tk, executados por processar() na thread principal"""
+
+    def __init__(self):
+        self._agendados = {}
+        self._proximo = 0
+        self.maior_intervalo = 0.0
+
+    def after(self, ms, funcao):
+        self._proximo += 1
+        self._agendados[self._proximo] = (time.monotonic() + ms / 1000, funcao)
+        return self._proximo
+
+    def after_cancel(self, identificador):
+        self._agendados.pop(identificador, None)
+
+    def processar(self, condicao, tempo_maximo=120):
+        """Gira o 'mainloop' até condicao() ser verdadeira, medindo o maior intervalo entre voltas"""
+        limite = time.monotonic() + tempo_maximo
+        anterior = time.monotonic()
+        while not condicao() and time.monotonic() < limite:
+            agora = time.monotonic()
+            self.maior_intervalo = max(self.maior_intervalo, agora - anterior)
+            anterior = agora
+            for identificador, (quando, funcao) in sorted(self._agendados.items()):
+                if quando <= agora:
+                    del self._agendados[identificador]
+                    funcao()
+            time.sleep(0.002)
+
+
+def cronometrado(funcao):
+    def tarefa():
+        inicio = time.perf_counter()
+        resultado = funcao()
+        return resultado, time.perf_counter() - inicio
+    return tarefa
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("CÁLCULO EM SEGUNDO PLANO DA INTERFACE")
+    print("="*80)
+
+    # Referência: primeiro cálculo numa thread sem aquecimento (monta os sistemas)
+    frio = {}
+
+    def calcular_frio():
+        frio['resultado'], frio['tempo'] = cronometrado(SessaoPaciente(**PACIENTE).calcular)()
+    thread_fria = threading.Thread(target=calcular_frio)
+    thread_fria.start()
+    thread_fria.join()
+
+    raiz = RaizFalsa()
+    trabalhador = calc.TrabalhadorCalculo(raiz, intervalo_ms=10)
+    retornos = []
+
+    def registrar(rotulo):
+        return lambda valor: retornos.append((rotulo, valor, threading.current_thread() is threading.main_thread()))
+
+    inicio = time.perf_counter()
+    trabalhador.enviar(cronometrado(calc.construir_todos_sistemas), registrar('aquecimento'))
+    tempo_envio = time.perf_counter() - inicio
+    raiz.processar(lambda: not trabalhador.ocupado)
+    tempo_aquecimento = retornos[0][1][1]
+    intervalo_aquecimento = raiz.maior_intervalo
+
+    sessao = SessaoPaciente()
+    for i, pcr in enumerate((40, 120, 200)):
+        def tarefa(pcr=pcr):
+            sessao.atualizar(**dict(PACIENTE, pcr=pcr))
+            return sessao.calcular()
+        trabalhador.enviar(cronometrado(tarefa), registrar(f'calculo{i}'))
+    trabalhador.enviar(lambda: SessaoPaciente(**dict(PACIENTE, imc=12.0)).calcular(),
+                       registrar('sucesso_inesperado'), registrar('falha'))
+    with contextlib.redirect_stderr(io.StringIO()) as stderr_fundo:
+        raiz.processar(lambda: not trabalhador.ocupado)
+    rastro_falha = ''.join(traceback.format_exception(type(retornos[-1][1]), retornos[-1][1],
+                                                      retornos[-1][1].__traceback__))
+
+    trabalhador.encerrar()
+    trabalhador._thread.join(5)
+
+    calculos = [valor for rotulo, valor, _ in retornos if rotulo.startswith('calculo')]
+    esperados = [SessaoPaciente(**dict(PACIENTE, pcr=pcr)).calcular() for pcr in (40, 120, 200)]
+    primeiro_quente = calculos[0][1]
+    print(f"Montagem dos sistemas: {tempo_aquecimento:.2f} s | maior pausa do mainloop: "
+          f"{1000*intervalo_aquecimento:.0f} ms")
+    print(f"Primeiro cálculo: {1000*frio['tempo']:.0f} ms sem aquecimento -> {1000*primeiro_quente:.0f} ms "
+          f"após aquecimento (seguintes: {', '.join(f'{1000*t:.0f}' for _, t in calculos[1:])} ms)")
+
+    verificacoes = [
+        ("enviar() não bloqueia a interface", tempo_envio < 0.05),
+        ("Mainloop continua girando durante a montagem dos sistemas", intervalo_aquecimento < 0.25),
+        ("Retornos chamados na thread da interface", all(principal for _, _, principal in retornos)),
+        ("Retornos na ordem de envio",
+         [rotulo for rotulo, _, _ in retornos] == ['aquecimento', 'calculo0', 'calculo1', 'calculo2', 'falha']),
+        ("Resultados iguais ao cálculo direto", [resultado for resultado, _ in calculos] == esperados),
+        ("Primeiro cálculo após aquecimento bem mais rápido que sem aquecimento",
+         primeiro_quente * 5 < frio['tempo']),
+        ("Zona sem regra ativada chega ao retorno de falha",
+         isinstance(retornos[-1][1], KeyError)),
+        ("Retorno de falha recebe o traceback da thread de fundo", 'calcular' in rastro_falha),
+        ("Thread de fundo não imprime nada no stderr", stderr_fundo.getvalue() == ''),
+        ("Trabalhador ocioso e encerrado", not trabalhador.ocupado and not trabalhador._thread.is_alive()),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Cálculo em segundo plano funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,151 @@
+"""
+Teste da calibração das funções de pertinência (calibracao_pertinencias.py)
+
+Com o conjunto Delphi, a pontuação do calibrador é a de pontuar_pacientes.
+Casos rotulados por um conjunto "verdadeiro" (pontos Delphi deslocados
+dentro dos limites) começam com discordâncias e voltam à concordância total
+depois da calibração, sem sair dos limites nem desordenar os pontos. Os
+escores mantidos pela busca incremental (só as linhas com cortes alterados
+são refeitas) são iguais aos de uma pontuação do zero com o conjunto
+calibrado. Confere ainda os casos_teste do submódulo 1 como alvo, a recusa
+de limites inconsistentes, o JSON diffável, a vazão e a linha de comando.
+"""
+import sys
+import io
+import contextlib
+import copy
+import json
+import os
+import tempfile
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import calibracao_pertinencias as cp
+from coorte_colunar import CATEGORIAS
+from incerteza_medicao import categorias_dos_escores
+from pipeline_pacientes import pontuar_pacientes
+from teste_sensibilidade_lote import gerar_pacientes
+
+LIMITES = 'limites_calibracao.json'
+CASOS = 400
+VAZAO_MINIMA = 20000          # linhas x base de regras por segundo
+
+# casos_teste do __main__ de submodulo1_fenotipico.py
+CASOS_FENOTIPICO = [
+    {"imc": 23.5, "perda": 1.0, "sarcopenia": 0.0, "esperado": "BAIXO"},
+    {"imc": 21.0, "perda": 8.0, "sarcopenia": 1.5, "esperado": "MODERADO"},
+    {"imc": 16.5, "perda": 12.0, "sarcopenia": 2.5, "esperado": "ALTO"},
+    {"imc": 33.0, "perda": 2.0, "sarcopenia": 0.5, "esperado": "BAIXO-MODERADO"},
+    {"imc": 19.0, "perda": 6.5, "sarcopenia": 2.8, "esperado": "MODERADO-ALTO ou ALTO"},
+]
+
+
+def recusado(limites, excecao):
+    try:
+        cp.carregar_limites(limites)
+        return False
+    except excecao:
+        return True
+
+
+def dentro_dos_limites(parametros, livres):
+    for sistema, entrada, termo, p, k, minimo, maximo in livres:
+        pontos = parametros[sistema][entrada][termo][p][1]
+        if not minimo <= pontos[k] <= maximo or any(a > b for a, b in zip(pontos, pontos[1:])):
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("CALIBRAÇÃO DAS FUNÇÕES DE PERTINÊNCIA")
+    print("="*80)
+
+    delphi, livres = cp.carregar_limites(LIMITES)
+    casos = gerar_pacientes(CASOS, semente=3)
+    igual_pipeline = np.array_equal(cp.pontuar_com_parametros(casos), pontuar_pacientes(casos)['escore_final'],
+                                    equal_nan=True)
+
+    # Rótulos gerados por pontos deslocados dentro dos limites
+    verdade = copy.deepcopy(delphi)
+    verdade['fenotipico']['imc']['medio_risco'][0][1][1] = 21.5
+    verdade['fenotipico']['perda_ponderal']['medio_risco'][0][1][1] = 9
+    verdade['inflamatorio']['pcr']['medio_risco'][0][1][1] = 40
+    verdade['inflamatorio']['albumina']['medio_risco'][0][1][1] = 3.0
+    rotulos = categorias_dos_escores(cp.pontuar_com_parametros(casos, verdade))
+    for caso, categoria in zip(casos, rotulos):
+        caso['esperado'] = CATEGORIAS[categoria]
+
+    calibrador = cp.CalibradorPertinencias(casos, LIMITES)
+    resultado = calibrador.calibrar()
+    refeito = cp.pontuar_com_parametros(casos, resultado['parametros'])
+    vazao = resultado['avaliacoes'] / resultado['tempo']
+    print(f"Concordância: {resultado['acertos_inicial']}/{CASOS} -> {resultado['acertos_final']}/{CASOS} "
+          f"em {resultado['rodadas']} rodada(s), {resultado['tempo']:.2f} s")
+    for rotulo, antes, depois in resultado['alteracoes']:
+        print(f"  {rotulo}: {antes} -> {depois}")
+    print(f"  {resultado['avaliacoes']:,} avaliações ({vazao:,.0f}/s)")
+
+    # Alvo = submódulo, com os casos_teste do submódulo 1
+    fenotipico = cp.CalibradorPertinencias(CASOS_FENOTIPICO, LIMITES, alvo='fenotipico')
+    resultado_fen = fenotipico.calibrar()
+
+    # Limites inconsistentes
+    with open(LIMITES, encoding='utf-8') as arquivo:
+        original = json.load(arquivo)
+    desatualizado = copy.deepcopy(original)
+    desatualizado['fenotipico']['imc']['medio_risco']['pecas'][0][1][1] = 21
+    sem_delphi = copy.deepcopy(original)
+    sem_delphi['fenotipico']['imc']['medio_risco']['limites'][0][1] = [22, 24]
+    desconhecido = {'fenotipico_v3': {}}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_delphi = os.path.join(pasta, 'delphi.json')
+        caminho_calibrado = os.path.join(pasta, 'calibrado.json')
+        cp.gravar_parametros(delphi, caminho_delphi)
+        cp.gravar_parametros(resultado['parametros'], caminho_calibrado)
+        relido = cp.carregar_parametros(caminho_calibrado)
+        with open(caminho_delphi, encoding='utf-8') as a, open(caminho_calibrado, encoding='utf-8') as b:
+            linhas_delphi, linhas_calibrado = a.read().splitlines(), b.read().splitlines()
+        caminho_cli = os.path.join(pasta, 'cli.json')
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            codigo = cp.main([LIMITES, 'dados_pacientes.csv', '--esperado', 'Categoria', '--rodadas', '1',
+                              '--saida', caminho_cli])
+        cli_ok = codigo == 0 and cp.carregar_parametros(caminho_cli).keys() == delphi.keys()
+
+    termos_alterados = {rotulo.split('[')[0] for rotulo, _, _ in resultado['alteracoes']}
+    linhas_diferentes = [b for a, b in zip(linhas_delphi, linhas_calibrado) if a != b]
+
+    verificacoes = [
+        ("Limites de exemplo conferem com a base (20 pontos livres)", len(livres) == 20),
+        ("Conjunto Delphi: mesmos escores de pontuar_pacientes", igual_pipeline),
+        ("Rótulos deslocados: discordâncias antes da calibração", resultado['acertos_inicial'] < CASOS),
+        ("Concordância total depois da calibração", resultado['acertos_final'] == CASOS),
+        ("Pontos calibrados dentro dos limites e em ordem", dentro_dos_limites(resultado['parametros'], livres)),
+        ("Busca incremental = pontuação do zero com o conjunto calibrado",
+         np.array_equal(calibrador.valores['escore_final'], refeito, equal_nan=True)),
+        ("casos_teste do submódulo 1: concordância não piora, inflamatório ignorado",
+         resultado_fen['acertos_final'] >= resultado_fen['acertos_inicial'] and resultado_fen['casos'] == 5
+         and fenotipico.ignorados == ['inflamatorio']),
+        ("Peças desatualizadas recusadas", recusado(desatualizado, ValueError)),
+        ("Limites sem o valor Delphi recusados", recusado(sem_delphi, ValueError)),
+        ("Sistema desconhecido recusado", recusado(desconhecido, KeyError)),
+        ("JSON relido igual ao conjunto calibrado", relido == resultado['parametros']),
+        ("Diff Delphi x calibrado: uma linha por termo alterado",
+         len(linhas_delphi) == len(linhas_calibrado) and len(linhas_diferentes) == len(termos_alterados)),
+        (f"Vazão acima de {VAZAO_MINIMA:,} avaliações/s", vazao > VAZAO_MINIMA),
+        ("Linha de comando com dados_pacientes.csv", cli_ok),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Calibração das pertinências funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,98 @@
+"""
+Relatório de precisão do centroide exato (forma fechada)
+
+Compara, para as 7 bases de regras e pacientes aleatórios:
+- exato x skfuzzy: diferença do centroide amostrado do skfuzzy (o que a
+  calculadora usa hoje) para o centroide em forma fechada
+- exato x referência densa: a mesma agregação integrada numa grade de
+  200001 pontos; confirma que a forma fechada é o centroide verdadeiro
+
+Também mostra o tempo de defuzzificação de cada método para o lote inteiro.
+"""
+import sys
+import io
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import motor_vetorizado as mv
+
+N_PACIENTES = 400
+PONTOS_REFERENCIA = 200001
+TOLERANCIA_REFERENCIA = 1e-6
+rng = np.random.default_rng(7)
+
+
+def centroide_referencia(motor, cortes):
+    """Centroide numa grade muito fina (erro de discretização desprezível)"""
+    x = np.linspace(motor.universo_saida[0], motor.universo_saida[-1], PONTOS_REFERENCIA)
+    mfs = np.array([np.interp(x, motor.universo_saida, mf) for mf in motor.mfs_saida])
+    escores = np.empty(len(cortes))
+    for i, corte in enumerate(cortes):
+        agregado = np.minimum(corte[:, None], mfs).max(axis=0)
+        escores[i] = mv.centroide_linear_por_trechos(x[None, :], agregado[None, :])[0]
+    return escores
+
+
+escores_aleatorios = {nome: rng.uniform(0, 100, N_PACIENTES)
+                      for nome in ['escore_fenotipico', 'escore_ingestao', 'escore_inflamatorio', 'escore_gravidade']}
+casos = [
+    ("Submódulo 1 - Fenotípico", 'fenotipico',
+     {'imc': rng.uniform(12, 50, N_PACIENTES), 'perda_ponderal': rng.uniform(0, 30, N_PACIENTES),
+      'sarcopenia': rng.uniform(0, 3, N_PACIENTES)}),
+    ("Submódulo 2 - Ingestão", 'ingestao',
+     {'vet_consumido': rng.uniform(0, 100, N_PACIENTES), 'duracao_deficit': rng.uniform(0, 30, N_PACIENTES),
+      'sintomas_gi': rng.uniform(0, 3, N_PACIENTES)}),
+    ("Submódulo 3 - Inflamatório (completo)", 'inflamatorio',
+     {'pcr': rng.uniform(0, 400, N_PACIENTES), 'albumina': rng.uniform(1.5, 5.0, N_PACIENTES),
+      'febre': rng.uniform(0, 3, N_PACIENTES)}),
+    ("Submódulo 3 - Inflamatório (simplificado)", 'inflamatorio_simplificado',
+     {'pcr': rng.uniform(0, 400, N_PACIENTES), 'febre': rng.uniform(0, 3, N_PACIENTES)}),
+    ("Submódulo 4 - Gravidade", 'gravidade',
+     {'diagnostico': rng.uniform(0, 3, N_PACIENTES), 'comorbidades': rng.uniform(0, 5, N_PACIENTES),
+      'idade_var': rng.uniform(18, 100, N_PACIENTES), 'cirurgia_var': rng.uniform(0, 1, N_PACIENTES)}),
+    ("Integrador (completo)", 'integrador_completo', escores_aleatorios),
+    ("Integrador (simplificado)", 'integrador_simplificado', escores_aleatorios),
+]
+
+print("="*110)
+print(f"CENTROIDE EXATO x CENTROIDE AMOSTRADO DO SKFUZZY ({N_PACIENTES} pacientes por base de regras)")
+print("="*110)
+print(f"{'Base de regras':<44}{'|exato-skfuzzy| máx':>20}{'médio':>9}{'|exato-ref.| máx':>18}"
+      f"{'amostrado (ms)':>16}{'exato (ms)':>12}")
+
+falhas = 0
+for nome, chave, entradas in casos:
+    motor = mv.obter_motor(chave)
+    cortes = motor.cortes(motor.forcas_regras(motor.pertinencias(entradas)))
+    ativos = cortes.max(axis=1) > 0
+    cortes = cortes[ativos]
+
+    inicio = time.perf_counter()
+    amostrado = motor.defuzzificar(cortes)
+    tempo_amostrado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    exato = motor.defuzzificar_exato(cortes)
+    tempo_exato = time.perf_counter() - inicio
+
+    referencia = centroide_referencia(motor, cortes)
+    erro_skfuzzy = np.abs(exato - amostrado)
+    erro_referencia = np.abs(exato - referencia).max()
+    ok = erro_referencia <= TOLERANCIA_REFERENCIA
+    if not ok:
+        falhas += 1
+
+    print(f"{nome:<44}{erro_skfuzzy.max():>20.4f}{erro_skfuzzy.mean():>9.4f}{erro_referencia:>18.1e}"
+          f"{1000*tempo_amostrado:>16.2f}{1000*tempo_exato:>12.2f}  {'✓' if ok else '✗'}")
+
+print(f"\n{'='*110}")
+print("|exato-skfuzzy|: erro do centroide amostrado do skfuzzy em relação ao centroide verdadeiro")
+print(f"|exato-ref.|: deve ficar abaixo de {TOLERANCIA_REFERENCIA:g} (erro de discretização da referência)")
+if falhas == 0:
+    print("✓ O centroide em forma fechada coincide com a referência densa em todas as bases de regras.")
+else:
+    print(f"✗ {falhas} base(s) de regras com centroide exato divergente da referência!")
+    sys.exit(1)
+print(f"{'='*110}")
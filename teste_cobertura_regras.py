@@ -0,0 +1,153 @@
+"""
+Teste da varredura de zonas mortas (cobertura_regras.py)
+
+Varre todas as bases do registro (os dois modos de albumina) e confere as
+zonas mortas encontradas contra o skfuzzy: um ponto de cada região gera o
+KeyError de SOLUCAO_KEYERROR_v21.md. Pontos aleatórios de cada base dão NaN
+no motor vetorizado exatamente quando caem numa região listada. Por fim,
+a base de gravidade antiga (cirurgia com a zona morta de antes da v2.1,
+reconstruída como em test_zona_morta.py) tem a zona encontrada sem testar
+ponto a ponto.
+"""
+import sys
+import io
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import skfuzzy as fuzz
+from skfuzzy import control as ctrl
+
+import calculadora_desktop_albumina_opcional as calc
+import cobertura_regras as cr
+import motor_vetorizado as mv
+
+AMOSTRAS_ALEATORIAS = 5000
+ORCAMENTO_SEGUNDOS = 60
+
+
+def ponto_da_regiao(regiao):
+    """Um ponto dentro da região (o ponto isolado ou o meio de cada intervalo)"""
+    return [minimo if minimo == maximo else (minimo + maximo) / 2 for minimo, maximo, _, _ in regiao]
+
+
+def na_regiao(colunas, regiao):
+    dentro = np.ones(len(colunas[0]), dtype=bool)
+    for valores, (minimo, maximo, fechado_esq, fechado_dir) in zip(colunas, regiao):
+        dentro &= (valores >= minimo) if fechado_esq else (valores > minimo)
+        dentro &= (valores <= maximo) if fechado_dir else (valores < maximo)
+    return dentro
+
+
+def keyerror_no_skfuzzy(nome, entradas, valores):
+    simulacao = calc.obter_simulacao(nome)
+    for entrada, valor in zip(entradas, valores):
+        simulacao.input[entrada] = valor
+    try:
+        simulacao.compute()
+        simulacao.output[mv.obter_motor(nome).saida]
+        return False
+    except KeyError:
+        return True
+
+
+def gravidade_antiga():
+    """Diagnóstico x cirurgia com as pertinências anteriores à v2.1 (zona morta em 0.4-0.6)"""
+    diagnostico = ctrl.Antecedent(np.arange(0, 3.1, 0.1), 'diagnostico')
+    diagnostico['baixo_risco'] = fuzz.trapmf(diagnostico.universe, [0, 0, 0.3, 0.8])
+    diagnostico['medio_risco'] = fuzz.trimf(diagnostico.universe, [0.5, 1.5, 2.3])
+    diagnostico['alto_risco'] = fuzz.trapmf(diagnostico.universe, [2, 2.5, 3, 3])
+    cirurgia_var = ctrl.Antecedent(np.arange(0, 1.1, 0.1), 'cirurgia_var')
+    cirurgia_var['nao'] = fuzz.trapmf(cirurgia_var.universe, [0, 0, 0.2, 0.4])
+    cirurgia_var['sim'] = fuzz.trapmf(cirurgia_var.universe, [0.6, 0.8, 1, 1])
+    risco = ctrl.Consequent(np.arange(0, 101, 1), 'risco_gravidade')
+    risco['baixo'] = fuzz.trapmf(risco.universe, [0, 0, 15, 30])
+    risco['moderado'] = fuzz.trimf(risco.universe, [35, 50, 65])
+    risco['alto'] = fuzz.trapmf(risco.universe, [70, 85, 100, 100])
+    regras = [ctrl.Rule(diagnostico[termo] & cirurgia_var[lado], risco[saida])
+              for termo, saida in (('baixo_risco', 'baixo'), ('medio_risco', 'moderado'), ('alto_risco', 'alto'))
+              for lado in ('nao', 'sim')]
+    # Termos de diagnóstico que nunca se sobrepõem: regra impossível
+    regras.append(ctrl.Rule(diagnostico['baixo_risco'] & diagnostico['alto_risco'], risco['alto']))
+    return ctrl.ControlSystem(regras)
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("VARREDURA DE ZONAS MORTAS E COBERTURA DAS REGRAS")
+    print("="*80)
+
+    inicio = time.perf_counter()
+    relatorios = cr.varrer_todos()
+    tempo_total = time.perf_counter() - inicio
+    for relatorio in relatorios.values():
+        cr.imprimir_relatorio(relatorio)
+    print(f"\nTodas as bases: {sum(r['pontos'] for r in relatorios.values()):,} pontos em {tempo_total:.1f} s")
+
+    # Cada região: um ponto dela gera KeyError no skfuzzy
+    confirmadas = [keyerror_no_skfuzzy(nome, r['entradas'], ponto_da_regiao(regiao))
+                   for nome, r in relatorios.items() for regiao in r['regioes']]
+
+    # Pontos aleatórios: NaN no motor vetorizado <=> dentro de uma região listada
+    rng = np.random.default_rng(0)
+    coerentes = True
+    for nome, relatorio in relatorios.items():
+        motor = mv.obter_motor(nome)
+        # Inclui um ponto de cada região (podem ter medida nula, como imc = 12)
+        pontos = [ponto_da_regiao(regiao) for regiao in relatorio['regioes']]
+        colunas = [np.concatenate([rng.uniform(minimo, maximo, AMOSTRAS_ALEATORIAS), [p[i] for p in pontos]])
+                   for i, (minimo, maximo) in enumerate(relatorio['limites'])]
+        sem_regra = np.isnan(motor.avaliar(dict(zip(motor.entradas, colunas))))
+        dentro = np.zeros(len(colunas[0]), dtype=bool)
+        for regiao in relatorio['regioes']:
+            dentro |= na_regiao(colunas, regiao)
+        coerentes = coerentes and np.array_equal(sem_regra, dentro)
+
+    antiga = cr.varrer_sistema(gravidade_antiga())
+    simulacao = ctrl.ControlSystemSimulation(gravidade_antiga())
+    zona_antiga_no_skfuzzy = []
+    for cirurgia in (0.4, 0.45, 0.5, 0.55):
+        simulacao.input['diagnostico'] = 1.0
+        simulacao.input['cirurgia_var'] = cirurgia
+        try:
+            simulacao.compute()
+            zona_antiga_no_skfuzzy.append('risco_gravidade' not in simulacao.output)
+        except KeyError:
+            zona_antiga_no_skfuzzy.append(True)
+    print()
+    cr.imprimir_relatorio(antiga)
+    fenotipico = [cr.formatar_regiao(relatorios['fenotipico']['entradas'], regiao,
+                                     relatorios['fenotipico']['limites'])
+                  for regiao in relatorios['fenotipico']['regioes']]
+
+    verificacoes = [
+        ("Todas as bases, nos dois modos, varridas",
+         set(relatorios) == {'fenotipico', 'ingestao', 'inflamatorio', 'inflamatorio_simplificado', 'gravidade',
+                             'integrador_completo', 'integrador_simplificado'}),
+        (f"Varredura completa em menos de {ORCAMENTO_SEGUNDOS} s", tempo_total < ORCAMENTO_SEGUNDOS),
+        ("Gravidade v2.1 e integradores sem zona morta",
+         not any(relatorios[nome]['regioes'] for nome in ('gravidade', 'integrador_completo',
+                                                          'integrador_simplificado'))),
+        ("Fenotípico: imc = 12 (o KeyError de test_calculo_em_fundo) encontrado",
+         any(texto.startswith('imc = 12') for texto in fenotipico)),
+        ("Toda região listada gera KeyError no skfuzzy", bool(confirmadas) and all(confirmadas)),
+        ("NaN do motor vetorizado <=> ponto dentro de região listada", coerentes),
+        # np.arange(0, 1.1, 0.1)[6] é 0.6000000000000001: 'sim' já é positivo (~1e-16) em (0.5, 0.6)
+        ("Gravidade antiga: zona morta de cirurgia encontrada, como o skfuzzy a vê",
+         [cr.formatar_regiao(antiga['entradas'], regiao, antiga['limites']) for regiao in antiga['regioes']]
+         == ['cirurgia_var ∈ [0.4, 0.5]'] and zona_antiga_no_skfuzzy == [True, True, True, False]),
+        ("Gravidade antiga: regra impossível apontada",
+         antiga['regras_nunca_ativadas'] == ['diagnostico[baixo_risco] & diagnostico[alto_risco] -> alto']),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Varredura de zonas mortas funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,128 @@
+"""
+Teste de estresse: cálculo fuzzy concorrente em muitas threads
+
+Para cada função (submódulos 1-4 e integrador dos módulos separados, e as
+funções da calculadora com albumina opcional), os resultados de referência
+são calculados em série; depois as mesmas chamadas são repetidas, embaralhadas,
+por 32 threads simultâneas. Qualquer escore diferente do de referência
+indica pacientes trocados entre threads.
+
+Como controle, a simulação global compartilhada (calculadora_fenotipica) é
+usada diretamente pelas mesmas threads, para mostrar o problema corrigido.
+"""
+import sys
+import io
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import submodulo1_fenotipico
+import submodulo2_ingestao
+import submodulo3_inflamatorio
+import submodulo4_gravidade
+import modulo_integrador_final
+import calculadora_desktop_albumina_opcional as calc
+
+N_THREADS = 32
+N_CASOS = 40
+REPETICOES = 3
+rng = np.random.default_rng(5)
+
+
+def casos(*intervalos, inteiros=()):
+    colunas = [rng.integers(lo, hi + 1, N_CASOS).astype(float) if i in inteiros else rng.uniform(lo, hi, N_CASOS)
+               for i, (lo, hi) in enumerate(intervalos)]
+    return [tuple(float(v) for v in linha) for linha in zip(*colunas)]
+
+
+def resultado(funcao, argumentos):
+    """Escore da chamada, ou o nome da exceção (zonas sem regra ativada)"""
+    try:
+        return funcao(*argumentos)
+    except KeyError as e:
+        return f"KeyError {e}"
+    except Exception as e:  # estado corrompido por outra thread (só no controle)
+        return f"{type(e).__name__} {e}"
+
+
+def integrador_albumina(fen, ing, inf, grav, modo):
+    return calc.calcular_risco_final_integrado(fen, ing, inf, grav, modo_completo=bool(modo))
+
+
+funcoes = [
+    ("submodulo1 calcular_risco_fenotipico", submodulo1_fenotipico.calcular_risco_fenotipico,
+     casos((12, 50), (0, 30), (0, 3))),
+    ("submodulo2 calcular_risco_ingestao", submodulo2_ingestao.calcular_risco_ingestao,
+     casos((0, 100), (0, 30), (0, 3))),
+    ("submodulo3 calcular_risco_inflamatorio", submodulo3_inflamatorio.calcular_risco_inflamatorio,
+     casos((0, 400), (1.5, 5.0), (0, 3))),
+    ("submodulo4 calcular_risco_gravidade", submodulo4_gravidade.calcular_risco_gravidade,
+     casos((0, 3), (0, 5), (18, 100), (0, 1), inteiros=(3,))),
+    ("modulo_integrador_final calcular_risco_final", modulo_integrador_final.calcular_risco_final,
+     casos((0, 100), (0, 100), (0, 100), (0, 100))),
+    ("calculadora calcular_submodulo_fenotipico", calc.calcular_submodulo_fenotipico,
+     casos((13, 50), (0, 30), (0, 3))),
+    ("calculadora calcular_submodulo_inflamatorio_simplificado", calc.calcular_submodulo_inflamatorio_simplificado,
+     casos((0, 400), (0, 3))),
+    ("calculadora calcular_submodulo_gravidade", calc.calcular_submodulo_gravidade,
+     casos((0, 3), (0, 5), (18, 100), (0, 1))),
+    ("calculadora calcular_risco_final_integrado", integrador_albumina,
+     casos((0, 100), (0, 100), (0, 100), (0, 100), (0, 1), inteiros=(4,))),
+]
+
+
+def estressar(funcao, argumentos, esperados):
+    """Repete as chamadas embaralhadas em N_THREADS threads; retorna (chamadas, divergências, threads)"""
+    tarefas = [i for i in range(len(argumentos)) for _ in range(REPETICOES)]
+    random.Random(0).shuffle(tarefas)
+    barreira = threading.Barrier(N_THREADS)
+    threads_usadas = set()
+
+    def executar(bloco):
+        barreira.wait()  # todas as threads começam juntas
+        threads_usadas.add(threading.get_ident())
+        return [(i, resultado(funcao, argumentos[i])) for i in bloco]
+
+    blocos = [tarefas[k::N_THREADS] for k in range(N_THREADS)]
+    with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+        respostas = [par for parte in executor.map(executar, blocos) for par in parte]
+    divergencias = sum(1 for i, obtido in respostas if obtido != esperados[i])
+    return len(respostas), divergencias, len(threads_usadas)
+
+
+print("="*92)
+print(f"ESTRESSE DE CONCORRÊNCIA - {N_THREADS} threads, {N_CASOS} pacientes x {REPETICOES} repetições por função")
+print("="*92)
+
+falhas = 0
+for nome, funcao, argumentos in funcoes:
+    esperados = [resultado(funcao, a) for a in argumentos]
+    chamadas, divergencias, threads = estressar(funcao, argumentos, esperados)
+    falhas += divergencias
+    print(f"{nome:<60}{chamadas:>5} chamadas {threads:>3} threads "
+          f"{'✓' if divergencias == 0 else f'✗ {divergencias} divergentes'}")
+
+# Controle: a simulação global compartilhada, usada sem isolamento
+def fenotipico_compartilhado(imc, perda, sarcopenia):
+    simulacao = submodulo1_fenotipico.calculadora_fenotipica
+    simulacao.input['imc'] = imc
+    simulacao.input['perda_ponderal'] = perda
+    simulacao.input['sarcopenia'] = sarcopenia
+    simulacao.compute()
+    return simulacao.output['risco_fenotipico']
+
+argumentos = funcoes[0][2]
+esperados = [resultado(submodulo1_fenotipico.calcular_risco_fenotipico, a) for a in argumentos]
+_, divergencias_controle, _ = estressar(fenotipico_compartilhado, argumentos, esperados)
+print(f"\nControle (simulação global compartilhada, sem isolamento): {divergencias_controle} resultados trocados")
+
+print(f"\n{'='*92}")
+if falhas == 0:
+    print("✓ Nenhum paciente trocado entre threads: resultados idênticos ao cálculo em série.")
+else:
+    print(f"✗ {falhas} resultado(s) divergentes sob concorrência!")
+    sys.exit(1)
+print(f"{'='*92}")
@@ -0,0 +1,176 @@
+"""
+Teste da coorte colunar (coorte_colunar.py)
+
+Converte o dados_pacientes.csv do repositório (formatos misturados) e
+confere coluna a coluna contra a leitura do CSV, que as colunas são
+memmaps somente leitura abertos sem cópia (inclusive as fatias de um
+período), que novos CSVs são acrescentados sem afetar leitores já abertos,
+que linhas com nan/inf ou valores fora das faixas são apontadas e ficam
+fora das colunas, que bytes deixados por uma gravação interrompida são
+ignorados e descartados, e que as estatísticas da coorte são as mesmas da leitura do
+CSV, só que muito mais rápidas.
+"""
+import sys
+import io
+import csv
+import os
+import tempfile
+import time
+from datetime import date
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import coorte_colunar as cc
+from coorte_colunar import CoorteColunar, GravadorCoorte, converter_csv
+
+LINHAS_ESCALA = 50000
+GANHO_MINIMO = 20
+
+# Cabeçalho gravado por calculadora_desktop.py (sem Modo)
+CABECALHO_ANTIGO = ['Data', 'Hora', 'IMC', 'Perda%', 'Sarcopenia', 'VET%', 'Duracao', 'SintomasGI', 'PCR',
+                    'Albumina', 'Febre', 'Diagnostico', 'Comorbidades', 'Idade', 'Cirurgia',
+                    'Escore_Fenotipico', 'Escore_Ingestao', 'Escore_Inflamatorio', 'Escore_Gravidade',
+                    'Escore_Final', 'Categoria']
+
+
+def iguais(a, b):
+    """Arrays iguais, com NaN igual a NaN"""
+    a, b = np.asarray(a), np.asarray(b)
+    if a.dtype.kind == 'f':
+        return a.shape == b.shape and bool(np.all((a == b) | (np.isnan(a) & np.isnan(b))))
+    return np.array_equal(a, b)
+
+
+def mesmas_estatisticas(x, y):
+    if x.keys() != y.keys() or x['pacientes'] != y['pacientes'] or x['por_categoria'] != y['por_categoria']:
+        return False
+    pares = [(x['modo_completo'], y['modo_completo'])]
+    pares += [(x['escore_final_por_categoria'][k], y['escore_final_por_categoria'][k])
+              for k in x['escore_final_por_categoria']]
+    pares += [(x['escores'][c][k], y['escores'][c][k]) for c in x['escores'] for k in x['escores'][c]]
+    return all(abs(a - b) < 1e-6 for a, b in pares)
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("COORTE COLUNAR - conversão dos CSVs, leitura sem cópia e estatísticas")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # 1. Arquivo real do repositório
+        coorte_real = os.path.join(pasta, 'real')
+        resumo_real = converter_csv('dados_pacientes.csv', coorte_real)
+        referencia = cc.colunas_do_csv('dados_pacientes.csv')
+        coorte = CoorteColunar(coorte_real)
+        colunas_iguais = all(iguais(coorte[c], referencia[c]) for c in cc.COLUNAS_COORTE)
+        sem_copia = all(isinstance(coorte[c], np.memmap) for c in cc.COLUNAS_COORTE)
+        try:
+            coorte.escore_final[0] = 0
+            somente_leitura = False
+        except ValueError:
+            somente_leitura = True
+        dezembro = coorte.periodo(date(2025, 12, 19), date(2025, 12, 23))
+        fatia_sem_copia = np.shares_memory(dezembro['escore_final'], coorte.escore_final)
+
+        # 2. Acrescentar um CSV antigo (uma linha inválida) com a coorte aberta
+        antigo = os.path.join(pasta, 'antigo.csv')
+        with open(antigo, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(CABECALHO_ANTIGO)
+            escritor.writerow(['01/02/2026', '08:00:00', 30.0, 1.0, 0.0, 90.0, 0.0, 0.0, 2.0, 4.1, 0.0, 0.0, 0.0,
+                               40, 0.0, '11.7', '11.7', '11.7', '11.7', '12.0', 'BAIXO'])
+            escritor.writerow(['01/02/2026', 'xx', 30.0, 1.0, 0.0, 90.0, 0.0, 0.0, 2.0, 4.1, 0.0, 0.0, 0.0,
+                               40, 0.0, '11.7', '11.7', '11.7', '11.7', '12.0', 'BAIXO'])
+            escritor.writerow(['01/01/2025', '08:00:00', 30.0, 1.0, 0.0, 90.0, 0.0, 0.0, 2.0, '', 0.0, 0.0, 0.0,
+                               40, 0.0, 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'SEM REGRA ATIVADA'])
+        resumo_antigo = converter_csv(antigo, coorte_real)
+        linhas_leitor_antigo = len(coorte)
+        ampliada = CoorteColunar(coorte_real)
+        periodo_fora_de_ordem = ampliada.periodo(date(2025, 12, 19), date(2025, 12, 23))
+
+        # 2b. Valores não finitos ou fora das faixas: apontados, fora dos memmaps
+        invalidas = os.path.join(pasta, 'invalidas.csv')
+        with open(invalidas, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(CABECALHO_ANTIGO)
+            for imc, pcr, final in ((30.0, 2.0, '12.0'), ('nan', 2.0, '12.0'), (80.0, 2.0, '12.0'),
+                                    (30.0, '-inf', '12.0'), (30.0, 2.0, 'inf'), (30.0, 2.0, '-5'),
+                                    (31.0, 2.0, '12.5')):
+                escritor.writerow(['02/02/2026', '08:00:00', imc, 1.0, 0.0, 90.0, 0.0, 0.0, pcr, 4.1, 0.0, 0.0,
+                                   0.0, 40, 0.0, '11.7', '11.7', '11.7', '11.7', final, 'BAIXO'])
+        coorte_invalidas = os.path.join(pasta, 'invalidas')
+        resumo_invalidas = converter_csv(invalidas, coorte_invalidas)
+        lida_invalidas = CoorteColunar(coorte_invalidas)
+        referencia_invalidas = cc.colunas_do_csv(invalidas)
+        invalidas_fora = (list(lida_invalidas.imc) == [30.0, 31.0]
+                          and np.isfinite(lida_invalidas.escore_final).all()
+                          and all(iguais(lida_invalidas[c], referencia_invalidas[c]) for c in cc.COLUNAS_COORTE))
+
+        # 3. Gravação interrompida: bytes além das linhas registradas
+        with open(os.path.join(coorte_real, 'escore_final.bin'), 'ab') as f:
+            f.write(b'\x00' * 6)
+        linhas_com_lixo = len(CoorteColunar(coorte_real))
+        GravadorCoorte(coorte_real)
+        tamanho_apos_reabrir = os.path.getsize(os.path.join(coorte_real, 'escore_final.bin'))
+
+        # 4. Escala: estatísticas pelo CSV x pela coorte
+        sintetico = os.path.join(pasta, 'sintetico.csv')
+        cc.gravar_csv_sintetico(sintetico, LINHAS_ESCALA)
+        coorte_escala = os.path.join(pasta, 'escala')
+        inicio = time.perf_counter()
+        resumo_escala = converter_csv(sintetico, coorte_escala, tamanho_bloco=7000)
+        tempo_conversao = time.perf_counter() - inicio
+        tempos = cc.executar_benchmark(sintetico, coorte_escala)
+        escala = CoorteColunar(coorte_escala)
+        semana = escala.periodo(date(2023, 6, 5), date(2023, 6, 12))
+        mascara = ((escala.data_hora >= np.datetime64('2023-06-05'))
+                   & (escala.data_hora < np.datetime64('2023-06-12')))
+
+    print(f"dados_pacientes.csv: {resumo_real['linhas']} linhas convertidas")
+    print(f"{LINHAS_ESCALA:,} linhas: conversão {tempo_conversao:.1f} s (uma vez)")
+    print(f"  Ler CSV + estatísticas: {tempos['csv']:.3f} s | abrir coorte: {1000*tempos['abrir']:.1f} ms | "
+          f"abrir + estatísticas: {1000*tempos['coorte']:.1f} ms ({tempos['csv']/tempos['coorte']:.0f}x)")
+
+    verificacoes = [
+        ("Arquivo misto convertido por inteiro", resumo_real['linhas'] == 9 and not resumo_real['erros']),
+        ("Colunas iguais à leitura do CSV", colunas_iguais),
+        ("Linhas sem Modo com o modo deduzido da albumina",
+         list(coorte.modo_completo[:5]) == [1, 1, 1, 1, 1] and list(coorte.modo_completo[5:]) == [0, 1, 0, 0]),
+        ("Colunas abertas como memmap, sem cópia", sem_copia),
+        ("Colunas somente leitura", somente_leitura),
+        ("Período em coorte ordenada é fatia do mapeamento",
+         fatia_sem_copia and len(dezembro['escore_final']) == 7),
+        ("CSV acrescentado: linha inválida apontada, as outras gravadas",
+         resumo_antigo['linhas'] == 2 and [n for n, _ in resumo_antigo['erros']] == [3] and len(ampliada) == 11),
+        ("nan/inf e valores fora das faixas apontados",
+         resumo_invalidas['linhas'] == 2 and [n for n, _ in resumo_invalidas['erros']] == [3, 4, 5, 6, 7]),
+        ("Linhas inválidas fora das colunas (coorte = leitura do CSV)", invalidas_fora),
+        ("Leitor aberto antes continua vendo só as linhas de então", linhas_leitor_antigo == 9),
+        ("Sem regra ativada e escores N/A gravados como -1 e NaN",
+         ampliada.categoria[-1] == cc.SEM_CATEGORIA and np.isnan(ampliada.escore_final[-1])
+         and np.isnan(ampliada.albumina[-1])),
+        ("Coorte fora de ordem filtra o período por máscara",
+         not ampliada.ordenado and iguais(periodo_fora_de_ordem['escore_final'], dezembro['escore_final'])),
+        ("Bytes de gravação interrompida ignorados e descartados",
+         linhas_com_lixo == 11 and tamanho_apos_reabrir == 11 * 4),
+        ("Conversão em blocos completa", resumo_escala['linhas'] == LINHAS_ESCALA and escala.ordenado),
+        ("Estatísticas da coorte = estatísticas do CSV",
+         mesmas_estatisticas(tempos['estatisticas_coorte'], tempos['estatisticas_csv'])),
+        ("Período por busca binária = período por máscara",
+         iguais(semana['escore_final'], escala.escore_final[mascara]) and len(semana['escore_final']) > 0),
+        (f"Estatísticas pela coorte ao menos {GANHO_MINIMO}x mais rápidas que pelo CSV",
+         tempos['csv'] > GANHO_MINIMO * tempos['coorte']),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Coorte colunar funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,117 @@
+"""
+Teste da propagação de incerteza de medição (incerteza_medicao.py)
+
+Confere que erro zero reproduz o escore medido, que a mesma semente repete
+o resultado, que cada amostra é o pontuar_pacientes das entradas sorteadas,
+que as probabilidades (mais a fração sem regra) somam 1 e que os cortes de
+categoria são os de categorizar_risco. Pacientes perto de um corte mudam de
+categoria com mais frequência que os distantes. Por fim, uma enfermaria de
+40 pacientes com K = 1000 cabe no orçamento de tempo.
+"""
+import sys
+import io
+import contextlib
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calc
+import incerteza_medicao as im
+from coorte_colunar import CATEGORIAS
+from pipeline_pacientes import pontuar_pacientes
+from teste_sensibilidade_lote import gerar_pacientes
+
+ENFERMARIA = 40
+AMOSTRAS = 1000
+ORCAMENTO_SEGUNDOS = 15
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("INCERTEZA DE MEDIÇÃO POR MONTE CARLO")
+    print("="*80)
+
+    pacientes = gerar_pacientes(ENFERMARIA)
+    im.propagar_incerteza(pacientes[:2], 10)        # compila os motores fora da medição
+    inicio = time.perf_counter()
+    resultado = im.propagar_incerteza(pacientes, AMOSTRAS, semente=0)
+    tempo = time.perf_counter() - inicio
+    repetido = im.propagar_incerteza(pacientes, AMOSTRAS, semente=0)
+    print(f"{ENFERMARIA} pacientes x {AMOSTRAS} amostras em {tempo:.2f} s")
+
+    sem_erro = im.propagar_incerteza(pacientes, 20, erros={campo: ('normal', 0.0) for campo in im.ERROS_PADRAO})
+    base = resultado['base']['escore_final']
+    zero_ok = (np.array_equal(sem_erro['escores'], np.repeat(base[:, None], 20, axis=1), equal_nan=True)
+               and np.all(sem_erro['prob_mudar'][~np.isnan(base)] == 0))
+
+    # Cada amostra = pontuar_pacientes das entradas sorteadas
+    pequeno = im.propagar_incerteza(pacientes[:3], 50, semente=1, guardar_entradas=True)
+    amostras_ok = True
+    for i in range(3):
+        lote = [dict(pacientes[i], **{campo: pequeno['entradas'][campo][i, k] for campo in im.ERROS_PADRAO})
+                for k in range(50)]
+        for linha in lote:
+            if pacientes[i]['albumina'] is None:
+                linha['albumina'] = None
+        amostras_ok = amostras_ok and np.allclose(pontuar_pacientes(lote, validar=False)['escore_final'], pequeno['escores'][i],
+                                                  equal_nan=True)
+    albumina_ok = all(np.isnan(pequeno['entradas']['albumina'][i]).all() == (pacientes[i]['albumina'] is None)
+                      for i in range(3))
+
+    # Mesmos cortes de categorizar_risco
+    grade = np.round(np.arange(0, 100.01, 0.25), 2)
+    cortes_ok = [CATEGORIAS[k] for k in im.categorias_dos_escores(grade)] == \
+                [calc.categorizar_risco(e)[0] for e in grade]
+
+    triplo = im.propagar_incerteza(pacientes, AMOSTRAS // 4, semente=0,
+                                   erros={campo: (d, 3 * p) for campo, (d, p) in im.ERROS_PADRAO.items()})
+    print(f"  Médias na enfermaria: desvio {np.nanmean(resultado['desvio']):.2f} -> "
+          f"{np.nanmean(triplo['desvio']):.2f}, P(mudar) {np.nanmean(resultado['prob_mudar']):.3f} -> "
+          f"{np.nanmean(triplo['prob_mudar']):.3f} com erros 3x maiores")
+
+    erros_invalidos = []
+    modelos_invalidos = ({'peso': ('normal', 1.0)}, {'imc': ('lognormal', 1.0)}, {'pcr': ('normal', -1.0)},
+                         {'pcr': ('normal', float('nan'))}, {'imc': ('uniforme', float('inf'))})
+    for erros in modelos_invalidos:
+        try:
+            im.propagar_incerteza(pacientes[:1], 5, erros=erros)
+        except ValueError:
+            erros_invalidos.append(True)
+    with contextlib.redirect_stdout(io.StringIO()) as saida, contextlib.redirect_stderr(io.StringIO()):
+        codigo = im.main(['dados_pacientes.csv', '--amostras', '200', '--semente', '0',
+                          '--erro', 'pcr=normal_relativo:0.2'])
+
+    verificacoes = [
+        ("Formas (pacientes, amostras) e (pacientes, categorias)",
+         resultado['escores'].shape == (ENFERMARIA, AMOSTRAS)
+         and resultado['probabilidades'].shape == (ENFERMARIA, len(CATEGORIAS))),
+        ("Erro zero: todas as amostras iguais ao escore medido", zero_ok),
+        ("Mesma semente, mesmo resultado", np.array_equal(resultado['escores'], repetido['escores'], equal_nan=True)),
+        ("Cada amostra igual ao pontuar_pacientes das entradas sorteadas", amostras_ok),
+        ("Albumina ausente continua ausente nas amostras", albumina_ok),
+        ("Probabilidades + sem regra somam 1",
+         np.allclose(resultado['probabilidades'].sum(axis=1) + resultado['sem_regra'], 1.0)),
+        ("Cortes de categoria iguais aos de categorizar_risco", cortes_ok),
+        ("Erros 3x maiores: desvio e P(mudar) médios maiores",
+         np.nanmean(triplo['desvio']) > np.nanmean(resultado['desvio'])
+         and np.nanmean(triplo['prob_mudar']) > np.nanmean(resultado['prob_mudar'])),
+        ("P5 <= P50 <= P95", bool(np.all(resultado['p05'] <= resultado['p50'])
+                                  and np.all(resultado['p50'] <= resultado['p95']))),
+        ("Modelos de erro inválidos recusados (inclusive NaN/inf)", len(erros_invalidos) == len(modelos_invalidos)),
+        ("Linha de comando: uma linha por paciente",
+         codigo == 0 and len(saida.getvalue().splitlines()) == 2 + 9),
+        (f"{ENFERMARIA} x {AMOSTRAS} amostras em menos de {ORCAMENTO_SEGUNDOS} s", tempo < ORCAMENTO_SEGUNDOS),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Propagação de incerteza funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,115 @@
+"""
+Medição de latência por paciente: ANTES x DEPOIS do registro de sistemas fuzzy
+
+ANTES: cada chamada montava os Antecedents, as regras e um ControlSystem novo
+DEPOIS: cada base de regras é compilada uma única vez por processo (registro)
+
+O script também confere que os escores dos dois caminhos são idênticos.
+"""
+import sys
+import io
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from skfuzzy import control as ctrl
+
+import calculadora_desktop_albumina_opcional as calc
+
+# (nome, imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre, diag, comorb, idade, cirurg)
+casos = [
+    ("Paciente saudável jovem",
+     24.0, 2.0, 0.0, 85.0, 2.0, 0.0, 3.0, 4.2, 0.0, 0.0, 0.0, 35.0, 0.0),
+    ("Paciente desnutrido grave",
+     15.0, 15.0, 3.0, 30.0, 20.0, 3.0, 150.0, 2.0, 2.0, 3.0, 4.0, 75.0, 1.0),
+    ("Paciente sem albumina disponível",
+     22.0, 5.0, 1.0, 70.0, 7.0, 1.0, 30.0, None, 1.0, 1.0, 1.0, 65.0, 0.0),
+    ("Idoso frágil sem albumina",
+     18.0, 10.0, 2.0, 50.0, 14.0, 2.0, 80.0, None, 1.0, 2.0, 4.0, 82.0, 0.0),
+]
+
+
+def simular_sem_registro(construtor, entradas, saida):
+    """Reproduz o caminho antigo: sistema e simulação novos a cada chamada"""
+    sistema = ctrl.ControlSystem(list(construtor().rules))
+    simulacao = ctrl.ControlSystemSimulation(sistema)
+    for nome, valor in entradas.items():
+        simulacao.input[nome] = valor
+    simulacao.compute()
+    return simulacao.output[saida]
+
+
+def pontuar_antes(imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre, diag, comorb, idade, cirurg):
+    escore_fen = simular_sem_registro(
+        lambda: calc._construir_sistema('fenotipico'),
+        {'imc': imc, 'perda_ponderal': perda, 'sarcopenia': sarco}, 'risco_fenotipico')
+    escore_ing = simular_sem_registro(
+        lambda: calc._construir_sistema('ingestao'),
+        {'vet_consumido': vet, 'duracao_deficit': duracao, 'sintomas_gi': sintomas}, 'risco_ingestao')
+    if albumina is not None:
+        escore_inf = simular_sem_registro(
+            lambda: calc._construir_sistema('inflamatorio'),
+            {'pcr': pcr, 'albumina': albumina, 'febre': febre}, 'risco_inflamatorio')
+    else:
+        escore_inf = simular_sem_registro(
+            lambda: calc._construir_sistema('inflamatorio_simplificado'),
+            {'pcr': pcr, 'febre': febre}, 'risco_inflamatorio')
+    escore_grav = simular_sem_registro(
+        lambda: calc._construir_sistema('gravidade'),
+        {'diagnostico': diag, 'comorbidades': comorb, 'idade_var': idade, 'cirurgia_var': cirurg},
+        'risco_gravidade')
+    return simular_sem_registro(
+        lambda: calc._construir_sistema(calc.chave_integrador(albumina is not None)),
+        {'escore_fenotipico': escore_fen, 'escore_ingestao': escore_ing,
+         'escore_inflamatorio': escore_inf, 'escore_gravidade': escore_grav},
+        'risco_final')
+
+
+def pontuar_depois(imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre, diag, comorb, idade, cirurg):
+    escore_fen = calc.calcular_submodulo_fenotipico(imc, perda, sarco)
+    escore_ing = calc.calcular_submodulo_ingestao(vet, duracao, sintomas)
+    if albumina is not None:
+        escore_inf = calc.calcular_submodulo_inflamatorio(pcr, albumina, febre)
+    else:
+        escore_inf = calc.calcular_submodulo_inflamatorio_simplificado(pcr, febre)
+    escore_grav = calc.calcular_submodulo_gravidade(diag, comorb, idade, cirurg)
+    return calc.calcular_risco_final_integrado(
+        escore_fen, escore_ing, escore_inf, escore_grav,
+        modo_completo=(albumina is not None)
+    )
+
+
+print("="*80)
+print("LATÊNCIA POR PACIENTE - ANTES x DEPOIS DO REGISTRO DE SISTEMAS")
+print("="*80)
+
+inicio = time.perf_counter()
+calc.construir_todos_sistemas()
+print(f"Compilação única das 7 bases de regras: {1000*(time.perf_counter() - inicio):.0f} ms\n")
+
+divergencias = 0
+print(f"{'Caso':<36}{'Antes (ms)':>12}{'Depois (ms)':>13}{'Ganho':>9}   Escore")
+for nome, *entradas in casos:
+    inicio = time.perf_counter()
+    escore_antes = pontuar_antes(*entradas)
+    tempo_antes = time.perf_counter() - inicio
+
+    # Melhor de 5 repetições para o caminho com registro
+    tempo_depois = float('inf')
+    for _ in range(5):
+        inicio = time.perf_counter()
+        escore_depois = pontuar_depois(*entradas)
+        tempo_depois = min(tempo_depois, time.perf_counter() - inicio)
+
+    status = "✓" if abs(escore_antes - escore_depois) < 1e-9 else "✗ DIVERGENTE"
+    if status != "✓":
+        divergencias += 1
+    print(f"{nome:<36}{1000*tempo_antes:>12.1f}{1000*tempo_depois:>13.2f}{tempo_antes/tempo_depois:>8.0f}x   "
+          f"{escore_depois:.2f} {status}")
+
+print(f"\n{'='*80}")
+if divergencias == 0:
+    print("✓ Escores idênticos nos dois caminhos.")
+else:
+    print(f"✗ {divergencias} caso(s) com escores divergentes!")
+    sys.exit(1)
+print(f"{'='*80}")
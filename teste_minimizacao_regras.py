@@ -0,0 +1,82 @@
+"""
+Teste da minimização das bases de regras (compilador_regras.minimizar e
+minimizacao_regras.py)
+
+Confere que cada conjunção removida é de fato coberta por uma mantida, que
+nenhuma entrada fica sem regra, que as bases minimizadas dão escores
+idênticos às declaradas na grade densa e no skfuzzy (integradores e
+gravidade), que a regra repetida do integrador (fenotípico alto & gravidade
+alta -> alto, na dominância e no fallback) é apontada, e que a calculadora e
+o motor vetorizado já usam as bases minimizadas, com compute() mais rápido.
+"""
+import sys
+import io
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calc
+import minimizacao_regras as mr
+import modulo_integrador_final as integrador_delphi
+import motor_vetorizado as mv
+from bases_regras import BASES
+from compilador_regras import cobre, compilar
+
+BASES_PROVADAS = ('integrador_completo', 'integrador_simplificado', 'gravidade', 'integrador_delphi')
+PONTOS_POR_EIXO = 7
+CHAMADAS_SKFUZZY = 40
+
+if __name__ == "__main__":
+    print("="*80)
+    print(f"MINIMIZAÇÃO DAS BASES DE REGRAS - {PONTOS_POR_EIXO} pontos uniformes por eixo")
+    print("="*80)
+
+    minimizadas = {nome: compilar(nome, minimizada=True) for nome in BASES}
+    coberturas_validas = all(
+        cobre(base.original, mantida, removida) and mantida in base.mantidas and removida not in base.mantidas
+        for base in minimizadas.values() for removida, mantida in base.removidas)
+    entradas_preservadas = all(bool(np.all((base.antecedentes >= 0).any(axis=0))) for base in minimizadas.values())
+
+    relatorios = mr.provar_todas(BASES_PROVADAS, PONTOS_POR_EIXO, CHAMADAS_SKFUZZY)
+    for relatorio in relatorios.values():
+        mr.imprimir_relatorio(relatorio)
+    integrador = relatorios['integrador_completo']
+
+    sistema_registro = calc.obter_sistema('integrador_completo')
+    escore_delphi = integrador_delphi.calcular_risco_final(60, 40, 20, 80)
+
+    print()
+    verificacoes = [
+        ("Cada conjunção removida é coberta por uma mantida", coberturas_validas),
+        ("Nenhuma entrada fica sem regra (o skfuzzy rejeitaria o input)", entradas_preservadas),
+        ("Bases sem redundância ficam intactas",
+         minimizadas['fenotipico'].n_conjuncoes == compilar('fenotipico').n_conjuncoes),
+        ("Grade densa idêntica nas bases minimizadas", all(r['identicos'] for r in relatorios.values())),
+        ("skfuzzy idêntico nas bases minimizadas", all(r['identicos_skfuzzy'] for r in relatorios.values())),
+        ("Regra repetida do integrador apontada (regra 88 = regra 1)",
+         any('(regra 88)' in removida and '(regra 1)' in mantida for removida, mantida in integrador['repetidas'])),
+        ("Integrador completo com menos da metade das conjunções",
+         2 * integrador['conjuncoes_minimizadas'] < integrador['conjuncoes']),
+        ("Registro da calculadora usa a base minimizada",
+         len(list(sistema_registro.rules)) == minimizadas['integrador_completo'].n_regras),
+        ("Motor vetorizado usa a base minimizada",
+         mv.obter_motor('integrador_completo').n_regras == integrador['conjuncoes_minimizadas']),
+        ("Integrador Delphi minimizado aceita as quatro entradas", np.isfinite(escore_delphi)),
+        ("compute() do integrador ao menos 20% mais rápido",
+         integrador['tempo_skfuzzy'][1] < 0.8 * integrador['tempo_skfuzzy'][0]),
+        ("Linha de comando sem bases divergentes",
+         mr.main(['inflamatorio_simplificado', '--pontos', '51', '--chamadas', '5']) == 0),
+    ]
+
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Minimização das bases de regras funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,105 @@
+"""
+Validação do motor vetorizado contra o skfuzzy
+
+Para cada uma das 7 bases de regras, pontua pacientes aleatórios (mais os
+extremos dos universos) pelos dois caminhos:
+- skfuzzy: ControlSystemSimulation.compute() paciente a paciente
+- vetorizado: uma única chamada do motor_vetorizado para o lote inteiro
+
+Confere a diferença máxima (limite TOLERANCIA_SKFUZZY), que os pacientes sem
+regra ativada coincidem (KeyError no skfuzzy = NaN no motor) e mostra a vazão
+de cada caminho em pacientes por segundo.
+"""
+import sys
+import io
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calc
+import motor_vetorizado as mv
+
+N_PACIENTES = 400
+rng = np.random.default_rng(2024)
+
+
+def uniforme(minimo, maximo, casas=1):
+    """Valores aleatórios incluindo os dois extremos do intervalo"""
+    valores = rng.uniform(minimo, maximo, N_PACIENTES - 2).round(casas)
+    return np.concatenate([valores, [minimo, maximo]])
+
+
+def pontuar_skfuzzy(funcao, colunas):
+    escores = []
+    for linha in zip(*colunas):
+        try:
+            escores.append(funcao(*linha))
+        except KeyError:
+            escores.append(np.nan)
+    return np.array(escores)
+
+
+escores_aleatorios = [uniforme(0, 100, 2) for _ in range(4)]
+casos = [
+    ("Submódulo 1 - Fenotípico",
+     mv.calcular_fenotipico_vetorizado, calc.calcular_submodulo_fenotipico,
+     [uniforme(12, 50), uniforme(0, 30), uniforme(0, 3, 0)]),
+    ("Submódulo 2 - Ingestão",
+     mv.calcular_ingestao_vetorizado, calc.calcular_submodulo_ingestao,
+     [uniforme(0, 100), uniforme(0, 30), uniforme(0, 3, 0)]),
+    ("Submódulo 3 - Inflamatório (completo)",
+     mv.calcular_inflamatorio_vetorizado, calc.calcular_submodulo_inflamatorio,
+     [uniforme(0, 400), uniforme(1.5, 5.0, 2), uniforme(0, 3, 0)]),
+    ("Submódulo 3 - Inflamatório (simplificado)",
+     mv.calcular_inflamatorio_simplificado_vetorizado, calc.calcular_submodulo_inflamatorio_simplificado,
+     [uniforme(0, 400), uniforme(0, 3, 0)]),
+    ("Submódulo 4 - Gravidade",
+     mv.calcular_gravidade_vetorizado, calc.calcular_submodulo_gravidade,
+     [uniforme(0, 3), uniforme(0, 5), uniforme(18, 100, 0), uniforme(0, 1)]),
+    ("Integrador (completo)",
+     lambda *e: mv.calcular_risco_final_vetorizado(*e, modo_completo=True),
+     lambda *e: calc.calcular_risco_final_integrado(*e, modo_completo=True),
+     escores_aleatorios),
+    ("Integrador (simplificado)",
+     lambda *e: mv.calcular_risco_final_vetorizado(*e, modo_completo=False),
+     lambda *e: calc.calcular_risco_final_integrado(*e, modo_completo=False),
+     escores_aleatorios),
+]
+
+print("="*96)
+print(f"MOTOR VETORIZADO x SKFUZZY ({N_PACIENTES} pacientes por base de regras)")
+print("="*96)
+
+calc.construir_todos_sistemas()
+
+falhas = 0
+print(f"{'Base de regras':<44}{'Dif. máx.':>11}{'Sem regra':>11}{'skfuzzy (pac/s)':>17}{'Vetor. (pac/s)':>16}")
+for nome, vetorizado, skfuzzy, colunas in casos:
+    vetorizado(*[c[:2] for c in colunas])  # compila o motor fora da medição
+
+    inicio = time.perf_counter()
+    escores_skfuzzy = pontuar_skfuzzy(skfuzzy, colunas)
+    tempo_skfuzzy = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    escores_vetorizados = vetorizado(*colunas)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    mesmos_nan = np.array_equal(np.isnan(escores_skfuzzy), np.isnan(escores_vetorizados))
+    diferencas = np.abs(escores_skfuzzy - escores_vetorizados)
+    diferenca_maxima = np.nanmax(diferencas) if not np.isnan(diferencas).all() else 0.0
+    ok = mesmos_nan and diferenca_maxima <= mv.TOLERANCIA_SKFUZZY
+    if not ok:
+        falhas += 1
+
+    print(f"{nome:<44}{diferenca_maxima:>11.1e}{int(np.isnan(escores_skfuzzy).sum()):>11}"
+          f"{N_PACIENTES/tempo_skfuzzy:>17.0f}{N_PACIENTES/tempo_vetorizado:>16.0f}  {'✓' if ok else '✗'}")
+
+print(f"\n{'='*96}")
+if falhas == 0:
+    print(f"✓ Todas as bases de regras coincidem com o skfuzzy (tolerância {mv.TOLERANCIA_SKFUZZY:g}).")
+else:
+    print(f"✗ {falhas} base(s) de regras divergem do skfuzzy!")
+    sys.exit(1)
+print(f"{'='*96}")
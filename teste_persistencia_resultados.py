@@ -0,0 +1,173 @@
+"""
+Teste da persistência dos resultados (persistencia_resultados.py)
+
+Confere que vários processos e várias threads gravando no mesmo CSV nunca
+intercalam linhas nem duplicam o cabeçalho, que as linhas ficam em memória
+até completar o lote (e são gravadas ao fechar), que uma trava mantida por
+outro processo gera TimeoutError sem perder linhas, que um arquivo apagado
+durante o uso é recriado e que salvar_csv da calculadora continua gravando
+no formato de dados_pacientes.csv.
+"""
+import sys
+import io
+import csv
+import os
+import tempfile
+import threading
+import multiprocessing
+from types import SimpleNamespace
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import calculadora_desktop_albumina_opcional as calc
+import persistencia_resultados as pr
+from persistencia_resultados import GravadorResultados
+
+CABECALHO = ['Processo', 'Indice', 'Texto']
+PROCESSOS = 4
+LINHAS_POR_PROCESSO = 400
+# Linhas de ~8 KB: sem trava, gravações desse tamanho se intercalam
+TEXTO = 'x' * 8000
+
+
+def gravar_processo(caminho, processo):
+    with GravadorResultados(caminho, CABECALHO, linhas_por_descarga=7, fsync=False) as gravador:
+        for i in range(LINHAS_POR_PROCESSO):
+            gravador.escrever([processo, i, TEXTO])
+
+
+def ler(caminho):
+    with open(caminho, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def linhas_integras(linhas, origens, por_origem):
+    """Cabeçalho único e cada origem com todas as suas linhas, completas e em ordem"""
+    if linhas[0] != CABECALHO or CABECALHO in linhas[1:]:
+        return False
+    vistos = {origem: [] for origem in origens}
+    for linha in linhas[1:]:
+        if len(linha) != 3 or linha[2] != TEXTO or linha[0] not in vistos:
+            return False
+        vistos[linha[0]].append(int(linha[1]))
+    return all(indices == list(range(por_origem)) for indices in vistos.values())
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("PERSISTÊNCIA DOS RESULTADOS - arquivo aberto, lotes e trava consultiva")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # 1. Vários processos no mesmo arquivo
+        caminho = os.path.join(pasta, 'processos.csv')
+        contexto = multiprocessing.get_context('spawn')
+        processos = [contexto.Process(target=gravar_processo, args=(caminho, p)) for p in range(PROCESSOS)]
+        for p in processos:
+            p.start()
+        for p in processos:
+            p.join()
+        linhas_processos = ler(caminho)
+        print(f"{PROCESSOS} processos x {LINHAS_POR_PROCESSO} linhas: {len(linhas_processos) - 1} linhas gravadas")
+
+        # 2. Várias threads no mesmo gravador
+        caminho = os.path.join(pasta, 'threads.csv')
+        gravador = GravadorResultados(caminho, CABECALHO, linhas_por_descarga=5, fsync=False)
+        threads = [threading.Thread(target=lambda t=t: [gravador.escrever([f't{t}', i, TEXTO]) for i in range(200)])
+                   for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        gravador.fechar()
+        linhas_threads = ler(caminho)
+
+        # 3. Lotes: nada no disco até completar 10 linhas; o resto sai ao fechar
+        caminho = os.path.join(pasta, 'lotes.csv')
+        gravador = GravadorResultados(caminho, CABECALHO, linhas_por_descarga=10)
+        for i in range(9):
+            gravador.escrever(['0', i, TEXTO])
+        existe_antes = os.path.exists(caminho)
+        gravador.escrever(['0', 9, TEXTO])
+        no_lote = len(ler(caminho)) - 1
+        for i in range(10, 13):
+            gravador.escrever(['0', i, TEXTO])
+        pendentes_antes = gravador.pendentes
+        gravador.fechar()
+        linhas_lotes = ler(caminho)
+
+        # 4. Trava mantida por outro processo (outro descritor do mesmo arquivo)
+        caminho = os.path.join(pasta, 'travado.csv')
+        gravador = GravadorResultados(caminho, CABECALHO, tempo_limite_trava=0.2)
+        gravador.escrever(['0', 0, TEXTO])
+        outro = open(caminho, 'a', encoding='utf-8')
+        pr.travar(outro)
+        try:
+            gravador.escrever(['0', 1, TEXTO])
+            expirou = False
+        except TimeoutError:
+            expirou = True
+        pendentes_travado = gravador.pendentes
+        pr._destravar(outro)
+        outro.close()
+        gravador.descarregar()
+        linhas_travado = ler(caminho)
+
+        # 5. Arquivo apagado enquanto aberto: recriado com cabeçalho
+        caminho = os.path.join(pasta, 'apagado.csv')
+        gravador = GravadorResultados(caminho, CABECALHO)
+        gravador.escrever(['0', 0, TEXTO])
+        os.remove(caminho)
+        gravador.escrever(['0', 0, TEXTO])
+        gravador.fechar()
+        linhas_apagado = ler(caminho)
+
+        # 6. salvar_csv da calculadora: formato de dados_pacientes.csv
+        caminho = os.path.join(pasta, 'dados_pacientes.csv')
+        interface = SimpleNamespace(gravador=GravadorResultados(caminho, calc.CABECALHO_RESULTADOS), banco=None)
+        calc.CalculadoraFuzzyGUI.salvar_csv(interface, 22.0, 8.0, 1.0, 60.0, 10.0, 1.0, 40.0, None, 1.0,
+                                            2.0, 2.0, 70.0, 0.0, 42.17, 38.1, 35.0, 51.66, 45.3,
+                                            'MODERADO', 'SIMPLIFICADO (sem albumina)')
+        calc.CalculadoraFuzzyGUI.salvar_csv(interface, 22.0, 8.0, 1.0, 60.0, 10.0, 1.0, 40.0, 3.2, 1.0,
+                                            2.0, 2.0, 70.0, 0.0, 42.17, 38.1, 35.0, 51.66, 45.3,
+                                            'MODERADO', 'COMPLETO (com albumina)')
+        interface.gravador.fechar()
+        with open(caminho, newline='', encoding='utf-8') as f:
+            registros = list(csv.DictReader(f))
+
+        # 7. Vazão: lotes de 100 x gravação antiga (reabrir a cada linha)
+        caminho = os.path.join(pasta, 'vazao.csv')
+        vazao_antiga = pr.medir_vazao(caminho, 3000)
+        vazao_lotes = pr.medir_vazao(caminho, 3000, linhas_por_descarga=100)
+        print(f"Vazão: {vazao_antiga:,.0f} linhas/s (reabrir a cada linha) -> "
+              f"{vazao_lotes:,.0f} linhas/s (lotes de 100)")
+
+    verificacoes = [
+        ("Processos: cabeçalho único, linhas completas e em ordem",
+         linhas_integras(linhas_processos, [str(p) for p in range(PROCESSOS)], LINHAS_POR_PROCESSO)),
+        ("Threads: todas as linhas, sem intercalação",
+         linhas_integras(linhas_threads, [f't{t}' for t in range(8)], 200)),
+        ("Arquivo não criado antes do primeiro lote", not existe_antes),
+        ("Lote gravado ao completar 10 linhas", no_lote == 10 and pendentes_antes == 3),
+        ("Linhas pendentes gravadas ao fechar", linhas_integras(linhas_lotes, ['0'], 13)),
+        ("Trava de outro processo gera TimeoutError", expirou),
+        ("Linha não gravada fica em memória e sai depois",
+         pendentes_travado == 1 and linhas_integras(linhas_travado, ['0'], 2)),
+        ("Arquivo apagado é recriado com cabeçalho", linhas_integras(linhas_apagado, ['0'], 1)),
+        ("salvar_csv grava cabeçalho e colunas de dados_pacientes.csv",
+         len(registros) == 2 and list(registros[0]) == calc.CABECALHO_RESULTADOS),
+        ("Albumina ausente gravada como N/A",
+         [r['Albumina'] for r in registros] == ['N/A', '3.2'] and registros[0]['Escore_Final'] == '45.3'),
+        ("Lotes de 100 ao menos 1.5x mais rápidos que reabrir a cada linha", vazao_lotes > 1.5 * vazao_antiga),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Persistência dos resultados funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,143 @@
+"""
+Teste do pipeline de pontuação ponta a ponta (pontuar_pacientes)
+
+Pontua num único lote os casos do teste de integração (modos misturados) e
+um lote aleatório, e confere, linha a linha e na ordem de entrada, contra a
+sequência de chamadas da calculadora (submódulos + integrador, modo
+escolhido à mão como em CalculadoraFuzzyGUI.calcular). Confere também que
+valores infinitos ou fora de FAIXAS_ENTRADA são rejeitados com o índice do
+paciente, em vez de saturados e pontuados.
+"""
+import sys
+import io
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calc
+from pipeline_pacientes import CAMPOS_ENTRADA, linhas_invalidas, normalizar_lote, pontuar_pacientes
+
+TOLERANCIA = 1e-6
+
+# (nome, imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre, diag, comorb, idade, cirurg)
+casos = [
+    ("Paciente saudável jovem",
+     24.0, 2.0, 0.0, 85.0, 2.0, 0.0, 3.0, 4.2, 0.0, 0.0, 0.0, 35.0, 0.0),
+    ("Paciente desnutrido grave",
+     15.0, 15.0, 3.0, 30.0, 20.0, 3.0, 150.0, 2.0, 2.0, 3.0, 4.0, 75.0, 1.0),
+    ("Paciente sem albumina disponível",
+     22.0, 5.0, 1.0, 70.0, 7.0, 1.0, 30.0, None, 1.0, 1.0, 1.0, 65.0, 0.0),
+    ("Valores na zona de transição",
+     20.0, 8.0, 1.0, 60.0, 10.0, 1.0, 50.0, 3.0, 1.0, 1.0, 1.5, 68.0, 0.5),
+    ("Idoso frágil sem albumina",
+     18.0, 10.0, 2.0, 50.0, 14.0, 2.0, 80.0, None, 1.0, 2.0, 4.0, 82.0, 0.0),
+    ("Cirurgia 0.45 (antiga zona morta)",
+     21.0, 6.0, 1.0, 65.0, 8.0, 1.0, 40.0, 3.2, 1.0, 1.0, 1.0, 66.0, 0.45),
+    ("Pós-operatório sem albumina",
+     19.0, 12.0, 2.0, 45.0, 12.0, 2.0, 120.0, None, 2.0, 2.0, 2.0, 70.0, 1.0),
+]
+
+
+def pontuar_chamadas_separadas(imc, perda, sarco, vet, duracao, sintomas, pcr, albumina, febre,
+                               diag, comorb, idade, cirurg):
+    """Caminho atual: cinco chamadas e escolha manual do modo"""
+    escore_fen = calc.calcular_submodulo_fenotipico(imc, perda, sarco)
+    escore_ing = calc.calcular_submodulo_ingestao(vet, duracao, sintomas)
+    if albumina is not None:
+        escore_inf = calc.calcular_submodulo_inflamatorio(pcr, albumina, febre)
+    else:
+        escore_inf = calc.calcular_submodulo_inflamatorio_simplificado(pcr, febre)
+    escore_grav = calc.calcular_submodulo_gravidade(diag, comorb, idade, cirurg)
+    escore_final = calc.calcular_risco_final_integrado(escore_fen, escore_ing, escore_inf, escore_grav,
+                                                       modo_completo=(albumina is not None))
+    return escore_fen, escore_ing, escore_inf, escore_grav, escore_final
+
+
+def conferir(registros, resultado):
+    """Número de linhas divergentes entre o pipeline e as chamadas separadas"""
+    divergentes = 0
+    chaves = ['escore_fenotipico', 'escore_ingestao', 'escore_inflamatorio', 'escore_gravidade', 'escore_final']
+    for i, registro in enumerate(registros):
+        esperado = pontuar_chamadas_separadas(*[registro[campo] for campo in CAMPOS_ENTRADA])
+        obtido = [resultado[chave][i] for chave in chaves]
+        modo_ok = resultado['modo_completo'][i] == (registro['albumina'] is not None)
+        categoria_ok = resultado['categoria'][i] == calc.categorizar_risco(esperado[-1])[0]
+        if not (np.allclose(esperado, obtido, atol=TOLERANCIA, rtol=0) and modo_ok and categoria_ok):
+            divergentes += 1
+    return divergentes
+
+
+print("="*88)
+print("PIPELINE DE PONTUAÇÃO - pontuar_pacientes(lote)")
+print("="*88)
+
+falhas = 0
+
+# 1. Casos clínicos com modos misturados, como lista de registros
+registros = [dict(zip(CAMPOS_ENTRADA, valores)) for _, *valores in casos]
+resultado = pontuar_pacientes(registros)
+print(f"\n{'Caso':<36}{'Modo':<30}{'Final':>7}   Categoria")
+for (nome, *_), modo, final, categoria in zip(casos, resultado['modo'], resultado['escore_final'],
+                                              resultado['categoria']):
+    print(f"{nome:<36}{modo:<30}{final:>7.2f}   {categoria}")
+divergentes = conferir(registros, resultado)
+print(f"\nCasos clínicos: {len(casos) - divergentes}/{len(casos)} idênticos às chamadas separadas")
+falhas += divergentes
+
+# 2. Lote aleatório como dict de colunas (albumina ausente em ~40% das linhas)
+rng = np.random.default_rng(11)
+n = 300
+colunas = {
+    'imc': rng.uniform(13, 45, n), 'perda': rng.uniform(0, 30, n), 'sarcopenia': rng.integers(0, 4, n),
+    'vet': rng.uniform(0, 100, n), 'duracao': rng.uniform(0, 30, n), 'sintomas': rng.integers(0, 4, n),
+    'pcr': rng.uniform(0, 300, n), 'albumina': [None if rng.random() < 0.4 else round(rng.uniform(1.5, 5.0), 1)
+                                                for _ in range(n)],
+    'febre': rng.integers(0, 4, n), 'diagnostico': rng.integers(0, 4, n), 'comorbidades': rng.integers(0, 6, n),
+    'idade': rng.uniform(18, 100, n), 'cirurgia': rng.integers(0, 2, n),
+}
+inicio = time.perf_counter()
+resultado = pontuar_pacientes(colunas)
+tempo = time.perf_counter() - inicio
+
+registros = [{campo: (colunas[campo][i] if campo == 'albumina' else float(colunas[campo][i]))
+              for campo in CAMPOS_ENTRADA} for i in range(n)]
+# Linhas sem regra ativada (NaN) ficam fora da comparação: a calculadora gera KeyError
+validos = ~np.isnan(resultado['escore_final'])
+divergentes = conferir([r for r, v in zip(registros, validos) if v],
+                       {chave: ([x for x, v in zip(valores, validos) if v] if isinstance(valores, list)
+                                else valores[validos]) for chave, valores in resultado.items()})
+print(f"Lote aleatório: {n} pacientes ({int(resultado['modo_completo'].sum())} completos) em {1000*tempo:.1f} ms; "
+      f"{int(validos.sum()) - divergentes}/{int(validos.sum())} idênticos às chamadas separadas")
+falhas += divergentes
+
+# 3. Valores infinitos ou fora das faixas: rejeitados com o índice do paciente
+print("\nValores inválidos:")
+base = dict(zip(CAMPOS_ENTRADA, casos[0][1:]))
+invalidos = [('imc', float('inf')), ('imc', 80.0), ('idade', 5.0), ('pcr', float('-inf')),
+             ('albumina', float('inf')), ('albumina', 0.5)]
+for campo, valor in invalidos:
+    lote = [base, dict(base, **{campo: valor})]
+    try:
+        pontuar_pacientes(lote)
+        mensagem = None
+    except ValueError as e:
+        mensagem = str(e)
+    ok = mensagem is not None and 'paciente 1:' in mensagem and campo in mensagem
+    print(f"  {'✓' if ok else '✗'} {campo}={valor}: {mensagem}")
+    falhas += not ok
+# Sem validação, quem chama recebe as colunas e os motivos por índice
+colunas_sem_validar = normalizar_lote([base, dict(base, imc=80.0), base, dict(base, pcr=float('inf'))],
+                                      validar=False)
+motivos = linhas_invalidas(colunas_sem_validar)
+ok = sorted(motivos) == [1, 3]
+print(f"  {'✓' if ok else '✗'} linhas_invalidas sem validar: {motivos}")
+falhas += not ok
+
+print(f"\n{'='*88}")
+if falhas == 0:
+    print("✓ Pipeline idêntico às chamadas separadas, com o modo correto em cada linha e na ordem de entrada.")
+else:
+    print(f"✗ {falhas} paciente(s) divergentes!")
+    sys.exit(1)
+print(f"{'='*88}")
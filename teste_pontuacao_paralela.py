@@ -0,0 +1,79 @@
+"""
+Teste da pontuação paralela pelo caminho skfuzzy (pontuacao_paralela.py)
+
+Confere que o lote distribuído entre processos, em blocos, devolve
+exatamente os escores do caminho serial da calculadora, na ordem de
+entrada, e que coincide com o pipeline vetorizado. Pacientes com valor
+ausente, não finito ou fora das faixas são apontados com o índice, sem ir
+ao pool e sem derrubar o lote.
+"""
+import sys
+import io
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import pontuacao_paralela as pp
+from pipeline_pacientes import CAMPOS_ENTRADA, normalizar_lote, pontuar_pacientes
+
+if __name__ == "__main__":
+    print("="*80)
+    print("PONTUAÇÃO PARALELA (SKFUZZY) - 2 processos, blocos de 16 pacientes")
+    print("="*80)
+
+    lote = pp._lote_aleatorio(60, semente=3)
+    lote['imc'][5] = 12.0  # zona sem regra ativada no fenotípico
+
+    paralelo = pp.pontuar_pacientes_paralelo(lote, trabalhadores=2, tamanho_bloco=16)
+
+    colunas = normalizar_lote(lote)
+    serial = np.array([pp._pontuar_paciente(*[colunas[campo][i] for campo in CAMPOS_ENTRADA])
+                       for i in range(60)])
+    vetorizado = pontuar_pacientes(lote)
+
+    chaves = ['escore_fenotipico', 'escore_ingestao', 'escore_inflamatorio', 'escore_gravidade', 'escore_final']
+    matriz_paralela = np.column_stack([paralelo[chave] for chave in chaves])
+    matriz_vetorizada = np.column_stack([vetorizado[chave] for chave in chaves])
+
+    verificacoes = [
+        ("Idêntico ao caminho serial, na ordem de entrada",
+         np.array_equal(matriz_paralela, serial, equal_nan=True)),
+        ("Coincide com o pipeline vetorizado (1e-6)",
+         np.allclose(matriz_paralela, matriz_vetorizada, atol=1e-6, rtol=0, equal_nan=True)),
+        ("Modo escolhido por linha", np.array_equal(paralelo['modo_completo'], ~np.isnan(colunas['albumina']))),
+        ("Zona sem regra ativada vira NaN / categoria None",
+         np.isnan(paralelo['escore_final'][5]) and paralelo['categoria'][5] is None),
+    ]
+
+    # Pacientes inválidos: apontados por índice, os outros pontuados normalmente
+    invalido = {campo: valores[:8].copy() for campo, valores in lote.items()}
+    invalido['imc'][1] = np.inf
+    invalido['imc'][2] = 80.0
+    invalido['idade'][4] = 5.0
+    invalido['pcr'][6] = -np.inf
+    invalido['sarcopenia'][7] = np.nan
+    com_rejeitados = pp.pontuar_pacientes_paralelo(invalido, trabalhadores=2, tamanho_bloco=2)
+    print("Rejeitados:")
+    for indice, motivo in com_rejeitados['rejeitados'].items():
+        print(f"  paciente {indice}: {motivo}")
+    aceitos = [0, 3, 5]
+    rejeitados_ok = (sorted(com_rejeitados['rejeitados']) == [1, 2, 4, 6, 7]
+                     and np.isnan(com_rejeitados['escore_final'][[1, 2, 4, 6, 7]]).all()
+                     and all(com_rejeitados['categoria'][i] is None for i in (1, 2, 4, 6, 7))
+                     and np.array_equal(com_rejeitados['escore_final'][aceitos], paralelo['escore_final'][aceitos],
+                                        equal_nan=True))
+    verificacoes.append(("Inválidos apontados por índice, os outros pontuados", rejeitados_ok))
+    verificacoes.append(("Lote válido sem rejeitados", paralelo['rejeitados'] == {}))
+
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Pontuação paralela idêntica ao caminho de referência.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
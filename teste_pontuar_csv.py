@@ -0,0 +1,171 @@
+"""
+Teste da pontuação em lote de CSV (pontuar_csv.py)
+
+1. Arquivo no formato de salvar_csv (com Modo), pontuado em blocos pequenos:
+   escores iguais aos do pipeline, ordem das linhas preservada e linhas
+   inválidas listadas
+   Valores não finitos ("nan", "inf") e fora das faixas do formulário da
+   calculadora: só a linha é ignorada (e apontada no stderr), o resto do
+   arquivo é pontuado
+2. dados_pacientes.csv do repositório (cabeçalho sem Modo + linhas com Modo)
+3. Memória limitada: o pico com 4x mais linhas fica próximo do pico original
+"""
+import sys
+import io
+import os
+import csv
+import tempfile
+import tracemalloc
+from contextlib import redirect_stderr
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import pontuar_csv
+from pipeline_pacientes import CAMPOS_ENTRADA, pontuar_pacientes
+
+CABECALHO_SALVAR_CSV = [
+    'Data', 'Hora', 'Modo', 'IMC', 'Perda%', 'Sarcopenia', 'VET%', 'Duracao',
+    'SintomasGI', 'PCR', 'Albumina', 'Febre', 'Diagnostico', 'Comorbidades',
+    'Idade', 'Cirurgia', 'Escore_Fenotipico', 'Escore_Ingestao',
+    'Escore_Inflamatorio', 'Escore_Gravidade', 'Escore_Final', 'Categoria'
+]
+
+
+def gerar_csv(caminho, n, semente=0):
+    """Grava n pacientes aleatórios no formato de salvar_csv; retorna as colunas de entrada"""
+    rng = np.random.default_rng(semente)
+    colunas = {
+        'imc': rng.uniform(13, 45, n).round(1), 'perda': rng.uniform(0, 30, n).round(1),
+        'sarcopenia': rng.integers(0, 4, n).astype(float), 'vet': rng.uniform(0, 100, n).round(0),
+        'duracao': rng.uniform(0, 30, n).round(0), 'sintomas': rng.integers(0, 4, n).astype(float),
+        'pcr': rng.uniform(0, 300, n).round(1),
+        'albumina': np.where(rng.random(n) < 0.4, np.nan, rng.uniform(1.5, 5.0, n).round(1)),
+        'febre': rng.integers(0, 4, n).astype(float), 'diagnostico': rng.integers(0, 4, n).astype(float),
+        'comorbidades': rng.integers(0, 6, n).astype(float), 'idade': rng.uniform(18, 100, n).round(0),
+        'cirurgia': rng.integers(0, 2, n).astype(float),
+    }
+    with open(caminho, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(CABECALHO_SALVAR_CSV)
+        for i in range(n):
+            valores = [colunas[campo][i] for campo in CAMPOS_ENTRADA]
+            valores[7] = "N/A" if np.isnan(valores[7]) else valores[7]
+            escritor.writerow([f"{i:06d}", "08:00:00", ""] + valores + [""] * 6)
+    return colunas
+
+
+def pico_memoria(caminho, bloco):
+    tracemalloc.start()
+    with open(caminho, newline='', encoding='utf-8') as entrada, open(os.devnull, 'w', newline='') as saida:
+        pontuar_csv.pontuar_arquivo(entrada, saida, tamanho_bloco=bloco)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico
+
+
+print("="*80)
+print("PONTUAÇÃO EM LOTE DE CSV - pontuar_csv.py")
+print("="*80)
+
+falhas = 0
+with tempfile.TemporaryDirectory() as pasta:
+    # 1. Formato de salvar_csv, blocos de 128 linhas, com duas linhas inválidas no meio
+    caminho = os.path.join(pasta, 'admissoes.csv')
+    n = 1000
+    colunas = gerar_csv(caminho, n)
+    with open(caminho, 'a', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(["invalida", "", "", "", "5", "0"] + [""] * 16)
+        csv.writer(f).writerow(["curta", "08:00:00"])
+
+    saida = io.StringIO()
+    with open(caminho, newline='', encoding='utf-8') as entrada:
+        resumo = pontuar_csv.pontuar_arquivo(entrada, saida, tamanho_bloco=128)
+    saida.seek(0)
+    linhas = list(csv.DictReader(saida))
+    esperado = pontuar_pacientes(colunas)
+
+    cabecalho_ok = list(linhas[0].keys()) == CABECALHO_SALVAR_CSV
+    ordem_ok = [linha['Data'] for linha in linhas] == [f"{i:06d}" for i in range(n)]
+    escores_ok = all(
+        linha['Escore_Final'] == f"{final:.1f}" and linha['Categoria'] == categoria and linha['Modo'] == modo
+        for linha, final, categoria, modo in zip(linhas, esperado['escore_final'], esperado['categoria'],
+                                                 esperado['modo']))
+    erros_ok = [numero for numero, _ in resumo['erros']] == [n + 2, n + 3]
+    print(f"\n1. {resumo['linhas']} linhas pontuadas em blocos de 128")
+    print(f"   {'✓' if cabecalho_ok else '✗'} Cabeçalho igual ao de salvar_csv")
+    print(f"   {'✓' if ordem_ok else '✗'} Ordem das linhas preservada")
+    print(f"   {'✓' if escores_ok else '✗'} Escores, Modo e Categoria iguais aos do pipeline")
+    print(f"   {'✓' if erros_ok else '✗'} Linhas inválidas listadas: {resumo['erros']}")
+    falhas += not (cabecalho_ok and ordem_ok and escores_ok and erros_ok)
+
+    # 1b. Uma linha válida entre linhas não finitas ou fora da faixa, pela linha de comando
+    def linha_paciente(**alteracoes):
+        valores = {'IMC': '22.0', 'Perda%': '5.0', 'Sarcopenia': '1', 'VET%': '70', 'Duracao': '5',
+                   'SintomasGI': '1', 'PCR': '20', 'Albumina': '3.5', 'Febre': '0', 'Diagnostico': '1',
+                   'Comorbidades': '1', 'Idade': '60', 'Cirurgia': '0'}
+        valores.update(alteracoes)
+        return ["01/01/2026", "08:00:00", ""] + [valores[c] for c in CABECALHO_SALVAR_CSV[3:16]] + [""] * 6
+
+    invalidas = [
+        ("IMC nan", {'IMC': 'nan'}, "IMC inválido"),
+        ("PCR inf", {'PCR': 'inf'}, "PCR inválido"),
+        ("Albumina -inf", {'Albumina': '-inf'}, "Albumina inválido"),
+        ("IMC 80", {'IMC': '80'}, "IMC fora da faixa"),
+        ("Idade 5", {'Idade': '5'}, "Idade fora da faixa"),
+        ("Albumina 0.2", {'Albumina': '0.2'}, "Albumina fora da faixa"),
+        ("Comorbidades 7", {'Comorbidades': '7'}, "Comorbidades fora da faixa"),
+    ]
+    faixas = os.path.join(pasta, 'faixas.csv')
+    with open(faixas, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(CABECALHO_SALVAR_CSV)
+        escritor.writerow(linha_paciente())
+        for _, alteracoes, _ in invalidas:
+            escritor.writerow(linha_paciente(**alteracoes))
+        escritor.writerow(linha_paciente(Albumina='N/A'))
+    erros_cli = io.StringIO()
+    with redirect_stderr(erros_cli):
+        codigo = pontuar_csv.main([faixas, os.path.join(pasta, 'faixas_pontuadas.csv'), '--bloco', '2',
+                                   '--silencioso'])
+    with open(os.path.join(pasta, 'faixas_pontuadas.csv'), newline='', encoding='utf-8') as f:
+        pontuadas = list(csv.DictReader(f))
+    relatorio = erros_cli.getvalue()
+    print(f"\n1b. Linhas não finitas ou fora da faixa ({len(pontuadas)} pontuadas)")
+    for k, (descricao, _, motivo) in enumerate(invalidas):
+        ok = f"linha {k + 3} ignorada: {motivo}" in relatorio
+        print(f"   {'✓' if ok else '✗'} {descricao}: linha ignorada e apontada no stderr")
+        falhas += not ok
+    ok = (codigo == 1 and [linha['IMC'] for linha in pontuadas] == ['22.0', '22.0']
+          and all(linha['Categoria'] != "SEM REGRA ATIVADA" for linha in pontuadas))
+    print(f"   {'✓' if ok else '✗'} Linhas válidas ao redor pontuadas (albumina N/A aceita)")
+    falhas += not ok
+
+    # 2. Arquivo do repositório com os dois formatos misturados
+    saida = io.StringIO()
+    with open('dados_pacientes.csv', newline='', encoding='utf-8') as entrada:
+        resumo = pontuar_csv.pontuar_arquivo(entrada, saida, tamanho_bloco=4)
+    ok = resumo['linhas'] == 9 and not resumo['erros']
+    print(f"\n2. dados_pacientes.csv: {resumo['linhas']} linhas, {len(resumo['erros'])} inválidas "
+          f"{'✓' if ok else '✗'}")
+    falhas += not ok
+
+    # 3. Memória limitada pelo tamanho do bloco, não pelo tamanho do arquivo
+    pequeno = os.path.join(pasta, 'pequeno.csv')
+    grande = os.path.join(pasta, 'grande.csv')
+    gerar_csv(pequeno, 4000, semente=1)
+    gerar_csv(grande, 16000, semente=2)
+    pico_pequeno = pico_memoria(pequeno, bloco=500)
+    pico_grande = pico_memoria(grande, bloco=500)
+    ok = pico_grande < 1.5 * pico_pequeno
+    print(f"\n3. Pico de memória (bloco de 500): 4000 linhas = {pico_pequeno/1e6:.1f} MB, "
+          f"16000 linhas = {pico_grande/1e6:.1f} MB {'✓' if ok else '✗'}")
+    falhas += not ok
+
+print(f"\n{'='*80}")
+if falhas == 0:
+    print("✓ Pontuação em lote de CSV funcionando corretamente.")
+else:
+    print(f"✗ {falhas} verificação(ões) falharam!")
+    sys.exit(1)
+print(f"{'='*80}")
@@ -0,0 +1,136 @@
+"""
+Teste da análise de sensibilidade em lote (sensibilidade_lote.py)
+
+Compara, para alguns pacientes (um deles sem albumina), as faixas e
+inclinações do lote com o cálculo ingênuo: um pontuar_pacientes por
+paciente, entrada e passo. Confere também as formas dos arrays, a albumina
+NaN no modo simplificado, a entrada principal de cada paciente, o relatório
+em CSV da linha de comando e que a avaliação vetorizada é muito mais rápida
+que o laço.
+"""
+import sys
+import io
+import csv
+import contextlib
+import os
+import tempfile
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import sensibilidade_lote as sl
+from pipeline_pacientes import CAMPOS_ENTRADA, pontuar_pacientes
+
+PACIENTES = 30
+PASSOS = 11
+REFERENCIAS = 3
+GANHO_MINIMO = 10
+
+
+def gerar_pacientes(n, semente=0):
+    rng = np.random.default_rng(semente)
+    limites = sl.limites_entradas()
+    pacientes = []
+    for i in range(n):
+        paciente = {campo: float(rng.uniform(minimo + 0.05 * (maximo - minimo), maximo - 0.05 * (maximo - minimo)))
+                    for campo, (minimo, maximo) in limites.items()}
+        if i % 3 == 1:
+            paciente['albumina'] = None
+        pacientes.append(paciente)
+    return pacientes
+
+
+def ingenuo(paciente, resultado):
+    """Mesmas grades e pontos da derivada, um pontuar_pacientes por avaliação"""
+    sub = np.full((len(CAMPOS_ENTRADA), PASSOS), np.nan)
+    final = np.full((len(CAMPOS_ENTRADA), PASSOS), np.nan)
+    inclinacao = np.full(len(CAMPOS_ENTRADA), np.nan)
+    limites = sl.limites_entradas()
+    for j, campo in enumerate(CAMPOS_ENTRADA):
+        if campo == 'albumina' and paciente['albumina'] is None:
+            continue
+        chave = f"escore_{sl.SUBMODULO_DO_CAMPO[campo]}"
+        for k, valor in enumerate(resultado['grade'][campo]):
+            r = pontuar_pacientes([dict(paciente, **{campo: valor})], validar=False)
+            sub[j, k], final[j, k] = r[chave][0], r['escore_final'][0]
+        minimo, maximo = limites[campo]
+        h = sl.PASSO_RELATIVO_DERIVADA * (maximo - minimo)
+        antes, depois = np.clip(paciente[campo] - h, minimo, maximo), np.clip(paciente[campo] + h, minimo, maximo)
+        r = pontuar_pacientes([dict(paciente, **{campo: antes}), dict(paciente, **{campo: depois})], validar=False)
+        inclinacao[j] = (r['escore_final'][1] - r['escore_final'][0]) / (depois - antes)
+    return sub, final, inclinacao
+
+
+def proximos(a, b):
+    return a.shape == b.shape and bool(np.all((np.abs(a - b) < 1e-9) | (np.isnan(a) & np.isnan(b))))
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("ANÁLISE DE SENSIBILIDADE EM LOTE")
+    print("="*80)
+
+    pacientes = gerar_pacientes(PACIENTES)
+    sl.analisar_sensibilidade(pacientes[:2], PASSOS)      # compila os motores fora da medição
+    inicio = time.perf_counter()
+    resultado = sl.analisar_sensibilidade(pacientes, PASSOS)
+    tempo_lote = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    referencias = [ingenuo(pacientes[i], resultado) for i in range(REFERENCIAS)]
+    tempo_ingenuo = (time.perf_counter() - inicio) / REFERENCIAS * PACIENTES
+
+    iguais = all(proximos(resultado['escore_submodulo'][i], sub) and proximos(resultado['escore_final'][i], final)
+                 and proximos(resultado['inclinacao_final'][i], inclinacao)
+                 for i, (sub, final, inclinacao) in enumerate(referencias))
+    j_albumina = CAMPOS_ENTRADA.index('albumina')
+    sem_albumina = np.array([p['albumina'] is None for p in pacientes])
+    limites = sl.limites_entradas()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = os.path.join(pasta, 'sensibilidade.csv')
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            codigo = sl.main(['dados_pacientes.csv', '--saida', saida, '--passos', str(PASSOS)])
+        with open(saida, newline='', encoding='utf-8') as f:
+            relatorio = list(csv.DictReader(f))
+
+    avaliacoes = PACIENTES * len(CAMPOS_ENTRADA) * (PASSOS + 2)
+    print(f"{PACIENTES} pacientes x {len(CAMPOS_ENTRADA)} entradas x {PASSOS + 2} pontos = {avaliacoes:,} avaliações")
+    print(f"  Vetorizado: {tempo_lote:.2f} s | laço por paciente/entrada/passo: {tempo_ingenuo:.1f} s "
+          f"(estimado de {REFERENCIAS} pacientes) -> {tempo_ingenuo/tempo_lote:.0f}x")
+    contagem = {campo: resultado['principal'].count(campo) for campo in CAMPOS_ENTRADA}
+    print("  Entrada principal: " + ", ".join(f"{campo} {n}" for campo, n in contagem.items() if n))
+
+    verificacoes = [
+        ("Formas (pacientes, entradas, passos) e (pacientes, entradas)",
+         resultado['escore_final'].shape == (PACIENTES, 13, PASSOS)
+         and resultado['amplitude_submodulo'].shape == (PACIENTES, 13)),
+        ("Grade de ponta a ponta do universo de cada entrada",
+         all(resultado['grade'][c][0] == limites[c][0] and resultado['grade'][c][-1] == limites[c][1]
+             for c in CAMPOS_ENTRADA)),
+        ("Escores e inclinações iguais ao laço ingênuo", iguais),
+        ("Albumina NaN só para pacientes sem albumina",
+         np.isnan(resultado['amplitude_final'][sem_albumina, j_albumina]).all()
+         and not np.isnan(resultado['amplitude_final'][~sem_albumina, j_albumina]).any()),
+        ("Amplitude = máximo - mínimo, nunca negativa",
+         np.allclose(resultado['amplitude_final'], resultado['maximo_final'] - resultado['minimo_final'],
+                     equal_nan=True) and np.nanmin(resultado['amplitude_final']) >= 0),
+        ("Entrada principal = maior amplitude do escore final",
+         resultado['principal'] == [CAMPOS_ENTRADA[int(np.nanargmax(a))] for a in resultado['amplitude_final']]),
+        ("Linha de comando: uma linha por paciente e entrada",
+         codigo == 0 and len(relatorio) == 9 * 13 and relatorio[0]['Campo'] == 'imc'),
+        (f"Vetorizado ao menos {GANHO_MINIMO}x mais rápido que o laço", tempo_ingenuo > GANHO_MINIMO * tempo_lote),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Análise de sensibilidade funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,176 @@
+"""
+Teste de carga do serviço HTTP de pontuação (servidor_pontuacao.py)
+
+Sobe o serviço em localhost numa porta livre, dispara requisições
+simultâneas de vários clientes e confere que cada resposta é igual à
+pontuação direta do paciente pelo pipeline, que as requisições foram de fato
+agrupadas em lotes, que as métricas batem com a carga enviada e que entradas
+inválidas (inclusive valores fora das faixas do formulário e Content-Length
+não numérico ou negativo) recebem 400 sem afetar os outros pacientes.
+"""
+import sys
+import io
+import json
+import math
+import socket
+import urllib.error
+import urllib.request
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+from pipeline_pacientes import pontuar_pacientes
+from servidor_pontuacao import CAMPOS_RESULTADO, ServicoPontuacao, executar_carga, obter_metricas, _postar
+
+CLIENTES = 16
+REQUISICOES_POR_CLIENTE = 25
+
+
+def gerar_pacientes(n, semente=14):
+    rng = np.random.default_rng(semente)
+    pacientes = []
+    for i in range(n):
+        pacientes.append({
+            'imc': round(float(rng.uniform(14, 45)), 1), 'perda': round(float(rng.uniform(0, 30)), 1),
+            'sarcopenia': int(rng.integers(0, 4)), 'vet': int(rng.integers(0, 101)),
+            'duracao': int(rng.integers(0, 31)), 'sintomas': int(rng.integers(0, 4)),
+            'pcr': int(rng.integers(0, 301)), 'febre': int(rng.integers(0, 4)),
+            'diagnostico': int(rng.integers(0, 4)), 'comorbidades': int(rng.integers(0, 6)),
+            'idade': int(rng.integers(18, 101)), 'cirurgia': int(rng.integers(0, 2)),
+        })
+        # Albumina informada, omitida, null ou "N/A"
+        escolha = i % 4
+        if escolha == 0:
+            pacientes[-1]['albumina'] = round(float(rng.uniform(1.5, 5.0)), 1)
+        elif escolha == 2:
+            pacientes[-1]['albumina'] = None
+        elif escolha == 3:
+            pacientes[-1]['albumina'] = 'N/A'
+    return pacientes
+
+
+def esperado(paciente):
+    resultado = pontuar_pacientes([paciente])
+    saida = {}
+    for campo in CAMPOS_RESULTADO:
+        valor = resultado[campo][0]
+        if isinstance(valor, (float, np.floating)):
+            valor = None if math.isnan(valor) else float(valor)
+        elif isinstance(valor, np.bool_):
+            valor = bool(valor)
+        saida[campo] = valor
+    return saida
+
+
+def status_de(url, corpo):
+    dados = corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode('utf-8')
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url + '/pontuar', data=dados), timeout=30) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def status_cabecalho(url, content_length, tempo_limite=5):
+    """Status de um POST com Content-Length arbitrário (None se o servidor não responder a tempo)"""
+    host, porta = url.rsplit('//', 1)[1].split(':')
+    with socket.create_connection((host, int(porta)), timeout=tempo_limite) as conexao:
+        conexao.sendall(f"POST /pontuar HTTP/1.1\r\nHost: {host}\r\nContent-Length: {content_length}\r\n"
+                        f"Content-Type: application/json\r\n\r\n{{}}".encode('ascii'))
+        try:
+            linha = conexao.makefile('rb').readline().decode('ascii')
+        except socket.timeout:
+            return None
+    return int(linha.split()[1]) if linha.startswith('HTTP/') else None
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print(f"SERVIÇO HTTP DE PONTUAÇÃO - {CLIENTES} clientes x {REQUISICOES_POR_CLIENTE} requisições")
+    print("="*80)
+
+    pacientes = gerar_pacientes(60)
+    # Paciente em zona sem regra ativada (IMC 12)
+    pacientes.append(dict(pacientes[0], imc=12.0))
+    esperados = [esperado(p) for p in pacientes]
+
+    with ServicoPontuacao(porta=0, janela_ms=5) as servico:
+        _postar(servico.url, pacientes[0])   # aquecimento
+        carga = executar_carga(servico.url, pacientes, CLIENTES, REQUISICOES_POR_CLIENTE)
+        metricas = obter_metricas(servico.url)
+
+        lista = _postar(servico.url, pacientes[:5])
+        status_faltando = status_de(servico.url, {k: v for k, v in pacientes[1].items() if k != 'pcr'})
+        status_texto = status_de(servico.url, dict(pacientes[1], idade='setenta'))
+        status_json = status_de(servico.url, b'{imc: 22')
+        status_vazio = status_de(servico.url, [])
+        status_faixas = {descricao: status_de(servico.url, dict(pacientes[1], **alteracao))
+                         for descricao, alteracao in (('IMC 80', {'imc': 80}), ('idade 5', {'idade': 5}),
+                                                      ('albumina 0.2', {'albumina': 0.2}))}
+        # json.dumps grava Infinity, que o json.loads do servidor aceita
+        status_infinito = status_de(servico.url, dict(pacientes[1], pcr=float('inf')))
+        status_lista_faixa = status_de(servico.url, [pacientes[2], dict(pacientes[3], imc=80)])
+        status_tamanho_texto = status_cabecalho(servico.url, 'abc')
+        status_tamanho_negativo = status_cabecalho(servico.url, -5)
+        with urllib.request.urlopen(servico.url + '/saude', timeout=30) as r:
+            saude = json.loads(r.read())
+        try:
+            urllib.request.urlopen(servico.url + '/desconhecido', timeout=30)
+            status_caminho = 200
+        except urllib.error.HTTPError as e:
+            status_caminho = e.code
+        depois_erros = _postar(servico.url, pacientes[1])
+        metricas_finais = obter_metricas(servico.url)
+
+    print(f"Vazão: {carga['vazao']:.0f} req/s | cliente p50 {carga['latencia_ms']['p50']:.1f} ms, "
+          f"p95 {carga['latencia_ms']['p95']:.1f} ms, p99 {carga['latencia_ms']['p99']:.1f} ms")
+    print(f"Servidor: p50 {metricas['latencia_ms']['p50']:.1f} ms | {metricas['lotes']} lotes, "
+          f"{metricas['requisicoes_por_lote']:.1f} requisições por lote")
+    print(f"Histograma dos lotes: {metricas['histograma_lotes']}")
+
+    for falha in sorted(set(carga['falhas'])):
+        print(f"  falha: {falha}")
+    divergentes = [i for i, respostas in carga['respostas'].items()
+                   if any(r != esperados[i] for r in respostas)]
+    total = CLIENTES * REQUISICOES_POR_CLIENTE
+    verificacoes = [
+        ("Todas as requisições respondidas", carga['requisicoes'] == total and not carga['falhas']),
+        ("Respostas iguais à pontuação direta do pipeline", not divergentes),
+        ("Zona sem regra ativada volta com escore e categoria null",
+         esperados[-1]['escore_final'] is None and esperados[-1]['categoria'] is None
+         and len(pacientes) - 1 in carga['respostas']),
+        ("Albumina omitida, null e 'N/A' usam o modo simplificado",
+         [e['modo_completo'] for e in esperados[:4]] == [True, False, False, False]),
+        ("Requisições agrupadas em lotes", metricas['requisicoes_por_lote'] > 1.5),
+        ("Histograma soma todas as requisições",
+         sum(int(t) * n for t, n in metricas['histograma_lotes'].items()) == total + 1),
+        ("Métricas contam requisições e pacientes",
+         metricas['requisicoes'] == total + 1 and metricas['pacientes'] == total + 1),
+        ("Lista de pacientes respondida em ordem", lista == esperados[:5]),
+        ("Campo obrigatório ausente -> 400", status_faltando == 400),
+        ("Valor não numérico -> 400", status_texto == 400),
+        ("JSON inválido -> 400", status_json == 400),
+        ("Lista vazia -> 400", status_vazio == 400),
+        ("Valores fora das faixas do formulário -> 400 (IMC 80, idade 5, albumina 0.2)",
+         all(status == 400 for status in status_faixas.values())),
+        ("Valor infinito -> 400", status_infinito == 400),
+        ("Um paciente fora da faixa numa lista -> 400", status_lista_faixa == 400),
+        ("Content-Length não numérico -> 400", status_tamanho_texto == 400),
+        ("Content-Length negativo -> 400 (sem bloquear a conexão)", status_tamanho_negativo == 400),
+        ("Caminho desconhecido -> 404", status_caminho == 404),
+        ("Saúde responde ok", saude == {'status': 'ok'}),
+        ("Serviço continua respondendo após erros", depois_erros == esperados[1]),
+        ("Erros contados nas métricas", metricas_finais['erros'] == 12),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Serviço HTTP de pontuação funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,194 @@
+"""
+Teste do recálculo incremental (sessao_paciente.py)
+
+Confere que a sessão dá os mesmos escores que a avaliação completa, que uma
+nova PCR recalcula só o inflamatório e o integrador, que informar a albumina
+troca para o modo completo, que repetir um valor não recalcula nada, que
+uma zona sem regra ativada deixa a etapa pendente, que albumina NaN é
+ausente e que valores não finitos ou fora das faixas são rejeitados sem
+alterar a sessão.
+"""
+import sys
+import io
+import time
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import calculadora_desktop_albumina_opcional as calc
+from sessao_paciente import SessaoPaciente
+
+PACIENTE = dict(imc=22.0, perda=8.0, sarcopenia=1, vet=60, duracao=10, sintomas=1,
+                pcr=40, albumina=None, febre=1, diagnostico=2, comorbidades=2, idade=70, cirurgia=0)
+
+
+class Contadora:
+    """Repassa as chamadas à calculadora contando quantas vezes cada função foi chamada"""
+
+    def __init__(self):
+        self.chamadas = {}
+
+    def __getattr__(self, nome):
+        funcao = getattr(calc, nome)
+
+        def contada(*args, **kwargs):
+            self.chamadas[nome] = self.chamadas.get(nome, 0) + 1
+            return funcao(*args, **kwargs)
+        return contada
+
+    def zerar(self):
+        self.chamadas = {}
+
+
+def avaliacao_completa(p):
+    escores = [calc.calcular_submodulo_fenotipico(p['imc'], p['perda'], p['sarcopenia']),
+               calc.calcular_submodulo_ingestao(p['vet'], p['duracao'], p['sintomas'])]
+    if p['albumina'] is None:
+        escores.append(calc.calcular_submodulo_inflamatorio_simplificado(p['pcr'], p['febre']))
+    else:
+        escores.append(calc.calcular_submodulo_inflamatorio(p['pcr'], p['albumina'], p['febre']))
+    escores.append(calc.calcular_submodulo_gravidade(p['diagnostico'], p['comorbidades'], p['idade'], p['cirurgia']))
+    return escores + [calc.calcular_risco_final_integrado(*escores, modo_completo=p['albumina'] is not None)]
+
+
+def escores(resultado):
+    return [resultado['escore_fenotipico'], resultado['escore_ingestao'], resultado['escore_inflamatorio'],
+            resultado['escore_gravidade'], resultado['escore_final']]
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("SESSÃO DE PACIENTE - RECÁLCULO INCREMENTAL")
+    print("="*80)
+
+    contadora = Contadora()
+    sessao = SessaoPaciente(contadora, **PACIENTE)
+    primeira = sessao.calcular()
+    chamadas_inicial = sum(contadora.chamadas.values())
+
+    # Novo resultado de PCR
+    contadora.zerar()
+    marcadas_pcr = sessao.atualizar(pcr=120)
+    apos_pcr = sessao.calcular()
+    chamadas_pcr = dict(contadora.chamadas)
+
+    # Chega a albumina: modo completo
+    contadora.zerar()
+    sessao.atualizar(albumina=2.8)
+    apos_albumina = sessao.calcular()
+    chamadas_albumina = dict(contadora.chamadas)
+
+    # Mesmo valor de novo (como a interface reenvia todos os campos)
+    contadora.zerar()
+    marcadas_repetidas = sessao.atualizar(**dict(PACIENTE, pcr=120, albumina=2.8))
+    repetida = sessao.calcular()
+    chamadas_repetidas = sum(contadora.chamadas.values())
+
+    # Albumina retirada com 'N/A': volta ao modo simplificado
+    sessao.atualizar(albumina='N/A')
+    sem_albumina = sessao.calcular()
+
+    # 1 -> 1.0 é o mesmo valor
+    sessao.atualizar(sarcopenia=1.0)
+    sem_mudanca = sessao.pendentes
+
+    # Integrador poupado quando o submódulo recalculado devolve o mesmo escore
+    # (IMC 22 -> 22.1 cai no mesmo plato do fenotípico)
+    contadora.zerar()
+    sessao.atualizar(imc=22.1)
+    plato = sessao.calcular()
+    chamadas_plato = dict(contadora.chamadas)
+
+    # Zona sem regra ativada (IMC 12): erro propagado, etapa continua pendente
+    zona = SessaoPaciente(**dict(PACIENTE, imc=12.0))
+    try:
+        zona.calcular()
+        erro_zona = False
+    except KeyError:
+        erro_zona = True
+    pendente_zona = 'fenotipico' in zona.pendentes
+    zona.atualizar(imc=22.0)
+    recuperada = zona.calcular()
+
+    try:
+        sessao.atualizar(hemoglobina=12)
+        campo_rejeitado = False
+    except KeyError:
+        campo_rejeitado = True
+
+    # Albumina NaN = ausente (modo simplificado, sem KeyError); NaN repetido não suja nada
+    com_nan = SessaoPaciente(**dict(PACIENTE, albumina=float('nan')))
+    resultado_nan = com_nan.calcular()
+    nan_repetido = com_nan.atualizar(albumina=float('nan'))
+
+    # Valores não finitos ou fora das faixas: ValueError, sessão intacta
+    invalidos = [dict(imc=float('inf')), dict(imc=80.0), dict(idade=5.0), dict(pcr=float('-inf')),
+                 dict(albumina=float('inf')), dict(albumina=0.5), dict(pcr=50.0, comorbidades=float('nan'))]
+    intacta = SessaoPaciente(**PACIENTE)
+    entradas_antes = dict(intacta.entradas)
+    rejeitados = 0
+    for valores in invalidos:
+        try:
+            intacta.atualizar(**valores)
+        except ValueError as e:
+            rejeitados += 1
+            print(f"  rejeitado {valores}: {e}")
+    sessao_intacta = intacta.entradas == entradas_antes and intacta.pendentes == {
+        'fenotipico', 'ingestao', 'inflamatorio', 'gravidade', 'integrador'}
+
+    # Custo: avaliação completa x atualização de laboratório
+    rapida = SessaoPaciente(**PACIENTE)
+    rapida.calcular()
+    REPETICOES = 20
+    inicio = time.perf_counter()
+    for i in range(REPETICOES):
+        avaliacao_completa(dict(PACIENTE, pcr=41 + i))
+    tempo_completo = (time.perf_counter() - inicio) / REPETICOES
+    inicio = time.perf_counter()
+    for i in range(REPETICOES):
+        rapida.atualizar(pcr=41 + i)
+        rapida.calcular()
+    tempo_incremental = (time.perf_counter() - inicio) / REPETICOES
+    print(f"Avaliação completa: {1000*tempo_completo:.1f} ms | nova PCR: {1000*tempo_incremental:.1f} ms "
+          f"({tempo_incremental/tempo_completo:.0%})")
+
+    verificacoes = [
+        ("Primeiro cálculo avalia os 5 sistemas", chamadas_inicial == 5),
+        ("Escores iguais à avaliação completa", escores(primeira) == avaliacao_completa(PACIENTE)),
+        ("Nova PCR suja só inflamatório e integrador", marcadas_pcr == {'inflamatorio', 'integrador'}),
+        ("Nova PCR recalcula só inflamatório e integrador",
+         chamadas_pcr == {'calcular_submodulo_inflamatorio_simplificado': 1, 'calcular_risco_final_integrado': 1}),
+        ("Escores após PCR iguais à avaliação completa",
+         escores(apos_pcr) == avaliacao_completa(dict(PACIENTE, pcr=120))),
+        ("Albumina usa o inflamatório completo",
+         chamadas_albumina == {'calcular_submodulo_inflamatorio': 1, 'calcular_risco_final_integrado': 1}),
+        ("Albumina troca para o modo completo",
+         apos_albumina['modo_completo'] and escores(apos_albumina)
+         == avaliacao_completa(dict(PACIENTE, pcr=120, albumina=2.8))),
+        ("Valores repetidos não recalculam nada",
+         marcadas_repetidas == set() and chamadas_repetidas == 0 and repetida == apos_albumina),
+        ("Albumina 'N/A' volta ao modo simplificado", sem_albumina == apos_pcr),
+        ("1 e 1.0 são o mesmo valor", sem_mudanca == set()),
+        ("Escore inalterado não recalcula o integrador",
+         plato == sem_albumina and chamadas_plato == {'calcular_submodulo_fenotipico': 1}),
+        ("Zona sem regra ativada propaga o erro e fica pendente", erro_zona and pendente_zona),
+        ("Sessão se recupera ao corrigir a entrada",
+         escores(recuperada) == avaliacao_completa(PACIENTE)),
+        ("Campo desconhecido é rejeitado", campo_rejeitado),
+        ("Albumina NaN usa o modo simplificado",
+         not resultado_nan['modo_completo'] and escores(resultado_nan) == avaliacao_completa(PACIENTE)),
+        ("Albumina NaN repetida não suja nada", nan_repetido == set()),
+        ("Valores não finitos ou fora das faixas rejeitados", rejeitados == len(invalidos)),
+        ("Atualização rejeitada não altera a sessão", sessao_intacta),
+        ("Nova PCR custa menos da metade da avaliação completa", tempo_incremental * 2 < tempo_completo),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Recálculo incremental funcionando corretamente.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")
@@ -0,0 +1,165 @@
+"""
+Teste do backend de superfícies tabeladas (superficies_lut.py)
+
+Numa amostra fixa de pacientes de cada base de regras, confere que a
+interpolação fica dentro do orçamento de erro documentado contra o motor
+exato, que pacientes em células abaixo de LIMIAR_ATIVACAO (zonas mortas) ou
+não certificadas recebem o escore do motor exato, que a consulta de um
+paciente (avaliar_paciente) e a de arrays (avaliar) dão o mesmo escore, que
+NaN, infinito e valores fora do universo são rejeitados nos dois caminhos,
+que o integrador público usa o motor exato e que sem a certificação o erro
+passa do orçamento.
+"""
+import sys
+import io
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+
+import calculadora_desktop_albumina_opcional as calc
+import motor_vetorizado as mv
+import superficies_lut as lut
+
+AMOSTRAS = 5000
+PACIENTES_INDIVIDUAIS = 300
+ERRO_MAXIMO_TOLERADO = 1.0
+ERRO_P99_TOLERADO = 0.4
+
+
+def amostra(superficie, n, semente):
+    rng = np.random.default_rng(semente)
+    return {entrada: rng.uniform(universo.min(), universo.max(), n)
+            for entrada, universo in zip(superficie.entradas, superficie.motor.universos)}
+
+
+def rejeita(funcao, *argumentos):
+    try:
+        funcao(*argumentos)
+    except ValueError:
+        return True
+    return False
+
+
+if __name__ == "__main__":
+    print("="*96)
+    print(f"SUPERFÍCIES TABELADAS (LUT) - {AMOSTRAS} pacientes por base, "
+          f"orçamento {lut.ERRO_MAXIMO_PADRAO} por célula")
+    print("="*96)
+    print(f"{'Sistema':<28}{'Erro máx.':>11}{'Erro p99':>10}{'% exato':>9}{'Exato idêntico':>16}"
+          f"{'Paciente = array':>18}")
+    print("-"*96)
+
+    resultados = {}
+    for k, nome in enumerate(calc._CONSTRUTORES_SISTEMAS):
+        superficie = lut.obter_superficie(nome)
+        entradas = amostra(superficie, AMOSTRAS, semente=k)
+        exatos = superficie.motor.avaliar(entradas)
+        interpolados = superficie.avaliar(entradas)
+        _, pelo_motor = superficie._interpolar(superficie.motor.colunas_entrada(entradas))
+
+        erros = np.abs(interpolados - exatos)
+        validos = ~np.isnan(erros)
+        # Zonas mortas e células não certificadas: exatamente o escore do motor (inclusive NaN)
+        exato_identico = np.array_equal(interpolados[pelo_motor], exatos[pelo_motor], equal_nan=True)
+        mesmos_nan = np.array_equal(np.isnan(interpolados), np.isnan(exatos))
+
+        individuais = [superficie.avaliar_paciente(*(valores[i] for valores in entradas.values()))
+                       for i in range(PACIENTES_INDIVIDUAIS)]
+        paciente_igual_array = np.allclose(individuais, interpolados[:PACIENTES_INDIVIDUAIS],
+                                           rtol=0, atol=1e-9, equal_nan=True)
+
+        resultados[nome] = {
+            'erro_maximo': float(erros[validos].max()),
+            'erro_p99': float(np.percentile(erros[validos], 99)),
+            'fracao_exata': float(pelo_motor.mean()),
+            'exato_identico': exato_identico and mesmos_nan,
+            'paciente_igual_array': paciente_igual_array,
+        }
+        r = resultados[nome]
+        print(f"{nome:<28}{r['erro_maximo']:>11.3f}{r['erro_p99']:>10.3f}{100*r['fracao_exata']:>9.1f}"
+              f"{'✓' if r['exato_identico'] else '✗':>16}{'✓' if r['paciente_igual_array'] else '✗':>18}")
+
+    # Zona morta do fenotípico (IMC perto de 30): a célula tem vértice abaixo de LIMIAR_ATIVACAO
+    fenotipico = lut.obter_superficie('fenotipico')
+    zona_morta = {'imc': np.array([30.0, 29.95]), 'perda_ponderal': np.array([0.0, 0.5]),
+                  'sarcopenia': np.array([0.0, 0.0])}
+    colunas_zona = fenotipico.motor.colunas_entrada(zona_morta)
+    _, zona_pelo_motor = fenotipico._interpolar(colunas_zona)
+    zona_lut = fenotipico.avaliar(zona_morta)
+    zona_exata = fenotipico.motor.avaliar(zona_morta)
+    zona_paciente = [fenotipico.avaliar_paciente(30.0, 0.0, 0.0), fenotipico.avaliar_paciente(29.95, 0.5, 0.0)]
+
+    # Funções públicas: escalar e array
+    escalar = lut.calcular_submodulo_gravidade(2.0, 1.0, 75.0, 1.0)
+    vetor = lut.calcular_submodulo_gravidade(np.array([2.0, 0.0]), np.array([1.0, 0.0]),
+                                             np.array([75.0, 30.0]), np.array([1.0, 0.0]))
+
+    # Integrador público: motor exato, sem LUT
+    rng = np.random.default_rng(7)
+    escores_sub = [rng.uniform(0, 100, 200) for _ in range(4)]
+    integrador_exato = all(
+        np.array_equal(lut.calcular_risco_final_integrado(*escores_sub, modo_completo=modo),
+                       mv.obter_motor(calc.chave_integrador(modo)).avaliar(
+                           dict(zip(mv.obter_motor(calc.chave_integrador(modo)).entradas, escores_sub))),
+                       equal_nan=True)
+        for modo in (True, False))
+    integrador_escalar = abs(lut.calcular_risco_final_integrado(60, 40, 20, 80)
+                             - calc.calcular_risco_final_integrado(60, 40, 20, 80)) < 1e-9
+
+    # Sem certificação (só zonas mortas), o erro passa do orçamento
+    sem_certificacao = lut.SuperficieLUT('inflamatorio_simplificado', erro_maximo=None)
+    entradas_simpl = amostra(sem_certificacao, AMOSTRAS, semente=99)
+    erro_sem_certificacao = np.nanmax(np.abs(sem_certificacao.avaliar(entradas_simpl)
+                                             - sem_certificacao.motor.avaliar(entradas_simpl)))
+    print(f"\ninflamatorio_simplificado sem certificação: erro máximo {erro_sem_certificacao:.3f}")
+
+    print()
+    verificacoes = [
+        (f"Erro máximo abaixo de {ERRO_MAXIMO_TOLERADO} ponto em todas as bases",
+         all(r['erro_maximo'] < ERRO_MAXIMO_TOLERADO for r in resultados.values())),
+        (f"Erro p99 abaixo de {ERRO_P99_TOLERADO} ponto em todas as bases",
+         all(r['erro_p99'] < ERRO_P99_TOLERADO for r in resultados.values())),
+        ("Pacientes enviados ao motor exato recebem o escore exato (NaN incluído)",
+         all(r['exato_identico'] for r in resultados.values())),
+        ("Zona morta do fenotípico calculada pelo motor exato",
+         bool(zona_pelo_motor.all()) and np.array_equal(zona_lut, zona_exata, equal_nan=True)
+         and np.allclose(zona_paciente, zona_exata, rtol=0, atol=0, equal_nan=True)),
+        ("avaliar_paciente igual ao caminho de arrays em todas as bases",
+         all(r['paciente_igual_array'] for r in resultados.values())),
+        ("Funções públicas: escalar igual ao array", abs(escalar - vetor[0]) < 1e-9),
+        ("NaN rejeitado em avaliar_paciente", rejeita(fenotipico.avaliar_paciente, np.nan, 0.0, 0.0)),
+        ("NaN rejeitado no caminho de arrays",
+         rejeita(fenotipico.avaliar, dict(zona_morta, imc=np.array([22.0, np.nan])))),
+        ("NaN rejeitado nas funções públicas",
+         rejeita(lut.calcular_submodulo_ingestao, 50.0, float('nan'), 1.0)),
+        ("Infinito rejeitado nos dois caminhos",
+         rejeita(fenotipico.avaliar_paciente, np.inf, 0.0, 0.0)
+         and rejeita(fenotipico.avaliar, dict(zona_morta, perda_ponderal=np.array([0.0, -np.inf])))),
+        ("Fora do universo rejeitado nos dois caminhos",
+         rejeita(fenotipico.avaliar_paciente, 80.0, 0.0, 0.0)
+         and rejeita(fenotipico.avaliar, dict(zona_morta, imc=np.array([22.0, 5.0])))
+         and rejeita(lut.calcular_submodulo_inflamatorio_simplificado, -1.0, 0.0)),
+        ("Borda do universo aceita (IMC 50)",
+         not rejeita(fenotipico.avaliar_paciente, 50.0, 0.0, 0.0)
+         and not rejeita(fenotipico.avaliar, dict(zona_morta, imc=np.array([50.0, 12.0])))),
+        ("Integrador público = motor exato (arrays, os dois modos)", integrador_exato),
+        ("Integrador público escalar = calculadora", integrador_escalar),
+        ("Integrador público rejeita NaN e fora do universo",
+         rejeita(lut.calcular_risco_final_integrado, 60.0, float('nan'), 20.0, 80.0)
+         and rejeita(lut.calcular_risco_final_integrado, 60.0, 40.0, 120.0, 80.0)),
+        (f"Sem certificação o erro passa do orçamento ({lut.ERRO_MAXIMO_PADRAO})",
+         erro_sem_certificacao > lut.ERRO_MAXIMO_PADRAO and not sem_certificacao.celula_exata.any()),
+    ]
+
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*96}")
+    if falhas == 0:
+        print("✓ Superfícies tabeladas dentro do orçamento de erro.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*96}")
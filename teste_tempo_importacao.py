@@ -0,0 +1,80 @@
+"""
+Teste do orçamento de tempo de importação dos módulos separados
+
+Importar submodulo1_fenotipico ... modulo_integrador_final não deve carregar
+skfuzzy, numpy nem matplotlib, nem montar os sistemas fuzzy: isso acontece
+no primeiro cálculo. Cada medição roda num processo Python novo (sem módulos
+em cache) e o melhor de REPETICOES tempos precisa caber no orçamento.
+"""
+import sys
+import io
+import json
+import subprocess
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# Orçamento acordado para importar os cinco módulos juntos (segundos)
+ORCAMENTO_IMPORTACAO_S = 0.25
+REPETICOES = 3
+
+MODULOS = ['submodulo1_fenotipico', 'submodulo2_ingestao', 'submodulo3_inflamatorio',
+           'submodulo4_gravidade', 'modulo_integrador_final']
+MODULOS_PESADOS = ['skfuzzy', 'numpy', 'matplotlib']
+
+MEDICAO = f"""
+import json, sys, time
+inicio = time.perf_counter()
+import {', '.join(MODULOS)}
+importacao = time.perf_counter() - inicio
+pesados = [m for m in {MODULOS_PESADOS!r} if m in sys.modules]
+
+inicio = time.perf_counter()
+escore = submodulo1_fenotipico.calcular_risco_fenotipico(23.5, 1.0, 0.0)
+primeiro = time.perf_counter() - inicio
+inicio = time.perf_counter()
+submodulo1_fenotipico.calcular_risco_fenotipico(23.5, 1.0, 0.0)
+segundo = time.perf_counter() - inicio
+
+legado = submodulo1_fenotipico.calculadora_fenotipica.ctrl is submodulo1_fenotipico.sistema_fenotipico
+print(json.dumps({{'importacao': importacao, 'pesados': pesados, 'primeiro': primeiro,
+                  'segundo': segundo, 'escore': escore, 'legado': legado}}))
+"""
+
+
+def medir():
+    saida = subprocess.run([sys.executable, '-c', MEDICAO], capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print(f"TEMPO DE IMPORTAÇÃO DOS MÓDULOS SEPARADOS - orçamento {ORCAMENTO_IMPORTACAO_S*1000:.0f} ms")
+    print("="*80)
+
+    medicoes = [medir() for _ in range(REPETICOES)]
+    melhor = min(m['importacao'] for m in medicoes)
+    m = medicoes[0]
+
+    print(f"Importação dos 5 módulos: {melhor*1000:.1f} ms (melhor de {REPETICOES} processos)")
+    print(f"Primeiro cálculo (carrega skfuzzy e monta o sistema): {m['primeiro']*1000:.0f} ms")
+    print(f"Segundo cálculo: {m['segundo']*1000:.1f} ms\n")
+
+    verificacoes = [
+        (f"Importação dentro do orçamento ({ORCAMENTO_IMPORTACAO_S*1000:.0f} ms)",
+         melhor <= ORCAMENTO_IMPORTACAO_S),
+        ("skfuzzy, numpy e matplotlib não carregados na importação",
+         all(not med['pesados'] for med in medicoes)),
+        ("Primeiro cálculo correto (caso 1 do submódulo 1: escore 25.8)", round(m['escore'], 1) == 25.8),
+        ("Objetos legados (sistema/calculadora) disponíveis sob demanda", m['legado']),
+    ]
+    falhas = 0
+    for descricao, ok in verificacoes:
+        print(f"  {'✓' if ok else '✗'} {descricao}")
+        falhas += not ok
+
+    print(f"\n{'='*80}")
+    if falhas == 0:
+        print("✓ Importação leve: sistemas fuzzy construídos só no primeiro uso.")
+    else:
+        print(f"✗ {falhas} verificação(ões) falharam!")
+        sys.exit(1)
+    print(f"{'='*80}")